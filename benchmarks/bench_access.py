@@ -0,0 +1,88 @@
+"""Benchmark of the chunk cache and driver settings of the Reader.
+
+Writes compressed items of random float32 features in large chunks, then
+reports the mean latency of Reader.read_partial with various file access
+settings: sequential reads of consecutive windows along each item, and random
+reads of windows anywhere in the group. A partial read decodes the whole chunks
+it covers, the sequential reads benefit from a chunk cache large enough to hold
+the chunk being read. The core driver loads the whole file in memory when the
+reader is opened, this time is reported separately.
+
+Usage: python benchmarks/bench_access.py [--items N] [--frames F] [--dim D] [--window W]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from h5features import Item, Reader, Writer
+
+SETTINGS = [
+    ("default", {}),
+    ("chunk cache 8 MB", {"chunk_cache_bytes": 2**23, "chunk_cache_slots": 1009}),
+    ("chunk cache 64 MB", {"chunk_cache_bytes": 2**26, "chunk_cache_slots": 10007}),
+    ("metadata cache 16 MB", {"metadata_cache": 2**24}),
+    ("core driver", {"driver": "core"}),
+    ("core + chunk cache 8 MB", {"driver": "core", "chunk_cache_bytes": 2**23, "chunk_cache_slots": 1009}),
+]
+
+
+def main() -> None:
+    """Run the benchmark and print a line per file access setting."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20, help="number of items, default to %(default)s")
+    parser.add_argument("--frames", type=int, default=4000, help="frames per item, default to %(default)s")
+    parser.add_argument("--dim", type=int, default=256, help="features dimension, default to %(default)s")
+    parser.add_argument("--window", type=int, default=20, help="frames per partial read, default to %(default)s")
+    parser.add_argument("--chunk-bytes", type=int, default=2**21, help="chunk size in bytes, default to %(default)s")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = np.vstack((np.arange(args.frames), np.arange(args.frames) + 1)).T * 0.01
+    items = [
+        Item(f"item{i}", rng.standard_normal((args.frames, args.dim), dtype=np.float32), times)
+        for i in range(args.items)
+    ]
+
+    # the same number of reads in both patterns
+    windows = [(item.name, start * 0.01) for item in items for start in range(0, args.frames, args.window)]
+    random_windows = [
+        (items[i].name, start * 0.01)
+        for i, start in zip(
+            rng.integers(0, args.items, size=len(windows)),
+            rng.integers(0, args.frames - args.window, size=len(windows)),
+            strict=True,
+        )
+    ]
+
+    print(f"{'setting':<26} {'open ms':>8} {'sequential ms':>14} {'random ms':>10}")  # noqa: T201
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = Path(tmpdir) / "bench.h5f"
+        Writer(filename, compression="deflate", compression_level=1, shuffle=True, chunk_bytes=args.chunk_bytes).write(
+            items
+        )
+
+        for name, setting in SETTINGS:
+            start = time.perf_counter()
+            reader = Reader(filename, **setting)
+            reader.items()
+            open_time = time.perf_counter() - start
+
+            latencies = []
+            for pattern in (windows, random_windows):
+                start = time.perf_counter()
+                for item, tstart in pattern:
+                    reader.read_partial(item, start=tstart, stop=tstart + args.window * 0.01)
+                latencies.append((time.perf_counter() - start) / len(pattern))
+
+            print(  # noqa: T201
+                f"{name:<26} {open_time * 1e3:8.1f} {latencies[0] * 1e3:14.3f} {latencies[1] * 1e3:10.3f}"
+            )
+            del reader
+
+
+if __name__ == "__main__":
+    main()
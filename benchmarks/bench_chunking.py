@@ -0,0 +1,78 @@
+"""Benchmark of the chunking policy of the Writer.
+
+Writes items of random float32 features with various chunking policies, then
+reports the mean latency of reading a whole item with Reader.read and of
+reading a short time interval with Reader.read_partial, together with the file
+size. The sweep is done for small (13-dimensional, as MFCCs) and large
+(1024-dimensional, as embeddings) features.
+
+Usage: python benchmarks/bench_chunking.py [--items N] [--frames F] [--window W]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from h5features import Item, Reader, Writer
+
+DIMS = [13, 1024]
+
+POLICIES = [
+    {"access": "partial", "chunk_bytes": 2**12},
+    {"access": "partial", "chunk_bytes": 2**14},
+    {"access": "partial", "chunk_bytes": 2**16},
+    {"access": "partial", "chunk_bytes": 2**18},
+    {"access": "whole", "chunk_bytes": 2**18},
+    {"access": "whole", "chunk_bytes": 2**20},
+    {"access": "whole", "chunk_bytes": 2**22},
+]
+
+
+def main() -> None:
+    """Run the benchmark and print a line per features dimension and chunking policy."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20, help="number of items, default to %(default)s")
+    parser.add_argument("--frames", type=int, default=2000, help="frames per item, default to %(default)s")
+    parser.add_argument("--window", type=int, default=50, help="frames per partial read, default to %(default)s")
+    parser.add_argument("--repeat", type=int, default=5, help="reads per item, default to %(default)s")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = np.vstack((np.arange(args.frames), np.arange(args.frames) + 1)).T * 0.01
+    print(f"{'dim':>5} {'policy':<22} {'read ms':>9} {'partial ms':>11} {'size MB':>8}")  # noqa: T201
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for dim in DIMS:
+            items = [
+                Item(f"item{i}", rng.standard_normal((args.frames, dim), dtype=np.float32), times)
+                for i in range(args.items)
+            ]
+            starts = rng.integers(0, args.frames - args.window, size=(args.items, args.repeat)) * 0.01
+
+            for index, policy in enumerate(POLICIES):
+                name = f"{policy['access']} {policy['chunk_bytes'] // 1024} kB"
+                filename = Path(tmpdir) / f"bench{dim}_{index}.h5f"
+                Writer(filename, compression="deflate", compression_level=1, shuffle=True, **policy).write(items)
+                reader = Reader(filename)
+
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    for item in items:
+                        reader.read(item.name)
+                read_time = (time.perf_counter() - start) / (args.repeat * args.items)
+
+                start = time.perf_counter()
+                for item, item_starts in zip(items, starts, strict=True):
+                    for tstart in item_starts:
+                        reader.read_partial(item.name, start=tstart, stop=tstart + args.window * 0.01)
+                partial_time = (time.perf_counter() - start) / (args.repeat * args.items)
+
+                size = filename.stat().st_size / 2**20
+                print(f"{dim:>5} {name:<22} {read_time * 1e3:9.2f} {partial_time * 1e3:11.2f} {size:8.1f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark of the compression settings of the Writer.
+
+Writes and reads back synthetic speech-like features (smooth 40-dimensional
+log-mel like frames, computed in float32 as most feature extractors do) with
+various compression settings, and reports the write and read throughput in MB/s
+together with the compression ratio. The codecs whose HDF5 filter plugin is not
+available are skipped.
+
+Usage: python benchmarks/bench_compression.py [--items N] [--frames F] [--dim D]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from h5features import Item, Reader, Writer
+
+SETTINGS = [
+    {"compression": "none"},
+    {"compression": "deflate", "compression_level": 1},
+    {"compression": "deflate", "compression_level": 1, "shuffle": True},
+    {"compression": "deflate", "compression_level": 4},
+    {"compression": "deflate", "compression_level": 4, "shuffle": True},
+    {"compression": "deflate", "compression_level": 9},
+    {"compression": "deflate", "compression_level": 9, "shuffle": True},
+    {"compression": "lzf"},
+    {"compression": "lzf", "shuffle": True},
+    {"compression": "zstd", "compression_level": 3},
+    {"compression": "zstd", "compression_level": 3, "shuffle": True},
+    {"compression": "blosc", "compression_level": 5, "shuffle": True},
+]
+
+
+def speech_features(rng: np.random.Generator, frames: int, dim: int) -> np.ndarray:
+    """Return smooth features correlated along time and frequency, as log-mel filterbanks."""
+    noise = rng.standard_normal((frames, dim)).astype(np.float32)
+    kernel = np.hanning(9).astype(np.float32)
+    kernel /= kernel.sum()
+    smooth = np.apply_along_axis(lambda x: np.convolve(x, kernel, mode="same"), 0, noise)
+    envelope = np.linspace(2, -2, dim, dtype=np.float32)
+    return (10 * smooth + envelope).astype(np.float32).astype(np.float64)
+
+
+def main() -> None:
+    """Run the benchmark and print a line per compression setting."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="number of items, default to %(default)s")
+    parser.add_argument("--frames", type=int, default=1000, help="frames per item, default to %(default)s")
+    parser.add_argument("--dim", type=int, default=40, help="features dimension, default to %(default)s")
+    parser.add_argument("--workers", type=int, default=0, help="threads used to compress, default to all cores")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = np.vstack((np.arange(args.frames), np.arange(args.frames) + 1)).T * 0.01
+    items = [Item(f"item{i}", speech_features(rng, args.frames, args.dim), times) for i in range(args.items)]
+    size = args.items * args.frames * (args.dim + 2) * 8 / 2**20
+    print(f"{args.items} items, {size:.1f} MB of data")  # noqa: T201
+
+    print(f"{'compression':<30} {'write MB/s':>10} {'read MB/s':>10} {'ratio':>7}")  # noqa: T201
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for index, settings in enumerate(SETTINGS):
+            name = " ".join(str(value) if key != "shuffle" else "shuffle" for key, value in settings.items())
+            filename = Path(tmpdir) / f"bench{index}.h5f"
+            try:
+                writer = Writer(filename, **settings)
+            except RuntimeError:
+                print(f"{name:<30} {'not available':>10}")  # noqa: T201
+                continue
+
+            start = time.perf_counter()
+            writer.write(items, workers=args.workers)
+            del writer
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            Reader(filename).read_all(workers=args.workers)
+            read_time = time.perf_counter() - start
+
+            ratio = size * 2**20 / filename.stat().st_size
+            print(f"{name:<30} {size / write_time:10.1f} {size / read_time:10.1f} {ratio:7.2f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Memory benchmark of the numpy <-> h5features.Item conversions.
+
+Measures the peak memory overhead when building an Item from numpy arrays (with
+and without copy) and when accessing its features. Each scenario runs in its own
+process so the peak resident set size is not polluted by previous runs.
+
+Usage: python benchmarks/bench_memory.py [--frames N] [--dim D]
+"""
+
+import argparse
+import multiprocessing
+import resource
+
+import numpy as np
+
+from h5features import Item
+
+
+def peak_rss() -> int:
+    """Return the peak resident set size of the current process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+
+def scenario(frames: int, dim: int, *, copy: bool, queue: multiprocessing.Queue) -> None:
+    """Build an item from a (frames, dim) array and access its features 10 times."""
+    features = np.random.default_rng(0).random((frames, dim))
+    times = np.arange(frames, dtype=np.float64)
+    baseline = peak_rss()
+
+    item = Item("item", features, times, copy=copy)
+    after_init = peak_rss()
+
+    views = [item.features() for _ in range(10)]
+    after_access = peak_rss()
+
+    assert all(view.shape == (frames, dim) for view in views)
+    queue.put((after_init - baseline, after_access - baseline))
+
+
+def main() -> None:
+    """Run the benchmark and print the memory overhead of each scenario."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=1_000_000, help="number of frames, default to %(default)s")
+    parser.add_argument("--dim", type=int, default=128, help="features dimension, default to %(default)s")
+    args = parser.parse_args()
+
+    size = args.frames * args.dim * 8 // 2**20
+    print(f"features: {args.frames} x {args.dim} float64 ({size} MB)")  # noqa: T201
+
+    context = multiprocessing.get_context("spawn")
+    for copy in (True, False):
+        queue = context.Queue()
+        process = context.Process(target=scenario, args=(args.frames, args.dim), kwargs={"copy": copy, "queue": queue})
+        process.start()
+        init, access = queue.get()
+        process.join()
+        print(f"copy={copy!s:5}  Item() overhead: {init:6d} MB  features() x 10 overhead: {access:6d} MB")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
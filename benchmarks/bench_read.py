@@ -0,0 +1,63 @@
+"""Benchmark of the parallel read of a whole h5features file.
+
+Writes a file of compressed random items and reports the time taken by
+``Reader.read_all`` for an increasing number of workers.
+
+Usage: python benchmarks/bench_read.py [--items N] [--frames F] [--dim D]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from h5features import Item, Reader, Writer
+
+
+def generate(filename: Path, items: int, frames: int, dim: int) -> int:
+    """Write `items` random items in `filename`, return the size of the data in bytes."""
+    rng = np.random.default_rng(0)
+    writer = Writer(filename, compress=True)
+    for i in range(items):
+        # integer valued features so that compression is meaningful
+        features = rng.integers(0, 256, (frames, dim)).astype(np.float64)
+        times = np.arange(frames, dtype=np.float64) * 0.01
+        writer.write(Item(f"item{i}", features, times))
+    return items * frames * (dim + 1) * 8
+
+
+def main() -> None:
+    """Run the benchmark and print the read time for each number of workers."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500, help="number of items, default to %(default)s")
+    parser.add_argument("--frames", type=int, default=1000, help="frames per item, default to %(default)s")
+    parser.add_argument("--dim", type=int, default=40, help="features dimension, default to %(default)s")
+    parser.add_argument("--repeat", type=int, default=3, help="best time of N runs, default to %(default)s")
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} cores available")  # noqa: T201
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = Path(tmpdir) / "bench.h5f"
+        size = generate(filename, args.items, args.frames, args.dim) / 2**20
+        print(f"{args.items} items, {size:.1f} MB of data, {filename.stat().st_size / 2**20:.1f} MB on disk")  # noqa: T201
+
+        reader = Reader(filename)
+        workers = 1
+        reference = None
+        while workers <= (os.cpu_count() or 1):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                reader.read_all(workers=workers)
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            reference = reference or best
+            print(f"workers={workers:3d}  {best:.3f}s  {size / best:8.1f} MB/s  speedup x{reference / best:.2f}")  # noqa: T201
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Benchmark suite of the h5features read and write hot paths.
+
+Generates synthetic speech-like corpora and times ``Writer.write``,
+``Reader.read_all``, ``Reader.read``, ``Reader.read_partial`` and
+``Reader.list_groups`` for each combination of format version, number of items,
+mean duration, features dimension, compression and properties of the selected
+preset. Reports the throughput, the latency percentiles and the peak resident
+set size of each scenario as JSON. Each scenario runs in its own process so the
+peak resident set size is not polluted by previous runs.
+
+The native counterpart is ``benchmarks/benchmark.cpp``, built as the
+``benchmark`` executable along with the tests. Both report the same JSON
+layout, so the overhead of the Python bindings can be compared.
+
+Usage: python benchmarks/bench_suite.py [--preset quick|default|full] [--output FILE] [--seed N]
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from importlib.metadata import version as package_version
+from pathlib import Path
+
+import numpy as np
+
+from h5features import Item, Reader, Version, Writer
+
+# The frame shift and window length of the features, in seconds
+FRAME_SHIFT = 0.01
+FRAME_LENGTH = 0.025
+
+# The maximal number of calls timed for the per-item operations
+MAX_CALLS = 500
+
+# The number of calls timed for list_groups
+LIST_GROUPS_CALLS = 100
+
+# The duration of the partial reads, in seconds
+PARTIAL_DURATION = 1.0
+
+# The axes of each preset as (items, durations, dims), the scenarios are their cartesian product
+PRESETS = {
+    "quick": ([100], [2.0], [40]),
+    "default": ([1000], [3.0], [13, 80]),
+    "full": ([100, 2000], [1.0, 10.0], [13, 80]),
+}
+
+
+def scenarios(preset: str) -> list[dict]:
+    """Return the scenarios of a preset."""
+    items, durations, dims = PRESETS[preset]
+    return [
+        {
+            "version": version,
+            "items": nitems,
+            "duration": duration,
+            "dim": dim,
+            "compress": compress,
+            "properties": properties,
+        }
+        for version, nitems, duration, dim, compress, properties in itertools.product(
+            ["1.2", "2.0"], items, durations, dims, [False, True], [False, True]
+        )
+    ]
+
+
+def generate_item(name: str, frames: int, dim: int, rng: np.random.Generator, *, properties: bool) -> Item:
+    """Generate an utterance of ``frames`` frames.
+
+    The features are temporally correlated like cepstral coefficients and
+    rounded to single precision as most extractors do, so that compression
+    ratios are realistic.
+    """
+    noise = 0.44 * rng.standard_normal((frames, dim))
+    features = np.empty((frames, dim))
+    previous = np.zeros(dim)
+    for i in range(frames):
+        previous = 0.9 * previous + noise[i]
+        features[i] = previous
+    features = features.astype(np.float32).astype(np.float64)
+
+    start = np.arange(frames) * FRAME_SHIFT
+    times = np.stack((start, start + FRAME_LENGTH), axis=1)
+
+    props = None
+    if properties:
+        speaker = int(rng.integers(100))
+        props = {
+            "speaker": f"spk{speaker}",
+            "gender": "f" if speaker % 2 == 0 else "m",
+            "channel": 1,
+            "duration": frames * FRAME_SHIFT,
+        }
+    return Item(name, features, times, props)
+
+
+def generate_corpus(scenario: dict, rng: np.random.Generator) -> list[Item]:
+    """Generate a corpus of utterances with log-normal durations."""
+    sigma = 0.5
+    durations = rng.lognormal(np.log(scenario["duration"]) - sigma**2 / 2, sigma, scenario["items"])
+    return [
+        generate_item(
+            f"utt{i:06d}",
+            max(10, int(duration / FRAME_SHIFT)),
+            scenario["dim"],
+            rng,
+            properties=scenario["properties"],
+        )
+        for i, duration in enumerate(durations)
+    ]
+
+
+def item_bytes(item: Item) -> int:
+    """Return the number of bytes of features and times in an item."""
+    return item.size * (item.dim + 2) * 8
+
+
+def peak_rss() -> float:
+    """Return the peak resident set size of the current process in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+
+
+def measure(seconds: float, calls: int, nbytes: int = 0, latencies: list[float] | None = None) -> dict:
+    """Return the statistics of an operation as a dictionary."""
+    result = {"seconds": seconds, "calls": calls, "calls_per_s": calls / seconds}
+    if nbytes:
+        result |= {"bytes": nbytes, "throughput_mb_s": nbytes / 2**20 / seconds}
+    if latencies:
+        latencies_ms = np.asarray(latencies) * 1e3
+        result["latency_ms"] = {
+            "mean": float(latencies_ms.mean()),
+            "p50": float(np.percentile(latencies_ms, 50, method="inverted_cdf")),
+            "p90": float(np.percentile(latencies_ms, 90, method="inverted_cdf")),
+            "p99": float(np.percentile(latencies_ms, 99, method="inverted_cdf")),
+            "max": float(latencies_ms.max()),
+        }
+    return result
+
+
+def run(scenario: dict, filename: Path, seed: int, queue: multiprocessing.Queue) -> None:
+    """Run a scenario and send its results to the ``queue``."""
+    rng = np.random.default_rng(seed)
+    corpus = generate_corpus(scenario, rng)
+    nbytes = sum(item_bytes(item) for item in corpus)
+    frames = sum(item.size for item in corpus)
+    benchmarks = {}
+
+    start = time.perf_counter()
+    version = Version.v1_2 if scenario["version"] == "1.2" else Version.v2_0
+    Writer(filename, overwrite=True, compress=scenario["compress"], version=version).write(corpus)
+    benchmarks["write"] = measure(time.perf_counter() - start, len(corpus), nbytes)
+
+    start = time.perf_counter()
+    Reader(filename).read_all()
+    benchmarks["read_all"] = measure(time.perf_counter() - start, len(corpus), nbytes)
+
+    # the items and the partial read windows are sampled beforehand
+    sampled = rng.integers(len(corpus), size=min(MAX_CALLS, len(corpus)))
+    windows = [rng.uniform(0, max(0, corpus[i].size * FRAME_SHIFT - PARTIAL_DURATION)) for i in sampled]
+
+    reader = Reader(filename)
+    latencies, read_bytes = [], 0
+    for i in sampled:
+        start = time.perf_counter()
+        item = reader.read(corpus[i].name)
+        latencies.append(time.perf_counter() - start)
+        read_bytes += item_bytes(item)
+    benchmarks["read_item"] = measure(sum(latencies), len(sampled), read_bytes, latencies)
+
+    latencies, read_bytes = [], 0
+    for i, window in zip(sampled, windows, strict=True):
+        start = time.perf_counter()
+        item = reader.read_partial(corpus[i].name, window, window + PARTIAL_DURATION)
+        latencies.append(time.perf_counter() - start)
+        read_bytes += item_bytes(item)
+    benchmarks["read_partial"] = measure(sum(latencies), len(sampled), read_bytes, latencies)
+    del reader
+
+    latencies = []
+    for _ in range(LIST_GROUPS_CALLS):
+        start = time.perf_counter()
+        Reader.list_groups(filename)
+        latencies.append(time.perf_counter() - start)
+    benchmarks["list_groups"] = measure(sum(latencies), LIST_GROUPS_CALLS, latencies=latencies)
+
+    queue.put(
+        {
+            "scenario": scenario,
+            "corpus": {"frames": frames, "bytes": nbytes, "file_bytes": filename.stat().st_size},
+            "peak_rss_mb": peak_rss(),
+            "benchmarks": benchmarks,
+        }
+    )
+
+
+def main() -> None:
+    """Run the scenarios of a preset and write their results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--preset", choices=PRESETS, default="default", help="scenarios to run, default to %(default)s"
+    )
+    parser.add_argument("--output", type=Path, help="JSON file to write, default to standard output")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the corpora, default to %(default)s")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = Path(tmpdir) / "features.h5"
+        todo = scenarios(args.preset)
+        for i, scenario in enumerate(todo):
+            print(f"scenario {i + 1}/{len(todo)}", file=sys.stderr)  # noqa: T201
+            queue = context.Queue()
+            process = context.Process(target=run, args=(scenario, filename, args.seed, queue))
+            process.start()
+            results.append(queue.get())
+            process.join()
+
+    report = {
+        "suite": "python",
+        "h5features": package_version("h5features"),
+        "preset": args.preset,
+        "seed": args.seed,
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with args.output.open("w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
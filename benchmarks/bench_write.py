@@ -0,0 +1,57 @@
+"""Benchmark of the pipelined write of a list of items.
+
+Reports the time taken by ``Writer.write(items)`` to write compressed random
+items for an increasing number of workers.
+
+Usage: python benchmarks/bench_write.py [--items N] [--frames F] [--dim D]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from h5features import Item, Writer
+
+
+def main() -> None:
+    """Run the benchmark and print the write time for each number of workers."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="number of items, default to %(default)s")
+    parser.add_argument("--frames", type=int, default=1000, help="frames per item, default to %(default)s")
+    parser.add_argument("--dim", type=int, default=40, help="features dimension, default to %(default)s")
+    parser.add_argument("--repeat", type=int, default=3, help="best time of N runs, default to %(default)s")
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} cores available")  # noqa: T201
+
+    # integer valued features so that compression is meaningful
+    rng = np.random.default_rng(0)
+    times = np.arange(args.frames, dtype=np.float64) * 0.01
+    items = [
+        Item(f"item{i}", rng.integers(0, 256, (args.frames, args.dim)).astype(np.float64), times)
+        for i in range(args.items)
+    ]
+    size = args.items * args.frames * (args.dim + 1) * 8 / 2**20
+    print(f"{args.items} items, {size:.1f} MB of data")  # noqa: T201
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workers = 1
+        reference = None
+        while workers <= (os.cpu_count() or 1):
+            timings = []
+            for repeat in range(args.repeat):
+                filename = Path(tmpdir) / f"bench_{workers}_{repeat}.h5f"
+                start = time.perf_counter()
+                Writer(filename, compress=True).write(items, workers=workers)
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            reference = reference or best
+            print(f"workers={workers:3d}  {best:.3f}s  {size / best:8.1f} MB/s  speedup x{reference / best:.2f}")  # noqa: T201
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
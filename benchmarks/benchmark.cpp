@@ -0,0 +1,362 @@
+// Native benchmark of the h5features read and write hot paths.
+//
+// Generates synthetic speech-like corpora and times writer::write,
+// reader::read_all, reader::read_item, partial reads and reader::list_groups
+// for each combination of format version, number of items, mean duration,
+// features dimension, compression and properties of the selected preset.
+// Reports the throughput, the latency percentiles and the peak resident set
+// size of each scenario as JSON. The Python counterpart is bench_suite.py.
+//
+// Usage: benchmark [--preset quick|default|full] [--output FILE] [--seed N] [--tmpdir DIR]
+
+#include "h5features.h"
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <cstddef>
+#include <filesystem>
+#include <fstream>
+#include <iomanip>
+#include <iostream>
+#include <numeric>
+#include <optional>
+#include <random>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <vector>
+
+#ifndef _WIN32
+#include <sys/resource.h>
+#endif
+
+namespace {
+// The frame shift and window length of the features, in seconds
+constexpr double frame_shift = 0.01;
+constexpr double frame_length = 0.025;
+
+// The maximal number of calls timed for the per-item operations
+constexpr std::size_t max_calls = 500;
+
+// The number of calls timed for list_groups
+constexpr std::size_t list_groups_calls = 100;
+
+// The duration of the partial reads, in seconds
+constexpr double partial_duration = 1.0;
+
+// A benchmark configuration
+struct scenario {
+  h5features::version version;
+  std::size_t items;
+  double duration;
+  std::size_t dim;
+  bool compress;
+  bool properties;
+};
+
+// The timings of an operation
+struct measure {
+  // The total duration of the operation in seconds
+  double seconds = 0;
+
+  // The number of bytes of features and times processed
+  std::size_t bytes = 0;
+
+  // The latency of each call in seconds
+  std::vector<double> latencies{};
+};
+
+// The axes of a preset, the scenarios are their cartesian product
+struct preset {
+  std::vector<std::size_t> items;
+  std::vector<double> durations;
+  std::vector<std::size_t> dims;
+};
+
+preset get_preset(const std::string &name) {
+  if (name == "quick") {
+    return {{100}, {2.0}, {40}};
+  }
+  if (name == "default") {
+    return {{1000}, {3.0}, {13, 80}};
+  }
+  if (name == "full") {
+    return {{100, 2000}, {1.0, 10.0}, {13, 80}};
+  }
+  throw std::invalid_argument("unknown preset " + name + ", must be quick, default or full");
+}
+
+std::vector<scenario> make_scenarios(const preset &preset) {
+  std::vector<scenario> scenarios;
+  for (const auto version : {h5features::version::v1_2, h5features::version::v2_0}) {
+    for (const auto items : preset.items) {
+      for (const auto duration : preset.durations) {
+        for (const auto dim : preset.dims) {
+          for (const bool compress : {false, true}) {
+            for (const bool properties : {false, true}) {
+              scenarios.push_back({version, items, duration, dim, compress, properties});
+            }
+          }
+        }
+      }
+    }
+  }
+  return scenarios;
+}
+
+// Generates an utterance of `frames` frames. The features are temporally
+// correlated like cepstral coefficients and rounded to single precision as
+// most extractors do, so that compression ratios are realistic.
+h5features::item generate_item(const std::string &name, std::size_t frames, std::size_t dim, bool properties,
+                               std::mt19937 &engine) {
+  std::normal_distribution<double> noise{0, 1};
+  std::vector<double> features(frames * dim);
+  std::vector<double> previous(dim, 0);
+  for (std::size_t i = 0; i < frames; ++i) {
+    for (std::size_t j = 0; j < dim; ++j) {
+      previous[j] = 0.9 * previous[j] + 0.44 * noise(engine);
+      features[i * dim + j] = static_cast<float>(previous[j]);
+    }
+  }
+
+  std::vector<double> start(frames);
+  std::vector<double> stop(frames);
+  for (std::size_t i = 0; i < frames; ++i) {
+    start[i] = static_cast<double>(i) * frame_shift;
+    stop[i] = start[i] + frame_length;
+  }
+
+  h5features::properties props;
+  if (properties) {
+    const auto speaker = std::uniform_int_distribution<int>{0, 99}(engine);
+    props.set<std::string>("speaker", "spk" + std::to_string(speaker));
+    props.set<std::string>("gender", speaker % 2 == 0 ? "f" : "m");
+    props.set<int>("channel", 1);
+    props.set<double>("duration", static_cast<double>(frames) * frame_shift);
+  }
+
+  return {name, {features, dim}, {start, stop}, props};
+}
+
+// Generates a corpus of utterances with log-normal durations
+std::vector<h5features::item> generate_corpus(const scenario &scenario, std::mt19937 &engine) {
+  constexpr double sigma = 0.5;
+  std::lognormal_distribution<double> duration{std::log(scenario.duration) - sigma * sigma / 2, sigma};
+
+  std::vector<h5features::item> corpus;
+  corpus.reserve(scenario.items);
+  for (std::size_t i = 0; i < scenario.items; ++i) {
+    const auto frames = std::max<std::size_t>(10, static_cast<std::size_t>(duration(engine) / frame_shift));
+    std::ostringstream name;
+    name << "utt" << std::setw(6) << std::setfill('0') << i;
+    corpus.push_back(generate_item(name.str(), frames, scenario.dim, scenario.properties, engine));
+  }
+  return corpus;
+}
+
+// Returns the number of bytes of features and times in an item
+std::size_t item_bytes(const h5features::item &item) { return item.size() * (item.dim() + 2) * sizeof(double); }
+
+// Times a single call of `func`, in seconds
+template <class Function> double timeit(Function &&func) {
+  const auto start = std::chrono::steady_clock::now();
+  func();
+  return std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
+
+// Resets the peak resident set size, only supported on Linux
+void reset_peak_rss() {
+#ifdef __linux__
+  std::ofstream{"/proc/self/clear_refs"} << "5";
+#endif
+}
+
+// Returns the peak resident set size in MB, since the last reset on Linux
+std::optional<double> peak_rss() {
+#ifdef __linux__
+  std::ifstream status{"/proc/self/status"};
+  for (std::string line; std::getline(status, line);) {
+    if (line.rfind("VmHWM:", 0) == 0) {
+      return std::stod(line.substr(6)) / 1024;
+    }
+  }
+#endif
+#if defined(__APPLE__)
+  rusage usage{};
+  getrusage(RUSAGE_SELF, &usage);
+  return static_cast<double>(usage.ru_maxrss) / (1024 * 1024);
+#elif !defined(_WIN32)
+  rusage usage{};
+  getrusage(RUSAGE_SELF, &usage);
+  return static_cast<double>(usage.ru_maxrss) / 1024;
+#else
+  return std::nullopt;
+#endif
+}
+
+// Returns the percentile `q` of sorted values, using the nearest rank
+double percentile(const std::vector<double> &sorted, double q) {
+  const auto rank = static_cast<std::size_t>(std::ceil(q / 100 * static_cast<double>(sorted.size())));
+  return sorted[std::max<std::size_t>(rank, 1) - 1];
+}
+
+void to_json(std::ostream &os, const measure &measure, std::size_t calls) {
+  os << "{\"seconds\": " << measure.seconds << ", \"calls\": " << calls
+     << ", \"calls_per_s\": " << static_cast<double>(calls) / measure.seconds;
+  if (measure.bytes != 0) {
+    os << ", \"bytes\": " << measure.bytes
+       << ", \"throughput_mb_s\": " << static_cast<double>(measure.bytes) / (1024 * 1024) / measure.seconds;
+  }
+  if (not measure.latencies.empty()) {
+    auto sorted = measure.latencies;
+    std::sort(sorted.begin(), sorted.end());
+    const auto mean = std::accumulate(sorted.begin(), sorted.end(), 0.0) / static_cast<double>(sorted.size());
+    os << ", \"latency_ms\": {\"mean\": " << mean * 1e3 << ", \"p50\": " << percentile(sorted, 50) * 1e3
+       << ", \"p90\": " << percentile(sorted, 90) * 1e3 << ", \"p99\": " << percentile(sorted, 99) * 1e3
+       << ", \"max\": " << sorted.back() * 1e3 << "}";
+  }
+  os << "}";
+}
+
+// Runs a scenario and sends its results to `os` as a JSON object
+void run(std::ostream &os, const scenario &scenario, const std::filesystem::path &filename, unsigned seed) {
+  reset_peak_rss();
+  std::mt19937 engine{seed};
+  const auto corpus = generate_corpus(scenario, engine);
+  std::size_t bytes = 0;
+  std::size_t frames = 0;
+  for (const auto &item : corpus) {
+    bytes += item_bytes(item);
+    frames += item.size();
+  }
+
+  measure write{};
+  write.bytes = bytes;
+  write.seconds = timeit([&] {
+    h5features::writer writer{filename.string(), "features", true, scenario.compress, scenario.version};
+    writer.write(corpus.begin(), corpus.end());
+  });
+
+  measure read_all{};
+  read_all.bytes = bytes;
+  read_all.seconds = timeit([&] { static_cast<void>(h5features::reader{filename.string(), "features"}.read_all()); });
+
+  // the items and the partial read windows are sampled beforehand
+  const auto calls = std::min(max_calls, corpus.size());
+  std::uniform_int_distribution<std::size_t> index{0, corpus.size() - 1};
+  std::vector<std::size_t> sampled(calls);
+  std::generate(sampled.begin(), sampled.end(), [&] { return index(engine); });
+  std::vector<double> windows(calls);
+  for (std::size_t i = 0; i < calls; ++i) {
+    const auto duration = static_cast<double>(corpus[sampled[i]].size()) * frame_shift;
+    windows[i] = std::uniform_real_distribution<double>{0, std::max(0.0, duration - partial_duration)}(engine);
+  }
+
+  measure read_item{};
+  measure read_partial{};
+  {
+    const h5features::reader reader{filename.string(), "features"};
+    for (const auto i : sampled) {
+      read_item.latencies.push_back(timeit([&] { read_item.bytes += item_bytes(reader.read_item(corpus[i].name())); }));
+    }
+    for (std::size_t i = 0; i < calls; ++i) {
+      const auto &name = corpus[sampled[i]].name();
+      read_partial.latencies.push_back(timeit([&] {
+        read_partial.bytes += item_bytes(reader.read_item(name, windows[i], windows[i] + partial_duration));
+      }));
+    }
+  }
+  read_item.seconds = std::accumulate(read_item.latencies.begin(), read_item.latencies.end(), 0.0);
+  read_partial.seconds = std::accumulate(read_partial.latencies.begin(), read_partial.latencies.end(), 0.0);
+
+  measure list_groups{};
+  for (std::size_t i = 0; i < list_groups_calls; ++i) {
+    list_groups.latencies.push_back(
+        timeit([&] { static_cast<void>(h5features::reader::list_groups(filename.string())); }));
+  }
+  list_groups.seconds = std::accumulate(list_groups.latencies.begin(), list_groups.latencies.end(), 0.0);
+
+  const auto rss = peak_rss();
+  os << "    {\"scenario\": {\"version\": \"" << scenario.version << "\", \"items\": " << scenario.items
+     << ", \"duration\": " << scenario.duration << ", \"dim\": " << scenario.dim
+     << ", \"compress\": " << (scenario.compress ? "true" : "false")
+     << ", \"properties\": " << (scenario.properties ? "true" : "false") << "},\n"
+     << "     \"corpus\": {\"frames\": " << frames << ", \"bytes\": " << bytes
+     << ", \"file_bytes\": " << std::filesystem::file_size(filename) << "},\n"
+     << "     \"peak_rss_mb\": ";
+  if (rss.has_value()) {
+    os << rss.value();
+  } else {
+    os << "null";
+  }
+  os << ",\n     \"benchmarks\": {\n       \"write\": ";
+  to_json(os, write, corpus.size());
+  os << ",\n       \"read_all\": ";
+  to_json(os, read_all, corpus.size());
+  os << ",\n       \"read_item\": ";
+  to_json(os, read_item, calls);
+  os << ",\n       \"read_partial\": ";
+  to_json(os, read_partial, calls);
+  os << ",\n       \"list_groups\": ";
+  to_json(os, list_groups, list_groups_calls);
+  os << "}}";
+}
+
+int usage(const char *program) {
+  std::cerr << "usage: " << program << " [--preset quick|default|full] [--output FILE] [--seed N] [--tmpdir DIR]\n";
+  return 1;
+}
+} // namespace
+
+int main(int argc, char **argv) {
+  std::string preset_name = "default";
+  std::string output;
+  unsigned seed = 0;
+  auto tmpdir = std::filesystem::temp_directory_path();
+  for (int i = 1; i < argc; i += 2) {
+    const std::string arg = argv[i];
+    if (i + 1 == argc) {
+      return usage(argv[0]);
+    }
+    if (arg == "--preset") {
+      preset_name = argv[i + 1];
+    } else if (arg == "--output") {
+      output = argv[i + 1];
+    } else if (arg == "--seed") {
+      seed = static_cast<unsigned>(std::stoul(argv[i + 1]));
+    } else if (arg == "--tmpdir") {
+      tmpdir = argv[i + 1];
+    } else {
+      return usage(argv[0]);
+    }
+  }
+
+  std::vector<scenario> scenarios;
+  try {
+    scenarios = make_scenarios(get_preset(preset_name));
+  } catch (const std::invalid_argument &error) {
+    std::cerr << error.what() << '\n';
+    return usage(argv[0]);
+  }
+
+  const auto filename = tmpdir / ("h5features_benchmark_" + std::to_string(std::random_device{}()) + ".h5");
+  std::ostringstream results;
+  results << "{\n  \"suite\": \"native\",\n  \"h5features\": \"" << H5FEATURES_VERSION << "\",\n  \"preset\": \""
+          << preset_name << "\",\n  \"seed\": " << seed << ",\n  \"cpus\": " << std::thread::hardware_concurrency()
+          << ",\n  \"results\": [\n";
+  for (std::size_t i = 0; i < scenarios.size(); ++i) {
+    std::cerr << "scenario " << i + 1 << "/" << scenarios.size() << '\n';
+    run(results, scenarios[i], filename, seed);
+    results << (i + 1 < scenarios.size() ? ",\n" : "\n");
+  }
+  results << "  ]\n}\n";
+  std::filesystem::remove(filename);
+
+  if (output.empty()) {
+    std::cout << results.str();
+  } else {
+    std::ofstream{output} << results.str();
+  }
+  return 0;
+}
@@ -0,0 +1,115 @@
+#ifndef H5FEATURES_APPENDER_H
+#define H5FEATURES_APPENDER_H
+
+#include "h5features/details/stats_recorder.h"
+#include "h5features/details/writer_interface.h"
+#include "h5features/features.h"
+#include "h5features/properties.h"
+#include "h5features/times.h"
+#include <cstddef>
+#include <memory>
+#include <string>
+
+namespace h5features {
+class writer;
+
+/**
+   \brief Writes an item to file by blocks of frames
+
+   An appender is returned by `h5features::writer::open_item`. It writes an
+   item whose features are computed incrementally, a recording being
+   processed block by block for instance, without holding the whole item in
+   memory. The features and times datasets of the item are extended chunk by
+   chunk, each chunk being compressed and written once: the memory used is
+   bounded by the size of a block plus one chunk, whatever the length of the
+   item.
+
+   The item is complete once the appender is closed, this writes its
+   attributes and properties. The item is discarded if the appender is
+   destroyed before being closed, if a write operation fails or if its writer
+   is closed first.
+
+ */
+class appender {
+public:
+  /// Discards the item if the appender is not closed
+  virtual ~appender();
+
+  /// Move constructor
+  appender(appender &&) = default;
+
+  /**
+     \brief Appends a block of frames to the item
+
+     \param features The features of the frames, with the dimension and dtype
+     given to `h5features::writer::open_item`
+     \param times The timestamps of the frames, they must follow the
+     timestamps already appended
+
+     \throw h5features::exception If the features and times are not
+     consistent with the item, if the appender is closed or if the write
+     operation failed. The item is discarded when the write operation failed.
+
+   */
+  void append(const h5features::features &features, const h5features::times &times);
+
+  /**
+     \brief Writes the remaining frames and the properties, and closes the item
+
+     The appender cannot be used after being closed.
+
+     \param properties The properties of the item
+
+     \throw h5features::exception If the item is empty, if the appender is
+     closed or if the write operation failed. The item is discarded when the
+     write operation failed.
+
+   */
+  void close(const h5features::properties &properties = {});
+
+  /**
+     \brief Discards the item and closes the appender
+
+     The incomplete item is removed from the file. This does nothing if the
+     appender is closed.
+
+     \throw h5features::exception If the item cannot be removed
+
+   */
+  void abort();
+
+  /// Returns true if the appender is closed
+  bool closed() const noexcept;
+
+  /// Returns the name of the item
+  std::string name() const;
+
+  /// Returns the number of frames appended so far
+  std::size_t size() const noexcept;
+
+private:
+  friend class h5features::writer;
+
+  // Appenders are instantiated by `h5features::writer::open_item`
+  appender(std::shared_ptr<h5features::details::item_stream> stream,
+           std::shared_ptr<h5features::details::stats_recorder> recorder);
+
+  // Copy disabled
+  appender(const appender &) = delete;
+
+  // Copy disabled
+  appender &operator=(const appender &) = delete;
+
+  // The item being written, shared with the writer to discard it when the
+  // writer is closed first. Null once moved.
+  std::shared_ptr<h5features::details::item_stream> m_stream;
+
+  // The I/O statistics of the writer, null when disabled
+  std::shared_ptr<h5features::details::stats_recorder> m_recorder;
+
+  // Returns the item being written or throws if the appender is closed
+  h5features::details::item_stream &checked_stream() const;
+};
+} // namespace h5features
+
+#endif // H5FEATURES_APPENDER_H
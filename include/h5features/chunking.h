@@ -0,0 +1,93 @@
+#ifndef H5FEATURES_CHUNKING_H
+#define H5FEATURES_CHUNKING_H
+
+#include <cstddef>
+#include <iostream>
+#include <string>
+
+namespace h5features {
+/**
+   \brief The chunking policy of the features written by a `h5features::writer`
+
+   The features of an item are stored in chunks of consecutive frames, a chunk
+   being the unit of I/O and compression in HDF5: reading a single frame
+   requires to read and decompress its whole chunk. The chunk size is chosen
+   per item from a target size in bytes and from the expected access pattern:
+
+   - `access::partial` is for items read with `h5features::reader::read_item`
+     on time intervals. The chunks hold as many frames as fit in the target
+     size (at least one frame, at most the whole item), so that a partial read
+     only decodes the chunks it covers. The default target is 64 kB.
+   - `access::whole` is for items always read entirely. An item smaller than
+     the target is stored in a single chunk, a larger one is split in chunks of
+     balanced sizes, each below the target. The default target is 1 MB.
+
+   The chunking policy applies on the features in version 2.0 only.
+
+ */
+class chunking {
+public:
+  /// The expected access pattern to the items
+  enum class access { whole, partial };
+
+  /**
+     \brief Instantiates a chunking policy
+
+     \param access The expected access pattern to the items
+     \param target_bytes The target size of a chunk in bytes, when 0 use the
+     default of the access pattern: 1 MB for `access::whole` and 64 kB for
+     `access::partial`
+
+     \throw h5features::exception If `target_bytes` is 4 GB or more (the HDF5
+     limit on chunks size)
+
+   */
+  explicit chunking(access access = access::partial, std::size_t target_bytes = 0);
+
+  /// Returns the expected access pattern
+  access get_access() const noexcept;
+
+  /// Returns the target size of a chunk in bytes
+  std::size_t target_bytes() const noexcept;
+
+  /**
+     \brief Returns the number of frames in a chunk
+
+     \param size The number of frames in the item
+     \param frame_bytes The size of a frame in bytes
+
+   */
+  std::size_t frames(std::size_t size, std::size_t frame_bytes) const noexcept;
+
+  /// Returns true if the two chunking policies are equal
+  bool operator==(const chunking &other) const noexcept;
+
+  /// Returns true if the two chunking policies are different
+  bool operator!=(const chunking &other) const noexcept;
+
+  /**
+     \brief Returns the access pattern from its name
+
+     \param name The access pattern name, either "whole" or "partial"
+
+     \throw h5features::exception If the name is not a known access pattern
+
+   */
+  static access parse_access(const std::string &name);
+
+private:
+  // The expected access pattern
+  access m_access;
+
+  // The target size of a chunk in bytes
+  std::size_t m_target_bytes;
+};
+
+/// Sends an access pattern name to stream
+std::ostream &operator<<(std::ostream &os, h5features::chunking::access access);
+
+/// Sends a chunking policy to stream
+std::ostream &operator<<(std::ostream &os, const h5features::chunking &chunking);
+} // namespace h5features
+
+#endif // H5FEATURES_CHUNKING_H
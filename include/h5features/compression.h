@@ -0,0 +1,109 @@
+#ifndef H5FEATURES_COMPRESSION_H
+#define H5FEATURES_COMPRESSION_H
+
+#include "h5features/hdf5.h"
+#include <iostream>
+#include <string>
+
+namespace h5features {
+/**
+   \brief The compression settings of the data written by a `h5features::writer`
+
+   The compression is made of a codec, a compression level and an optional byte
+   shuffle filter applied before compression. Shuffling regroups the bytes of
+   the same significance of the float values and usually improves the
+   compression ratio of features.
+
+   The `deflate` codec and the shuffle filter are always available. Other codecs
+   are optional and require the corresponding HDF5 filter plugin to be installed
+   (see `compression::is_available`). Data compressed with `deflate` is
+   compressed in parallel by the writer, other codecs are applied by HDF5.
+
+ */
+class compression {
+public:
+  /// The available compression codecs
+  enum class codec { none, deflate, lzf, zstd, blosc };
+
+  /**
+     \brief Instantiates compression settings
+
+     \param codec The compression codec
+     \param level The compression level, when -1 use the default level of the
+     codec: 9 for deflate (level in [1, 9]), 3 for zstd (level in [1, 22]) and
+     5 for blosc (level in [0, 9]). Ignored for none and lzf.
+     \param shuffle When true apply the byte shuffle filter before compression,
+     ignored for none.
+
+     \throw h5features::exception If the level is not valid for the codec
+
+   */
+  explicit compression(codec codec = codec::deflate, int level = -1, bool shuffle = false);
+
+  /// Returns the compression codec
+  codec get_codec() const noexcept;
+
+  /// Returns the compression level, 0 if the codec has no level
+  int level() const noexcept;
+
+  /// Returns true if the byte shuffle filter is applied before compression
+  bool shuffle() const noexcept;
+
+  /// Returns true if the data is compressed
+  bool enabled() const noexcept;
+
+  /// Returns true if the two compression settings are equal
+  bool operator==(const compression &other) const noexcept;
+
+  /// Returns true if the two compression settings are different
+  bool operator!=(const compression &other) const noexcept;
+
+  /**
+     \brief Returns true if a codec is available in the HDF5 library
+
+     Optional codecs are available if the HDF5 filter plugin is found in the
+     `HDF5_PLUGIN_PATH` directory.
+
+   */
+  static bool is_available(codec codec);
+
+  /**
+     \brief Returns the codec from its name
+
+     \param name The codec name, one of "none", "deflate", "lzf", "zstd" or
+     "blosc"
+
+     \throw h5features::exception If the name is not a known codec
+
+   */
+  static codec parse_codec(const std::string &name);
+
+  /**
+     \brief Adds the compression filters to dataset creation properties
+
+     \param props The properties of a chunked dataset
+
+     \throw h5features::exception If the codec is not available
+
+   */
+  void apply(hdf5::DataSetCreateProps &props) const;
+
+private:
+  // The compression codec
+  codec m_codec;
+
+  // The compression level
+  int m_level;
+
+  // True if the byte shuffle filter is applied
+  bool m_shuffle;
+};
+
+/// Sends a compression codec name to stream
+std::ostream &operator<<(std::ostream &os, h5features::compression::codec codec);
+
+/// Sends compression settings to stream
+std::ostream &operator<<(std::ostream &os, const h5features::compression &compression);
+} // namespace h5features
+
+#endif // H5FEATURES_COMPRESSION_H
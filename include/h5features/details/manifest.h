@@ -0,0 +1,67 @@
+#ifndef H5FEATURES_MANIFEST_H
+#define H5FEATURES_MANIFEST_H
+
+#include <cstddef>
+#include <filesystem>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace h5features {
+namespace details {
+/**
+   \brief An entry of a manifest: the name of an item and its shard
+
+   The shard is the name of a file relative to the directory of the sharded
+   dataset.
+
+ */
+using manifest_entry = std::pair<std::string, std::string>;
+
+/// Returns the name of the manifest written by the writer of rank `rank`
+std::string manifest_name(std::size_t rank);
+
+/// Returns the name of the shard `index` written by the writer of rank `rank`
+std::string shard_name(std::size_t rank, std::size_t index);
+
+/**
+   \brief Returns the manifests of a sharded dataset, ordered by rank
+
+   The manifests are the files named `manifest-<rank>.tsv` in `directory`.
+
+ */
+std::vector<std::filesystem::path> list_manifests(const std::filesystem::path &directory);
+
+/**
+   \brief Returns the shards written by the writer of rank `rank`
+
+   The shards are the files named `shard-<rank>-<index>.h5` in `directory`,
+   ordered by index. They are found on disk: the shard being written when a
+   writer was interrupted is not in the manifest.
+
+ */
+std::vector<std::filesystem::path> list_shards(const std::filesystem::path &directory, std::size_t rank);
+
+/**
+   \brief Reads the entries of a manifest
+
+   A manifest is a text file with one `<item>\t<shard>` line per item.
+
+   \throw h5features::exception If the file cannot be read or if a line is
+   not valid
+
+ */
+std::vector<h5features::details::manifest_entry> read_manifest(const std::filesystem::path &filename);
+
+/**
+   \brief Appends entries to a manifest, the file is created if needed
+
+   \throw h5features::exception If the file cannot be written
+
+ */
+void append_manifest(const std::filesystem::path &filename,
+                     const std::vector<h5features::details::manifest_entry> &entries);
+} // namespace details
+} // namespace h5features
+
+#endif // H5FEATURES_MANIFEST_H
@@ -0,0 +1,79 @@
+#ifndef H5FEATURES_MAPPED_FILE_H
+#define H5FEATURES_MAPPED_FILE_H
+
+#include "h5features/dtype.h"
+#include "h5features/hdf5.h"
+#include "h5features/span.h"
+#include <cstddef>
+#include <map>
+#include <optional>
+#include <string>
+#include <utility>
+
+namespace h5features {
+namespace details {
+/**
+   \brief A read-only memory map of a whole HDF5 file
+
+   The mapping gives access to the raw data of the datasets stored without
+   compression, bypassing the HDF5 read pipeline. The data are shared with the
+   page cache of the operating system, so several processes reading the same
+   file share the same memory.
+
+ */
+class mapped_file {
+public:
+  /**
+     \brief Maps a file in memory
+
+     \param filename The file to map
+     \throw h5features::exception If the file cannot be mapped
+   */
+  explicit mapped_file(const std::string &filename);
+
+  /// Unmaps the file
+  ~mapped_file();
+
+  /// Returns the size of the mapped file in bytes
+  std::size_t size() const noexcept;
+
+  /**
+     \brief Returns a view on the data of a dataset
+
+     The dataset can be mapped if it is stored without filter, with the
+     native datatype of `dtype`, and either contiguous or in chunks stored one
+     after the other in the file. The location of the data is resolved once
+     per dataset and cached. This must be called with the HDF5 lock held.
+
+     \param dataset A dataset of the mapped file
+     \param dtype The type of the dataset elements in memory
+     \return The data of the dataset, or nothing if it cannot be mapped
+
+   */
+  std::optional<h5features::span<const std::byte>> view(const hdf5::DataSet &dataset, h5features::dtype dtype) const;
+
+private:
+  // Copy disabled
+  mapped_file(const mapped_file &) = delete;
+  mapped_file &operator=(const mapped_file &) = delete;
+
+  // The beginning of the mapped file
+  const std::byte *m_data;
+
+  // The size of the mapped file in bytes
+  std::size_t m_size;
+
+  // The address of the data of the datasets already viewed, by object address
+  // of the dataset and dtype, `HADDR_UNDEF` if it cannot be mapped. The number
+  // of elements is stored so that a dataset extended since is resolved again.
+  mutable std::map<std::pair<haddr_t, h5features::dtype>, std::pair<std::size_t, haddr_t>> m_addresses;
+
+#ifdef _WIN32
+  // The handle on the file mapping
+  void *m_mapping;
+#endif
+};
+} // namespace details
+} // namespace h5features
+
+#endif // H5FEATURES_MAPPED_FILE_H
@@ -2,7 +2,11 @@
 #define H5FEATURES_PROPERTIES_READER_H
 
 #include "h5features/hdf5.h"
+#include "h5features/item.h"
 #include "h5features/properties.h"
+#include "h5features/span.h"
+#include <cstddef>
+#include <string>
 
 namespace h5features {
 namespace details {
@@ -10,6 +14,23 @@ namespace details {
    Read properties from a given HDF5 group
  */
 h5features::properties read_properties(const hdf5::Group &group);
+
+/**
+   Decodes properties encoded by `h5features::details::encode_properties()`
+
+   \throw h5features::exception If the encoded properties are not valid
+ */
+h5features::properties decode_properties(h5features::span<const std::byte> encoded);
+
+/**
+   Read the properties stored as the object `name` of a given HDF5 group
+
+   The properties are either stored as a group (see `write_properties()`) or as
+   a dataset of encoded properties (see `encode_properties()`). The encoded
+   properties are read but decoded on the first access to the item's
+   properties.
+ */
+h5features::item::lazy_properties read_lazy_properties(const hdf5::Group &group, const std::string &name);
 } // namespace details
 } // namespace h5features
 
@@ -3,6 +3,9 @@
 
 #include "h5features/hdf5.h"
 #include "h5features/properties.h"
+#include <cstddef>
+#include <string>
+#include <vector>
 
 namespace h5features {
 namespace details {
@@ -23,6 +26,37 @@ namespace details {
 
 */
 void write_properties(const h5features::properties &properties, hdf5::Group &group, bool compress);
+
+/**
+   Encodes properties in a compact binary format
+
+   The whole properties tree is serialized in a single buffer, so that it is
+   written and read as a single dataset. This does not call HDF5. The buffer
+   starts with the magic bytes `H5FP` and a format version, then each property
+   is encoded as its name, a type tag and its value. The integers are little
+   endian and the properties are sorted by name.
+
+   \param properties The properties to encode
+   \return The encoded properties
+
+   \see h5features::details::decode_properties
+
+*/
+std::vector<std::byte> encode_properties(const h5features::properties &properties);
+
+/**
+   Write encoded properties as a dataset of bytes
+
+   \param encoded The properties encoded with `encode_properties()`
+   \param group The HDF5 group to write the properties to
+   \param name The name of the dataset to create in the group
+   \param compress When true, compress the dataset
+
+   \throw h5features::exception If the dataset cannot be written
+
+*/
+void write_properties(const std::vector<std::byte> &encoded, hdf5::Group &group, const std::string &name,
+                      bool compress);
 } // namespace details
 } // namespace h5features
 
@@ -0,0 +1,206 @@
+#ifndef H5FEATURES_RAW_DATASET_H
+#define H5FEATURES_RAW_DATASET_H
+
+#include "h5features/compression.h"
+#include "h5features/dtype.h"
+#include "h5features/features.h"
+#include "h5features/hdf5.h"
+#include "h5features/span.h"
+#include <cstddef>
+#include <string>
+#include <vector>
+
+namespace h5features {
+namespace details {
+/**
+   \brief The content of a 1D dataset of floats, as stored on file
+
+   This class separates the HDF5 calls from the CPU bound work of compression
+   and decompression, so that the latter can be executed concurrently in
+   several threads while the former are serialized by the HDF5 lock (see
+   `details::lock_hdf5()`).
+
+   Reading a dataset is split in two steps. The constructor from a dataset
+   reads its content and must be called with the HDF5 lock held. Then
+   `decode()` returns the data without calling HDF5. When the dataset is
+   chunked and only filtered by shuffle and/or deflate, the chunks are read as
+   they are stored on disk (with `H5Dread_chunk`) and decoded by `decode()`.
+   Otherwise the dataset is entirely read and decoded by HDF5 in the
+   constructor.
+
+   Writing a dataset is split in two steps as well. The constructor from data
+   splits it in chunks, shuffles and compresses them with deflate without
+   calling HDF5. Then `write()` creates the dataset and writes the chunks as
+   they are (with `H5Dwrite_chunk`), it must be called with the HDF5 lock held.
+   When using another compression codec, the data is encoded by HDF5 in
+   `write()`.
+
+ */
+class raw_dataset {
+public:
+  /**
+     \brief Reads the raw content of a dataset
+
+     \param dataset The dataset to read, must be a 1D dataset
+     \param dtype The type of the data in memory, the data is converted by
+     HDF5 if the dataset is of another type
+
+     \throw h5features::exception If the read operation failed
+
+   */
+  explicit raw_dataset(const hdf5::DataSet &dataset, h5features::dtype dtype = h5features::dtype::float64);
+
+  /**
+     \brief Encodes data to be written in a dataset
+
+     When `chunk_size` is 0 or the codec is not deflate, the data is not copied
+     and must remain valid until `write()` is called.
+
+     \param data The bytes of the data to encode
+     \param dtype The type of the data, the dataset is created with that type
+     \param chunk_size The number of elements in a chunk, 0 for a contiguous
+     dataset
+     \param compression The compression settings, ignored for a contiguous
+     dataset
+
+     \throw h5features::exception If a chunk cannot be compressed
+
+   */
+  raw_dataset(h5features::span<const std::byte> data, h5features::dtype dtype, std::size_t chunk_size,
+              const h5features::compression &compression);
+
+  /// Encodes float64 data, see above
+  raw_dataset(h5features::span<const double> data, std::size_t chunk_size, const h5features::compression &compression);
+
+  /**
+     \brief Decodes and returns the dataset content
+
+     This method must be called only once.
+
+     \tparam T The type of the data in memory, must match the dtype given to
+     the constructor
+
+     \throw h5features::exception If a chunk cannot be decompressed
+
+   */
+  template <class T> std::vector<T> decode() {
+    check_dtype(h5features::details::dtype_of<T>::value);
+    std::vector<T> data(m_size);
+    decode(reinterpret_cast<char *>(data.data()));
+    return data;
+  }
+
+  /**
+     \brief Decodes the dataset content as features of dimension `dim`
+
+     The features have the dtype given to the constructor.
+
+     \throw h5features::exception If a chunk cannot be decompressed
+
+   */
+  h5features::features decode_features(std::size_t dim);
+
+  /**
+     \brief Creates a dataset and writes the encoded data in it
+
+     \param group The group in which to create the dataset
+     \param name The name of the dataset to create
+
+     \return The created dataset
+
+     \throw hdf5::Exception If the dataset cannot be created
+     \throw h5features::exception If a chunk cannot be written
+
+   */
+  hdf5::DataSet write(hdf5::Group &group, const std::string &name) const;
+
+  /**
+     \brief Writes the encoded data at `offset` in an extendable dataset
+
+     The dataset is extended to `offset` plus the size of the data. It must
+     be chunked with the chunk size given to the constructor, and `offset`
+     must be the start of a chunk.
+
+     \throw hdf5::Exception If the dataset cannot be extended
+     \throw h5features::exception If a chunk cannot be written
+
+   */
+  void write(hdf5::DataSet &dataset, std::size_t offset) const;
+
+private:
+  // A chunk as stored on disk
+  struct chunk {
+    // index of the first element of the chunk in the dataset
+    std::size_t offset;
+
+    // a bit is set for each filter skipped for this chunk
+    unsigned int filter_mask;
+
+    // the chunk content, possibly compressed
+    std::vector<char> bytes;
+  };
+
+  // Returns true if the chunks of the dataset can be read and decoded directly
+  bool init_filters(const hdf5::DataSet &dataset);
+
+  // Returns true if the filter at `position` is applied on the chunk
+  static bool is_applied(const chunk &chunk, int position) noexcept;
+
+  // Throws if the data is not of type `dtype`
+  void check_dtype(h5features::dtype dtype) const;
+
+  // Writes the encoded chunks in `dataset` from the element `offset`
+  void write_chunks(const hdf5::DataSet &dataset, std::size_t offset) const;
+
+  // Decodes the dataset content to `destination`, of `m_size` elements
+  void decode(char *destination);
+
+  // The type of the elements
+  h5features::dtype m_dtype;
+
+  // Size in bytes of an element
+  std::size_t m_element_size;
+
+  // Number of elements in the dataset
+  std::size_t m_size;
+
+  // Number of elements in a chunk, 0 for a contiguous dataset
+  std::size_t m_chunk_size;
+
+  // True if the chunks are encoded and decoded out of HDF5
+  bool m_direct;
+
+  // The compression settings, when writing
+  h5features::compression m_compression;
+
+  // Position of the shuffle filter in the pipeline, -1 if not applied
+  int m_shuffle;
+
+  // Position of the deflate filter in the pipeline, -1 if not applied
+  int m_deflate;
+
+  // The raw chunks as stored on disk
+  std::vector<chunk> m_chunks;
+
+  // The dataset content, when decoded by HDF5
+  std::vector<char> m_data;
+
+  // The data to write, when encoded by HDF5
+  h5features::span<const std::byte> m_view;
+};
+
+/**
+   \brief Reads a selection of a features dataset, keeping the dtype on file
+
+   This must be called with the HDF5 lock held.
+
+   \param selection The selection to read, of `size * dim` elements
+   \param dtype The type of the features in memory (see `read_dtype()`)
+   \param dim The dimension of the features
+
+ */
+h5features::features read_features(const hdf5::Selection &selection, h5features::dtype dtype, std::size_t dim);
+} // namespace details
+} // namespace h5features
+
+#endif // H5FEATURES_RAW_DATASET_H
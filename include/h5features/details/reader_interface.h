@@ -1,14 +1,40 @@
 #ifndef H5FEATURES_READER_INTERFACE_H
 #define H5FEATURES_READER_INTERFACE_H
 
+#include "h5features/dtype.h"
 #include "h5features/hdf5.h"
 #include "h5features/item.h"
 #include "h5features/version.h"
+#include <cstddef>
+#include <functional>
 #include <string>
+#include <tuple>
+#include <utility>
 #include <vector>
 
 namespace h5features {
 namespace details {
+/// A function returning an item, see `reader_interface::fetch_item`
+using deferred_item = std::function<h5features::item()>;
+
+/// A name of item and a time interval, see `reader_interface::read_segments`
+using segment = std::tuple<std::string, double, double>;
+
+/// The shape of an item on file, see `reader_interface::read_shape`
+struct item_shape {
+  /// The number of frames
+  std::size_t size;
+
+  /// The dimension of the features
+  std::size_t dim;
+
+  /// The type of the features on file
+  h5features::dtype dtype;
+
+  /// The dimension of the times, 1 or 2
+  std::size_t times_dim;
+};
+
 class reader_interface {
 public:
   reader_interface(hdf5::Group &&group, h5features::version version);
@@ -17,13 +43,64 @@ public:
 
   h5features::version version() const noexcept;
 
+  // Returns the group being read
+  const hdf5::Group &group() const noexcept;
+
   virtual std::vector<std::string> items() const = 0;
 
+  // Returns the number of frames of each item, in the same order as `items()`
+  virtual std::vector<std::size_t> sizes() const = 0;
+
+  // Returns the dimension of the features of each item, in the same order as
+  // `items()`
+  virtual std::vector<std::size_t> dims() const = 0;
+
+  // Returns the first and last timestamps of each item, in the same order as
+  // `items()`
+  virtual std::vector<std::pair<double, double>> time_spans() const = 0;
+
   virtual h5features::item read_item(const std::string &name, bool ignore_properties = false) const = 0;
 
   virtual h5features::item read_item(const std::string &name, double start, double stop,
                                      bool ignore_properties = false) const = 0;
 
+  // Reads the features of the frames [start, stop) of an item
+  virtual h5features::features read_frames(const std::string &name, std::size_t start, std::size_t stop) const = 0;
+
+  // Returns the shape of an item, reading its metadata only
+  virtual item_shape read_shape(const std::string &name) const = 0;
+
+  // Reads the features and times of an item of the given `shape` into
+  // `features` and `times`, which have room for all its frames. The features
+  // are converted to `dtype` by HDF5, without intermediate buffer.
+  virtual void read_item_into(const std::string &name, const item_shape &shape, std::byte *features,
+                              h5features::dtype dtype, double *times) const = 0;
+
+  // Reads the content of an item from file and returns a function decoding it.
+  // This must be called with the HDF5 lock held, the returned function does
+  // not call HDF5 and can be executed concurrently. The default implementation
+  // reads the whole item.
+  virtual deferred_item fetch_item(const std::string &name, bool ignore_properties = false) const;
+
+  // Reads several items, returned in the same order as `names`. This must be
+  // called with the HDF5 lock held. The default implementation reads the items
+  // one by one.
+  virtual std::vector<h5features::item> read_items(const std::vector<std::string> &names,
+                                                   bool ignore_properties = false) const;
+
+  // Partial reads of several segments, returned in the same order as
+  // `segments`. The segments are grouped by item and each item is read once
+  // with `read_item_segments`. This must be called with the HDF5 lock held.
+  std::vector<h5features::item> read_segments(const std::vector<segment> &segments,
+                                              bool ignore_properties = false) const;
+
+  // Partial reads of an item within several time intervals, returned in the
+  // same order as `intervals`. The default implementation reads the intervals
+  // one by one.
+  virtual std::vector<h5features::item> read_item_segments(const std::string &name,
+                                                           const std::vector<std::pair<double, double>> &intervals,
+                                                           bool ignore_properties = false) const;
+
 protected:
   // The underlying HDF5 group to read from
   const hdf5::Group m_group;
@@ -31,6 +108,14 @@ protected:
   // The h5features file version
   h5features::version m_version;
 };
+
+// Reads the features of several ranges of frames [first, last) of an item. The
+// ranges are merged in sorted and disjoint runs, overlapping or adjacent ranges
+// being merged, and `read` is called once to read the features of all the
+// runs, concatenated. The returned features share its buffer.
+std::vector<h5features::features>
+read_ranges(const std::vector<std::pair<std::size_t, std::size_t>> &ranges,
+            const std::function<h5features::features(const std::vector<std::pair<std::size_t, std::size_t>> &)> &read);
 } // namespace details
 } // namespace h5features
 
@@ -0,0 +1,118 @@
+#ifndef H5FEATURES_STATS_RECORDER_H
+#define H5FEATURES_STATS_RECORDER_H
+
+#include "h5features/hdf5.h"
+#include "h5features/stats.h"
+#include <chrono>
+#include <cstddef>
+#include <functional>
+#include <memory>
+#include <mutex>
+
+namespace h5features {
+namespace details {
+/// A function receiving statistics, see `stats_recorder`
+using stats_callback = std::function<void(const h5features::stats &)>;
+
+/// An operation counted in `h5features::stats`
+using stats_operation = h5features::stats::operation h5features::stats::*;
+
+/**
+   \brief Accumulates the statistics of a reader or a writer
+
+   The recorder is thread safe. The operations are recorded in the recorder of
+   the current `stats_scope`.
+
+ */
+class stats_recorder {
+public:
+  /// Instantiates a recorder, `callback` is called at the end of each scope
+  explicit stats_recorder(stats_callback callback = nullptr);
+
+  /// Returns the statistics recorded so far
+  h5features::stats get() const;
+
+  /// Resets the statistics to zero
+  void reset();
+
+  /// Records an execution of `operation` lasting `seconds`
+  void add(stats_operation operation, double seconds);
+
+  /// Records bytes read from file, uncompressed and as stored
+  void add_read(std::size_t bytes, std::size_t stored_bytes);
+
+  /// Records bytes written to file, uncompressed and as stored
+  void add_written(std::size_t bytes, std::size_t stored_bytes);
+
+  /// Calls the callback, if any, with the statistics recorded so far
+  void notify() const;
+
+private:
+  mutable std::mutex m_mutex;
+  h5features::stats m_stats;
+  stats_callback m_callback;
+};
+
+/**
+   \brief Sets the recorder of the current thread for the lifetime of the scope
+
+   The operations executed in the thread within the scope are recorded.
+   Nothing is recorded out of a scope or when the recorder is null, so that
+   instrumentation is almost free when statistics are disabled. When `notify`
+   is true, the recorder callback is called at the end of the scope, unless
+   the scope is nested in another scope of the same recorder.
+
+ */
+class stats_scope {
+public:
+  stats_scope(std::shared_ptr<stats_recorder> recorder, bool notify = true);
+
+  ~stats_scope();
+
+  /// Returns the recorder of the current thread, null if none
+  static const std::shared_ptr<stats_recorder> &current() noexcept;
+
+private:
+  stats_scope(const stats_scope &) = delete;
+  stats_scope &operator=(const stats_scope &) = delete;
+
+  // The recorder of the enclosing scope
+  std::shared_ptr<stats_recorder> m_previous;
+
+  // True if the callback is called at the end of the scope
+  bool m_notify;
+};
+
+/// Times an operation and records it in the current scope on destruction
+class stats_timer {
+public:
+  explicit stats_timer(stats_operation operation);
+
+  ~stats_timer();
+
+private:
+  stats_timer(const stats_timer &) = delete;
+  stats_timer &operator=(const stats_timer &) = delete;
+
+  stats_recorder *m_recorder;
+  stats_operation m_operation;
+  std::chrono::steady_clock::time_point m_start;
+};
+
+/// Returns true if the operations are recorded in the current thread
+bool recording_stats() noexcept;
+
+/// Records `bytes` read from a `dataset`, the bytes stored on file are
+/// estimated from the compression ratio of the dataset
+void record_read(const hdf5::DataSet &dataset, std::size_t bytes);
+
+/// Records bytes written to file, uncompressed and as stored
+void record_written(std::size_t bytes, std::size_t stored_bytes);
+
+/// Returns the hit rate of the HDF5 metadata cache of the file containing
+/// `object`, and resets it if `reset` is true
+double metadata_cache_hit_rate(const hdf5::Object &object, bool reset = false);
+} // namespace details
+} // namespace h5features
+
+#endif // H5FEATURES_STATS_RECORDER_H
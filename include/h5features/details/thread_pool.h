@@ -0,0 +1,106 @@
+#ifndef H5FEATURES_THREAD_POOL_H
+#define H5FEATURES_THREAD_POOL_H
+
+#include <condition_variable>
+#include <cstddef>
+#include <functional>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <queue>
+#include <thread>
+#include <type_traits>
+#include <utility>
+#include <vector>
+
+namespace h5features {
+namespace details {
+/**
+   \brief A fixed size pool of threads executing tasks in FIFO order
+
+   The pool is used to parallelize the CPU bound parts of reading and writing
+   (compression, decompression and items assembly). Tasks must not call the
+   HDF5 library without holding the lock returned by `details::lock_hdf5()`.
+
+ */
+class thread_pool {
+public:
+  /**
+     \brief Starts a pool of `workers` threads
+
+     \param workers The number of threads in the pool, when 0 use the number
+     of cores available (see `thread_pool::default_workers()`).
+
+   */
+  explicit thread_pool(std::size_t workers);
+
+  /// Waits for the pending tasks to complete and joins the threads
+  ~thread_pool();
+
+  /// Returns the number of threads in the pool
+  std::size_t size() const noexcept;
+
+  /// Returns the number of cores available, at least 1
+  static std::size_t default_workers() noexcept;
+
+  /**
+     \brief Schedules a task for execution
+
+     \param task The function to execute, without arguments
+     \return A future on the result of the task. If the task throws, the
+     exception is rethrown when calling `get()` on the future.
+
+   */
+  template <class Task> std::future<std::invoke_result_t<Task>> submit(Task &&task) {
+    auto packaged = std::make_shared<std::packaged_task<std::invoke_result_t<Task>()>>(std::forward<Task>(task));
+    auto future = packaged->get_future();
+    push([packaged]() { (*packaged)(); });
+    return future;
+  }
+
+private:
+  // Copy disabled
+  thread_pool(const thread_pool &) = delete;
+
+  // Copy disabled
+  thread_pool &operator=(const thread_pool &) = delete;
+
+  // Pushes a task in the queue and notify a worker
+  void push(std::function<void()> &&task);
+
+  // The loop executed by each worker thread
+  void work();
+
+  // The tasks waiting for execution
+  std::queue<std::function<void()>> m_tasks;
+
+  // Protects the access to tasks and stopping flag
+  std::mutex m_mutex;
+
+  // Notifies workers a task is available or the pool is stopping
+  std::condition_variable m_condition;
+
+  // True when the pool is being destroyed
+  bool m_stopping;
+
+  // The worker threads
+  std::vector<std::thread> m_workers;
+};
+
+/// Returns the identifier of the current process
+long current_pid();
+
+/**
+   \brief Returns the I/O thread executing the asynchronous reads
+
+   A single thread per process executes the asynchronous reads of all the
+   readers, in order: the calls to HDF5 are serialized anyway. The thread is
+   started on first use, and started again in a process forked from a process
+   using it, where the thread no longer exists.
+
+ */
+thread_pool &io_thread();
+} // namespace details
+} // namespace h5features
+
+#endif // H5FEATURES_THREAD_POOL_H
@@ -0,0 +1,93 @@
+#ifndef H5FEATURES_TIME_INDEX_H
+#define H5FEATURES_TIME_INDEX_H
+
+#include "h5features/hdf5.h"
+#include "h5features/times.h"
+#include <cstddef>
+#include <optional>
+#include <utility>
+#include <vector>
+
+namespace h5features {
+namespace details {
+/**
+   \brief A sparse index of the timestamps of an item
+
+   The index samples the timestamps of one frame every `step` frames. It
+   locates the frames within a time interval up to `step` frames, so that a
+   partial read only needs the timestamps of those frames instead of the whole
+   times dataset. The index is stored as the attributes `index` and
+   `index_step` of the times dataset, and only for items longer than a few
+   steps.
+
+ */
+class time_index {
+public:
+  /// Builds the index of `times`, it is empty if `times` is short
+  explicit time_index(const h5features::times &times);
+
+  /**
+     \brief Starts an empty index of timestamps of dimension `dim`
+
+     The index is then built by `append()`, for an item written by blocks of
+     frames.
+
+   */
+  explicit time_index(std::size_t dim);
+
+  /**
+     \brief Indexes timestamps following the ones already indexed
+
+     The length of the item is not known in advance: the step starts at its
+     minimum and doubles, dropping every other sample, when the samples exceed
+     their maximal number. The index is empty if the item is short.
+
+   */
+  void append(const h5features::times &times);
+
+  /**
+     \brief Reads the index stored with a times dataset
+
+     \param dataset The times dataset
+     \param size The number of frames in the dataset
+     \param dim The dimension of the timestamps
+     \return The index, or nothing if the dataset has no index
+
+   */
+  static std::optional<time_index> read(const hdf5::DataSet &dataset, std::size_t size, std::size_t dim);
+
+  /// Writes the index as attributes of the times dataset, if not empty
+  void write(hdf5::DataSet &dataset) const;
+
+  /// Returns true if the index is empty
+  bool empty() const noexcept;
+
+  /**
+     \brief Returns a range of frames including the frames within `[start, stop]`
+
+     The returned range `[first, last)` contains the indices returned by
+     `h5features::times::get_indices(start, stop)`, it is empty if there is no
+     frame in `[start, stop]`.
+
+   */
+  std::pair<std::size_t, std::size_t> search(double start, double stop) const;
+
+private:
+  time_index(std::vector<double> &&samples, std::size_t size, std::size_t dim, std::size_t step);
+
+  // The number of frames in the indexed times
+  std::size_t m_size;
+
+  // The dimension of the timestamps (1 or 2)
+  std::size_t m_dim;
+
+  // The number of frames between two samples
+  std::size_t m_step;
+
+  // The timestamps of the frames 0, step, 2 * step, ...
+  std::vector<double> m_samples;
+};
+} // namespace details
+} // namespace h5features
+
+#endif // H5FEATURES_TIME_INDEX_H
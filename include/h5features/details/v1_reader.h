@@ -5,7 +5,9 @@
 #include "h5features/hdf5.h"
 #include "h5features/item.h"
 #include "h5features/version.h"
+#include <optional>
 #include <string>
+#include <unordered_map>
 #include <utility>
 #include <vector>
 
@@ -17,28 +19,66 @@ public:
 
   std::vector<std::string> items() const override;
 
+  std::vector<std::size_t> sizes() const override;
+
+  std::vector<std::size_t> dims() const override;
+
+  std::vector<std::pair<double, double>> time_spans() const override;
+
   h5features::item read_item(const std::string &name, bool ignore_properties) const override;
 
   h5features::item read_item(const std::string &name, double start, double stop, bool ignore_properties) const override;
 
+  h5features::features read_frames(const std::string &name, std::size_t start, std::size_t stop) const override;
+
+  h5features::details::item_shape read_shape(const std::string &name) const override;
+
+  void read_item_into(const std::string &name, const h5features::details::item_shape &shape, std::byte *features,
+                      h5features::dtype dtype, double *times) const override;
+
+  // Reads the items by runs of items contiguous on file, each run being read
+  // in a single selection of the features and times datasets
+  std::vector<h5features::item> read_items(const std::vector<std::string> &names,
+                                           bool ignore_properties) const override;
+
+  // Reads the times of the item once and its features in a single selection
+  std::vector<h5features::item> read_item_segments(const std::string &name,
+                                                   const std::vector<std::pair<double, double>> &intervals,
+                                                   bool ignore_properties) const override;
+
 private:
   // The list of items stored in the file
   std::vector<std::string> m_items;
 
+  // The index of each item in `m_items`, from its name
+  std::unordered_map<std::string, std::size_t> m_positions;
+
   // The times and features index
   std::vector<std::size_t> m_index;
 
+  // The features dataset, kept open so that its chunk cache persists across
+  // reads: HDF5 shares the cache among the handles of an open dataset
+  std::optional<hdf5::DataSet> m_features;
+
   // Retrieve position of an item in the index
   std::pair<std::size_t, std::size_t> get_item_position(const std::string &name) const;
 
   // Loads features from its index position
   h5features::features read_features(const std::pair<std::size_t, std::size_t> &position) const;
 
+  // Returns the times dataset
+  hdf5::DataSet get_times_dataset() const;
+
+  // Returns the position of the frames of an item within [start, stop], reading
+  // only the timestamps required by a binary search
+  std::pair<std::size_t, std::size_t> search_times(const std::pair<std::size_t, std::size_t> &position, double start,
+                                                   double stop) const;
+
   // Loads times from its index position
   h5features::times read_times(const std::pair<std::size_t, std::size_t> &position) const;
 
   // Loads properties of an item from its name
-  h5features::properties read_properties(const std::string &name, bool ignore_properties) const;
+  h5features::item::lazy_properties read_properties(const std::string &name, bool ignore_properties) const;
 };
 } // namespace v1
 } // namespace h5features
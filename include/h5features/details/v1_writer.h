@@ -2,36 +2,98 @@
 #define H5FEATURES_V1_WRITER_H
 
 #include "h5features/details/writer_interface.h"
+#include <cstddef>
+#include <cstdint>
 #include <string>
+#include <unordered_set>
 #include <vector>
 
 namespace h5features {
 namespace v1 {
+/**
+   \brief Writes items in the v1 format
+
+   All the items are stacked in the same datasets. To avoid resizing and
+   rewriting the datasets for each item, the items and their properties are
+   buffered in memory and appended by batches. The datasets grow geometrically
+   and are trimmed to their actual size by `flush()`, which is called when the
+   writer is closed. The number of items and frames written is stored in the
+   "counts" attribute of the group after each batch, so that the group can be
+   appended or read even if the writer was not closed.
+
+ */
 class writer : public h5features::details::writer_interface {
 public:
-  writer(hdf5::Group &&group, bool compress, h5features::version version);
+  writer(hdf5::Group &&group, const h5features::compression &compression, const h5features::chunking &chunking,
+         h5features::version version, bool compact_properties = false);
 
   void write(const h5features::item &item) override;
 
+  void flush() override;
+
+  void write_concatenated(const h5features::details::concatenated_items &items) override;
+
 private:
   const std::size_t m_chunk_size;
-  std::vector<std::string> m_names;
 
-  // resize a `dataset` by `increment` over the first dimension, returns the new size
-  std::vector<std::size_t> resize_dataset(hdf5::DataSet &dataset, const std::size_t increment);
+  // The names of the items already written or pending
+  std::unordered_set<std::string> m_names;
+
+  // True when the datasets exist in the group
+  bool m_initialized;
+
+  // The dimensions of the features and times
+  std::size_t m_dim_features;
+  std::size_t m_dim_times;
+
+  // The type of the features dataset
+  h5features::dtype m_dtype;
+
+  // The number of items and frames written in the datasets, lower or equal
+  // to the datasets size, also stored in the "counts" attribute of the group
+  std::size_t m_items;
+  std::size_t m_frames;
 
-  void lazy_init(const std::size_t &dim_features, const std::size_t dim_times);
+  // The index of the last frame written or pending, -1 if none
+  std::int64_t m_last_index;
+
+  // The items waiting to be written
+  struct pending {
+    std::vector<std::int64_t> index;
+    std::vector<std::string> names;
+    std::vector<h5features::properties> properties;
+    std::vector<double> times;
+    std::vector<std::byte> features;
+    std::size_t frames = 0;
+  } m_pending;
+
+  // Grows a `dataset` along the first dimension to hold at least `size`
+  // elements, with a geometric growth
+  static void reserve_dataset(hdf5::DataSet &dataset, std::size_t size);
+
+  // Shrinks a `dataset` to `size` elements along the first dimension
+  static void trim_dataset(hdf5::DataSet &dataset, std::size_t size);
+
+  void lazy_init(const std::size_t &dim_features, h5features::dtype dtype, const std::size_t dim_times);
   void init_index();
   void init_items();
-  void init_features(const std::size_t &dim);
+  void init_features(const std::size_t &dim, h5features::dtype dtype);
   void init_times(const std::size_t &dim);
 
-  void check_appendable(const h5features::item &item) const;
-  void write_index(const h5features::item &item);
-  void write_name(const h5features::item &item);
-  void write_times(const h5features::item &item);
-  void write_features(const h5features::item &item);
-  void write_properties(const h5features::item &item);
+  void check_appendable(const std::string &name, std::size_t dim_features, h5features::dtype dtype,
+                        std::size_t dim_times) const;
+  void warn_properties(const std::string &name, const h5features::properties &properties) const;
+  void append_pending(const h5features::item &item);
+  void write_pending();
+
+  // Appends items to the datasets, `features` being in the dtype of the dataset
+  void append_datasets(const std::vector<std::int64_t> &index, const std::vector<std::string> &names,
+                       const double *times, const std::byte *features, std::size_t frames);
+
+  void write_properties(const std::string &name, const h5features::properties &properties);
+
+  // Stores the number of items and frames written in the group attributes
+  void write_counts();
 };
 } // namespace v1
 } // namespace h5features
@@ -0,0 +1,90 @@
+#ifndef H5FEATURES_V2_INDEX_H
+#define H5FEATURES_V2_INDEX_H
+
+#include "h5features/hdf5.h"
+#include "h5features/item.h"
+#include <cstddef>
+#include <optional>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace h5features {
+namespace v2 {
+/**
+   \brief The index of the items stored in a version 2.0 group
+
+   The index is an optional subgroup `__index__` of the features group. It
+   stores, for each item, its name, size, features dimension and time span in
+   the datasets `names`, `sizes`, `dims` and `spans`, so that the items
+   metadata can be loaded
+   without opening each item subgroup. The index is maintained by the writer
+   when enabled, it is ignored by the reader when it is not consistent with
+   the items in the group.
+
+ */
+class index {
+public:
+  /// The name of the index in the group, this is a reserved item name
+  static const std::string name;
+
+  /// The metadata of an item stored in the index
+  struct entry {
+    /// The number of frames
+    std::size_t size;
+
+    /// The dimension of the features
+    std::size_t dim;
+
+    /// The first and last timestamps
+    std::pair<double, double> span;
+  };
+
+  // Loads the index of a group. Returns nothing if the group has no index or if
+  // the index does not refer to all the items in the group (i.e. the group has
+  // been modified by a writer not maintaining the index).
+  static std::optional<h5features::v2::index> load(const hdf5::Group &group);
+
+  // Creates the index in a group, indexing the items already stored in it.
+  // Does nothing if the group already has an index.
+  static void create(hdf5::Group &group);
+
+  // Appends items to the index of a group, from their names and metadata. The
+  // datasets are resized once for all the items.
+  static void append(hdf5::Group &group, const std::vector<std::string> &items, const std::vector<entry> &metadata);
+
+  // Returns the metadata of an item from its datasets, this is used when the
+  // group has no index
+  static entry scan(const hdf5::Group &item_group);
+
+  /// Returns the name of the indexed items, in lexicographic order
+  const std::vector<std::string> &names() const noexcept;
+
+  /// Returns the size of the items, in the same order as `names`
+  const std::vector<std::size_t> &sizes() const noexcept;
+
+  /// Returns the features dimension of the items, in the same order as `names`
+  const std::vector<std::size_t> &dims() const noexcept;
+
+  /// Returns the time span of the items, in the same order as `names`
+  const std::vector<std::pair<double, double>> &spans() const noexcept;
+
+private:
+  index() = default;
+
+  // The name of the items
+  std::vector<std::string> m_names;
+
+  // The number of frames in each item
+  std::vector<std::size_t> m_sizes;
+
+  // The features dimension of each item
+  std::vector<std::size_t> m_dims;
+
+  // The first and last timestamps of each item
+  std::vector<std::pair<double, double>> m_spans;
+};
+} // namespace v2
+} // namespace h5features
+
+#endif // H5FEATURES_V2_INDEX_H
@@ -0,0 +1,130 @@
+#ifndef H5FEATURES_V2_ITEM_STREAM_H
+#define H5FEATURES_V2_ITEM_STREAM_H
+
+#include "h5features/compression.h"
+#include "h5features/details/time_index.h"
+#include "h5features/details/writer_interface.h"
+#include "h5features/dtype.h"
+#include "h5features/hdf5.h"
+#include "h5features/span.h"
+#include <cstddef>
+#include <optional>
+#include <string>
+#include <vector>
+
+namespace h5features {
+namespace v2 {
+class writer;
+
+/**
+   \brief A 1D dataset extended by whole chunks
+
+   The appended data is buffered until it fills a chunk, so that each chunk is
+   encoded and written only once, whatever the size of the appended blocks.
+   The memory used is bounded by the size of a block plus one chunk.
+
+ */
+class chunked_dataset {
+public:
+  chunked_dataset(hdf5::DataSet &&dataset, h5features::dtype dtype, std::size_t chunk_size,
+                  const h5features::compression &compression);
+
+  // Encodes the whole chunks of the buffered and appended data, buffers the
+  // remainder and returns a function writing the chunks. This does not call
+  // HDF5, the returned function must be called with the HDF5 lock held and
+  // while `data` is still valid.
+  h5features::details::deferred_write prepare(h5features::span<const std::byte> data);
+
+  // Writes the buffered data, must be called with the HDF5 lock held
+  void flush();
+
+  // Returns the dataset being written
+  hdf5::DataSet &dataset() noexcept;
+
+private:
+  // The dataset being written
+  hdf5::DataSet m_dataset;
+
+  // The type of the elements
+  h5features::dtype m_dtype;
+
+  // The number of elements in a chunk
+  std::size_t m_chunk_size;
+
+  // The compression of the chunks
+  h5features::compression m_compression;
+
+  // The number of elements encoded so far, where the buffered data goes
+  std::size_t m_offset;
+
+  // The data not filling a chunk yet
+  std::vector<std::byte> m_pending;
+};
+
+/**
+   \brief Writes an item of a version 2.0 group by blocks of frames
+
+   The item group and its extendable `features` and `times` datasets are
+   created when the stream is opened. The blocks of frames are appended chunk
+   by chunk, and the attributes, properties and index entry of the item are
+   written when it is closed.
+
+ */
+class item_stream : public h5features::details::item_stream {
+public:
+  item_stream(h5features::v2::writer &writer, const std::string &name, std::size_t dim,
+              h5features::times::format format, h5features::dtype dtype);
+
+  const std::string &name() const noexcept override;
+
+  std::size_t size() const noexcept override;
+
+  bool closed() const noexcept override;
+
+  h5features::details::deferred_write prepare(const h5features::features &features,
+                                              const h5features::times &times) override;
+
+  void close(const h5features::properties &properties) override;
+
+  void abort() override;
+
+private:
+  // The writer of the group, used only while the item is open
+  h5features::v2::writer &m_writer;
+
+  // The name of the item
+  const std::string m_name;
+
+  // The dimension of the features
+  const std::size_t m_dim;
+
+  // The dimension of the timestamps
+  const std::size_t m_dim_times;
+
+  // The type of the features
+  const h5features::dtype m_dtype;
+
+  // The group of the item, null once closed
+  std::optional<hdf5::Group> m_group;
+
+  // The features and times datasets, null once closed
+  std::optional<chunked_dataset> m_features;
+  std::optional<chunked_dataset> m_times;
+
+  // The index of the timestamps, built as the frames are appended
+  h5features::details::time_index m_index;
+
+  // The number of frames appended so far
+  std::size_t m_size;
+
+  // The first and last timestamps appended so far
+  std::vector<double> m_first;
+  std::vector<double> m_last;
+
+  // Releases the HDF5 objects of the item
+  void release();
+};
+} // namespace v2
+} // namespace h5features
+
+#endif // H5FEATURES_V2_ITEM_STREAM_H
@@ -1,26 +1,69 @@
 #ifndef H5FEATURES_V2_READER_H
 #define H5FEATURES_V2_READER_H
 
+#include "h5features/details/mapped_file.h"
 #include "h5features/details/reader_interface.h"
+#include "h5features/details/v2_index.h"
 #include "h5features/hdf5.h"
 #include "h5features/item.h"
 #include "h5features/version.h"
+#include <memory>
+#include <optional>
 #include <string>
+#include <utility>
 #include <vector>
 
 namespace h5features {
 namespace v2 {
 class reader : public h5features::details::reader_interface {
 public:
-  reader(hdf5::Group &&group, h5features::version version);
+  // When `mapping` is not null, the uncompressed datasets are viewed from the
+  // memory mapped file instead of being read
+  reader(hdf5::Group &&group, h5features::version version,
+         std::shared_ptr<const h5features::details::mapped_file> mapping = nullptr);
 
   std::vector<std::string> items() const override;
 
+  std::vector<std::size_t> sizes() const override;
+
+  std::vector<std::size_t> dims() const override;
+
+  std::vector<std::pair<double, double>> time_spans() const override;
+
   h5features::item read_item(const std::string &name, bool ignore_properties) const override;
 
   h5features::item read_item(const std::string &name, double start, double stop, bool ignore_properties) const override;
 
+  h5features::features read_frames(const std::string &name, std::size_t start, std::size_t stop) const override;
+
+  h5features::details::item_shape read_shape(const std::string &name) const override;
+
+  void read_item_into(const std::string &name, const h5features::details::item_shape &shape, std::byte *features,
+                      h5features::dtype dtype, double *times) const override;
+
+  // Reads the times of the item once and its features in a single selection
+  std::vector<h5features::item> read_item_segments(const std::string &name,
+                                                   const std::vector<std::pair<double, double>> &intervals,
+                                                   bool ignore_properties) const override;
+
+  h5features::details::deferred_item fetch_item(const std::string &name, bool ignore_properties) const override;
+
 private:
+  // The index of the items, when available in the group
+  std::optional<h5features::v2::index> m_index;
+
+  // The memory mapped file, null when not mapped
+  std::shared_ptr<const h5features::details::mapped_file> m_mapping;
+
+  // The name and features dataset of the last item partially read, kept open
+  // so that its chunk cache persists across reads: HDF5 shares the cache among
+  // the handles of an open dataset
+  mutable std::string m_retained_name;
+  mutable std::optional<hdf5::DataSet> m_retained;
+
+  // Keeps the features dataset of the item `name` open, if it exists
+  void retain_features(const std::string &name) const;
+
   // Initialize the group, forwarding hdf5::Exception to h5features::exception
   static hdf5::Group init_group(const std::string &filename, const std::string &group);
 };
@@ -1,18 +1,52 @@
 #ifndef H5FEATURES_V2_WRITER_H
 #define H5FEATURES_V2_WRITER_H
 
+#include "h5features/details/raw_dataset.h"
+#include "h5features/details/time_index.h"
+#include "h5features/details/v2_index.h"
 #include "h5features/details/writer_interface.h"
+#include <cstddef>
+#include <memory>
 #include <optional>
+#include <string>
+#include <utility>
+#include <vector>
 
 namespace h5features {
 namespace v2 {
+class item_stream;
+
 class writer : public h5features::details::writer_interface {
 public:
-  writer(hdf5::Group &&group, bool compress, h5features::version version);
+  writer(hdf5::Group &&group, const h5features::compression &compression, const h5features::chunking &chunking,
+         bool index, h5features::version version, bool compact_properties = false);
 
   void write(const h5features::item &item) override;
 
+  h5features::details::deferred_write prepare(const h5features::item &item) override;
+
+  void check_concatenated(const h5features::details::concatenated_items &items) override;
+
+  h5features::details::deferred_write prepare(const h5features::details::concatenated_items &items,
+                                              std::size_t i) override;
+
+  void flush() override;
+
+  std::unique_ptr<h5features::details::item_stream> open_item(const std::string &name, std::size_t dim,
+                                                              h5features::times::format format,
+                                                              h5features::dtype dtype) override;
+
 private:
+  friend class h5features::v2::item_stream;
+
+  // True when the group has an index of the items to maintain
+  bool m_index;
+
+  // The items written but not yet appended to the index, the index is
+  // appended by batches rather than resized for each item
+  std::vector<std::string> m_pending_names;
+  std::vector<h5features::v2::index::entry> m_pending_entries;
+
   // The dimension of the features in the group (must be constant according to
   // format specification), fixed on the first item wrote
   std::optional<std::size_t> m_dim_features;
@@ -21,8 +55,35 @@ private:
   // format specification), fixed on the first item wrote
   std::optional<std::size_t> m_dim_times;
 
-  void check_dim_features(const h5features::item &item);
-  void check_dim_times(const h5features::item &item);
+  // Encodes an item from its parts, the returned function must be called
+  // while `features`, `times` and `properties` are still valid
+  h5features::details::deferred_write prepare(const std::string &name, const h5features::features &features,
+                                              const h5features::times &times, const h5features::properties &properties);
+
+  // Writes the encoded item to file
+  void commit(const std::string &name, const h5features::features &features, const h5features::times &times,
+              const h5features::properties &properties, const h5features::details::raw_dataset &raw_features,
+              const h5features::details::raw_dataset &raw_times, const h5features::details::time_index &index,
+              const std::optional<std::vector<std::byte>> &encoded_properties);
+
+  // Checks an item can be written in the group and creates its group
+  hdf5::Group create_item(const std::string &name, std::size_t dim, std::size_t dim_times);
+
+  // Checks the name of an item is not reserved and not already in the group
+  void check_name(const std::string &name) const;
+
+  // Writes the attributes and properties of an item written by blocks, see
+  // `h5features::v2::item_stream`, and appends it to the index
+  void finalize_item(const std::string &name, hdf5::Group &item_group, hdf5::DataSet &features, hdf5::DataSet &times,
+                     const h5features::details::time_index &index, const h5features::properties &properties,
+                     std::size_t size, const std::pair<double, double> &span);
+
+  // Buffers an item to append to the index, the index is written when enough
+  // items are pending
+  void append_index(const std::string &name, const h5features::v2::index::entry &entry);
+
+  void check_dim_features(std::size_t dim);
+  void check_dim_times(std::size_t dim);
 };
 } // namespace v2
 } // namespace h5features
@@ -1,32 +1,140 @@
 #ifndef H5FEATURES_WRITER_INTERFACE_H
 #define H5FEATURES_WRITER_INTERFACE_H
 
+#include "h5features/chunking.h"
+#include "h5features/compression.h"
+#include "h5features/dtype.h"
 #include "h5features/hdf5.h"
 #include "h5features/item.h"
+#include "h5features/times.h"
 #include "h5features/version.h"
+#include <cstddef>
+#include <functional>
+#include <memory>
+#include <string>
+#include <vector>
 
 namespace h5features {
 namespace details {
+/// A function writing an item to file, see `writer_interface::prepare`
+using deferred_write = std::function<void()>;
+
+/// Items concatenated in single features and times, see
+/// `h5features::writer::write_concatenated`. The item `i` spans the frames
+/// `[offsets[i], offsets[i + 1])`.
+struct concatenated_items {
+  const std::vector<std::string> &names;
+  const h5features::features &features;
+  const h5features::times &times;
+  const std::vector<std::size_t> &offsets;
+
+  // Either empty or the properties of each item
+  const std::vector<h5features::properties> &properties;
+
+  // Returns the number of frames of the item `i`
+  std::size_t size(std::size_t i) const;
+
+  // Returns a view on the features of the item `i`, valid as long as
+  // `features` is
+  h5features::features features_of(std::size_t i) const;
+
+  // Returns a view on the times of the item `i`, valid as long as `times` is
+  h5features::times times_of(std::size_t i) const;
+
+  // Returns the properties of the item `i`, empty if there are none
+  const h5features::properties &properties_of(std::size_t i) const;
+};
+
+/// Writes an item by blocks of frames, see `h5features::appender`
+class item_stream {
+public:
+  virtual ~item_stream();
+
+  // Returns the name of the item
+  virtual const std::string &name() const noexcept = 0;
+
+  // Returns the number of frames appended so far
+  virtual std::size_t size() const noexcept = 0;
+
+  // Returns true once the item is closed or discarded
+  virtual bool closed() const noexcept = 0;
+
+  // Validates and encodes frames following the ones already appended, and
+  // returns a function writing them to file. This does not call HDF5, the
+  // returned function must be called with the HDF5 lock held and while
+  // `features` and `times` are still valid.
+  virtual deferred_write prepare(const h5features::features &features, const h5features::times &times) = 0;
+
+  // Writes the remaining frames and the properties of the item, must be called
+  // with the HDF5 lock held
+  virtual void close(const h5features::properties &properties) = 0;
+
+  // Removes the incomplete item from file, must be called with the HDF5 lock
+  // held. Does nothing if the item is closed.
+  virtual void abort() = 0;
+};
+
 class writer_interface {
 public:
-  writer_interface(hdf5::Group &&group, bool compress = true,
-                   h5features::version version = h5features::current_version);
+  writer_interface(hdf5::Group &&group, const h5features::compression &compression = h5features::compression{},
+                   const h5features::chunking &chunking = h5features::chunking{},
+                   h5features::version version = h5features::current_version, bool compact_properties = false);
 
   virtual ~writer_interface();
 
   h5features::version version() const noexcept;
 
+  // Returns the group being written
+  const hdf5::Group &group() const noexcept;
+
   virtual void write(const h5features::item &item) = 0;
 
+  // Writes concatenated items, already validated by the caller. The default
+  // implementation checks the items with `check_concatenated` and writes them
+  // one by one with `prepare`.
+  virtual void write_concatenated(const concatenated_items &items);
+
+  // Checks that all the concatenated items can be written in the group, before
+  // writing any of them. The default implementation does nothing.
+  virtual void check_concatenated(const concatenated_items &items);
+
+  // Writes the items buffered in memory, if any. The default implementation
+  // does nothing.
+  virtual void flush();
+
+  // Encodes an item and returns a function writing it to file. This does not
+  // call HDF5 and can be executed concurrently for several items. The returned
+  // function must be called with the HDF5 lock held, and while `item` is still
+  // valid. The default implementation defers the whole write.
+  virtual deferred_write prepare(const h5features::item &item);
+
+  // Encodes the item `i` of concatenated items, checked by
+  // `check_concatenated`, as `prepare(item)`. The returned function must be
+  // called while `items` is still valid. The default implementation throws,
+  // only version 2.0 supports it.
+  virtual deferred_write prepare(const concatenated_items &items, std::size_t i);
+
+  // Creates an item written by blocks of frames. The default implementation
+  // throws, only version 2.0 supports it.
+  virtual std::unique_ptr<item_stream> open_item(const std::string &name, std::size_t dim,
+                                                 h5features::times::format format, h5features::dtype dtype);
+
 protected:
   // The underlying HDF5 group to write to
   hdf5::Group m_group;
 
-  // true if data is compressed on file
-  bool m_compress;
+  // The compression of the data on file
+  h5features::compression m_compression;
+
+  // The chunking policy of the features
+  h5features::chunking m_chunking;
 
   // The h5features file version
   h5features::version m_version;
+
+  // When true, the properties are written in a compact encoding, see
+  // `h5features::details::encode_properties`
+  bool m_compact_properties;
 };
 } // namespace details
 } // namespace h5features
@@ -0,0 +1,71 @@
+#ifndef H5FEATURES_DTYPE_H
+#define H5FEATURES_DTYPE_H
+
+#include "h5features/hdf5.h"
+#include <cstddef>
+#include <cstdint>
+#include <iostream>
+#include <string>
+
+namespace h5features {
+/**
+   \brief The scalar types available to store features
+
+   The features are stored on file with the same type they have in memory.
+
+   - `dtype::float64` is stored in memory as `double`
+   - `dtype::float32` is stored in memory as `float`
+   - `dtype::float16` is an IEEE 754 half precision float. As C++17 has no
+     native half type, it is stored in memory as the 16 bits of the float in a
+     `std::uint16_t` (this is the layout of numpy's `float16`).
+
+ */
+enum class dtype { float16, float32, float64 };
+
+/// Returns the size in bytes of a scalar of type `dtype`
+std::size_t size_of(h5features::dtype dtype) noexcept;
+
+/// Send a dtype name to stream
+std::ostream &operator<<(std::ostream &os, h5features::dtype dtype);
+
+/**
+   \brief Returns the dtype from its name
+
+   \param name The dtype name, either "float16", "float32" or "float64"
+
+   \throw h5features::exception If the name is not a known dtype
+
+ */
+h5features::dtype parse_dtype(const std::string &name);
+
+namespace details {
+/// The dtype of the scalar type `T` in memory
+template <class T> struct dtype_of;
+
+template <> struct dtype_of<std::uint16_t> {
+  static constexpr h5features::dtype value = h5features::dtype::float16;
+};
+
+template <> struct dtype_of<float> {
+  static constexpr h5features::dtype value = h5features::dtype::float32;
+};
+
+template <> struct dtype_of<double> {
+  static constexpr h5features::dtype value = h5features::dtype::float64;
+};
+
+/// Returns the HDF5 datatype of `dtype`, this calls HDF5
+hdf5::DataType make_datatype(h5features::dtype dtype);
+
+/**
+   \brief Returns the dtype to read a dataset in memory
+
+   This is the dtype of the dataset when stored as a 16, 32 or 64 bits float,
+   and `dtype::float64` otherwise (the data is then converted by HDF5).
+
+ */
+h5features::dtype read_dtype(const hdf5::DataSet &dataset);
+} // namespace details
+} // namespace h5features
+
+#endif // H5FEATURES_DTYPE_H
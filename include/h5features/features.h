@@ -1,6 +1,10 @@
 #ifndef H5FEATURES_FEATURES_H
 #define H5FEATURES_FEATURES_H
 
+#include "h5features/dtype.h"
+#include "h5features/span.h"
+#include <cstddef>
+#include <memory>
 #include <vector>
 
 namespace h5features {
@@ -8,7 +12,14 @@ namespace h5features {
    \brief The features class stores the features vectors of a `h5features::item`
 
    Each item's timestamp is associated to a features vector of constant
-   dimension. Features are stored as float64 values.
+   dimension. Features are stored as float64, float32 or float16 values (see
+   `h5features::dtype`), the type is preserved when writing to and reading
+   from file.
+
+   The features data is immutable and shared between copies of a `features`
+   instance. It is either owned by the instance (when built from a
+   `std::vector`) or borrowed from an external buffer kept alive by an owner
+   handle (e.g. a numpy array in the Python API), so that no copy is done.
 
  */
 class features {
@@ -22,13 +33,13 @@ public:
   features(const features &) = default;
 
   /// Move constructor
-  features(features &&) = default;
+  features(features &&other) noexcept;
 
   /// Copy operator
   features &operator=(const features &) = default;
 
   /// Move operator
-  features &operator=(features &&) = default;
+  features &operator=(features &&other) noexcept;
 
   /// @name Constructors
   /// @{
@@ -49,6 +60,66 @@ public:
   features(std::vector<double> &&data, std::size_t dim, bool check = true);
   /// @}
 
+  /**
+     \brief Constructs a `features` instance from features vectors of any dtype
+
+     The dtype of the features is deduced from `T`, which must be `double`
+     (float64), `float` (float32) or `std::uint16_t` (float16).
+
+     \see features(const std::vector<double> &, std::size_t, bool)
+
+   */
+  template <class T, class = decltype(h5features::details::dtype_of<T>::value)>
+  features(std::vector<T> &&data, std::size_t dim, bool check = true)
+      : features{std::make_shared<const std::vector<T>>(std::move(data)), dim, check} {}
+
+  /// Copies `data`, see above
+  template <class T, class = decltype(h5features::details::dtype_of<T>::value)>
+  features(const std::vector<T> &data, std::size_t dim, bool check = true)
+      : features{std::vector<T>{data}, dim, check} {}
+
+  /**
+     \brief Constructs a `features` instance borrowing an external buffer
+
+     The data is not copied. The buffer must remain valid and unchanged as long
+     as the `features` instance (and its copies) is alive. This is ensured by
+     `owner`, which is released when the last copy of the instance is
+     destroyed.
+
+     \param data A view on `size * dim` scalars, with `size` frames of `dim`
+     scalars each
+     \param dim The dimension of each frame
+     \param owner A handle keeping `data` alive, can be null if the lifetime of
+     the buffer is guaranteed by the caller
+     \param check When true, ensures the features are valid
+
+     \throw h5features::exception If `check` is true and the features are not valid
+
+     \see h5features::features::validate
+
+   */
+  features(h5features::span<const double> data, std::size_t dim, std::shared_ptr<const void> owner, bool check = true);
+  features(h5features::span<const float> data, std::size_t dim, std::shared_ptr<const void> owner, bool check = true);
+
+  /**
+     \brief Constructs a `features` instance borrowing an external buffer of any dtype
+
+     This allows to borrow float16 features, see
+     `features(h5features::span<const double>, std::size_t, std::shared_ptr<const void>, bool)`
+     for details.
+
+     \param data A view on the bytes of `size * dim` scalars of type `dtype`
+     \param dtype The type of the scalars in `data`
+     \param dim The dimension of each frame
+     \param owner A handle keeping `data` alive
+     \param check When true, ensures the features are valid
+
+     \throw h5features::exception If `check` is true and the features are not valid
+
+   */
+  features(h5features::span<const std::byte> data, h5features::dtype dtype, std::size_t dim,
+           std::shared_ptr<const void> owner, bool check = true);
+
   /// Returns true if the two `features` instances are equal
   bool operator==(const features &other) const noexcept;
 
@@ -67,26 +138,60 @@ public:
      The features are valid if and only if:
      - it is non empty (at least one features vector)
      - all the vectors have the same dimension
+     - the data holds an entire number of scalars
 
      \throw h5features::exception If the features are not valid
 
    */
   void validate() const;
 
+  /// Returns the type of the features scalars
+  h5features::dtype get_dtype() const noexcept;
+
   /**
      \brief Returns the features data
 
      The returned `data` is such as `data[i * dim() + j]` the \f$j^{th}\f$
      dimension of the \f$i^{th}\f$ frame.
 
+     \tparam T The type of the scalars, must be `double` for float64 features,
+     `float` for float32 and `std::uint16_t` for float16
+
+     \throw h5features::exception If `T` does not match the features dtype
+
    */
-  const std::vector<double> &data() const noexcept;
+  template <class T = double> h5features::span<const T> data() const {
+    check_dtype(h5features::details::dtype_of<T>::value);
+    return {reinterpret_cast<const T *>(m_features.data()), m_features.size() / sizeof(T)};
+  }
+
+  /// Returns the raw bytes of the features data, whatever its dtype
+  h5features::span<const std::byte> bytes() const noexcept;
 
 private:
   features() = delete;
 
-  // The stored features
-  std::vector<double> m_features;
+  // Constructs features owning `buffer`
+  template <class T>
+  features(std::shared_ptr<const std::vector<T>> buffer, std::size_t dim, bool check)
+      : features{{reinterpret_cast<const std::byte *>(buffer->data()), buffer->size() * sizeof(T)},
+                 h5features::details::dtype_of<T>::value,
+                 dim,
+                 buffer,
+                 check} {}
+
+  // Throws if the features are not of type `dtype`
+  void check_dtype(h5features::dtype dtype) const;
+
+  // Keeps the features data alive, this is either a `std::vector` owned by
+  // the features or an external buffer
+  std::shared_ptr<const void> m_owner;
+
+  // The bytes of the stored features, viewed from the buffer held by `m_owner`
+  h5features::span<const std::byte> m_features;
+
+  // The type of the features scalars
+  h5features::dtype m_dtype;
 
   // The features dimension
   std::size_t m_dim;
@@ -0,0 +1,112 @@
+#ifndef H5FEATURES_FILE_ACCESS_H
+#define H5FEATURES_FILE_ACCESS_H
+
+#include "h5features/hdf5.h"
+#include <cstddef>
+#include <iostream>
+#include <string>
+
+namespace h5features {
+/**
+   \brief The settings used by a `h5features::reader` to access a HDF5 file
+
+   - The chunk cache holds the decompressed chunks of a dataset. A partial read
+     decodes the whole chunks it covers, the cache avoids decoding them again on
+     the next reads. The HDF5 default is a cache of 1 MB with 521 slots per
+     dataset, too small for large features chunks. The number of slots should
+     be a prime number about 100 times the number of chunks fitting in the
+     cache.
+   - The metadata cache holds the groups and datasets headers and the chunks
+     index of the file. A larger cache helps when reading many items.
+   - The `sec2` driver reads the file through POSIX I/O, this is the HDF5
+     default. The `core` driver loads the whole file in memory when it is
+     opened, so the reads do not access the disk anymore.
+
+   The settings are ignored when the file is already open in the process, by
+   another reader for instance: HDF5 then shares the open file.
+
+ */
+class file_access {
+public:
+  /// The available HDF5 file drivers
+  enum class driver { sec2, core };
+
+  /**
+     \brief Instantiates file access settings
+
+     \param chunk_cache_bytes The size of the chunk cache of each dataset in
+     bytes, when 0 use the HDF5 default of 1 MB
+     \param chunk_cache_slots The number of slots in the chunk cache of each
+     dataset, when 0 use the HDF5 default of 521
+     \param metadata_cache_bytes The initial size of the metadata cache of the
+     file in bytes, when 0 use the HDF5 default of 2 MB
+     \param driver The HDF5 file driver
+
+     \throw h5features::exception If `metadata_cache_bytes` is not 0 and not
+     in [1 kB, 128 MB] (the HDF5 limits on the metadata cache size)
+
+   */
+  explicit file_access(std::size_t chunk_cache_bytes = 0, std::size_t chunk_cache_slots = 0,
+                       std::size_t metadata_cache_bytes = 0, driver driver = driver::sec2);
+
+  /// Returns the size of the chunk cache in bytes, 0 for the HDF5 default
+  std::size_t chunk_cache_bytes() const noexcept;
+
+  /// Returns the number of slots in the chunk cache, 0 for the HDF5 default
+  std::size_t chunk_cache_slots() const noexcept;
+
+  /// Returns the initial size of the metadata cache, 0 for the HDF5 default
+  std::size_t metadata_cache_bytes() const noexcept;
+
+  /// Returns the HDF5 file driver
+  driver get_driver() const noexcept;
+
+  /// Returns true if the two file access settings are equal
+  bool operator==(const file_access &other) const noexcept;
+
+  /// Returns true if the two file access settings are different
+  bool operator!=(const file_access &other) const noexcept;
+
+  /**
+     \brief Returns the driver from its name
+
+     \param name The driver name, either "sec2" or "core"
+
+     \throw h5features::exception If the name is not a known driver
+
+   */
+  static driver parse_driver(const std::string &name);
+
+  /**
+     \brief Applies the settings to file access properties
+
+     The chunk cache settings are the default of all the datasets opened from
+     the file.
+
+     \throw h5features::exception If the properties cannot be modified
+
+   */
+  void apply(hdf5::FileAccessProps &props) const;
+
+private:
+  // The size of the chunk cache in bytes
+  std::size_t m_chunk_cache_bytes;
+
+  // The number of slots in the chunk cache
+  std::size_t m_chunk_cache_slots;
+
+  // The initial size of the metadata cache in bytes
+  std::size_t m_metadata_cache_bytes;
+
+  // The HDF5 file driver
+  driver m_driver;
+};
+
+/// Sends a driver name to stream
+std::ostream &operator<<(std::ostream &os, h5features::file_access::driver driver);
+
+/// Sends file access settings to stream
+std::ostream &operator<<(std::ostream &os, const h5features::file_access &access);
+} // namespace h5features
+
+#endif // H5FEATURES_FILE_ACCESS_H
@@ -0,0 +1,105 @@
+#ifndef H5FEATURES_FRAMES_ITERATOR_H
+#define H5FEATURES_FRAMES_ITERATOR_H
+
+#include "h5features/details/thread_pool.h"
+#include "h5features/features.h"
+#include <cstddef>
+#include <cstdint>
+#include <deque>
+#include <future>
+#include <memory>
+#include <optional>
+#include <string>
+#include <vector>
+
+namespace h5features {
+class reader;
+
+/**
+   \brief Streams the frames of a group by batches of fixed size
+
+   The iterator goes through the items of a group, in the order of
+   `h5features::reader::items()` or shuffled, and returns their features by
+   batches of `batch_frames` frames, a batch spanning several items if
+   needed. The last batch can be smaller. Each item is read by consecutive
+   slices (see `h5features::reader::read_frames`) so that only the batches
+   being built are in memory.
+
+   The next batches are read in advance by a background thread.
+
+   \see h5features::reader::iter_frames
+
+ */
+class frames_iterator {
+public:
+  /**
+     \brief Instantiates an iterator on the frames of a group
+
+     \param reader The reader of the group, must outlive the iterator
+     \param batch_frames The number of frames in a batch
+     \param shuffle_items When true, the items are visited in random order
+     \param prefetch The number of batches to read in advance in a background
+     thread, when 0 the batches are read in the calling thread by `next()`
+     \param seed The seed of the random generator used to shuffle the items
+
+     \throw h5features::exception If `batch_frames` is 0 or if the items size
+     cannot be read
+
+   */
+  frames_iterator(const h5features::reader &reader, std::size_t batch_frames, bool shuffle_items = false,
+                  std::size_t prefetch = 1, std::uint64_t seed = 0);
+
+  /// Move constructor
+  frames_iterator(frames_iterator &&) = default;
+
+  /// Waits for the batches being read and destroys the iterator
+  ~frames_iterator();
+
+  /**
+     \brief Returns the next batch of frames
+
+     \return A `batch_frames() x dim` features, or less frames for the last
+     batch, or nothing when all the frames have been returned
+
+     \throw h5features::exception If the read operation failed or if the items
+     have different dimensions or dtypes
+
+   */
+  std::optional<h5features::features> next();
+
+  /// Returns the number of frames in a batch
+  std::size_t batch_frames() const noexcept;
+
+private:
+  // The reading state, shared with the background thread
+  struct state {
+    const h5features::reader &reader;
+
+    // The items to read, in order, and their number of frames
+    std::vector<std::string> items;
+    std::vector<std::size_t> sizes;
+
+    // The position of the next frame to read
+    std::size_t item;
+    std::size_t frame;
+
+    std::size_t batch_frames;
+
+    // Reads the next batch
+    std::optional<h5features::features> read();
+  };
+
+  std::shared_ptr<state> m_state;
+
+  // The number of batches read in advance
+  std::size_t m_prefetch;
+
+  // The background thread, null when `m_prefetch` is 0
+  std::unique_ptr<h5features::details::thread_pool> m_pool;
+
+  // The batches being read in background
+  std::deque<std::future<std::optional<h5features::features>>> m_pending;
+};
+} // namespace h5features
+
+#endif // H5FEATURES_FRAMES_ITERATOR_H
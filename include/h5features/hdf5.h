@@ -2,7 +2,25 @@
 #define H5FEATURES_HDF5_H
 
 #include "highfive/H5File.hpp"
+#include <mutex>
 
 namespace hdf5 = HighFive;
 
+namespace h5features {
+namespace details {
+/**
+   \brief Locks the HDF5 library for the calling thread
+
+   The HDF5 library is generally not built thread-safe, so all the calls to
+   HDF5 issued by h5features are serialized through a single, process-wide,
+   recursive mutex. Work that does not involve HDF5 (such as decompression)
+   can run concurrently without holding the lock.
+
+   \return A lock owning the mutex until it goes out of scope
+
+ */
+std::unique_lock<std::recursive_mutex> lock_hdf5();
+} // namespace details
+} // namespace h5features
+
 #endif // H5FEATURES_HDF5_H
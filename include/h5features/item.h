@@ -4,6 +4,8 @@
 #include "h5features/features.h"
 #include "h5features/properties.h"
 #include "h5features/times.h"
+#include <functional>
+#include <memory>
 #include <string>
 
 namespace h5features {
@@ -25,6 +27,26 @@ namespace h5features {
  */
 class item {
 public:
+  /**
+     \brief Properties decoded on the first access
+
+     Wraps a function returning the properties of an item. The function is
+     called once, on the first call to `item::properties()` on the item or one
+     of its copies. It can be called from any thread and must not call HDF5.
+
+   */
+  class lazy_properties {
+  public:
+    /// Instantiates lazy properties from a function decoding them, a null
+    /// function stands for empty properties
+    explicit lazy_properties(std::function<h5features::properties()> decode);
+
+  private:
+    friend class item;
+
+    std::function<h5features::properties()> m_decode;
+  };
+
   /// Destructor
   virtual ~item() = default;
 
@@ -61,6 +83,9 @@ public:
 
   item(const std::string &name, h5features::features &&features, h5features::times &&times,
        h5features::properties &&properties, bool check = true);
+
+  item(const std::string &name, h5features::features &&features, h5features::times &&times,
+       lazy_properties &&properties, bool check = true);
   /// @}
 
   /// Returns the dimension of the features
@@ -72,8 +97,11 @@ public:
   /// Returns the item's name
   std::string name() const noexcept;
 
-  /// Returns true if the item has attached properties, false otherwise
-  bool has_properties() const noexcept;
+  /**
+     \brief Returns true if the item has attached properties, false otherwise
+     \throw h5features::exception If lazy properties cannot be decoded
+  */
+  bool has_properties() const;
 
   /// Returns the item's features
   const h5features::features &features() const noexcept;
@@ -81,14 +109,20 @@ public:
   /// Returns the item's timestamps
   const h5features::times &times() const noexcept;
 
-  /// Returns the item's properties
-  const h5features::properties &properties() const noexcept;
+  /**
+     \brief Returns the item's properties
+
+     Lazy properties are decoded on the first call.
+
+     \throw h5features::exception If lazy properties cannot be decoded
+  */
+  const h5features::properties &properties() const;
 
   /// Returns true if the two items are equal
-  bool operator==(const item &other) const noexcept;
+  bool operator==(const item &other) const;
 
   /// Returns true if the two items are not equal
-  bool operator!=(const item &other) const noexcept;
+  bool operator!=(const item &other) const;
 
   /**
      \brief Ensures the item has a valid state
@@ -124,6 +158,11 @@ private:
 
   // Item properties (eventually empty)
   h5features::properties m_properties;
+
+  // The lazy properties, shared by the copies of the item, null when the
+  // properties are not lazy
+  struct lazy_state;
+  std::shared_ptr<lazy_state> m_lazy;
 };
 } // namespace h5features
 
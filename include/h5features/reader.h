@@ -2,23 +2,72 @@
 #define H5FEATURES_READER_H
 
 #include "h5features/details/reader_interface.h"
+#include "h5features/details/stats_recorder.h"
+#include "h5features/dtype.h"
+#include "h5features/file_access.h"
+#include "h5features/frames_iterator.h"
 #include "h5features/item.h"
+#include "h5features/span.h"
+#include "h5features/stats.h"
 #include "h5features/version.h"
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <future>
 #include <memory>
 #include <string>
+#include <tuple>
+#include <utility>
 #include <vector>
 
 namespace h5features {
+class reader_pool;
+
 /**
    \brief The reader class reads `h5features::item` from a HDF5 file
 
    A reader is non-copyable and is attached to an HDF5 file and a group within
    this file.
+
+   The calls to the HDF5 library are serialized (see
+   `h5features::details::lock_hdf5()`) so a reader can be used concurrently
+   from several threads.
  */
 class reader {
 public:
+  /**
+     \brief The layout of several items concatenated in single arrays
+
+     The features of the items are stacked in a `(frames, dim)` array and
+     their times in a `(frames, times_dim)` array, the item `i` spanning the
+     rows `[offsets[i], offsets[i + 1])`.
+
+     \see h5features::reader::read_concatenated
+
+   */
+  struct concatenation {
+    /// The name of the items, in order
+    std::vector<std::string> names;
+
+    /// The index of the first frame of each item, followed by the total
+    /// number of frames
+    std::vector<std::size_t> offsets;
+
+    /// The dimension of the features
+    std::size_t dim = 0;
+
+    /// The type of the features on file, the one of the first item
+    h5features::dtype dtype = h5features::dtype::float64;
+
+    /// The dimension of the times, 1 or 2
+    std::size_t times_dim = 1;
+
+    /// Returns the total number of frames
+    std::size_t frames() const noexcept;
+  };
+
   /// Destructor
-  virtual ~reader() = default;
+  virtual ~reader();
 
   /// Move constructor
   reader(reader &&) = default;
@@ -26,14 +75,44 @@ public:
   /**
      \brief Instantiates a reader
 
+     When `memory_map` is true, the file is mapped in memory and the features
+     and times stored without compression are not read but viewed from the
+     mapped file: the items keep the mapping alive and share its memory with
+     the operating system page cache. The compressed data are read as usual.
+     Memory mapping is used in version 2.0 only.
+
+     \param filename The HDF5 file to read from
+     \param group The group within the file to read items from
+     \param memory_map When true, view the uncompressed data from a memory map
+     of the file
+
+     \throw h5features::exception If the file cannot be opened or mapped, or if
+     the group does not exist in the file.
+
+   */
+  reader(const std::string &filename, const std::string &group, bool memory_map = false);
+
+  /**
+     \brief Instantiates a reader with custom file access settings
+
+     The features dataset of the last item read by a partial read (or of the
+     whole group in version 1.x) is kept open, so that its chunk cache persists
+     across consecutive partial reads.
+
      \param filename The HDF5 file to read from
      \param group The group within the file to read items from
+     \param memory_map When true, view the uncompressed data from a memory map
+     of the file
+     \param access The chunk cache, metadata cache and driver used to access
+     the file
+
+     \throw h5features::exception If the file cannot be opened or mapped, or if
+     the group does not exist in the file.
 
-     \throw h5features::exception If the file cannot be opened or if the group
-     does not exist in the file.
+     \see h5features::file_access
 
    */
-  reader(const std::string &filename, const std::string &group);
+  reader(const std::string &filename, const std::string &group, bool memory_map, const h5features::file_access &access);
 
   /**
      \brief Returns the list of groups in the specified HDF5 file
@@ -60,15 +139,101 @@ public:
   */
   std::vector<std::string> items() const;
 
+  /**
+     \brief Returns the number of frames of each stored item
+
+     The sizes are in the same order as `items()`. This does not read the
+     items content: for version 2.0 groups written with an index (see
+     `h5features::writer`) this reads the index only, otherwise this reads the
+     metadata of each item.
+
+     \throw h5features::exception If the read operation failed.
+
+  */
+  std::vector<std::size_t> sizes() const;
+
+  /**
+     \brief Returns the dimension of the features of each stored item
+
+     The dimensions are in the same order as `items()`. As `sizes()`, this
+     reads the index only for version 2.0 groups written with an index,
+     otherwise this reads the metadata of each item.
+
+     \throw h5features::exception If the read operation failed.
+
+  */
+  std::vector<std::size_t> dims() const;
+
+  /**
+     \brief Returns the first and last timestamps of each stored item
+
+     The time spans are in the same order as `items()`. For version 2.0 groups
+     written with an index this reads the index only, otherwise this reads the
+     first and last timestamps of each item.
+
+     \throw h5features::exception If the read operation failed.
+
+  */
+  std::vector<std::pair<double, double>> time_spans() const;
+
   /**
      \brief Returns all the items stored in the file
 
      \param ignore_properties When true, do not read the item'sproperties
+     \param workers The number of threads used to decode the items, when 0
+     use all the available cores
 
      \throw h5features::exception If the read operation failed.
 
+     \see h5features::reader::read_many
+
+  */
+  std::vector<h5features::item> read_all(bool ignore_properties = false, std::size_t workers = 1) const;
+
+  /**
+     \brief Reads and returns several items
+
+     The items are read in parallel: the calls to HDF5 are serialized but the
+     decompression and assembly of the items are distributed over a pool of
+     `workers` threads. Decompression is parallelized for the data written
+     by version 2.0 only. Items from version 1.x files are read sequentially, by
+     runs of items stored contiguously on file.
+
+     \param names The name of the items to read
+     \param ignore_properties When true, do not read the item's properties
+     \param workers The number of threads used to decode the items, when 0
+     use all the available cores
+
+     \return The items, in the same order as `names`
+
+     \throw h5features::exception If one of the `names` group does not exist
+     or if the read operation failed.
+
   */
-  std::vector<h5features::item> read_all(bool ignore_properties = false) const;
+  std::vector<h5features::item> read_many(const std::vector<std::string> &names, bool ignore_properties = false,
+                                          std::size_t workers = 1) const;
+
+  /**
+     \brief Reads and returns the items in the range [start, stop)
+
+     The items are indexed in the order of `items()`. For version 1.x files the
+     items contiguous on file are read in a single selection of the features
+     and times datasets.
+
+     \param start The index of the first item to read
+     \param stop The index after the last item to read
+     \param ignore_properties When true, do not read the item's properties
+     \param workers The number of threads used to decode the items, when 0
+     use all the available cores
+
+     \throw h5features::exception If the range is not valid or if the read
+     operation failed.
+
+     \see h5features::reader::read_many
+
+  */
+  std::vector<h5features::item> read_range(std::size_t start, std::size_t stop, bool ignore_properties = false,
+                                           std::size_t workers = 1) const;
 
   /**
      \brief Reads and returns a `h5features::item` instance
@@ -99,7 +264,165 @@ public:
   */
   h5features::item read_item(const std::string &name, double start, double stop, bool ignore_properties = false) const;
 
+  /**
+     \brief Reads a `h5features::item` in the background I/O thread
+
+     The read is executed by the I/O thread of the process, see
+     `h5features::details::io_thread()`, and the calling thread is free
+     meanwhile. The reads submitted by several threads or readers are executed
+     in order. The reader can be destroyed before the read completes, the file
+     is then kept open until it does.
+
+     \param name The name of the item to read
+     \param ignore_properties When true, do not read the item's properties
+
+     \return A future on the item. If the read fails the exception is rethrown
+     by `get()`.
+
+  */
+  std::future<h5features::item> read_item_async(const std::string &name, bool ignore_properties = false) const;
+
+  /**
+     \brief Partial read of a `h5features::item` in the background I/O thread
+
+     \see h5features::reader::read_item_async(const std::string &, bool) const
+
+  */
+  std::future<h5features::item> read_item_async(const std::string &name, double start, double stop,
+                                                bool ignore_properties = false) const;
+
+  /**
+     \brief Partial reads of several segments of items
+
+     Each segment is a tuple `(name, start, stop)` and is read as with
+     `read_item(name, start, stop, ignore_properties)`. The segments of an item
+     are read together: the item's times are read once, the overlapping or
+     adjacent segments are merged and the features of all the segments are
+     read in a single selection. The features of the returned items share the
+     buffer of their item.
+
+     \param segments The name of the items and the time intervals `[start,
+     stop]` to read
+     \param ignore_properties When true, do not read the item's properties
+
+     \return The partial items, in the same order as `segments`
+
+     \throw h5features::exception If one of the items does not exist, if a
+     segment is empty or if the read operation failed.
+
+  */
+  std::vector<h5features::item> read_segments(const std::vector<std::tuple<std::string, double, double>> &segments,
+                                              bool ignore_properties = false) const;
+
+  /**
+     \brief Reads the features of a range of frames of an item
+
+     Unlike the partial read of an item, the frames are specified by their
+     index and not by timestamps. Only the requested frames are read from
+     file.
+
+     \param name The name of the item to read
+     \param start The index of the first frame to read
+     \param stop The index after the last frame to read
+
+     \throw h5features::exception If the `name` group does not exist, if
+     `[start, stop)` is empty or out of the item's frames, or if the read
+     operation failed.
+
+  */
+  h5features::features read_frames(const std::string &name, std::size_t start, std::size_t stop) const;
+
+  /**
+     \brief Returns the layout of items concatenated in single arrays
+
+     This reads the metadata of the items only (the number of frames, the
+     dimension and type of the features and the dimension of the times).
+
+     \param names The name of the items to concatenate
+
+     \throw h5features::exception If one of the items does not exist, or if
+     the items have features or times of different dimensions.
+
+     \see h5features::reader::read_concatenated
+
+  */
+  concatenation prepare_concatenated(const std::vector<std::string> &names) const;
+
+  /**
+     \brief Reads items concatenated in single arrays
+
+     The features and times of each item are read from file directly into
+     their slice of the destination arrays, so that the memory used does not
+     exceed the size of the arrays. The features are converted to `dtype` if
+     needed.
+
+     \param layout The layout of the concatenation, from `prepare_concatenated`
+     \param features The destination of the features, of `layout.frames() *
+     layout.dim` elements of type `dtype`
+     \param dtype The type of the destination features
+     \param times The destination of the times, of `layout.frames() *
+     layout.times_dim` elements
+
+     \throw h5features::exception If the destinations do not have the size of
+     the concatenation, or if the read operation failed.
+
+  */
+  void read_concatenated(const concatenation &layout, h5features::span<std::byte> features, h5features::dtype dtype,
+                         h5features::span<double> times) const;
+
+  /**
+     \brief Returns an iterator on the frames of the group, by batches
+
+     \param batch_frames The number of frames in a batch
+     \param shuffle_items When true, the items are visited in random order
+     \param prefetch The number of batches read in advance in a background
+     thread
+     \param seed The seed of the random generator used to shuffle the items
+
+     \throw h5features::exception If `batch_frames` is 0
+
+     \see h5features::frames_iterator
+
+  */
+  h5features::frames_iterator iter_frames(std::size_t batch_frames, bool shuffle_items = false,
+                                          std::size_t prefetch = 1, std::uint64_t seed = 0) const;
+
+  /**
+     \brief Enables the recording of I/O statistics
+
+     The statistics are accumulated from the call and returned by `stats()`.
+     Recording the statistics has a small cost, it is disabled by default.
+
+     \param callback When not null, called with the statistics at the end of
+     each operation on the reader, in the thread that called it. The exceptions it throws are ignored.
+
+   */
+  void enable_stats(std::function<void(const h5features::stats &)> callback = nullptr);
+
+  /// Disables the recording of I/O statistics and discards them
+  void disable_stats();
+
+  /**
+     \brief Returns the I/O statistics recorded so far
+
+     The statistics are zero if they are not enabled.
+
+   */
+  h5features::stats stats() const;
+
+  /// Resets the I/O statistics to zero
+  void reset_stats();
+
 private:
+  // The pool instantiates readers from the files it keeps open
+  friend class h5features::reader_pool;
+
+  // Instantiates a reader on a group of an open file
+  reader(const hdf5::File &file, const std::string &group, bool memory_map);
+
+  // Opens a file in read only mode with the access settings
+  static hdf5::File open(const std::string &filename, const h5features::file_access &access);
+
   // Default constructor not used
   reader() = delete;
 
@@ -118,8 +441,15 @@ private:
   // The name of the group being read
   const std::string m_groupname;
 
-  // The concrete reader used depends on the h5features version of the file
-  std::unique_ptr<h5features::details::reader_interface> m_reader;
+  // The concrete reader used depends on the h5features version of the file,
+  // shared with the pending asynchronous reads
+  std::shared_ptr<h5features::details::reader_interface> m_reader;
+
+  // The I/O statistics, null when disabled
+  std::shared_ptr<h5features::details::stats_recorder> m_stats;
+
+  // Returns the I/O statistics recorder, null when disabled
+  std::shared_ptr<h5features::details::stats_recorder> recorder() const;
 };
 } // namespace h5features
 
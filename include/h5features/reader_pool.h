@@ -0,0 +1,118 @@
+#ifndef H5FEATURES_READER_POOL_H
+#define H5FEATURES_READER_POOL_H
+
+#include "h5features/file_access.h"
+#include "h5features/hdf5.h"
+#include "h5features/reader.h"
+#include <cstddef>
+#include <list>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+
+namespace h5features {
+/**
+   \brief A pool of readers sharing their open files
+
+   The pool keeps the files open and hands out a reader per group. Opening
+   a file and parsing its superblock is done once: the readers of several
+   groups of the same file share it, and a reader already instantiated is
+   returned as is. The number of files kept open is capped, the least recently
+   used files are closed first. The readers handed out by the pool remain
+   valid after their file is evicted and keep it open until they are destroyed.
+
+   HDF5 handles must not be used across processes. When the pool is used from
+   a process forked after the files were opened (by data loading workers for
+   instance), the inherited files are dropped and reopened lazily.
+
+   The pool can be used concurrently from several threads.
+
+ */
+class reader_pool {
+public:
+  /**
+     \brief Instantiates an empty pool
+
+     \param max_files The maximal number of files kept open by the pool
+     \param memory_map When true, the readers view the uncompressed data from
+     a memory map of the file, see `h5features::reader`
+     \param access The settings used to open the files
+
+     \throw h5features::exception If `max_files` is 0
+
+   */
+  explicit reader_pool(std::size_t max_files = 16, bool memory_map = false,
+                       const h5features::file_access &access = h5features::file_access{});
+
+  /// Closes the files kept open by the pool
+  ~reader_pool();
+
+  /**
+     \brief Returns a reader on a group of a file
+
+     The file is opened if it is not in the pool already, evicting the least
+     recently used file if the pool is full.
+
+     \param filename The HDF5 file to read from
+     \param group The group within the file to read items from
+
+     \throw h5features::exception If the file cannot be opened or if the group
+     does not exist in the file
+
+   */
+  std::shared_ptr<h5features::reader> get(const std::string &filename, const std::string &group = "features");
+
+  /// Returns the number of files kept open by the pool
+  std::size_t open_files() const;
+
+  /// Returns the maximal number of files kept open by the pool
+  std::size_t max_files() const noexcept;
+
+  /// Closes all the files kept open by the pool
+  void clear();
+
+private:
+  // Copy disabled
+  reader_pool(const reader_pool &) = delete;
+
+  // Copy disabled
+  reader_pool &operator=(const reader_pool &) = delete;
+
+  // An open file and the readers of its groups
+  struct entry {
+    std::string filename;
+    hdf5::File file;
+    std::unordered_map<std::string, std::shared_ptr<h5features::reader>> readers;
+  };
+
+  // The maximal number of files kept open
+  const std::size_t m_max_files;
+
+  // True if the readers view the uncompressed data from a memory map
+  const bool m_memory_map;
+
+  // The settings used to open the files
+  const h5features::file_access m_access;
+
+  // Protects the entries from concurrent accesses
+  mutable std::mutex m_mutex;
+
+  // The process the files were opened in
+  long m_pid;
+
+  // The open files, the most recently used first
+  std::list<entry> m_entries;
+
+  // The position of each file in `m_entries`, from its name
+  std::unordered_map<std::string, std::list<entry>::iterator> m_positions;
+
+  // Drops the files inherited from the parent process after a fork
+  void check_process();
+
+  // Closes the least recently used files until at most `size` are open
+  void evict(std::size_t size);
+};
+} // namespace h5features
+
+#endif // H5FEATURES_READER_POOL_H
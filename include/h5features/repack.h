@@ -0,0 +1,125 @@
+#ifndef H5FEATURES_REPACK_H
+#define H5FEATURES_REPACK_H
+
+#include "h5features/chunking.h"
+#include "h5features/compression.h"
+#include "h5features/dtype.h"
+#include "h5features/item.h"
+#include "h5features/version.h"
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <optional>
+#include <string>
+
+namespace h5features {
+/// The settings of `h5features::repack`
+struct repack_options {
+  /// The group to write in the destination file, when empty use the source group
+  std::string group{};
+
+  /// The format version of the destination
+  h5features::version version = h5features::current_version;
+
+  /// The compression settings of the destination
+  h5features::compression compression{};
+
+  /// The chunking policy of the destination, used in version 2.0 only
+  h5features::chunking chunking{};
+
+  /// When true, maintain an index of the items, used in version 2.0 only
+  bool index = false;
+
+  /// When true, write the properties in a compact encoding
+  bool compact_properties = false;
+
+  /// When set, the features are converted to this type
+  std::optional<h5features::dtype> dtype{};
+
+  /// The number of threads used to decode and encode the items, when 0 use all the available cores
+  std::size_t workers = 0;
+
+  /// The number of items read and written at once
+  std::size_t batch_items = 256;
+
+  /// When true, the checksums of the items written are verified against the source
+  bool verify = true;
+
+  /// When true, the items already in the destination group are not written again
+  bool resume = false;
+
+  /// When true, erase the destination file if it already exists
+  bool overwrite = false;
+
+  /// When not null, called after each batch with the number of items processed and the total number of items
+  std::function<void(std::size_t, std::size_t)> progress{};
+};
+
+/// The outcome of `h5features::repack`
+struct repack_summary {
+  /// The number of items written to the destination
+  std::size_t written = 0;
+
+  /// The number of items already in the destination, when resuming
+  std::size_t skipped = 0;
+
+  /// The number of items whose checksum has been verified
+  std::size_t verified = 0;
+};
+
+/**
+   \brief Copies a group of items to another file, changing its storage
+
+   This upgrades or downgrades a group to another format version, or changes
+   its compression, chunking or features type. The items are streamed by
+   batches of `options.batch_items`: the next batch is read while the current
+   one is written, the items are decoded and encoded by `options.workers`
+   threads (decoding and encoding are parallelized for version 2.0 only) and
+   at most two batches are held in memory.
+
+   When `options.verify` is true, a CRC32 checksum of the features, times and
+   properties of each item is computed from the source, after the conversion
+   of the features. Once all the items are written, the destination is read
+   again and its checksums are compared to the source ones.
+
+   When `options.resume` is true, the items already in the destination group
+   are skipped, so that an interrupted repack can be continued. The writer is
+   flushed after each batch, so at most one batch is lost by an interruption.
+   The skipped items are first compared to the source by their checksums,
+   whatever `options.verify`. An item left unreadable by the interruption is
+   discarded and written again, this requires a destination in version 2.0
+   since the items of version 1.x are stored in shared datasets.
+
+   \param source The HDF5 file to read from
+   \param destination The HDF5 file to write to, must be another file than
+   `source`
+   \param group The group to read in the source file
+   \param options The settings of the destination
+
+   \throw h5features::exception If the source and destination are the same
+   file, if `options.batch_items` is 0, if `options.resume` and
+   `options.overwrite` are both true, if the read or write operations failed,
+   if a checksum does not match or if an incomplete item cannot be discarded. The items written before the error remain
+   in the destination.
+
+ */
+h5features::repack_summary repack(const std::string &source, const std::string &destination,
+                                  const std::string &group = "features",
+                                  const h5features::repack_options &options = h5features::repack_options{});
+
+namespace details {
+/**
+   \brief Returns a CRC32 checksum of an item
+
+   The checksum covers the name, the features with their type and dimension,
+   the times and the properties of the item. The properties are hashed
+   independently of the order of their entries. They are left out when
+   `properties` is false, to compare an item with its copy in a version 1.1
+   group, which does not store them.
+
+ */
+std::uint32_t checksum(const h5features::item &item, bool properties = true);
+} // namespace details
+} // namespace h5features
+
+#endif // H5FEATURES_REPACK_H
@@ -0,0 +1,142 @@
+#ifndef H5FEATURES_SHARDED_READER_H
+#define H5FEATURES_SHARDED_READER_H
+
+#include "h5features/file_access.h"
+#include "h5features/item.h"
+#include "h5features/reader.h"
+#include "h5features/reader_pool.h"
+#include <cstddef>
+#include <filesystem>
+#include <memory>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+namespace h5features {
+/**
+   \brief Reads items from a dataset sharded over several HDF5 files
+
+   The dataset is a directory written by one or several
+   `h5features::sharded_writer`. The manifests of all the ranks are read when
+   the reader is instantiated, the shards are opened when an item is read
+   from them, by a `h5features::reader_pool` keeping a limited number of
+   files open.
+
+   The reader can be used concurrently from several threads.
+
+ */
+class sharded_reader {
+public:
+  /**
+     \brief Instantiates a sharded reader
+
+     \param directory The directory of the sharded dataset
+     \param group The group to read in the shards
+     \param max_files The maximal number of shards kept open
+     \param memory_map When true, the readers view the uncompressed data from
+     a memory map of the shards, see `h5features::reader`
+     \param access The settings used to open the shards
+
+     \throw h5features::exception If the directory has no manifest, if a
+     manifest cannot be read or if an item is listed in several shards.
+
+   */
+  explicit sharded_reader(const std::string &directory, const std::string &group = "features",
+                          std::size_t max_files = 16, bool memory_map = false,
+                          const h5features::file_access &access = h5features::file_access{});
+
+  /// Returns the directory of the sharded dataset
+  std::string directory() const;
+
+  /// Returns the HDF5 group name in the shards
+  std::string groupname() const;
+
+  /// Returns the name of the items, ordered by rank and by writing order
+  std::vector<std::string> items() const;
+
+  /// Returns the shards of the dataset, ordered by rank and index
+  std::vector<std::string> shards() const;
+
+  /**
+     \brief Returns the shard storing an item
+
+     \throw h5features::exception If the item is not in the dataset
+
+   */
+  std::string shard(const std::string &name) const;
+
+  /**
+     \brief Reads and returns a `h5features::item` instance
+
+     \param name The name of the item to read
+     \param ignore_properties When true, do not read the item's properties
+
+     \throw h5features::exception If the item is not in the dataset or if the
+     read operation failed.
+
+   */
+  h5features::item read_item(const std::string &name, bool ignore_properties = false) const;
+
+  /**
+     \brief Partial read of a `h5features::item`
+
+     \see h5features::reader::read_item
+
+   */
+  h5features::item read_item(const std::string &name, double start, double stop, bool ignore_properties = false) const;
+
+  /**
+     \brief Reads and returns several items
+
+     The items are read shard by shard, with `h5features::reader::read_many`.
+
+     \param names The name of the items to read
+     \param ignore_properties When true, do not read the item's properties
+     \param workers The number of threads used to decode the items of a
+     shard, when 0 use all the available cores
+
+     \return The items, in the same order as `names`
+
+     \throw h5features::exception If one of the items is not in the dataset
+     or if the read operation failed.
+
+   */
+  std::vector<h5features::item> read_many(const std::vector<std::string> &names, bool ignore_properties = false,
+                                          std::size_t workers = 1) const;
+
+  /**
+     \brief Reads all the items of the dataset, in the order of `items()`
+
+     \see h5features::sharded_reader::read_many
+
+   */
+  std::vector<h5features::item> read_all(bool ignore_properties = false, std::size_t workers = 1) const;
+
+private:
+  // The directory of the sharded dataset
+  std::filesystem::path m_directory;
+
+  // The group read in the shards
+  std::string m_group;
+
+  // The name of the items
+  std::vector<std::string> m_items;
+
+  // The name of the shards
+  std::vector<std::string> m_shards;
+
+  // The index in `m_shards` of the shard of each item
+  std::unordered_map<std::string, std::size_t> m_positions;
+
+  // The readers of the shards
+  std::unique_ptr<h5features::reader_pool> m_pool;
+
+  // Returns the index of the shard of an item
+  std::size_t shard_index(const std::string &name) const;
+
+  // Returns a reader on a shard
+  std::shared_ptr<h5features::reader> get(std::size_t shard) const;
+};
+} // namespace h5features
+
+#endif // H5FEATURES_SHARDED_READER_H
@@ -0,0 +1,183 @@
+#ifndef H5FEATURES_SHARDED_WRITER_H
+#define H5FEATURES_SHARDED_WRITER_H
+
+#include "h5features/details/manifest.h"
+#include "h5features/item.h"
+#include "h5features/writer.h"
+#include <cstddef>
+#include <functional>
+#include <memory>
+#include <string>
+#include <unordered_set>
+#include <vector>
+
+namespace h5features {
+/**
+   \brief Writes items to a dataset sharded over several HDF5 files
+
+   The shards are HDF5 files written by a `h5features::writer` in a
+   directory. The writer rolls over to a new shard when the current one
+   reaches a number of items or a size. A manifest maps the items to their
+   shard, it is read by `h5features::sharded_reader`.
+
+   Several writers, from different processes or nodes, can write to the same
+   directory at once as long as they have different ranks: each rank writes
+   its own shards (`shard-<rank>-<index>.h5`) and its own manifest
+   (`manifest-<rank>.tsv`, with one `<item>\t<shard>` line per item). The
+   items must have distinct names across the ranks.
+
+   The items of a shard are added to the manifest once the shard is closed,
+   so that the manifest only refers to complete files. When a writer is
+   interrupted, the items of its last shard are not in the manifest and must
+   be written again.
+
+ */
+class sharded_writer {
+public:
+  /// Closes the last shard
+  virtual ~sharded_writer();
+
+  /**
+     \brief Instantiates a sharded writer
+
+     \param directory The directory of the sharded dataset, created if needed
+     \param group The group to write in the shards
+     \param max_items The maximal number of items in a shard, 0 for no limit
+     \param max_bytes The maximal size of the features and times of a shard,
+     in bytes before compression, 0 for no limit. A single item larger than
+     this goes to a shard of its own.
+     \param rank The rank of the writer, each of the writers of a dataset must
+     have a distinct rank
+     \param options The settings of the shards writers. When
+     `options.overwrite` is true, erase the shards and manifest of `rank` if
+     they exist, otherwise new shards are added after the existing ones.
+
+     \throw h5features::exception If the directory cannot be created or if the
+     existing manifest cannot be read.
+
+   */
+  explicit sharded_writer(const std::string &directory, const std::string &group = "features",
+                          std::size_t max_items = 0, std::size_t max_bytes = 0, std::size_t rank = 0,
+                          const h5features::writer_options &options = h5features::writer_options{});
+
+  /**
+     \brief Writes an item to the current shard
+
+     \throw h5features::exception If the item has already been written by
+     this rank, if its name contains a tab or a newline, if the writer is
+     closed or if the write operation failed.
+
+   */
+  void write(const h5features::item &item);
+
+  /**
+     \brief Writes a sequence of items, rolling over shards as needed
+
+     \param first The begin iterator on the items to write
+     \param last The end iterator on the items to write
+     \param workers The number of threads used to compress the items, see
+     `h5features::writer::write`
+
+     \throw h5features::exception If one item cannot be written. The items
+     written to the previous shards are kept, the items of the current shard
+     given to this call are not added to the manifest.
+
+   */
+  template <class Iterator> void write(Iterator &&first, Iterator &&last, std::size_t workers = 1) {
+    write_items(std::vector<std::reference_wrapper<const h5features::item>>(first, last), workers);
+  }
+
+  /**
+     \brief Closes the current shard and adds its items to the manifest
+
+     The writer cannot be used after being closed, closing a closed writer
+     does nothing.
+
+     \throw h5features::exception If the shard or the manifest cannot be
+     written
+
+   */
+  void close();
+
+  /// Returns true if the writer is closed
+  bool closed() const noexcept;
+
+  /// Returns the directory of the sharded dataset
+  std::string directory() const;
+
+  /// Returns the HDF5 group name in the shards
+  std::string groupname() const;
+
+  /// Returns the rank of the writer
+  std::size_t rank() const noexcept;
+
+  /// Returns the shards written by this writer so far, including the current one
+  std::vector<std::string> shards() const;
+
+private:
+  // Copy disabled
+  sharded_writer(const sharded_writer &) = delete;
+
+  // Copy disabled
+  sharded_writer &operator=(const sharded_writer &) = delete;
+
+  // The directory of the sharded dataset
+  const std::filesystem::path m_directory;
+
+  // The group written in the shards
+  const std::string m_group;
+
+  // The maximal number of items in a shard, 0 for no limit
+  const std::size_t m_max_items;
+
+  // The maximal uncompressed size of a shard, 0 for no limit
+  const std::size_t m_max_bytes;
+
+  // The rank of the writer
+  const std::size_t m_rank;
+
+  // The settings of the shards writers, a shard is always overwritten
+  const h5features::writer_options m_options;
+
+  // The writer of the current shard, null if no shard is open
+  std::unique_ptr<h5features::writer> m_writer;
+
+  // The index of the next shard to open
+  std::size_t m_next_shard;
+
+  // The shards written so far
+  std::vector<std::string> m_shards;
+
+  // The items of the current shard, added to the manifest when it is closed
+  std::vector<h5features::details::manifest_entry> m_pending;
+
+  // The number of items of the current shard
+  std::size_t m_items;
+
+  // The uncompressed size of the items of the current shard
+  std::size_t m_bytes;
+
+  // The items written by this rank, including the previous sessions
+  std::unordered_set<std::string> m_names;
+
+  // True when the writer is closed
+  bool m_closed;
+
+  // Writes items, rolling over shards as needed
+  void write_items(const std::vector<std::reference_wrapper<const h5features::item>> &items, std::size_t workers);
+
+  // Throws if the item cannot be written
+  void check_item(const h5features::item &item) const;
+
+  // Returns true if the item does not fit in the current shard
+  bool full(std::size_t bytes) const noexcept;
+
+  // Opens a new shard
+  void open_shard();
+
+  // Closes the current shard and adds its items to the manifest
+  void close_shard();
+};
+} // namespace h5features
+
+#endif // H5FEATURES_SHARDED_WRITER_H
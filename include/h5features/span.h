@@ -0,0 +1,82 @@
+#ifndef H5FEATURES_SPAN_H
+#define H5FEATURES_SPAN_H
+
+#include <algorithm>
+#include <cstddef>
+#include <type_traits>
+#include <vector>
+
+namespace h5features {
+/**
+   \brief A non-owning view on a contiguous sequence of scalars
+
+   This is a minimal replacement of C++20 `std::span`. It is used to expose the
+   data stored in `h5features::features` and `h5features::times` without
+   copying it, whatever the data is owned by the library or borrowed from the
+   user (e.g. a numpy array from the Python API).
+
+ */
+template <class T> class span {
+public:
+  /// Constructs an empty span
+  span() noexcept : m_data{nullptr}, m_size{0} {}
+
+  /// Constructs a span over `size` elements starting at `data`
+  span(T *data, std::size_t size) noexcept : m_data{data}, m_size{size} {}
+
+  /// Constructs a span over the whole content of a vector
+  template <class U> span(const std::vector<U> &vector) noexcept : m_data{vector.data()}, m_size{vector.size()} {}
+
+  /// Returns a pointer to the first element
+  T *data() const noexcept { return m_data; }
+
+  /// Returns the number of elements
+  std::size_t size() const noexcept { return m_size; }
+
+  /// Returns true if the span is empty
+  bool empty() const noexcept { return m_size == 0; }
+
+  /// Returns the element at position `i` (no bounds checking)
+  T &operator[](std::size_t i) const noexcept { return m_data[i]; }
+
+  /// Returns an iterator on the first element
+  T *begin() const noexcept { return m_data; }
+
+  /// Returns an iterator past the last element
+  T *end() const noexcept { return m_data + m_size; }
+
+  /// Returns the sub-span of `count` elements starting at `offset`
+  span subspan(std::size_t offset, std::size_t count) const noexcept { return {m_data + offset, count}; }
+
+  /// Returns a copy of the viewed elements as a vector
+  std::vector<std::remove_const_t<T>> to_vector() const { return {begin(), end()}; }
+
+private:
+  T *m_data;
+  std::size_t m_size;
+};
+
+/// Returns true if the two spans view equal elements
+template <class T, class U> bool operator==(const span<T> &lhs, const span<U> &rhs) {
+  return lhs.size() == rhs.size() and std::equal(lhs.begin(), lhs.end(), rhs.begin());
+}
+
+/// Returns true if the span and the vector have equal elements
+template <class T, class U> bool operator==(const span<T> &lhs, const std::vector<U> &rhs) {
+  return lhs == span<const U>(rhs);
+}
+
+/// Returns true if the vector and the span have equal elements
+template <class T, class U> bool operator==(const std::vector<U> &lhs, const span<T> &rhs) { return rhs == lhs; }
+
+/// Returns true if the two spans view different elements
+template <class T, class U> bool operator!=(const span<T> &lhs, const span<U> &rhs) { return not(lhs == rhs); }
+
+/// Returns true if the span and the vector have different elements
+template <class T, class U> bool operator!=(const span<T> &lhs, const std::vector<U> &rhs) { return not(lhs == rhs); }
+
+/// Returns true if the vector and the span have different elements
+template <class T, class U> bool operator!=(const std::vector<U> &lhs, const span<T> &rhs) { return not(lhs == rhs); }
+} // namespace h5features
+
+#endif // H5FEATURES_SPAN_H
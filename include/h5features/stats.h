@@ -0,0 +1,75 @@
+#ifndef H5FEATURES_STATS_H
+#define H5FEATURES_STATS_H
+
+#include <cstdint>
+
+namespace h5features {
+/**
+   \brief I/O statistics of a reader or a writer
+
+   The statistics are recorded once enabled with
+   `h5features::reader::enable_stats` or `h5features::writer::enable_stats`.
+   Each operation is counted and timed, the operations executed concurrently
+   by several threads are timed in each thread.
+
+ */
+struct stats {
+  /// The number of times an operation has been executed and its total duration
+  struct operation {
+    /// The number of executions
+    std::uint64_t count = 0;
+
+    /// The total duration of the executions, in seconds
+    double seconds = 0;
+  };
+
+  /// Opening the group of an item
+  operation open_group;
+
+  /// Reading times from file
+  operation read_times;
+
+  /// Reading features from file
+  operation read_features;
+
+  /// Reading properties from file
+  operation read_properties;
+
+  /// Decoding properties, when they are first accessed
+  operation decode_properties;
+
+  /// Decompressing data read from file, out of HDF5
+  operation decompress;
+
+  /// Compressing data to be written, out of HDF5
+  operation compress;
+
+  /// Writing times to file
+  operation write_times;
+
+  /// Writing features to file
+  operation write_features;
+
+  /// Writing properties to file
+  operation write_properties;
+
+  /// The number of bytes of features and times read, uncompressed
+  std::uint64_t bytes_read = 0;
+
+  /// The number of bytes of features and times read as stored on file,
+  /// estimated from the compression ratio of the datasets for partial reads
+  std::uint64_t bytes_read_stored = 0;
+
+  /// The number of bytes of features and times written, uncompressed
+  std::uint64_t bytes_written = 0;
+
+  /// The number of bytes of features and times written as stored on file
+  std::uint64_t bytes_written_stored = 0;
+
+  /// The hit rate of the HDF5 metadata cache of the file, in [0, 1]. HDF5 does
+  /// not report the hits of the chunk cache.
+  double cache_hit_rate = 0;
+};
+} // namespace h5features
+
+#endif // H5FEATURES_STATS_H
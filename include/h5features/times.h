@@ -1,6 +1,8 @@
 #ifndef H5FEATURES_TIMES_H
 #define H5FEATURES_TIMES_H
 
+#include "h5features/span.h"
+#include <memory>
 #include <utility>
 #include <vector>
 
@@ -19,6 +21,9 @@ namespace h5features {
    - `times::format::interval` where the timestamp is a pair `(tstart, tstop)`
      interpreted as the begin and end of the frame's time window.
 
+   As for `h5features::features`, the timestamps are immutable and either owned
+   by the instance or borrowed from an external buffer.
+
 */
 class times {
 public:
@@ -34,13 +39,13 @@ public:
   times(const times &) = default;
 
   /// Move constructor
-  times(times &&) = default;
+  times(times &&other) noexcept;
 
   /// Copy operator
   times &operator=(const times &) = default;
 
   /// Move operator
-  times &operator=(times &&) = default;
+  times &operator=(times &&other) noexcept;
 
   /// Destructor
   virtual ~times() = default;
@@ -76,6 +81,25 @@ public:
   times(std::vector<double> &&data, format times_format, bool validate = true);
   /// @}
 
+  /**
+     \brief Constructs a `times` instance borrowing an external buffer
+
+     The data is not copied, it is kept alive by `owner`. See
+     `times(const std::vector<double>&, format, bool)` for the data layout.
+
+     \param data A view on the timestamps data
+     \param times_format The actual format of the data
+     \param owner A handle keeping `data` alive, can be null if the lifetime of
+     the buffer is guaranteed by the caller
+     \param validate When true, ensures the timestamps are valid
+
+     \throw h5features::exception When `validate` is true, if the timestamps
+     are not valid.
+
+   */
+  times(h5features::span<const double> data, format times_format, std::shared_ptr<const void> owner,
+        bool validate = true);
+
   /**
      \brief Constructs a `times` instance from start and stop timestamps
 
@@ -107,7 +131,7 @@ public:
   std::size_t dim() const noexcept;
 
   /// Returns the timestamps raw data
-  const std::vector<double> &data() const noexcept;
+  h5features::span<const double> data() const noexcept;
 
   /**
      \brief Returns the first timestamp
@@ -154,6 +178,9 @@ public:
   /**
      \brief Returns a subset of those timestamps from `start` to `stop`
 
+     The returned times are a view on the timestamps of this instance, without
+     copy: they share the same buffer and keep it alive.
+
      \param start The first index of the returned times
      \param stop The last index of the returned times
 
@@ -166,8 +193,12 @@ private:
   // Default constructor not used
   times() = delete;
 
-  // The stored timestamps
-  std::vector<double> m_data;
+  // Keeps the timestamps data alive, this is either a `std::vector<double>`
+  // owned by the times or an external buffer
+  std::shared_ptr<const void> m_owner;
+
+  // The stored timestamps, viewed from the buffer held by `m_owner`
+  h5features::span<const double> m_data;
 
   // the timestamps format
   format m_format;
@@ -1,14 +1,64 @@
 #ifndef H5FEATURES_WRITER_H
 #define H5FEATURES_WRITER_H
 
+#include "h5features/appender.h"
+#include "h5features/chunking.h"
+#include "h5features/compression.h"
+#include "h5features/details/stats_recorder.h"
 #include "h5features/details/writer_interface.h"
+#include "h5features/dtype.h"
 #include "h5features/item.h"
+#include "h5features/stats.h"
+#include "h5features/times.h"
 #include "h5features/version.h"
-#include <algorithm>
+#include <cstddef>
+#include <functional>
 #include <memory>
 #include <string>
+#include <vector>
 
 namespace h5features {
+/// The settings of `h5features::writer`
+struct writer_options {
+  /// If true erase the file content if it is already existing, if false append new items to the existing group
+  bool overwrite = false;
+
+  /// The compression settings of the features and times
+  h5features::compression compression{};
+
+  /// The chunking policy of the features, used in version 2.0 only
+  h5features::chunking chunking{};
+
+  /**
+     \brief When true, maintain an index of the items, used in version 2.0 only
+
+     The writer maintains in the group an index of the items with their name,
+     size, features dimension and time span. This makes
+     `h5features::reader::items`, `h5features::reader::sizes`,
+     `h5features::reader::dims` and `h5features::reader::time_spans` cheap on
+     groups with many items. If the group already has items they are indexed
+     when opening the writer. An existing index is always maintained, whatever
+     the value of `index`.
+   */
+  bool index = false;
+
+  /**
+     \brief When true, write the properties in a compact encoding
+
+     The properties of each item are encoded in a single buffer written as a
+     dataset of bytes (see `h5features::details::encode_properties`), instead
+     of one HDF5 attribute or dataset per property and one group per nested
+     properties. This makes the properties much cheaper to write and read, and
+     they are decoded only when accessed (see `h5features::item::properties`).
+     The compact encoding is used in versions 1.2 and 2.0 and is read by both
+     formats.
+   */
+  bool compact_properties = false;
+
+  /// The version of the file to write. Version 1.0 is **not available** to write, only read.
+  h5features::version version = h5features::current_version;
+};
+
 /**
    \brief The writer class dumps `h5features::item` instances to a HDF5 file
 
@@ -19,7 +69,7 @@ namespace h5features {
 class writer {
 public:
   /// Destructor
-  virtual ~writer() = default;
+  virtual ~writer();
 
   /// Move constructor
   writer(writer &&) = default;
@@ -31,7 +81,7 @@ public:
      \param group The group in the file to write on
      \param overwrite If true erase the file content if it is already existing.
      If false it will append new items to the existing group.
-     \param compress When true, compress the data
+     \param compress When true, compress the data with deflate at level 9
      \param version The version of the file to write. Version 1.0 is **not
      available** to write, only read.
 
@@ -43,13 +93,30 @@ public:
   writer(const std::string &filename, const std::string &group = "features", bool overwrite = false,
          bool compress = true, h5features::version version = h5features::current_version);
 
+  /**
+     \brief Instantiates a writer with custom settings
+
+     \param filename The HDF5 file to write on
+     \param group The group in the file to write on
+     \param options The settings of the writer
+
+     \throw h5features::exception When `options.overwrite` is true, if the
+     `group` already exists in the file and the version is not supported. Or
+     if the requested `options.version` is not supported. Or if the
+     compression codec is not available.
+
+   */
+  writer(const std::string &filename, const std::string &group, const h5features::writer_options &options);
+
   /**
      \brief Writes a `h5features::item` to disk
 
      \param item The item to write
 
      \throw h5features::exception If the item name is already an existing
-     object in the group or if the write operation failed.
+     object in the group, if the writer is closed or if the write operation
+     failed. In version 1.x, also if the dimensions or the dtype of the item
+     differ from the items already in the group.
 
    */
   void write(const h5features::item &item);
@@ -57,17 +124,139 @@ public:
   /**
      \brief Writes a sequence of `h5features::item` to disk
 
+     The write is pipelined: a pool of `workers` threads compresses the items
+     while the calling thread writes them to file, in order. Compression is
+     parallelized when writing version 2.0 only, items are written
+     sequentially in version 1.x files.
+
      \param first The begin iterator on the items to write
      \param last The end iterator on the items to write
+     \param workers The number of threads used to compress the items, when 0
+     use all the available cores
 
      \throw h5features::exception If one item is already an existing
-     object in the group or if the write operation failed.
+     object in the group or if the write operation failed. The items
+     preceding the failing one are written.
 
   */
-  template <class Iterator> void write(Iterator &&first, Iterator &&last) {
-    std::for_each(first, last, [&](const auto &item) { write(item); });
+  template <class Iterator> void write(Iterator &&first, Iterator &&last, std::size_t workers = 1) {
+    write_items(std::vector<std::reference_wrapper<const h5features::item>>(first, last), workers);
   }
 
+  /**
+     \brief Writes items concatenated in single features and times
+
+     The item `names[i]` has the frames `[offsets[i], offsets[i + 1])` of
+     `features` and `times`. The items are validated at once before being
+     written: the offsets must cover all the frames, each item must have at
+     least one frame and its timestamps must be sorted. The items are then
+     written straight from the concatenated data: in version 1.x all the
+     items are appended at once, in version 2.0 each item is written from a
+     view on its frames, encoded by a pool of `workers` threads as in
+     `write(first, last, workers)`.
+
+     \param names The names of the items to write
+     \param features The concatenated features of the items, they can be
+     views on external data, see `h5features::features`
+     \param times The concatenated timestamps of the items, not validated as
+     a whole since they are not sorted across items
+     \param offsets The index of the first frame of each item, followed by the
+     total number of frames
+     \param properties Either empty or the properties of each item
+     \param workers The number of threads encoding the items in version 2.0,
+     when 0 use all the available cores
+
+     \throw h5features::exception If the items are not valid, if one item is
+     already an existing object in the group or if the write operation failed.
+     No item is written when one cannot be written in the group. If the write
+     operation fails in version 2.0, the items preceding the failing one are
+     written.
+
+   */
+  void write_concatenated(const std::vector<std::string> &names, const h5features::features &features,
+                          const h5features::times &times, const std::vector<std::size_t> &offsets,
+                          const std::vector<h5features::properties> &properties = {}, std::size_t workers = 1);
+
+  /**
+     \brief Opens an item to write it by blocks of frames
+
+     The returned `h5features::appender` extends the features and times of
+     the item chunk by chunk, so that an item can be written as its features
+     are computed without holding it entirely in memory. The item is complete
+     once the appender is closed. Several items can be written at once, and
+     the appenders not closed when the writer is closed are discarded. This is
+     supported in version 2.0 only.
+
+     \param name The name of the item to write
+     \param dim The dimension of the features
+     \param format The format of the timestamps
+     \param dtype The type of the features
+
+     \throw h5features::exception If the item is already an existing object in
+     the group, if its dimensions are not consistent with the group, if the
+     writer is closed or if the writer is not of version 2.0.
+
+   */
+  h5features::appender open_item(const std::string &name, std::size_t dim,
+                                 h5features::times::format format = h5features::times::format::interval,
+                                 h5features::dtype dtype = h5features::dtype::float64);
+
+  /**
+     \brief Writes the items buffered in memory to disk
+
+     The version 1.x writers buffer the items and append them to file by
+     batches. The buffered items are written by `flush()`, `close()` and when
+     the writer is destroyed. The version 2.0 writers write the items
+     immediately and buffer their entries in the index of the group, if any.
+
+     \throw h5features::exception If the writer is closed or if the write
+     operation failed.
+
+   */
+  void flush();
+
+  /**
+     \brief Flushes the buffered items and closes the file
+
+     The writer cannot be used after being closed, closing a closed writer
+     does nothing. The items opened by `open_item()` and not closed are
+     discarded.
+
+     \throw h5features::exception If the write operation failed. The file is
+     closed anyway.
+
+   */
+  void close();
+
+  /// Returns true if the writer is closed
+  bool closed() const noexcept;
+
+  /**
+     \brief Enables the recording of I/O statistics
+
+     The statistics are accumulated from the call and returned by `stats()`.
+     Recording the statistics has a small cost, it is disabled by default.
+
+     \param callback When not null, called with the statistics at the end of
+     each operation on the writer. The exceptions it throws are ignored.
+
+   */
+  void enable_stats(std::function<void(const h5features::stats &)> callback = nullptr);
+
+  /// Disables the recording of I/O statistics and discards them
+  void disable_stats();
+
+  /**
+     \brief Returns the I/O statistics recorded so far
+
+     The statistics are zero if they are not enabled.
+
+   */
+  h5features::stats stats() const;
+
+  /// Resets the I/O statistics to zero
+  void reset_stats();
+
   /// Returns the HDF5 file name
   std::string filename() const;
 
@@ -90,14 +279,38 @@ private:
   // Copy disabled
   writer &operator=(const writer &) = delete;
 
+  // Writes a sequence of items with a pool of workers
+  void write_items(const std::vector<std::reference_wrapper<const h5features::item>> &items, std::size_t workers);
+
+  // Writes `count` items, the item `i` being encoded by `prepare(i)` with a
+  // pool of workers while the previous ones are written to file
+  void write_prepared(std::size_t count, const std::function<h5features::details::deferred_write(std::size_t)> &prepare,
+                      std::size_t workers);
+
   // The name of the file to write on
   const std::string m_filename;
 
   // The name of the group to write on in the file
   const std::string m_groupname;
 
-  // The concrete writer used depends on the h5features version of the file
+  // The concrete writer used depends on the h5features version of the file,
+  // null once the writer is closed
   std::unique_ptr<h5features::details::writer_interface> m_writer;
+
+  // The h5features version being written
+  const h5features::version m_version;
+
+  // The items being written by an appender, discarded when the writer is closed
+  std::vector<std::weak_ptr<h5features::details::item_stream>> m_streams;
+
+  // The I/O statistics, null when disabled
+  std::shared_ptr<h5features::details::stats_recorder> m_stats;
+
+  // Returns the I/O statistics recorder, null when disabled
+  std::shared_ptr<h5features::details::stats_recorder> recorder() const;
+
+  // Returns the concrete writer or throws if the writer is closed
+  h5features::details::writer_interface &checked_writer() const;
 };
 } // namespace h5features
 
@@ -1,5 +1,29 @@
 """h5features library."""
 
-from ._core import Item, Reader, Version, Writer
+from ._core import (
+    Appender,
+    FramesIterator,
+    Item,
+    Reader,
+    ReaderPool,
+    ShardedReader,
+    ShardedWriter,
+    Stats,
+    Version,
+    Writer,
+    repack,
+)
 
-__all__ = ["Item", "Reader", "Version", "Writer"]
+__all__ = [
+    "Appender",
+    "FramesIterator",
+    "Item",
+    "Reader",
+    "ReaderPool",
+    "ShardedReader",
+    "ShardedWriter",
+    "Stats",
+    "Version",
+    "Writer",
+    "repack",
+]
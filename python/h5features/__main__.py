@@ -0,0 +1,98 @@
+"""Command line interface of h5features.
+
+Usage: h5features repack SOURCE DESTINATION [options]
+"""
+
+import argparse
+import sys
+
+from ._core import Version, repack
+
+VERSIONS = {"1.1": Version.v1_1, "1.2": Version.v1_2, "2.0": Version.v2_0}
+
+
+def parse_arguments(argv: list[str] | None) -> argparse.Namespace:
+    """Return the parsed command line arguments."""
+    parser = argparse.ArgumentParser(prog="h5features", description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_repack = subparsers.add_parser(
+        "repack",
+        help="copy a group to another file, changing its version, compression, chunking or dtype",
+        description=repack.__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser_repack.add_argument("source", help="HDF5 file to read from")
+    parser_repack.add_argument("destination", help="HDF5 file to write to")
+    parser_repack.add_argument("-g", "--group", default="features", help="group to read, default to %(default)s")
+    parser_repack.add_argument("--destination-group", help="group to write, default to the source group")
+    parser_repack.add_argument(
+        "--format-version", choices=VERSIONS, default="2.0", help="version to write, default to %(default)s"
+    )
+    parser_repack.add_argument(
+        "-c", "--compression", default="none", help="none, deflate, lzf, zstd or blosc, default to %(default)s"
+    )
+    parser_repack.add_argument("--compression-level", type=int, help="compression level, default to the codec one")
+    parser_repack.add_argument("--shuffle", action="store_true", help="shuffle the bytes before compression")
+    parser_repack.add_argument(
+        "--access", choices=["partial", "whole"], default="partial", help="chunking policy, default to %(default)s"
+    )
+    parser_repack.add_argument("--chunk-bytes", type=int, default=0, help="target size of the chunks in bytes")
+    parser_repack.add_argument("--index", action="store_true", help="maintain an index of the items")
+    parser_repack.add_argument("--compact-properties", action="store_true", help="compact encoding of the properties")
+    parser_repack.add_argument("--dtype", choices=["float16", "float32", "float64"], help="convert the features")
+    parser_repack.add_argument("-j", "--workers", type=int, default=0, help="number of threads, default to all cores")
+    parser_repack.add_argument(
+        "-b", "--batch-items", type=int, default=256, help="items per batch, default to %(default)s"
+    )
+    parser_repack.add_argument("--no-verify", action="store_true", help="do not verify the checksums")
+    parser_repack.add_argument("--resume", action="store_true", help="skip the items already in the destination")
+    parser_repack.add_argument("--overwrite", action="store_true", help="erase the destination if existing")
+    parser_repack.add_argument("-q", "--quiet", action="store_true", help="do not display the progress")
+    return parser.parse_args(argv)
+
+
+def progress(done: int, total: int) -> None:
+    """Display the number of items processed."""
+    sys.stderr.write(f"\r{done}/{total} items")
+    if done == total:
+        sys.stderr.write("\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the ``h5features`` command."""
+    args = parse_arguments(argv)
+    try:
+        summary = repack(
+            args.source,
+            args.destination,
+            group=args.group,
+            destination_group=args.destination_group,
+            version=VERSIONS[args.format_version],
+            compression=args.compression,
+            compression_level=args.compression_level,
+            shuffle=args.shuffle,
+            access=args.access,
+            chunk_bytes=args.chunk_bytes,
+            index=args.index,
+            compact_properties=args.compact_properties,
+            dtype=args.dtype,
+            workers=args.workers,
+            batch_items=args.batch_items,
+            verify=not args.no_verify,
+            resume=args.resume,
+            overwrite=args.overwrite,
+            progress=None if args.quiet else progress,
+        )
+    except RuntimeError as error:
+        sys.stderr.write(f"error: {error}\n")
+        return 1
+
+    sys.stderr.write(
+        f"{summary['written']} items written, {summary['skipped']} skipped, {summary['verified']} verified\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,13 +3,21 @@
 namespace nb = nanobind;
 
 void init_version(nb::module_ &m);
+void init_stats(nb::module_ &m);
 void init_item(nb::module_ &m);
 void init_reader(nb::module_ &m);
+void init_reader_pool(nb::module_ &m);
+void init_repack(nb::module_ &m);
+void init_sharded(nb::module_ &m);
 void init_writer(nb::module_ &m);
 
 NB_MODULE(_core, m) {
   init_version(m);
+  init_stats(m);
   init_item(m);
   init_reader(m);
+  init_reader_pool(m);
+  init_repack(m);
+  init_sharded(m);
   init_writer(m);
 }
@@ -1,14 +1,23 @@
+#include "h5features/dtype.h"
+#include "h5features/exception.h"
 #include "h5features/item.h"
 #include "h5features/properties.h"
 #include "nanobind/nanobind.h"
 #include "nanobind/ndarray.h"
 #include "nanobind/stl/optional.h"
+#include "nanobind/stl/pair.h"
 #include "nanobind/stl/string.h"
 #include "nanobind/stl/unordered_map.h"
 #include "nanobind/stl/variant.h"
 #include "nanobind/stl/vector.h"
+#include <cstddef>
+#include <cstdint>
 #include <memory>
+#include <optional>
+#include <sstream>
 #include <string>
+#include <utility>
+#include <variant>
 #include <vector>
 
 namespace nb = nanobind;
@@ -99,52 +108,178 @@ h5features::properties::value_type from_py_value(const nb::handle obj) {
   throw nb::value_error("Unsupported Python type for h5features::properties");
 }
 
+// Returns a handle keeping the numpy `array` alive, the Python object is
+// released with the GIL held whatever the thread destroying the last handle
+template <class Array> std::shared_ptr<const void> keep_alive(const Array &array) {
+  auto *owner = new Array(array);
+  return std::shared_ptr<const void>(array.data(), [owner](const void *) {
+    nb::gil_scoped_acquire gil;
+    delete owner;
+  });
+}
+
+// A 2D numpy array of float16, float32 or float64 features
+using features_array = nb::ndarray<nb::ro, nb::ndim<2>, nb::c_contig>;
+
+// The numpy float16 type, nanobind does not define it
+constexpr nb::dlpack::dtype float16{static_cast<std::uint8_t>(nb::dlpack::dtype_code::Float), 16, 1};
+
+// Returns the features dtype of a numpy dtype, if supported
+std::optional<h5features::dtype> to_dtype(const nb::dlpack::dtype &dtype) {
+  if (dtype == nb::dtype<double>()) {
+    return h5features::dtype::float64;
+  }
+  if (dtype == nb::dtype<float>()) {
+    return h5features::dtype::float32;
+  }
+  if (dtype == float16) {
+    return h5features::dtype::float16;
+  }
+  return std::nullopt;
+}
+
+// Returns the numpy dtype of a features dtype
+nb::dlpack::dtype from_dtype(h5features::dtype dtype) {
+  switch (dtype) {
+  case h5features::dtype::float16:
+    return float16;
+  case h5features::dtype::float32:
+    return nb::dtype<float>();
+  default:
+    return nb::dtype<double>();
+  }
+}
+
+// Builds features from a numpy array, copied or borrowed
+h5features::features make_features(const features_array &features, h5features::dtype dtype, bool copy) {
+  const h5features::span<const std::byte> bytes{static_cast<const std::byte *>(features.data()), features.nbytes()};
+  if (copy) {
+    auto buffer = std::make_shared<const std::vector<std::byte>>(bytes.begin(), bytes.end());
+    return {{buffer->data(), buffer->size()}, dtype, features.shape(1), buffer, true};
+  }
+  return {bytes, dtype, features.shape(1), keep_alive(features), true};
+}
+
+// Builds times from a 1D or 2D numpy array, copied or borrowed
+h5features::times make_times(const nb::ndarray<const double, nb::c_contig> &times, bool copy) {
+  if (times.ndim() != 1 and times.ndim() != 2) {
+    throw nb::type_error("Expected a 1D or 2D ndarray for times.");
+  }
+
+  const auto format = h5features::times::get_format(times.ndim() == 1 ? 1 : times.shape(1));
+  if (copy) {
+    return {std::vector<double>{times.data(), times.data() + times.size()}, format, true};
+  }
+  return {{times.data(), times.size()}, format, keep_alive(times), true};
+}
+
+// The start and stop timestamps of interval times, as two 1D numpy arrays
+// possibly strided (e.g. columns of a 2D array)
+using times_pair = std::pair<nb::ndarray<const double, nb::ndim<1>>, nb::ndarray<const double, nb::ndim<1>>>;
+
+// Builds interval times from start and stop arrays, interleaved in a single
+// pass into the times buffer
+h5features::times make_times(const times_pair &times) {
+  const auto &[start, stop] = times;
+  if (start.shape(0) != stop.shape(0)) {
+    throw h5features::exception("tstart and tstop must have the same size");
+  }
+
+  const auto size = start.shape(0);
+  const auto start_stride = start.stride(0);
+  const auto stop_stride = stop.stride(0);
+  const double *const first = start.data();
+  const double *const last = stop.data();
+  std::vector<double> data(2 * size);
+  double *const destination = data.data();
+  for (std::size_t i = 0; i < size; ++i) {
+    destination[2 * i] = first[i * start_stride];
+    destination[2 * i + 1] = last[i * stop_stride];
+  }
+  return {std::move(data), h5features::times::format::interval, true};
+}
+
+// The times of an item, either a 1D or 2D array or a pair of start and stop
+// arrays
+using times_array = std::variant<nb::ndarray<const double, nb::c_contig>, times_pair>;
+
+// Builds times from a numpy array or a pair of arrays, see above
+h5features::times make_times(const times_array &times, bool copy) {
+  if (const auto *pair = std::get_if<times_pair>(&times)) {
+    return make_times(*pair);
+  }
+  return make_times(std::get<0>(times), copy);
+}
+
 void init_item(nb::module_ &m) {
   nb::class_<h5features::item>(m, "Item")
       .def(
           "__init__",
-          [](h5features::item *t, const std::string &name,
-             const nb::ndarray<const double, nb::ndim<2>, nb::c_contig> &features,
-             const nb::ndarray<const double, nb::c_contig> &times, std::optional<nb::dict> properties) {
-            const auto props = properties ? from_py(*properties) : h5features::properties();
-            const h5features::features cfeatures{
-                std::vector<double>{features.data(), features.data() + features.size()}, features.shape(1), true};
-            if (times.ndim() == 1) {
-              const h5features::times ctimes{std::vector<double>{times.data(), times.data() + times.size()},
-                                             h5features::times::get_format(1), true};
-              return new (t) h5features::item(name, cfeatures, ctimes, props);
-            } else if (times.ndim() == 2) {
-              const h5features::times ctimes{std::vector<double>{times.data(), times.data() + times.size()},
-                                             h5features::times::get_format(times.shape(1)), true};
-              return new (t) h5features::item(name, cfeatures, ctimes, props);
+          [](h5features::item *t, const std::string &name, const features_array &features, const times_array &times,
+             std::optional<nb::dict> properties, bool copy) {
+            const auto dtype = to_dtype(features.dtype());
+            if (not dtype.has_value()) {
+              // features of other types are converted to float64 by the overload below
+              throw nb::next_overload();
             }
-            throw nb::type_error("Expected a 1D or 2D ndarray for times.");
+            new (t) h5features::item(name, make_features(features, dtype.value(), copy), make_times(times, copy),
+                                     properties ? from_py(*properties) : h5features::properties());
           },
-          "name"_a, "features"_a, "times"_a, "properties"_a = nb::none(),
-          "Handle the features of a single item (e.g. a speech signal).")
+          "name"_a, "features"_a, "times"_a, "properties"_a = nb::none(), nb::kw_only(), "copy"_a = true,
+          "Handle the features of a single item (e.g. a speech signal).\n\n"
+          "The features are stored as float64, float32 or float16, as given in the ``features`` array. Features of "
+          "another type are converted to float64.\n\n"
+          "When ``copy`` is False, the ``features`` and ``times`` arrays are borrowed instead of copied: the item "
+          "keeps them alive and they must not be modified afterwards. Arrays that are not C-contiguous (or times "
+          "that are not float64) are converted, and thus copied, anyway.\n\n"
+          "The ``times`` are either an array of shape ``(size,)`` or ``(size, 1)`` (one timestamp per frame) or "
+          "``(size, 2)`` (start and stop of each frame), or a pair ``(start, stop)`` of 1D arrays. The start and "
+          "stop arrays can be strided, such as the columns of a 2D array, they are interleaved in a single pass "
+          "without intermediate copy.")
+      .def(
+          "__init__",
+          [](h5features::item *t, const std::string &name,
+             const nb::ndarray<const double, nb::ndim<2>, nb::c_contig> &features, const times_array &times,
+             std::optional<nb::dict> properties, bool copy) {
+            new (t)
+                h5features::item(name, make_features(features_array{features}, h5features::dtype::float64, copy),
+                                 make_times(times, copy), properties ? from_py(*properties) : h5features::properties());
+          },
+          "name"_a, "features"_a, "times"_a, "properties"_a = nb::none(), nb::kw_only(), "copy"_a = true)
       .def("__eq__", &h5features::item::operator==, "other"_a)
       .def("__ne__", &h5features::item::operator!=, "other"_a)
       .def_prop_ro("name", &h5features::item::name, "The name of the item.")
       .def_prop_ro("dim", &h5features::item::dim, "The dimension of the features.")
       .def_prop_ro("size", &h5features::item::size, "The number of vectors in the features.")
+      .def_prop_ro(
+          "dtype",
+          [](const h5features::item &self) {
+            std::stringstream dtype;
+            dtype << self.features().get_dtype();
+            return dtype.str();
+          },
+          "The type of the features, either 'float64', 'float32' or 'float16'.")
       .def_prop_ro(
           "properties", [](const h5features::item &self) { return to_py(self.properties()); }, "The item's properties.")
       .def(
           "features",
           [](const h5features::item &self) {
             const auto &cfeatures = self.features();
-            return nb::ndarray<nb::numpy, double, nb::ndim<2>, nb::c_contig>(
-                const_cast<double *>(cfeatures.data().data()), {cfeatures.size(), cfeatures.dim()});
+            return nb::ndarray<nb::numpy, nb::ro, nb::ndim<2>, nb::c_contig>(
+                cfeatures.bytes().data(), {cfeatures.size(), cfeatures.dim()}, nb::handle(), {},
+                from_dtype(cfeatures.get_dtype()));
           },
-          "The item's features.")
+          nb::rv_policy::reference_internal,
+          "The item's features.\n\nThis is a read-only view on the item's data, without copy.")
       .def(
           "times",
           [](const h5features::item &self) {
             const auto &ctimes = self.times();
-            return nb::ndarray<nb::numpy, double, nb::ndim<2>, nb::c_contig>(const_cast<double *>(ctimes.data().data()),
-                                                                             {ctimes.size(), ctimes.dim()});
+            return nb::ndarray<nb::numpy, const double, nb::ndim<2>, nb::c_contig>(ctimes.data().data(),
+                                                                                   {ctimes.size(), ctimes.dim()});
           },
-          "The item's timestamps.")
+          nb::rv_policy::reference_internal,
+          "The item's timestamps.\n\nThis is a read-only view on the item's data, without copy.")
       .def("__repr__", [](const h5features::item &self) {
         return nb::str("Item(name={}, size={}, dim={})").format(self.name(), self.size(), self.dim());
       });
@@ -1,22 +1,271 @@
+#include "h5features/details/thread_pool.h"
+#include "h5features/dtype.h"
+#include "h5features/exception.h"
+#include "h5features/features.h"
+#include "h5features/file_access.h"
+#include "h5features/frames_iterator.h"
 #include "h5features/reader.h"
 #include "nanobind/nanobind.h"
+#include "nanobind/ndarray.h"
 #include "nanobind/stl/filesystem.h"
+#include "nanobind/stl/function.h"
+#include "nanobind/stl/optional.h"
+#include "nanobind/stl/pair.h"
 #include "nanobind/stl/string.h"
+#include "nanobind/stl/tuple.h"
 #include "nanobind/stl/vector.h"
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <exception>
 #include <filesystem>
+#include <memory>
+#include <optional>
+#include <sstream>
 #include <string>
+#include <tuple>
+#include <vector>
 
 namespace nb = nanobind;
 using namespace nb::literals;
 
+nb::dlpack::dtype from_dtype(h5features::dtype dtype);
+
+std::optional<h5features::dtype> to_dtype(const nb::dlpack::dtype &dtype);
+
+// A writeable 2D numpy array the features are read into
+using features_destination = nb::ndarray<nb::ndim<2>, nb::c_contig, nb::device::cpu>;
+
+// Reads the concatenated features and times of several items, into `out` if
+// not None or into newly allocated arrays, see `reader::read_concatenated`
+nb::tuple read_concatenated(const h5features::reader &self, std::optional<std::vector<std::string>> names,
+                            nb::object out) {
+  std::optional<h5features::reader::concatenation> layout;
+  {
+    nb::gil_scoped_release release;
+    layout.emplace(self.prepare_concatenated(names.has_value() ? names.value() : self.items()));
+  }
+  const auto frames = layout->frames();
+
+  nb::object features;
+  h5features::span<std::byte> destination;
+  h5features::dtype dtype = layout->dtype;
+  if (out.is_none()) {
+    const auto bytes = frames * layout->dim * h5features::size_of(dtype);
+    auto *buffer = new std::byte[bytes];
+    nb::capsule owner(buffer, [](void *p) noexcept { delete[] static_cast<std::byte *>(p); });
+    features =
+        nb::ndarray<nb::numpy, nb::ndim<2>, nb::c_contig>(buffer, {frames, layout->dim}, owner, {}, from_dtype(dtype))
+            .cast();
+    destination = {buffer, bytes};
+  } else {
+    features_destination array;
+    if (not nb::try_cast(out, array, false)) {
+      throw nb::type_error("out must be a writeable C-contiguous 2D array");
+    }
+    const auto out_dtype = to_dtype(array.dtype());
+    if (not out_dtype.has_value()) {
+      throw nb::type_error("out must be an array of float64, float32 or float16");
+    }
+    if (array.shape(0) != frames or array.shape(1) != layout->dim) {
+      std::stringstream msg;
+      msg << "out has shape (" << array.shape(0) << ", " << array.shape(1) << "), expected (" << frames << ", "
+          << layout->dim << ")";
+      throw h5features::exception(msg.str());
+    }
+    features = out;
+    dtype = out_dtype.value();
+    destination = {static_cast<std::byte *>(array.data()), array.nbytes()};
+  }
+
+  auto *times = new std::vector<double>(frames * layout->times_dim);
+  nb::capsule times_owner(times, [](void *p) noexcept { delete static_cast<std::vector<double> *>(p); });
+  auto *offsets = new std::vector<std::int64_t>(layout->offsets.begin(), layout->offsets.end());
+  nb::capsule offsets_owner(offsets, [](void *p) noexcept { delete static_cast<std::vector<std::int64_t> *>(p); });
+  {
+    nb::gil_scoped_release release;
+    self.read_concatenated(layout.value(), destination, dtype, {times->data(), times->size()});
+  }
+
+  return nb::make_tuple(
+      features, nb::ndarray<nb::numpy, double, nb::ndim<2>>(times->data(), {frames, layout->times_dim}, times_owner),
+      nb::ndarray<nb::numpy, const std::int64_t, nb::ndim<1>>(offsets->data(), {offsets->size()}, offsets_owner),
+      layout->names);
+}
+
+// Returns a read-only numpy array owning the features
+nb::object to_numpy(h5features::features &&features) {
+  auto *owner = new h5features::features(std::move(features));
+  nb::capsule capsule(owner, [](void *p) noexcept { delete static_cast<h5features::features *>(p); });
+  return nb::ndarray<nb::numpy, nb::ro, nb::ndim<2>, nb::c_contig>(owner->bytes().data(), {owner->size(), owner->dim()},
+                                                                   capsule, {}, from_dtype(owner->get_dtype()))
+      .cast();
+}
+
+// Concatenates the features of several items, `offsets[i]` being the index of
+// the first frame of the item `i` and `offsets[items.size()]` the total size
+h5features::features concatenate(const std::vector<h5features::item> &items, std::vector<std::int64_t> &offsets) {
+  offsets.assign(1, 0);
+  if (items.empty()) {
+    return {std::vector<double>{}, 0, false};
+  }
+
+  const auto &first = items.front().features();
+  std::size_t bytes = 0;
+  for (const auto &item : items) {
+    const auto &features = item.features();
+    if (features.dim() != first.dim() or features.get_dtype() != first.get_dtype()) {
+      std::stringstream msg;
+      msg << "cannot concatenate item '" << item.name() << "' with dimension " << features.dim() << " and dtype "
+          << features.get_dtype() << ", previous items have dimension " << first.dim() << " and dtype "
+          << first.get_dtype();
+      throw h5features::exception(msg.str());
+    }
+    bytes += features.bytes().size();
+    offsets.push_back(offsets.back() + static_cast<std::int64_t>(features.size()));
+  }
+
+  auto buffer = std::make_shared<std::vector<std::byte>>();
+  buffer->reserve(bytes);
+  for (const auto &item : items) {
+    buffer->insert(buffer->end(), item.features().bytes().begin(), item.features().bytes().end());
+  }
+  const h5features::span<const std::byte> data{buffer->data(), buffer->size()};
+  return {data, first.get_dtype(), first.dim(), std::move(buffer), false};
+}
+
+// The Python objects of an asynchronous read, referenced from the I/O thread
+// and released with the GIL held
+struct async_read {
+  nb::object reader;
+  nb::object future;
+
+  void release() {
+    reader.reset();
+    future.reset();
+  }
+};
+
+// Reads an item in the I/O thread, returns a concurrent.futures.Future on it
+nb::object submit_read(nb::object self, const std::string &name, std::optional<double> start,
+                       std::optional<double> stop, bool ignore_properties) {
+  if (start.has_value() != stop.has_value()) {
+    throw nb::value_error("start and stop must be both specified or both None");
+  }
+
+  // the pending reads complete before the interpreter finalizes, as the I/O
+  // thread needs the GIL to complete them
+  static std::atomic<bool> registered{false};
+  if (not registered.exchange(true)) {
+    nb::module_::import_("atexit").attr("register")(nb::cpp_function([]() {
+      const nb::gil_scoped_release release;
+      h5features::details::io_thread().submit([]() {}).wait();
+    }));
+  }
+
+  const auto &reader = nb::cast<const h5features::reader &>(self);
+  auto state =
+      std::make_shared<async_read>(async_read{self, nb::module_::import_("concurrent.futures").attr("Future")()});
+  nb::object future = state->future;
+
+  h5features::details::io_thread().submit([state, &reader, name, start, stop, ignore_properties]() {
+    {
+      const nb::gil_scoped_acquire acquire;
+      bool running = false;
+      try {
+        running = nb::cast<bool>(state->future.attr("set_running_or_notify_cancel")());
+      } catch (nb::python_error &e) {
+        e.discard_as_unraisable("h5features asynchronous read");
+      }
+
+      // the future was cancelled before the read started
+      if (not running) {
+        state->release();
+        return;
+      }
+    }
+
+    // the GIL is not held during the read
+    std::optional<h5features::item> item;
+    std::string error;
+    try {
+      item.emplace(start.has_value() ? reader.read_item(name, start.value(), stop.value(), ignore_properties)
+                                     : reader.read_item(name, ignore_properties));
+    } catch (const std::exception &e) {
+      error = e.what();
+    }
+
+    const nb::gil_scoped_acquire acquire;
+    try {
+      if (item.has_value()) {
+        state->future.attr("set_result")(nb::cast(std::move(item.value())));
+      } else {
+        state->future.attr("set_exception")(nb::handle(PyExc_RuntimeError)(error));
+      }
+    } catch (nb::python_error &e) {
+      e.discard_as_unraisable("h5features asynchronous read");
+    }
+    state->release();
+  });
+
+  return future;
+}
+
+// Reads an item in the I/O thread, returns an asyncio future on it
+nb::object read_async(nb::object self, const std::string &name, std::optional<double> start, std::optional<double> stop,
+                      bool ignore_properties) {
+  const auto asyncio = nb::module_::import_("asyncio");
+  const auto loop = asyncio.attr("get_running_loop")();
+  return asyncio.attr("wrap_future")(submit_read(std::move(self), name, start, stop, ignore_properties),
+                                     "loop"_a = loop);
+}
+
 void init_reader(nb::module_ &m) {
+  nb::class_<h5features::frames_iterator>(m, "FramesIterator",
+                                          "Iterator on the frames of a group by batches, see "
+                                          ":py:meth:`.Reader.iter_frames`.")
+      .def(
+          "__iter__", [](h5features::frames_iterator &self) -> h5features::frames_iterator & { return self; },
+          nb::rv_policy::reference_internal)
+      .def("__next__",
+           [](h5features::frames_iterator &self) {
+             std::optional<h5features::features> batch;
+             {
+               nb::gil_scoped_release release;
+               batch = self.next();
+             }
+             if (not batch.has_value()) {
+               throw nb::stop_iteration();
+             }
+             return to_numpy(std::move(batch.value()));
+           })
+      .def_prop_ro("batch_frames", &h5features::frames_iterator::batch_frames, "The number of frames in a batch.");
+
   nb::class_<h5features::reader>(m, "Reader")
       .def(
           "__init__",
-          [](h5features::reader *t, const std::filesystem::path &filename, const std::string &group) {
-            return new (t) h5features::reader(filename.string(), group);
+          [](h5features::reader *t, const std::filesystem::path &filename, const std::string &group, bool mmap,
+             std::size_t chunk_cache_bytes, std::size_t chunk_cache_slots, std::size_t metadata_cache,
+             const std::string &driver) {
+            const h5features::file_access access{chunk_cache_bytes, chunk_cache_slots, metadata_cache,
+                                                 h5features::file_access::parse_driver(driver)};
+            new (t) h5features::reader(filename.string(), group, mmap, access);
           },
-          "filename"_a, nb::kw_only(), "group"_a = "features", "Read :py:class:`.Item` instances from an HDF5 file.")
+          "filename"_a, nb::kw_only(), "group"_a = "features", "mmap"_a = false, "chunk_cache_bytes"_a = 0,
+          "chunk_cache_slots"_a = 0, "metadata_cache"_a = 0, "driver"_a = "sec2",
+          "Read :py:class:`.Item` instances from an HDF5 file.\n\n"
+          "When ``mmap`` is True, the file is memory mapped and the data written without compression "
+          "(``Writer(compress=False)``) are not copied: :py:meth:`.Item.features` and :py:meth:`.Item.times` are "
+          "read-only views on the mapped file, shared with the page cache of the system. Compressed data are read "
+          "as usual. Memory mapping is used in version 2.0 only.\n\n"
+          "``chunk_cache_bytes`` and ``chunk_cache_slots`` set the size in bytes and the number of slots of the "
+          "chunk cache of each dataset, which holds the decompressed chunks of features. Partial reads of large "
+          "features chunks benefit from a cache larger than the HDF5 default of 1 MB and 521 slots. The number of "
+          "slots should be a prime number about 100 times the number of chunks fitting in the cache. "
+          "``metadata_cache`` is the initial size in bytes of the metadata cache of the file, in [1 kB, 128 MB]. "
+          "The default of 0 keeps the HDF5 defaults. ``driver`` is ``'sec2'`` to read the file through POSIX I/O or "
+          "``'core'`` to load the whole file in memory when it is opened. These settings are ignored when the file "
+          "is already open in the process, by another :py:class:`.Reader` for instance.")
       .def(
           "read",
           [](const h5features::reader &self, const std::string &name, bool ignore_properties) {
@@ -29,9 +278,130 @@ void init_reader(nb::module_ &m) {
              bool ignore_properties) { return self.read_item(name, start, stop, ignore_properties); },
           "name"_a, "start"_a, "stop"_a, nb::kw_only(), "ignore_properties"_a = false,
           "Partial read of an :py:class:`.Item` within the time interval ``[start, stop]``.")
-      .def("read_all", &h5features::reader::read_all, nb::kw_only(), "ignore_properties"_a = false,
-           "Read all the items stored in the file.")
+      .def("submit", &submit_read, "name"_a, "start"_a = nb::none(), "stop"_a = nb::none(), nb::kw_only(),
+           "ignore_properties"_a = false,
+           "Read an :py:class:`.Item` in the background I/O thread, return a :py:class:`concurrent.futures.Future` "
+           "on it.\n\n"
+           "Read the whole item, or its time interval ``[start, stop]`` as with :py:meth:`read_partial` when "
+           "``start`` and ``stop`` are given. A single native thread per process executes the reads of all the "
+           "readers in order, without holding the GIL. The caller is free meanwhile and many reads can be "
+           "pending without any Python thread. A future cancelled before its read starts is not read. The reads "
+           "still pending complete at interpreter exit.")
+      .def(
+          "read_async",
+          [](nb::object self, const std::string &name, bool ignore_properties) {
+            return read_async(std::move(self), name, std::nullopt, std::nullopt, ignore_properties);
+          },
+          "name"_a, nb::kw_only(), "ignore_properties"_a = false,
+          "Read an :py:class:`.Item` in the background I/O thread, return an awaitable on it.\n\n"
+          "This must be called from a running :py:mod:`asyncio` event loop, which is not blocked by the read. "
+          "See :py:meth:`submit`.")
+      .def(
+          "read_partial_async",
+          [](nb::object self, const std::string &name, double start, double stop, bool ignore_properties) {
+            return read_async(std::move(self), name, start, stop, ignore_properties);
+          },
+          "name"_a, "start"_a, "stop"_a, nb::kw_only(), "ignore_properties"_a = false,
+          "Partial read of an :py:class:`.Item` within ``[start, stop]`` in the background I/O thread, return an "
+          "awaitable on it.\n\n"
+          "This must be called from a running :py:mod:`asyncio` event loop. See :py:meth:`submit`.")
+      .def("read_all", &h5features::reader::read_all, nb::kw_only(), "ignore_properties"_a = false, "workers"_a = 1,
+           nb::call_guard<nb::gil_scoped_release>(),
+           "Read all the items stored in the file.\n\n"
+           "The items are decoded in parallel using ``workers`` threads (all the available cores if 0). "
+           "The GIL is released during the read.")
+      .def("read_many", &h5features::reader::read_many, "names"_a, nb::kw_only(), "ignore_properties"_a = false,
+           "workers"_a = 1, nb::call_guard<nb::gil_scoped_release>(),
+           "Read the items named in ``names``, returned in the same order.\n\n"
+           "The items are decoded in parallel using ``workers`` threads (all the available cores if 0). "
+           "The GIL is released during the read.")
+      .def("read_range", &h5features::reader::read_range, "start"_a, "stop"_a, nb::kw_only(),
+           "ignore_properties"_a = false, "workers"_a = 1, nb::call_guard<nb::gil_scoped_release>(),
+           "Read the items ``items()[start:stop]``.\n\n"
+           "For version 1.x files, the items contiguous on file are read at once. "
+           "The GIL is released during the read.")
+      .def(
+          "read_segments",
+          [](const h5features::reader &self, const std::vector<std::tuple<std::string, double, double>> &segments,
+             bool ignore_properties, bool concatenate) -> nb::object {
+            if (not concatenate) {
+              std::vector<h5features::item> items;
+              {
+                nb::gil_scoped_release release;
+                items = self.read_segments(segments, ignore_properties);
+              }
+              return nb::cast(std::move(items));
+            }
+
+            std::optional<h5features::features> features;
+            auto offsets = new std::vector<std::int64_t>();
+            nb::capsule owner(offsets, [](void *p) noexcept { delete static_cast<std::vector<std::int64_t> *>(p); });
+            {
+              nb::gil_scoped_release release;
+              features.emplace(::concatenate(self.read_segments(segments, true), *offsets));
+            }
+            return nb::make_tuple(
+                to_numpy(std::move(features.value())),
+                nb::ndarray<nb::numpy, const std::int64_t, nb::ndim<1>>(offsets->data(), {offsets->size()}, owner));
+          },
+          "segments"_a, nb::kw_only(), "ignore_properties"_a = false, "concatenate"_a = false,
+          "Partial reads of several segments ``(name, start, stop)``, returned in the same order.\n\n"
+          "Each segment is read as with :py:meth:`read_partial`. The segments of an item are read together: the "
+          "item's times are read once and the features of all the segments in a single selection. "
+          "When ``concatenate`` is True, return ``(features, offsets)`` instead of a list of :py:class:`.Item`, "
+          "with ``features`` the read-only concatenation of the features of all the segments and "
+          "``features[offsets[i]:offsets[i + 1]]`` the features of the segment ``i``. The GIL is released during "
+          "the read.")
+      .def("read_concatenated", &read_concatenated, "names"_a = nb::none(), nb::kw_only(),
+           nb::arg("out").none() = nb::none(),
+           "Read the features and times of several items concatenated in single arrays.\n\n"
+           "Read the items named in ``names``, in that order, or all the items in the order of :py:meth:`items` if "
+           "``names`` is None. Return ``(features, times, offsets, names)`` with ``features[offsets[i]:offsets[i + "
+           "1]]`` and ``times[offsets[i]:offsets[i + 1]]`` the features and times of the item ``names[i]``. The "
+           "total size is computed from the file metadata and each item is decoded directly into its slice of the "
+           "destination, the peak memory is the size of the output. The features are read into ``out`` if given, a "
+           "writeable C-contiguous array of shape ``(offsets[-1], dim)`` and of dtype float64, float32 or float16 "
+           "(the features are converted if needed), returned as ``features``. Otherwise a new array is allocated, "
+           "with the dtype of the first item. The items must have the same features and times dimensions. The GIL "
+           "is released during the read.")
+      .def(
+          "read_frames",
+          [](const h5features::reader &self, const std::string &name, std::size_t start, std::size_t stop) {
+            std::optional<h5features::features> features;
+            {
+              nb::gil_scoped_release release;
+              features.emplace(self.read_frames(name, start, stop));
+            }
+            return to_numpy(std::move(features.value()));
+          },
+          "name"_a, "start"_a, "stop"_a,
+          "Read the features of the frames ``[start, stop)`` of an item.\n\n"
+          "Return a read-only array of shape ``(stop - start, dim)``, only the requested frames are read from file.")
+      .def("iter_frames", &h5features::reader::iter_frames, "batch_frames"_a = 4096, nb::kw_only(),
+           "shuffle_items"_a = false, "prefetch"_a = 1, "seed"_a = 0, nb::keep_alive<0, 1>(),
+           "Iterate over the frames of the group by batches of ``batch_frames`` frames.\n\n"
+           "Yield read-only arrays of shape ``(batch_frames, dim)``, the last one can be smaller. A batch spans "
+           "several items if needed. The items are visited in the order of :py:meth:`items`, or in random order "
+           "(with the given ``seed``) when ``shuffle_items`` is True. Only the frames of the batches being built "
+           "are read from file, and ``prefetch`` batches are read in advance by a background thread.")
       .def("items", &h5features::reader::items, "The name of stored items.")
+      .def("sizes", &h5features::reader::sizes,
+           "The number of frames of each stored item, in the same order as :py:meth:`items`.")
+      .def("dims", &h5features::reader::dims,
+           "The dimension of the features of each stored item, in the same order as :py:meth:`items`.")
+      .def("time_spans", &h5features::reader::time_spans,
+           "The first and last timestamps of each stored item, in the same order as :py:meth:`items`.")
+      .def("enable_stats", &h5features::reader::enable_stats, "callback"_a = nb::none(),
+           "Enable the recording of I/O statistics, returned by :py:meth:`stats`.\n\n"
+           "Each operation is counted and timed, along with the bytes read, uncompressed and as stored on file. When "
+           "``callback`` is not None, it is "
+           "called with the :py:class:`.Stats` at the end of each operation, for instance to forward them to a "
+           "metrics system. The statistics are disabled by default.")
+      .def("disable_stats", &h5features::reader::disable_stats, "Disable the recording of I/O statistics.")
+      .def("stats", &h5features::reader::stats, nb::call_guard<nb::gil_scoped_release>(),
+           "Return the :py:class:`.Stats` recorded since they are enabled or reset.")
+      .def("reset_stats", &h5features::reader::reset_stats, nb::call_guard<nb::gil_scoped_release>(),
+           "Reset the I/O statistics to zero.")
       .def_prop_ro("filename", &h5features::reader::filename, "The name of the file being read.")
       .def_prop_ro("groupname", &h5features::reader::groupname, "The name of the group being read in the file.")
       .def_prop_ro("version", &h5features::reader::version,
@@ -0,0 +1,46 @@
+#include "h5features/file_access.h"
+#include "h5features/reader.h"
+#include "h5features/reader_pool.h"
+#include "nanobind/nanobind.h"
+#include "nanobind/stl/filesystem.h"
+#include "nanobind/stl/shared_ptr.h"
+#include "nanobind/stl/string.h"
+#include <cstddef>
+#include <filesystem>
+#include <memory>
+#include <string>
+
+namespace nb = nanobind;
+using namespace nb::literals;
+
+void init_reader_pool(nb::module_ &m) {
+  nb::class_<h5features::reader_pool>(m, "ReaderPool")
+      .def(
+          "__init__",
+          [](h5features::reader_pool *t, std::size_t max_files, bool mmap, std::size_t chunk_cache_bytes,
+             std::size_t chunk_cache_slots, std::size_t metadata_cache, const std::string &driver) {
+            const h5features::file_access access{chunk_cache_bytes, chunk_cache_slots, metadata_cache,
+                                                 h5features::file_access::parse_driver(driver)};
+            new (t) h5features::reader_pool(max_files, mmap, access);
+          },
+          "max_files"_a = 16, nb::kw_only(), "mmap"_a = false, "chunk_cache_bytes"_a = 0, "chunk_cache_slots"_a = 0,
+          "metadata_cache"_a = 0, "driver"_a = "sec2",
+          "A pool of :py:class:`.Reader` sharing their open files.\n\n"
+          "The pool keeps at most ``max_files`` files open and hands out a reader per group. The groups of a file "
+          "share the open file, and a reader already instantiated is returned as is. The least recently used files "
+          "are closed first, the readers already handed out remain valid. When the pool is used in a forked "
+          "process (by data loading workers for instance), the files inherited from the parent process are "
+          "dropped and reopened lazily. The other arguments are the ones of :py:class:`.Reader`.")
+      .def(
+          "get",
+          [](h5features::reader_pool &self, const std::filesystem::path &filename, const std::string &group) {
+            return self.get(filename.string(), group);
+          },
+          "filename"_a, "group"_a = "features", nb::call_guard<nb::gil_scoped_release>(),
+          "Return the :py:class:`.Reader` of a group of a file, opening the file if needed.")
+      .def_prop_ro("open_files", &h5features::reader_pool::open_files, "The number of files kept open by the pool.")
+      .def_prop_ro("max_files", &h5features::reader_pool::max_files,
+                   "The maximal number of files kept open by the pool.")
+      .def("clear", &h5features::reader_pool::clear, nb::call_guard<nb::gil_scoped_release>(),
+           "Close all the files kept open by the pool.");
+}
@@ -0,0 +1,85 @@
+#include "h5features/chunking.h"
+#include "h5features/compression.h"
+#include "h5features/dtype.h"
+#include "h5features/repack.h"
+#include "h5features/version.h"
+#include "nanobind/nanobind.h"
+#include "nanobind/stl/filesystem.h"
+#include "nanobind/stl/optional.h"
+#include "nanobind/stl/string.h"
+#include <cstddef>
+#include <filesystem>
+#include <optional>
+#include <string>
+
+namespace nb = nanobind;
+using namespace nb::literals;
+
+void init_repack(nb::module_ &m) {
+  m.def(
+      "repack",
+      [](const std::filesystem::path &source, const std::filesystem::path &destination, const std::string &group,
+         const std::optional<std::string> &destination_group, h5features::version version, bool compress,
+         const std::optional<std::string> &compression, const std::optional<int> &compression_level, bool shuffle,
+         const std::string &access, std::size_t chunk_bytes, bool index, bool compact_properties,
+         const std::optional<std::string> &dtype, std::size_t workers, std::size_t batch_items, bool verify,
+         bool resume, bool overwrite, const nb::object &progress) {
+        auto codec = compress ? h5features::compression::codec::deflate : h5features::compression::codec::none;
+        if (compression.has_value()) {
+          codec = h5features::compression::parse_codec(compression.value());
+        }
+
+        h5features::repack_options options;
+        options.group = destination_group.value_or("");
+        options.version = version;
+        options.compression = h5features::compression{codec, compression_level.value_or(-1), shuffle};
+        options.chunking = h5features::chunking{h5features::chunking::parse_access(access), chunk_bytes};
+        options.index = index;
+        options.compact_properties = compact_properties;
+        if (dtype.has_value()) {
+          options.dtype = h5features::parse_dtype(dtype.value());
+        }
+        options.workers = workers;
+        options.batch_items = batch_items;
+        options.verify = verify;
+        options.resume = resume;
+        options.overwrite = overwrite;
+        if (not progress.is_none()) {
+          options.progress = [&progress](std::size_t done, std::size_t total) {
+            const nb::gil_scoped_acquire acquire;
+            progress(done, total);
+          };
+        }
+
+        h5features::repack_summary summary;
+        {
+          const nb::gil_scoped_release release;
+          summary = h5features::repack(source.string(), destination.string(), group, options);
+        }
+
+        nb::dict result;
+        result["written"] = summary.written;
+        result["skipped"] = summary.skipped;
+        result["verified"] = summary.verified;
+        return result;
+      },
+      "source"_a, "destination"_a, nb::kw_only(), "group"_a = "features", "destination_group"_a = nb::none(),
+      "version"_a = h5features::current_version, "compress"_a = false, "compression"_a = nb::none(),
+      "compression_level"_a = nb::none(), "shuffle"_a = false, "access"_a = "partial", "chunk_bytes"_a = 0,
+      "index"_a = false, "compact_properties"_a = false, "dtype"_a = nb::none(), "workers"_a = 0, "batch_items"_a = 256,
+      "verify"_a = true, "resume"_a = false, "overwrite"_a = false, nb::arg("progress").none() = nb::none(),
+      "Copy a group of items to another file, changing its storage.\n\n"
+      "This converts a group to another format ``version`` (from 1.1 or 1.2 to 2.0 for instance), or changes its "
+      "compression, chunking or features ``dtype`` (one of 'float16', 'float32' or 'float64'). The storage "
+      "arguments are the ones of :py:class:`.Writer`. The items are written in ``destination_group``, the source "
+      "``group`` by default.\n\n"
+      "The items are streamed by batches of ``batch_items``: the next batch is read while the current one is "
+      "written, and the items are decoded and encoded by ``workers`` threads (all the available cores if 0). "
+      "When ``verify`` is True, the destination is read again once written and the checksums of its items are "
+      "compared to the source ones. When ``resume`` is True, the items already in the destination group are "
+      "skipped, so that an interrupted repack can be continued. The skipped items are first checked against the "
+      "source whatever ``verify``, an item left incomplete by the interruption is written again. ``progress`` is "
+      "called after each batch with the "
+      "number of items processed and the total number of items. The GIL is released during the repack.\n\n"
+      "Return a dictionary with the number of items ``written``, ``skipped`` and ``verified``.");
+}
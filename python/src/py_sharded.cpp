@@ -0,0 +1,145 @@
+#include "h5features/chunking.h"
+#include "h5features/compression.h"
+#include "h5features/file_access.h"
+#include "h5features/item.h"
+#include "h5features/sharded_reader.h"
+#include "h5features/sharded_writer.h"
+#include "h5features/version.h"
+#include "nanobind/nanobind.h"
+#include "nanobind/stl/filesystem.h"
+#include "nanobind/stl/optional.h"
+#include "nanobind/stl/string.h"
+#include "nanobind/stl/vector.h"
+#include <cstddef>
+#include <filesystem>
+#include <optional>
+#include <string>
+#include <vector>
+
+namespace nb = nanobind;
+using namespace nb::literals;
+
+void init_sharded(nb::module_ &m) {
+  nb::class_<h5features::sharded_writer>(m, "ShardedWriter")
+      .def(
+          "__init__",
+          [](h5features::sharded_writer *t, const std::filesystem::path &directory, const std::string &group,
+             std::size_t max_items, std::size_t max_bytes, std::size_t rank, bool overwrite, bool compress,
+             const std::optional<std::string> &compression, const std::optional<int> &compression_level, bool shuffle,
+             const std::string &access, std::size_t chunk_bytes, bool index, bool compact_properties,
+             h5features::version version) {
+            auto codec = compress ? h5features::compression::codec::deflate : h5features::compression::codec::none;
+            if (compression.has_value()) {
+              codec = h5features::compression::parse_codec(compression.value());
+            }
+            h5features::writer_options options;
+            options.overwrite = overwrite;
+            options.compression = h5features::compression{codec, compression_level.value_or(-1), shuffle};
+            options.chunking = h5features::chunking{h5features::chunking::parse_access(access), chunk_bytes};
+            options.index = index;
+            options.compact_properties = compact_properties;
+            options.version = version;
+            new (t) h5features::sharded_writer(directory.string(), group, max_items, max_bytes, rank, options);
+          },
+          "directory"_a, nb::kw_only(), "group"_a = "features", "max_items"_a = 0, "max_bytes"_a = 0, "rank"_a = 0,
+          "overwrite"_a = false, "compress"_a = false, "compression"_a = nb::none(), "compression_level"_a = nb::none(),
+          "shuffle"_a = false, "access"_a = "partial", "chunk_bytes"_a = 0, "index"_a = false,
+          "compact_properties"_a = false, "version"_a = h5features::current_version,
+          "Write :py:class:`.Item` instances to a dataset sharded over several HDF5 files.\n\n"
+          "The shards are written in ``directory`` by a :py:class:`.Writer`. The writer rolls over to a new shard "
+          "when the current one holds ``max_items`` items or ``max_bytes`` bytes of uncompressed features and "
+          "times (0 for no limit). A single item larger than ``max_bytes`` goes to a shard of its own. A manifest "
+          "maps the items to their shard, it is read by :py:class:`.ShardedReader`.\n\n"
+          "Several writers, from different processes or nodes, can write to the same directory at once as long as "
+          "they have a different ``rank``: each rank writes its own shards ``shard-<rank>-<index>.h5`` and its own "
+          "manifest ``manifest-<rank>.tsv``. The items must have distinct names across the ranks. When "
+          "``overwrite`` is True, the shards and manifest of ``rank`` are erased, otherwise new shards are added "
+          "after the existing ones.\n\n"
+          "The items of a shard are added to the manifest once the shard is closed. When a writer is interrupted, "
+          "the items of its last shard are not in the manifest and must be written again. The other arguments are "
+          "the ones of :py:class:`.Writer`.")
+      .def(
+          "write", [](h5features::sharded_writer &self, const h5features::item &item) { return self.write(item); },
+          "item"_a, "Write an :py:class:`.Item` to the current shard.")
+      .def(
+          "write",
+          [](h5features::sharded_writer &self, const std::vector<h5features::item> &items, std::size_t workers) {
+            return self.write(items.begin(), items.end(), workers);
+          },
+          "items"_a, nb::kw_only(), "workers"_a = 0, nb::call_guard<nb::gil_scoped_release>(),
+          "Write a sequence of :py:class:`.Item`, rolling over shards as needed.\n\n"
+          "The items are compressed by ``workers`` threads (all the available cores if 0), as with "
+          ":py:meth:`.Writer.write`. The GIL is released during the write.")
+      .def("close", &h5features::sharded_writer::close, nb::call_guard<nb::gil_scoped_release>(),
+           "Close the current shard and add its items to the manifest. The writer cannot be used afterwards.")
+      .def_prop_ro("closed", &h5features::sharded_writer::closed, "True if the writer is closed.")
+      .def(
+          "__enter__", [](h5features::sharded_writer &self) -> h5features::sharded_writer & { return self; },
+          nb::rv_policy::reference)
+      .def(
+          "__exit__",
+          [](h5features::sharded_writer &self, const nb::args &) {
+            const nb::gil_scoped_release release;
+            self.close();
+          },
+          "Close the writer on exit of a ``with`` block.")
+      .def("shards", &h5features::sharded_writer::shards,
+           "The shards written by this writer so far, including the current one.")
+      .def_prop_ro("directory", &h5features::sharded_writer::directory, "The directory of the sharded dataset.")
+      .def_prop_ro("groupname", &h5features::sharded_writer::groupname, "The HDF5 group name in the shards.")
+      .def_prop_ro("rank", &h5features::sharded_writer::rank, "The rank of the writer.")
+      .def("__repr__", [](const h5features::sharded_writer &self) {
+        return nb::str("ShardedWriter(directory={}, groupname={}, rank={})")
+            .format(self.directory(), self.groupname(), self.rank());
+      });
+
+  nb::class_<h5features::sharded_reader>(m, "ShardedReader")
+      .def(
+          "__init__",
+          [](h5features::sharded_reader *t, const std::filesystem::path &directory, const std::string &group,
+             std::size_t max_files, bool mmap, std::size_t chunk_cache_bytes, std::size_t chunk_cache_slots,
+             std::size_t metadata_cache, const std::string &driver) {
+            const h5features::file_access access{chunk_cache_bytes, chunk_cache_slots, metadata_cache,
+                                                 h5features::file_access::parse_driver(driver)};
+            new (t) h5features::sharded_reader(directory.string(), group, max_files, mmap, access);
+          },
+          "directory"_a, nb::kw_only(), "group"_a = "features", "max_files"_a = 16, "mmap"_a = false,
+          "chunk_cache_bytes"_a = 0, "chunk_cache_slots"_a = 0, "metadata_cache"_a = 0, "driver"_a = "sec2",
+          "Read :py:class:`.Item` instances from a dataset written by :py:class:`.ShardedWriter`.\n\n"
+          "The manifests of all the ranks are read at once, the shards are opened when an item is read from them "
+          "by a :py:class:`.ReaderPool` keeping at most ``max_files`` files open. The other arguments are the ones "
+          "of :py:class:`.Reader`.")
+      .def(
+          "read",
+          [](const h5features::sharded_reader &self, const std::string &name, bool ignore_properties) {
+            return self.read_item(name, ignore_properties);
+          },
+          "name"_a, nb::kw_only(), "ignore_properties"_a = false, nb::call_guard<nb::gil_scoped_release>(),
+          "Read an :py:class:`.Item` from its shard.")
+      .def(
+          "read_partial",
+          [](const h5features::sharded_reader &self, const std::string &name, double start, double stop,
+             bool ignore_properties) { return self.read_item(name, start, stop, ignore_properties); },
+          "name"_a, "start"_a, "stop"_a, nb::kw_only(), "ignore_properties"_a = false,
+          nb::call_guard<nb::gil_scoped_release>(),
+          "Partial read of an :py:class:`.Item` within the time interval ``[start, stop]``.")
+      .def("read_all", &h5features::sharded_reader::read_all, nb::kw_only(), "ignore_properties"_a = false,
+           "workers"_a = 1, nb::call_guard<nb::gil_scoped_release>(),
+           "Read all the items of the dataset, in the order of :py:meth:`items`.\n\n"
+           "The items are read shard by shard and decoded in parallel using ``workers`` threads (all the available "
+           "cores if 0). The GIL is released during the read.")
+      .def("read_many", &h5features::sharded_reader::read_many, "names"_a, nb::kw_only(), "ignore_properties"_a = false,
+           "workers"_a = 1, nb::call_guard<nb::gil_scoped_release>(),
+           "Read the items named in ``names``, returned in the same order.\n\n"
+           "The items are read shard by shard and decoded in parallel using ``workers`` threads (all the available "
+           "cores if 0). The GIL is released during the read.")
+      .def("items", &h5features::sharded_reader::items,
+           "The name of the stored items, ordered by rank and by writing order.")
+      .def("shards", &h5features::sharded_reader::shards, "The shards of the dataset, ordered by rank and index.")
+      .def("shard", &h5features::sharded_reader::shard, "name"_a, "The shard storing an item.")
+      .def_prop_ro("directory", &h5features::sharded_reader::directory, "The directory of the sharded dataset.")
+      .def_prop_ro("groupname", &h5features::sharded_reader::groupname, "The HDF5 group name in the shards.")
+      .def("__repr__", [](const h5features::sharded_reader &self) {
+        return nb::str("ShardedReader(directory={}, groupname={})").format(self.directory(), self.groupname());
+      });
+}
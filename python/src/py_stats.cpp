@@ -0,0 +1,81 @@
+#include "h5features/stats.h"
+#include "nanobind/nanobind.h"
+#include "nanobind/stl/string.h"
+#include <string>
+#include <vector>
+
+namespace nb = nanobind;
+
+// An operation of h5features::stats, its name and description
+struct operation_info {
+  std::string name;
+  h5features::stats::operation h5features::stats::*operation;
+  std::string doc;
+};
+
+// The operations of h5features::stats, in order
+static const std::vector<operation_info> operations{
+    {"open_group", &h5features::stats::open_group, "Opening the group of an item."},
+    {"read_times", &h5features::stats::read_times, "Reading times from file."},
+    {"read_features", &h5features::stats::read_features, "Reading features from file."},
+    {"read_properties", &h5features::stats::read_properties, "Reading properties from file."},
+    {"decode_properties", &h5features::stats::decode_properties, "Decoding properties, when they are first accessed."},
+    {"decompress", &h5features::stats::decompress, "Decompressing data out of HDF5, when reading in parallel."},
+    {"compress", &h5features::stats::compress, "Compressing data out of HDF5, when writing in version 2.0."},
+    {"write_times", &h5features::stats::write_times, "Writing times to file."},
+    {"write_features", &h5features::stats::write_features, "Writing features to file."},
+    {"write_properties", &h5features::stats::write_properties, "Writing properties to file."}};
+
+void init_stats(nb::module_ &m) {
+  auto stats = nb::class_<h5features::stats>(
+      m, "Stats",
+      "I/O statistics of a :py:class:`.Reader` or a :py:class:`.Writer`.\n\n"
+      "Each operation is a :py:class:`.Stats.Operation` counting its executions and their total duration. The "
+      "statistics are recorded once enabled with :py:meth:`.Reader.enable_stats` or :py:meth:`.Writer.enable_stats`.");
+
+  nb::class_<h5features::stats::operation>(stats, "Operation",
+                                           "The number of executions of an operation and their total duration.")
+      .def_ro("count", &h5features::stats::operation::count, "The number of executions.")
+      .def_ro("seconds", &h5features::stats::operation::seconds, "The total duration of the executions in seconds.")
+      .def("__repr__", [](const h5features::stats::operation &self) {
+        return nb::str("Operation(count={}, seconds={})").format(self.count, self.seconds);
+      });
+
+  for (const auto &info : operations) {
+    stats.def_prop_ro(
+        info.name.c_str(), [operation = info.operation](const h5features::stats &self) { return self.*operation; },
+        info.doc.c_str());
+  }
+
+  stats.def_ro("bytes_read", &h5features::stats::bytes_read, "The number of bytes of features and times read.")
+      .def_ro("bytes_read_stored", &h5features::stats::bytes_read_stored,
+              "The number of bytes of features and times read, as stored on file. Estimated from the compression "
+              "ratio of the datasets for partial reads.")
+      .def_ro("bytes_written", &h5features::stats::bytes_written, "The number of bytes of features and times written.")
+      .def_ro("bytes_written_stored", &h5features::stats::bytes_written_stored,
+              "The number of bytes of features and times written, as stored on file.")
+      .def_ro("cache_hit_rate", &h5features::stats::cache_hit_rate,
+              "The hit rate of the HDF5 metadata cache of the file, HDF5 does not report the hits of the chunk cache.")
+      .def(
+          "as_dict",
+          [](const h5features::stats &self) {
+            nb::dict dict;
+            for (const auto &info : operations) {
+              nb::dict operation;
+              operation["count"] = (self.*info.operation).count;
+              operation["seconds"] = (self.*info.operation).seconds;
+              dict[info.name.c_str()] = operation;
+            }
+            dict["bytes_read"] = self.bytes_read;
+            dict["bytes_read_stored"] = self.bytes_read_stored;
+            dict["bytes_written"] = self.bytes_written;
+            dict["bytes_written_stored"] = self.bytes_written_stored;
+            dict["cache_hit_rate"] = self.cache_hit_rate;
+            return dict;
+          },
+          "Return the statistics as a dictionary, the operations being dictionaries with the keys ``count`` and "
+          "``seconds``.")
+      .def("__repr__", [](const h5features::stats &self) {
+        return nb::str("Stats(bytes_read={}, bytes_written={})").format(self.bytes_read, self.bytes_written);
+      });
+}
@@ -1,36 +1,297 @@
+#include "h5features/appender.h"
+#include "h5features/chunking.h"
+#include "h5features/compression.h"
+#include "h5features/dtype.h"
+#include "h5features/features.h"
 #include "h5features/item.h"
+#include "h5features/properties.h"
+#include "h5features/times.h"
 #include "h5features/version.h"
 #include "h5features/writer.h"
 #include "nanobind/nanobind.h"
+#include "nanobind/ndarray.h"
 #include "nanobind/stl/filesystem.h"
+#include "nanobind/stl/function.h"
+#include "nanobind/stl/optional.h"
 #include "nanobind/stl/string.h"
 #include "nanobind/stl/vector.h"
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
 #include <filesystem>
+#include <optional>
 #include <string>
 #include <vector>
 
 namespace nb = nanobind;
 using namespace nb::literals;
 
+std::optional<h5features::dtype> to_dtype(const nb::dlpack::dtype &dtype);
+
+h5features::properties from_py(const nb::dict &d);
+
+// Writes concatenated items from numpy arrays, without copying them. The
+// arrays are kept alive by the caller during the write.
+template <class Array>
+void write_concatenated(h5features::writer &self, const std::vector<std::string> &names, const Array &features,
+                        h5features::dtype dtype, const nb::ndarray<const double, nb::c_contig> &times,
+                        const nb::ndarray<const std::int64_t, nb::ndim<1>, nb::c_contig> &offsets,
+                        const std::optional<std::vector<nb::dict>> &properties, std::size_t workers) {
+  if (times.ndim() != 1 and times.ndim() != 2) {
+    throw nb::type_error("Expected a 1D or 2D ndarray for times.");
+  }
+
+  const auto *first = offsets.data();
+  if (std::any_of(first, first + offsets.size(), [](std::int64_t offset) { return offset < 0; })) {
+    throw h5features::exception("offsets must be positive");
+  }
+  const std::vector<std::size_t> offsets_vector(first, first + offsets.size());
+
+  std::vector<h5features::properties> properties_vector;
+  if (properties.has_value()) {
+    properties_vector.reserve(properties->size());
+    for (const auto &dict : properties.value()) {
+      properties_vector.push_back(from_py(dict));
+    }
+  }
+
+  // the features and times are not validated as a whole, the concatenation is
+  const h5features::features cfeatures{{reinterpret_cast<const std::byte *>(features.data()), features.nbytes()},
+                                       dtype,
+                                       features.shape(1),
+                                       nullptr,
+                                       false};
+  const h5features::times ctimes{{times.data(), times.size()},
+                                 h5features::times::get_format(times.ndim() == 1 ? 1 : times.shape(1)),
+                                 nullptr,
+                                 false};
+
+  const nb::gil_scoped_release release;
+  self.write_concatenated(names, cfeatures, ctimes, offsets_vector, properties_vector, workers);
+}
+
+// Appends a block of frames from numpy arrays, without copying them
+template <class Array>
+void append_block(h5features::appender &self, const Array &features, h5features::dtype dtype,
+                  const nb::ndarray<const double, nb::c_contig> &times) {
+  if (times.ndim() != 1 and times.ndim() != 2) {
+    throw nb::type_error("Expected a 1D or 2D ndarray for times.");
+  }
+
+  // empty blocks are accepted and ignored
+  const bool check = features.shape(0) != 0;
+  const h5features::features cfeatures{{reinterpret_cast<const std::byte *>(features.data()), features.nbytes()},
+                                       dtype,
+                                       features.shape(1),
+                                       nullptr,
+                                       check};
+  const h5features::times ctimes{{times.data(), times.size()},
+                                 h5features::times::get_format(times.ndim() == 1 ? 1 : times.shape(1)),
+                                 nullptr,
+                                 check};
+
+  const nb::gil_scoped_release release;
+  self.append(cfeatures, ctimes);
+}
+
+h5features::times::format parse_times_format(const std::string &name) {
+  if (name == "simple") {
+    return h5features::times::format::simple;
+  }
+  if (name == "interval") {
+    return h5features::times::format::interval;
+  }
+  throw h5features::exception("unknown times format '" + name + "'");
+}
+
 void init_writer(nb::module_ &m) {
+  nb::class_<h5features::appender>(m, "Appender")
+      .def(
+          "append",
+          [](h5features::appender &self, const nb::ndarray<nb::ro, nb::ndim<2>, nb::c_contig> &features,
+             const nb::ndarray<const double, nb::c_contig> &times) {
+            const auto dtype = to_dtype(features.dtype());
+            if (not dtype.has_value()) {
+              // features of other types are converted to float64 by the overload below
+              throw nb::next_overload();
+            }
+            append_block(self, features, dtype.value(), times);
+          },
+          "features"_a, "times"_a,
+          "Append a block of frames to the item.\n\n"
+          "``features`` is an array of shape ``(frames, dim)`` with the dimension and dtype given to "
+          ":py:meth:`.Writer.open_item`, and ``times`` an array of shape ``(frames,)``, ``(frames, 1)`` or "
+          "``(frames, 2)`` with timestamps following the ones already appended. The arrays are not copied: the "
+          "frames are compressed and written chunk by chunk, and only the last incomplete chunk is kept in memory. "
+          "The item is discarded if the write fails. The GIL is released during the write.")
+      .def(
+          "append",
+          [](h5features::appender &self, const nb::ndarray<const double, nb::ndim<2>, nb::c_contig> &features,
+             const nb::ndarray<const double, nb::c_contig> &times) {
+            append_block(self, features, h5features::dtype::float64, times);
+          },
+          "features"_a, "times"_a)
+      .def(
+          "close",
+          [](h5features::appender &self, const std::optional<nb::dict> &properties) {
+            const auto cproperties = properties.has_value() ? from_py(properties.value()) : h5features::properties{};
+            const nb::gil_scoped_release release;
+            self.close(cproperties);
+          },
+          "properties"_a = nb::none(),
+          "Write the remaining frames and the ``properties`` of the item, and close it.\n\n"
+          "The item is complete once closed, the appender cannot be used afterwards.")
+      .def("abort", &h5features::appender::abort, nb::call_guard<nb::gil_scoped_release>(),
+           "Discard the item and close the appender. This does nothing if the appender is closed.")
+      .def_prop_ro("closed", &h5features::appender::closed, "True if the appender is closed.")
+      .def_prop_ro("name", &h5features::appender::name, "The name of the item.")
+      .def_prop_ro("size", &h5features::appender::size, "The number of frames appended so far.")
+      .def(
+          "__enter__", [](h5features::appender &self) -> h5features::appender & { return self; },
+          nb::rv_policy::reference)
+      .def(
+          "__exit__",
+          [](h5features::appender &self, const nb::handle &type, const nb::handle &, const nb::handle &) {
+            const nb::gil_scoped_release release;
+            if (type.is_none()) {
+              self.close();
+            } else {
+              self.abort();
+            }
+          },
+          nb::arg().none(), nb::arg().none(), nb::arg().none(),
+          "Close the appender on exit of a ``with`` block, or discard the item if an exception is raised.")
+      .def("__repr__", [](const h5features::appender &self) {
+        return nb::str("Appender(name={}, size={})").format(self.name(), self.size());
+      });
+
   nb::class_<h5features::writer>(m, "Writer")
       .def(
           "__init__",
           [](h5features::writer *t, std::filesystem::path &filename, const std::string &group, bool overwrite,
-             bool compress, h5features::version version) {
-            return new (t) h5features::writer(filename.string(), group, overwrite, compress, version);
+             bool compress, const std::optional<std::string> &compression, const std::optional<int> &compression_level,
+             bool shuffle, const std::string &access, std::size_t chunk_bytes, bool index, bool compact_properties,
+             h5features::version version) {
+            auto codec = compress ? h5features::compression::codec::deflate : h5features::compression::codec::none;
+            if (compression.has_value()) {
+              codec = h5features::compression::parse_codec(compression.value());
+            }
+            h5features::writer_options options;
+            options.overwrite = overwrite;
+            options.compression = h5features::compression{codec, compression_level.value_or(-1), shuffle};
+            options.chunking = h5features::chunking{h5features::chunking::parse_access(access), chunk_bytes};
+            options.index = index;
+            options.compact_properties = compact_properties;
+            options.version = version;
+            new (t) h5features::writer(filename.string(), group, options);
           },
           "filename"_a, nb::kw_only(), "group"_a = "features", "overwrite"_a = false, "compress"_a = false,
-          "version"_a = h5features::current_version, "Write :py:class:`.Item` instances to an HDF5 file.")
+          "compression"_a = nb::none(), "compression_level"_a = nb::none(), "shuffle"_a = false, "access"_a = "partial",
+          "chunk_bytes"_a = 0, "index"_a = false, "compact_properties"_a = false,
+          "version"_a = h5features::current_version,
+          "Write :py:class:`.Item` instances to an HDF5 file.\n\n"
+          "The data is compressed with ``compression``, one of 'none', 'deflate', 'lzf', 'zstd' or 'blosc'. "
+          "When not specified, use 'deflate' if ``compress`` is True and 'none' otherwise. The codecs other than "
+          "'none' and 'deflate' require the corresponding HDF5 filter plugin. ``compression_level`` defaults to 9 "
+          "for deflate, 3 for zstd and 5 for blosc. When ``shuffle`` is True, the bytes of the data are shuffled "
+          "before compression, this usually improves the compression of features.\n\n"
+          "In version 2.0, the features are stored in chunks of about ``chunk_bytes`` bytes, chosen for the expected "
+          "``access`` to the items: 'partial' when items are read on time intervals with "
+          ":py:meth:`.Reader.read_partial` (chunks of 64 kB by default) or 'whole' when items are always read entirely "
+          "(items are stored in a single chunk up to 1 MB by default).\n\n"
+          "In version 2.0, when ``index`` is True the writer maintains an index of the items in the group, making "
+          ":py:meth:`.Reader.items`, :py:meth:`.Reader.sizes` and :py:meth:`.Reader.time_spans` cheap on groups "
+          "with many items. An existing index is always maintained.\n\n"
+          "When ``compact_properties`` is True, the properties of each item are encoded in a single dataset of "
+          "bytes instead of one HDF5 object per property. They are much faster to write and read, and are decoded "
+          "only when accessed. This requires version 1.2 or 2.0.")
       .def(
           "write", [](h5features::writer &self, const h5features::item &item) { return self.write(item); }, "item"_a,
           "Write an :py:class:`.Item` to disk.")
       .def(
           "write",
-          [](h5features::writer &self, const std::vector<h5features::item> &items) {
-            return self.write(items.begin(), items.end());
+          [](h5features::writer &self, const std::vector<h5features::item> &items, std::size_t workers) {
+            return self.write(items.begin(), items.end(), workers);
+          },
+          "items"_a, nb::kw_only(), "workers"_a = 0, nb::call_guard<nb::gil_scoped_release>(),
+          "Write a sequence of :py:class:`.Item` to disk in parallel.\n\n"
+          "The items are compressed by ``workers`` threads (all the available cores if 0) while they are "
+          "written to file in order. The GIL is released during the write.")
+      .def(
+          "write_concatenated",
+          [](h5features::writer &self, const std::vector<std::string> &names,
+             const nb::ndarray<nb::ro, nb::ndim<2>, nb::c_contig> &features,
+             const nb::ndarray<const double, nb::c_contig> &times,
+             const nb::ndarray<const std::int64_t, nb::ndim<1>, nb::c_contig> &offsets,
+             const std::optional<std::vector<nb::dict>> &properties, std::size_t workers) {
+            const auto dtype = to_dtype(features.dtype());
+            if (not dtype.has_value()) {
+              // features of other types are converted to float64 by the overload below
+              throw nb::next_overload();
+            }
+            write_concatenated(self, names, features, dtype.value(), times, offsets, properties, workers);
+          },
+          "names"_a, "features"_a, "times"_a, "offsets"_a, "properties"_a = nb::none(), nb::kw_only(), "workers"_a = 0,
+          "Write items concatenated in single arrays, without building :py:class:`.Item` instances.\n\n"
+          "The item ``names[i]`` has the features ``features[offsets[i]:offsets[i + 1]]`` and the times "
+          "``times[offsets[i]:offsets[i + 1]]``, with ``offsets[-1]`` the total number of frames. ``features`` is an "
+          "array of shape ``(frames, dim)`` stored as in :py:class:`.Item` and ``times`` an array of shape "
+          "``(frames,)``, ``(frames, 1)`` or ``(frames, 2)``. ``properties`` is None or a list of one dictionary per "
+          "item. The items are validated at once and none is written if one cannot be written in the group. They "
+          "are then written straight from the arrays: in version 1.x all the items are appended at once, in "
+          "version 2.0 they are compressed by ``workers`` threads (all the available cores if 0) as in "
+          ":py:meth:`write`. The GIL is released during the write.")
+      .def(
+          "write_concatenated",
+          [](h5features::writer &self, const std::vector<std::string> &names,
+             const nb::ndarray<const double, nb::ndim<2>, nb::c_contig> &features,
+             const nb::ndarray<const double, nb::c_contig> &times,
+             const nb::ndarray<const std::int64_t, nb::ndim<1>, nb::c_contig> &offsets,
+             const std::optional<std::vector<nb::dict>> &properties, std::size_t workers) {
+            write_concatenated(self, names, features, h5features::dtype::float64, times, offsets, properties, workers);
+          },
+          "names"_a, "features"_a, "times"_a, "offsets"_a, "properties"_a = nb::none(), nb::kw_only(), "workers"_a = 0)
+      .def(
+          "open_item",
+          [](h5features::writer &self, const std::string &name, std::size_t dim, const std::string &times_format,
+             const std::string &dtype) {
+            return self.open_item(name, dim, parse_times_format(times_format), h5features::parse_dtype(dtype));
+          },
+          "name"_a, "dim"_a, "times_format"_a = "interval", nb::kw_only(), "dtype"_a = "float64",
+          "Open an item to write it by blocks of frames, return an :py:class:`.Appender` on it.\n\n"
+          "This writes an item as its features are computed, a long recording being processed block by block for "
+          "instance, without holding the whole item in memory. ``dim`` is the dimension of the features, "
+          "``times_format`` is 'interval' for timestamps as ``(start, stop)`` pairs or 'simple' for a single "
+          "timestamp per frame, and ``dtype`` is the type of the features, 'float64', 'float32' or 'float16'. The "
+          "item is complete once the appender is closed. Several items can be written at once, the items not "
+          "closed when the writer is closed are discarded. This requires version 2.0.")
+      .def("flush", &h5features::writer::flush, nb::call_guard<nb::gil_scoped_release>(),
+           "Write the items buffered in memory to disk.\n\n"
+           "In version 1.x, the items are buffered and appended to file by batches. They are written by "
+           ":py:meth:`flush`, :py:meth:`close` and when the writer is deleted.")
+      .def("close", &h5features::writer::close, nb::call_guard<nb::gil_scoped_release>(),
+           "Write the buffered items and close the file. The writer cannot be used afterwards.")
+      .def_prop_ro("closed", &h5features::writer::closed, "True if the writer is closed.")
+      .def(
+          "__enter__", [](h5features::writer &self) -> h5features::writer & { return self; }, nb::rv_policy::reference)
+      .def(
+          "__exit__",
+          [](h5features::writer &self, const nb::args &) {
+            const nb::gil_scoped_release release;
+            self.close();
           },
-          "items"_a, "Write a sequence of :py:class:`.Item` to disk in parallel.")
+          "Close the writer on exit of a ``with`` block.")
+      .def("enable_stats", &h5features::writer::enable_stats, "callback"_a = nb::none(),
+           "Enable the recording of I/O statistics, returned by :py:meth:`stats`.\n\n"
+           "Each operation is counted and timed, along with the bytes written, uncompressed and as stored on file. "
+           "When ``callback`` is not None, it is "
+           "called with the :py:class:`.Stats` at the end of each operation, for instance to forward them to a "
+           "metrics system. The statistics are disabled by default.")
+      .def("disable_stats", &h5features::writer::disable_stats, "Disable the recording of I/O statistics.")
+      .def("stats", &h5features::writer::stats, nb::call_guard<nb::gil_scoped_release>(),
+           "Return the :py:class:`.Stats` recorded since they are enabled or reset.")
+      .def("reset_stats", &h5features::writer::reset_stats, nb::call_guard<nb::gil_scoped_release>(),
+           "Reset the I/O statistics to zero.")
       .def_prop_ro("version", &h5features::writer::version, "The h5features format :py:class:`.Version` being written.")
       .def_prop_ro("filename", &h5features::writer::filename, "The HDF5 file name.")
       .def_prop_ro("groupname", &h5features::writer::groupname, "The HDF5 group name.")
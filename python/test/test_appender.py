@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from h5features import Item, Reader, Version, Writer
+
+
+@pytest.fixture
+def item(rng: np.random.Generator) -> Item:
+    times = np.arange(2000, dtype=np.float64)
+    return Item("item", rng.random((2000, 6)), np.stack([times, times + 1], axis=1), {"speaker": "spk"})
+
+
+@pytest.mark.parametrize("compression", ["none", "deflate"])
+@pytest.mark.parametrize("block", [1, 33, 500, 2000])
+def test_append(tmp_path: Path, item: Item, compression: str, block: int) -> None:
+    filename = tmp_path / "test.h5"
+    features, times = item.features(), item.times()
+    with Writer(filename, compression=compression, chunk_bytes=1024) as writer:
+        appender = writer.open_item("item", 6)
+        for start in range(0, item.size, block):
+            appender.append(features[start : start + block], times[start : start + block])
+        assert appender.size == item.size
+        assert appender.name == "item"
+        appender.close(item.properties)
+        assert appender.closed
+
+    # same item as when written at once
+    with Writer(tmp_path / "reference.h5", compression=compression, chunk_bytes=1024) as writer:
+        writer.write(item)
+    assert Reader(filename).read("item") == item
+    assert Reader(filename).read_partial("item", 100.5, 200) == Reader(tmp_path / "reference.h5").read_partial(
+        "item", 100.5, 200
+    )
+
+
+def test_append_simple_float32(tmp_path: Path, rng: np.random.Generator) -> None:
+    filename = tmp_path / "test.h5"
+    features = rng.random((100, 3)).astype(np.float32)
+    times = np.arange(100, dtype=np.float64)
+    with Writer(filename) as writer, writer.open_item("item", 3, "simple", dtype="float32") as appender:
+        appender.append(features[:50], times[:50])
+        appender.append(features[50:50], times[50:50])
+        appender.append(features[50:], times[50:])
+
+    read = Reader(filename).read("item")
+    assert read.features().dtype == np.float32
+    assert np.array_equal(read.features(), features)
+    assert np.array_equal(read.times().ravel(), times)
+
+
+def test_append_errors(tmp_path: Path, item: Item) -> None:
+    filename = tmp_path / "test.h5"
+    with (
+        Writer(filename, group="v1", version=Version.v1_2) as writer,
+        pytest.raises(RuntimeError, match=r"version 2\.0"),
+    ):
+        writer.open_item("item", 6)
+
+    with Writer(filename, group="features") as writer:
+        with pytest.raises(RuntimeError, match="unknown times format"):
+            writer.open_item("item", 6, "other")
+
+        appender = writer.open_item("item", 6)
+        with pytest.raises(RuntimeError, match="dimension"):
+            appender.append(np.zeros((2, 3)), np.zeros((2, 2)))
+        with pytest.raises(RuntimeError, match="same size"):
+            appender.append(np.zeros((2, 6)), np.zeros((3, 2)))
+        appender.append(item.features()[10:20], item.times()[10:20])
+        with pytest.raises(RuntimeError, match="sorted"):
+            appender.append(item.features()[:10], item.times()[:10])
+
+        # the item is discarded on error in a with block
+        with pytest.raises(ValueError, match="extraction failed"), writer.open_item("failed", 6):
+            raise ValueError("extraction failed")  # noqa: EM101, TRY003
+
+    assert Reader(filename).items() == []
+    assert appender.closed
+    with pytest.raises(RuntimeError, match="closed"):
+        appender.append(item.features(), item.times())
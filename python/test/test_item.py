@@ -51,12 +51,49 @@ def test_times(item: Item) -> None:
         Item(item.name, item.features(), item.times(), properties=[1, 2, 3])
 
 
+def test_times_start_stop(item: Item) -> None:
+    start = np.arange(10, dtype=np.float64)
+    stop = start + 1
+    assert np.array_equal(Item(item.name, item.features(), (start, stop)).times(), item.times())
+
+    # strided columns and arrays of another type
+    times = np.ascontiguousarray(item.times())
+    assert np.array_equal(Item(item.name, item.features(), (times[:, 0], times[:, 1])).times(), times)
+    assert np.array_equal(Item(item.name, item.features(), (np.arange(10), np.arange(1, 11))).times(), times)
+
+    # a (2, 2) array is still a 2D times array
+    times = np.array([[0, 1], [1, 2]], dtype=np.float64)
+    assert Item(item.name, item.features()[:2], times).times().tolist() == times.tolist()
+
+    with pytest.raises(RuntimeError, match="tstart and tstop must have the same size"):
+        Item(item.name, item.features(), (start, stop[:5]))
+    with pytest.raises(RuntimeError, match="tstart must be lower or equal to tstop"):
+        Item(item.name, item.features(), (stop, start))
+
+
 def test_casting(item: Item) -> None:
     # test if features are cast to float64
     item2 = Item(item.name, item.features().astype(np.int8), item.times())
     assert item2.features().dtype == np.float64
 
 
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.float16])
+@pytest.mark.parametrize("copy", [True, False])
+def test_dtype(item: Item, dtype: type, copy: bool) -> None:  # noqa: FBT001
+    # float features keep their type, without copy if borrowed
+    features = item.features().astype(dtype)
+    item2 = Item(item.name, features, item.times(), copy=copy)
+    assert item2.dtype == np.dtype(dtype).name
+    assert item2.features().dtype == dtype
+    assert np.all(item2.features() == features)
+    assert np.shares_memory(item2.features(), features) != copy
+
+    # not contiguous arrays are converted to their own type
+    item3 = Item(item.name, np.asfortranarray(features), item.times(), copy=copy)
+    assert item3.features().dtype == dtype
+    assert item3 == item2
+
+
 def test_properties(rng: np.random.Generator) -> None:
     """test properties"""
     features = np.ones((10, 4), dtype=np.float64)
@@ -140,3 +177,33 @@ def test_build_by_copy(rng: np.random.Generator) -> None:
     times_copy = np.copy(times)
     times[:] = 0
     assert np.all(item.times().flatten() == times_copy.flatten())
+
+
+def test_build_by_reference(rng: np.random.Generator) -> None:
+    features = rng.random((10, 2))
+    times = np.arange(10).astype(np.float64)
+    item = Item("item", features, times, copy=False)
+    assert np.shares_memory(item.features(), features)
+    assert np.shares_memory(item.times(), times)
+
+    # not contiguous or not float64 arrays are converted anyway
+    item = Item("item", features[::2], times[::2].astype(np.float32), copy=False)
+    assert not np.shares_memory(item.features(), features)
+    assert np.all(item.features() == features[::2])
+
+
+def test_view(rng: np.random.Generator) -> None:
+    features = rng.random((10, 2))
+    times = np.arange(10).astype(np.float64)
+
+    # the arrays returned by the item are read-only views on its data
+    item = Item("item", features, times)
+    assert np.shares_memory(item.features(), item.features())
+    assert np.shares_memory(item.times(), item.times())
+    assert not item.features().flags.writeable
+    with pytest.raises(ValueError, match="read-only"):
+        item.features()[0, 0] = 0
+
+    # the views keep the item alive
+    view = Item("item", features, times).features()
+    assert np.all(view == features)
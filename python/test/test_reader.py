@@ -1,9 +1,14 @@
+import asyncio
+import os
+import subprocess
+import sys
+from concurrent.futures import Future
 from pathlib import Path
 
 import numpy as np
 import pytest
 
-from h5features import Item, Reader, Version, Writer
+from h5features import Item, Reader, ReaderPool, Stats, Version, Writer
 
 
 @pytest.fixture
@@ -101,3 +106,313 @@ def test_read_partial(h5file: Path, item1: Item) -> None:
     assert item2.features().shape == (2, 3)
     assert np.all(item2.times() == np.asarray([[0, 1], [1, 2]]))
     assert item2 == item3
+
+
+@pytest.mark.parametrize("workers", [0, 1, 4])
+def test_read_many(h5file: Path, item1: Item, item2: Item, workers: int) -> None:
+    reader = Reader(h5file, group="features")
+    assert reader.read_all(workers=workers) == [item1, item2]
+    assert reader.read_many(["item2", "item1", "item2"], workers=workers) == [item2, item1, item2]
+    assert reader.read_many([], workers=workers) == []
+    assert all(item.properties == {} for item in reader.read_many(["item1"], ignore_properties=True, workers=workers))
+
+    with pytest.raises(RuntimeError, match="object 'spam' does not exist"):
+        reader.read_many(["item1", "spam"], workers=workers)
+    with pytest.raises(TypeError, match="incompatible function arguments."):
+        reader.read_many(["item1"], workers=-1)
+
+
+@pytest.mark.parametrize("version", [Version.v1_2, Version.v2_0])
+def test_read_range(tmpdir: Path, item1: Item, item2: Item, version: Version) -> None:
+    filename = str(tmpdir / f"range_{version.name}.h5f")
+    Writer(filename, version=version).write([item1, item2])
+    reader = Reader(filename)
+    assert reader.read_range(0, 2) == [item1, item2]
+    assert reader.read_range(1, 2) == [item2]
+    assert reader.read_range(1, 1) == []
+    assert reader.read_many(["item2", "item1", "item1"]) == [item2, item1, item1]
+
+    with pytest.raises(RuntimeError, match="invalid range of items"):
+        reader.read_range(1, 3)
+
+
+@pytest.mark.parametrize("index", [False, True])
+def test_sizes(tmpdir: Path, item1: Item, item2: Item, index: bool) -> None:  # noqa: FBT001
+    filename = str(tmpdir / f"sizes_{index}.h5f")
+    Writer(filename, index=index).write([item2, item1])
+    reader = Reader(filename)
+    assert reader.items() == ["item1", "item2"]
+    assert reader.sizes() == [10, 15]
+    assert reader.dims() == [item1.dim, item2.dim]
+    assert reader.time_spans() == [(0, 10), (0, 14.1)]
+    assert reader.read_all() == [item1, item2]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_mmap(tmpdir: Path, item1: Item, item2: Item, compress: bool) -> None:  # noqa: FBT001
+    filename = str(tmpdir / f"mmap_{compress}.h5f")
+    Writer(filename, compress=compress).write([item1, item2])
+    reader = Reader(filename, mmap=True)
+    assert reader.read_all() == [item1, item2]
+    assert reader.read_partial("item2", start=1, stop=5) == Reader(filename).read_partial("item2", start=1, stop=5)
+
+    features = reader.read("item1").features()
+    assert not features.flags.writeable
+    assert np.shares_memory(features, reader.read("item1").features()) == (not compress)
+
+
+@pytest.mark.parametrize("driver", ["sec2", "core"])
+def test_file_access(tmpdir: Path, item1: Item, item2: Item, driver: str) -> None:
+    filename = str(tmpdir / f"access_{driver}.h5f")
+    Writer(filename).write([item1, item2])
+    reader = Reader(
+        filename, chunk_cache_bytes=1 << 24, chunk_cache_slots=10007, metadata_cache=1 << 22, driver=driver
+    )
+    assert reader.read_all() == [item1, item2]
+    for _ in range(2):
+        assert reader.read_partial("item2", start=1, stop=5) == Reader(filename).read_partial("item2", start=1, stop=5)
+
+    with pytest.raises(RuntimeError, match="unknown file driver 'mpio'"):
+        Reader(filename, driver="mpio")
+    with pytest.raises(RuntimeError, match="metadata cache size"):
+        Reader(filename, metadata_cache=10)
+
+
+def test_reader_pool(tmpdir: Path, item1: Item, item2: Item) -> None:
+    files = [str(tmpdir / f"pool_{index}.h5f") for index in range(2)]
+    for filename in files:
+        Writer(filename, group="group1").write([item1, item2])
+        Writer(filename, group="group2", version=Version.v1_2).write(item2)
+
+    pool = ReaderPool(1)
+    assert pool.max_files == 1
+    reader = pool.get(files[0], "group1")
+    assert reader.read_all() == [item1, item2]
+    assert pool.get(files[0], "group2").read_all() == [item2]
+    assert pool.get(Path(files[0]), group="group2").version == Version.v1_2
+    assert pool.open_files == 1
+
+    # the first file is evicted, its reader remains valid
+    assert pool.get(files[1], "group1").read("item1") == item1
+    assert pool.open_files == 1
+    assert reader.read("item2") == item2
+
+    with pytest.raises(RuntimeError):
+        pool.get(files[0], "missing")
+    with pytest.raises(RuntimeError, match="at least one file"):
+        ReaderPool(0)
+
+    pool.clear()
+    assert pool.open_files == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_reader_pool_fork(h5file: Path, item1: Item) -> None:
+    pool = ReaderPool()
+    assert pool.get(h5file).read("item1") == item1
+
+    pid = os.fork()
+    if pid == 0:
+        # the child process reopens the file
+        status = 1
+        try:
+            status = int(pool.get(h5file).read("item1") != item1)
+        finally:
+            os._exit(status)
+
+    assert os.waitpid(pid, 0)[1] == 0
+    assert pool.get(h5file).read("item1") == item1
+
+
+def test_submit(h5file: Path, item1: Item, item2: Item) -> None:
+    reader = Reader(h5file)
+    futures = [reader.submit(name) for name in ("item1", "item2", "item1")]
+    assert all(isinstance(future, Future) for future in futures)
+    assert [future.result() for future in futures] == [item1, item2, item1]
+
+    partial = reader.submit("item2", 1, 5, ignore_properties=True)
+    assert partial.result() == reader.read_partial("item2", 1, 5, ignore_properties=True)
+
+    with pytest.raises(RuntimeError, match="does not exist"):
+        reader.submit("spam").result()
+    with pytest.raises(ValueError, match="both"):
+        reader.submit("item1", 1)
+
+    # the reader can be deleted before the reads complete
+    futures = [Reader(h5file).submit("item1") for _ in range(10)]
+    assert all(future.result() == item1 for future in futures)
+
+
+def test_read_async(h5file: Path, item1: Item) -> None:
+    reader = Reader(h5file)
+
+    async def read() -> list[Item]:
+        return await asyncio.gather(
+            reader.read_async("item1"),
+            reader.read_partial_async("item2", 1, 5),
+            reader.read_async("item2", ignore_properties=True),
+        )
+
+    items = asyncio.run(read())
+    assert items[0] == item1
+    assert items[1] == reader.read_partial("item2", 1, 5)
+    assert items[2] == reader.read("item2", ignore_properties=True)
+
+    async def fail() -> Item:
+        return await reader.read_async("spam")
+
+    with pytest.raises(RuntimeError, match="does not exist"):
+        asyncio.run(fail())
+
+    # an event loop is required
+    with pytest.raises(RuntimeError, match="no running event loop"):
+        reader.read_async("item1")
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_iter_frames(h5file: Path, item1: Item, item2: Item, prefetch: int) -> None:
+    reader = Reader(h5file, group="features")
+    frames = np.vstack((item1.features(), item2.features()))
+
+    batches = list(reader.iter_frames(4, prefetch=prefetch))
+    assert [batch.shape for batch in batches] == [(4, 3)] * 6 + [(1, 3)]
+    assert all(not batch.flags.writeable for batch in batches)
+    assert np.array_equal(np.vstack(batches), frames)
+
+    batches = list(reader.iter_frames(100, shuffle_items=True, seed=3, prefetch=prefetch))
+    assert len(batches) == 1
+    assert batches[0].shape == (25, 3)
+
+    assert np.array_equal(reader.read_frames("item2", 2, 5), item2.features()[2:5])
+    with pytest.raises(RuntimeError, match="invalid indices"):
+        reader.read_frames("item2", 2, 20)
+
+
+@pytest.mark.parametrize("version", [Version.v1_2, Version.v2_0])
+def test_read_segments(tmpdir: Path, item1: Item, item2: Item, version: Version) -> None:
+    filename = str(tmpdir / f"segments_{version.name}.h5f")
+    Writer(filename, version=version).write([item1, item2])
+    reader = Reader(filename)
+
+    segments = [("item2", 1, 5), ("item1", 0, 3), ("item2", 4, 9), ("item2", 1, 5), ("item1", -1, 100)]
+    items = reader.read_segments(segments)
+    assert items == [reader.read_partial(*segment) for segment in segments]
+    assert items[-1] == item1
+    assert reader.read_segments([]) == []
+
+    features, offsets = reader.read_segments(segments, concatenate=True)
+    assert not features.flags.writeable
+    assert offsets.tolist() == [0, 4, 7, 12, 16, 26]
+    for i, item in enumerate(items):
+        assert np.array_equal(features[offsets[i] : offsets[i + 1]], item.features())
+
+    features, offsets = reader.read_segments([], concatenate=True)
+    assert features.shape == (0, 0)
+    assert offsets.tolist() == [0]
+
+    with pytest.raises(RuntimeError, match="does not exist"):
+        reader.read_segments([("item1", 0, 3), ("spam", 0, 3)])
+
+
+@pytest.mark.parametrize("version", [Version.v1_2, Version.v2_0])
+def test_read_concatenated(tmpdir: Path, item1: Item, item2: Item, version: Version) -> None:
+    filename = str(tmpdir / f"concatenated_{version.name}.h5f")
+    Writer(filename, version=version).write([item1, item2])
+    reader = Reader(filename)
+
+    features, times, offsets, names = reader.read_concatenated()
+    assert features.flags.writeable
+    assert features.shape == (25, 3)
+    assert times.shape == (25, 2)
+    assert offsets.tolist() == [0, 10, 25]
+    assert names == ["item1", "item2"]
+    for i, item in enumerate((item1, item2)):
+        assert np.array_equal(features[offsets[i] : offsets[i + 1]], item.features())
+        assert np.array_equal(times[offsets[i] : offsets[i + 1]], item.times())
+
+    out = np.zeros((25, 3), dtype=np.float32)
+    result, times, offsets, names = reader.read_concatenated(["item2", "item1"], out=out)
+    assert result is out
+    assert offsets.tolist() == [0, 15, 25]
+    assert names == ["item2", "item1"]
+    assert np.array_equal(out[:15], item2.features().astype(np.float32))
+    assert np.array_equal(times[15:], item1.times())
+
+    features, times, offsets, names = reader.read_concatenated([])
+    assert features.shape == (0, 0)
+    assert offsets.tolist() == [0]
+    assert names == []
+
+    with pytest.raises(RuntimeError, match="does not exist"):
+        reader.read_concatenated(["item1", "spam"])
+    with pytest.raises(RuntimeError, match="expected"):
+        reader.read_concatenated(out=np.zeros((24, 3)))
+    with pytest.raises(TypeError, match="float64"):
+        reader.read_concatenated(out=np.zeros((25, 3), dtype=np.int64))
+    with pytest.raises(TypeError, match="writeable"):
+        reader.read_concatenated(out=np.zeros((3, 25)).T)
+    readonly = np.zeros((25, 3))
+    readonly.flags.writeable = False
+    with pytest.raises(TypeError, match="writeable"):
+        reader.read_concatenated(out=readonly)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="requires ru_maxrss in kB")
+def test_read_concatenated_memory(tmpdir: Path, rng: np.random.Generator) -> None:
+    filename = str(tmpdir / "memory.h5f")
+    with Writer(filename) as writer:
+        for i in range(64):
+            writer.write(Item(f"item{i}", rng.random((1024, 64)), np.arange(1024, dtype=np.float64)))
+
+    # measured in a new process, the peak memory of the current one is unknown
+    script = f"""
+import resource
+from h5features import Reader
+reader = Reader({filename!r})
+reader.items()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+features, times, _, _ = reader.read_concatenated()
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print((after - before) * 1024, features.nbytes + times.nbytes)
+"""
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, check=True, text=True).stdout  # noqa: S603
+    peak, size = map(int, output.split())
+
+    # the items are not copied, only the HDF5 caches come in addition to the output
+    assert peak < size + 8 * 2**20
+
+
+def test_stats(tmpdir: Path, item1: Item, item2: Item) -> None:
+    filename = tmpdir / "stats.h5"
+    received: list[Stats] = []
+    with Writer(filename) as writer:
+        writer.enable_stats(received.append)
+        writer.write([item1, item2])
+        stats = writer.stats()
+    assert stats.bytes_written == sum(item.features().nbytes + item.times().nbytes for item in (item1, item2))
+    assert stats.write_features.count == 2
+    assert len(received) == 2
+
+    reader = Reader(filename)
+    assert reader.stats().as_dict()["read_features"] == {"count": 0, "seconds": 0}
+
+    received.clear()
+    reader.enable_stats(received.append)
+    assert reader.read("item1") == item1
+    assert len(received) == 1
+    assert isinstance(received[0], Stats)
+    stats = reader.stats()
+    assert stats.read_features.count == 1
+    assert stats.read_features.seconds > 0
+    assert stats.open_group.count == 1
+    assert stats.bytes_read == item1.features().nbytes + item1.times().nbytes
+    assert 0 <= stats.cache_hit_rate <= 1
+    assert set(stats.as_dict()) >= {"read_times", "read_properties", "bytes_read_stored"}
+
+    reader.reset_stats()
+    assert reader.stats().bytes_read == 0
+
+    reader.disable_stats()
+    reader.read("item2")
+    assert reader.stats().bytes_read == 0
+    assert len(received) == 1
@@ -90,6 +90,42 @@ def test_v1_2(item: Item, tmpdir: Path) -> None:
     assert reader.read("item") == item
 
 
+@pytest.mark.parametrize("version", [Version.v1_2, Version.v2_0])
+def test_compact_properties(item: Item, tmpdir: Path, version: Version) -> None:
+    filename = tmpdir / "compact.h5f"
+    writer = Writer(filename, compact_properties=True, version=version)
+    writer.write(item)
+    writer.write(Item("item2", item.features(), item.times()))
+    del writer
+
+    reader = Reader(filename)
+    assert reader.read("item") == item
+    assert reader.read("item").properties == item.properties
+    assert reader.read("item2").properties == {}
+    assert reader.read("item", ignore_properties=True).properties == {}
+
+
+@pytest.mark.parametrize("version", [Version.v1_2, Version.v2_0])
+def test_context_manager(item: Item, tmpdir: Path, version: Version) -> None:
+    filename = tmpdir / "context.h5f"
+    with Writer(filename, version=version) as writer:
+        assert not writer.closed
+        writer.write(item)
+        writer.flush()
+        assert Reader(filename).items() == ["item"]
+        writer.write(Item("item2", item.features(), item.times()))
+    assert writer.closed
+    writer.close()
+    with pytest.raises(RuntimeError, match="writer is closed"):
+        writer.write(item)
+    with pytest.raises(RuntimeError, match="writer is closed"):
+        writer.flush()
+
+    reader = Reader(filename)
+    assert reader.items() == ["item", "item2"]
+    assert reader.read("item") == item
+
+
 def test_read_all(item: Item, tmpdir: Path) -> None:
     filename = tmpdir / "test.h5f"
     writer = Writer(filename, group="group")
@@ -126,3 +162,133 @@ def test_times1d(tmpdir: Path, rng: np.random.Generator) -> None:
     assert item3.features().shape == (2, 5)
     item3 = reader.read_partial("name", 0, 0.5)
     assert item3.features().shape == (1, 5)
+
+
+@pytest.mark.parametrize("workers", [0, 1, 4])
+@pytest.mark.parametrize("version", [Version.v1_2, Version.v2_0])
+def test_write_many(tmpdir: Path, rng: np.random.Generator, version: Version, workers: int) -> None:
+    filename = tmpdir / "test.h5f"
+    times = np.vstack((np.arange(500), np.arange(500) + 1)).T.astype(np.float64)
+    items = [Item(f"item{i}", rng.random((500, 4)), times, properties={"i": i}) for i in range(10)]
+
+    Writer(filename, compress=True, version=version).write(items, workers=workers)
+    assert Reader(filename).read_all() == items
+
+    filename = tmpdir / "test2.h5f"
+    with pytest.raises(RuntimeError, match="already exists"):
+        Writer(filename, version=version).write([items[0], items[1], items[0]], workers=workers)
+    assert Reader(filename).items() == ["item0", "item1"]
+
+
+@pytest.mark.parametrize("version", [Version.v1_2, Version.v2_0])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int32])
+def test_write_concatenated(tmpdir: Path, rng: np.random.Generator, version: Version, dtype: type) -> None:
+    filename = tmpdir / "test.h5f"
+    sizes = [20, 30, 10, 40]
+    offsets = np.cumsum([0, *sizes])
+    names = [f"item{i}" for i in range(len(sizes))]
+    features = (rng.random((offsets[-1], 4)) * 10).astype(dtype)
+    times = np.concatenate([np.arange(size, dtype=np.float64) for size in sizes])
+    properties = [{"i": i} for i in range(len(sizes))]
+
+    with Writer(filename, version=version) as writer:
+        writer.write_concatenated(names, features, times, offsets, properties, workers=2)
+    items = [
+        Item(name, features[start:stop], times[start:stop], prop)
+        for name, start, stop, prop in zip(names, offsets[:-1], offsets[1:], properties, strict=True)
+    ]
+    assert Reader(filename).read_all() == items
+
+    # the features are read back concatenated in the stored dtype
+    features2, times2, offsets2, names2 = Reader(filename).read_concatenated()
+    assert features2.dtype == (np.float64 if dtype == np.int32 else dtype)
+    assert np.array_equal(features2, features)
+    assert np.array_equal(times2[:, 0], times)
+    assert np.array_equal(offsets2, offsets)
+    assert names2 == names
+
+    filename = tmpdir / "test2.h5f"
+    with Writer(filename, version=version) as writer:
+        with pytest.raises(RuntimeError, match="offsets must start at 0"):
+            writer.write_concatenated(names, features, times, np.array([0, 20, 50, 60, 99]))
+        with pytest.raises(RuntimeError, match="strictly increasing"):
+            writer.write_concatenated(names, features, times, np.array([0, 20, 20, 60, 100]))
+        with pytest.raises(RuntimeError, match="offsets must be positive"):
+            writer.write_concatenated(names, features, times, np.array([0, -1, 50, 60, 100]))
+        with pytest.raises(RuntimeError, match="item1' must be sorted"):
+            writer.write_concatenated(names, features, times, np.array([0, 10, 50, 60, 100]))
+        with pytest.raises(RuntimeError, match="one element per item"):
+            writer.write_concatenated(names, features, times, offsets, properties[:2])
+        with pytest.raises(RuntimeError, match="same size"):
+            writer.write_concatenated(names, features, times[:-1], offsets)
+        writer.write_concatenated(names[:2], features[:50], times[:50], offsets[:3])
+        with pytest.raises(RuntimeError, match="item 'item1'.*already exists"):
+            writer.write_concatenated([names[2], names[1]], features[50:], times[50:], offsets[2:] - 50)
+    assert Reader(filename).items() == names[:2]
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {},
+        {"compress": True},
+        {"compression": "none"},
+        {"compression": "deflate", "compression_level": 1},
+        {"compression": "deflate", "shuffle": True},
+        {"compress": True, "compression_level": 4, "shuffle": True},
+    ],
+)
+def test_compression(tmpdir: Path, rng: np.random.Generator, settings: dict) -> None:
+    filename = tmpdir / "test.h5f"
+    times = np.vstack((np.arange(500), np.arange(500) + 1)).T.astype(np.float64)
+    items = [Item(f"item{i}", rng.random((500, 4)), times) for i in range(5)]
+
+    Writer(filename, **settings).write(items)
+    assert Reader(filename).read_all() == items
+
+
+def test_compression_bad(tmpdir: Path) -> None:
+    filename = tmpdir / "test.h5f"
+    with pytest.raises(RuntimeError, match="unknown compression codec 'gzip'"):
+        Writer(filename, compression="gzip")
+    with pytest.raises(RuntimeError, match="invalid compression level 10 for deflate"):
+        Writer(filename, compression="deflate", compression_level=10)
+    with pytest.raises(TypeError, match="incompatible function arguments."):
+        Writer(filename, compression=1)
+
+
+@pytest.mark.parametrize("version", [Version.v1_1, Version.v1_2, Version.v2_0])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.float16])
+def test_dtype(tmpdir: Path, rng: np.random.Generator, version: Version, dtype: type) -> None:
+    times = np.vstack((np.arange(200), np.arange(200) + 1)).T.astype(np.float64)
+    item = Item("item", rng.random((200, 4)).astype(dtype), times)
+
+    for compress in (True, False):
+        filename = tmpdir / f"test_{compress}.h5"
+        Writer(filename, compress=compress, version=version).write(item)
+
+        reader = Reader(filename)
+        item2 = reader.read("item")
+        assert item2.features().dtype == dtype
+        assert item2 == item
+        assert reader.read_all(workers=2) == [item]
+
+        partial = reader.read_partial("item", start=10, stop=20)
+        assert partial.features().dtype == dtype
+        assert np.all(partial.features() == item.features()[10:20])
+
+
+@pytest.mark.parametrize("access", ["whole", "partial"])
+@pytest.mark.parametrize("chunk_bytes", [0, 100, 2**20])
+def test_chunking(tmpdir: Path, rng: np.random.Generator, access: str, chunk_bytes: int) -> None:
+    times = np.vstack((np.arange(500), np.arange(500) + 1)).T.astype(np.float64)
+    item = Item("item", rng.random((500, 7)), times)
+
+    filename = tmpdir / "test.h5"
+    Writer(filename, compress=True, access=access, chunk_bytes=chunk_bytes).write(item)
+    reader = Reader(filename)
+    assert reader.read("item") == item
+    assert np.all(reader.read_partial("item", start=100, stop=120).features() == item.features()[100:120])
+
+    with pytest.raises(RuntimeError, match="unknown access pattern"):
+        Writer(tmpdir / "test2.h5", access="random")
@@ -0,0 +1,86 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from h5features import Item, Reader, Version, Writer, repack
+from h5features.__main__ import main
+
+
+@pytest.fixture
+def items(rng: np.random.Generator) -> list[Item]:
+    return [
+        Item(f"item{i}", rng.random((10 + i, 3)), np.arange(10 + i, dtype=np.float64), {"speaker": f"spk{i % 2}"})
+        for i in range(7)
+    ]
+
+
+@pytest.fixture
+def source(tmp_path: Path, items: list[Item]) -> Path:
+    filename = tmp_path / "source.h5"
+    Writer(filename, version=Version.v1_2).write(items)
+    return filename
+
+
+def test_repack(tmp_path: Path, source: Path, items: list[Item]) -> None:
+    destination = tmp_path / "destination.h5"
+    progress = []
+    summary = repack(
+        source,
+        destination,
+        destination_group="repacked",
+        compression="deflate",
+        index=True,
+        batch_items=3,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+    assert summary == {"written": 7, "skipped": 0, "verified": 7}
+    assert progress == [(3, 7), (6, 7), (7, 7)]
+
+    reader = Reader(destination, group="repacked")
+    assert reader.version == Version.v2_0
+    assert reader.read_all() == items
+
+
+def test_repack_dtype(tmp_path: Path, source: Path, items: list[Item]) -> None:
+    destination = tmp_path / "destination.h5"
+    repack(source, destination, dtype="float32")
+    for item in items:
+        repacked = Reader(destination).read(item.name)
+        assert repacked.features().dtype == np.float32
+        assert np.array_equal(repacked.features(), item.features().astype(np.float32))
+        assert repacked.properties == item.properties
+
+    with pytest.raises(RuntimeError, match="unknown dtype"):
+        repack(source, tmp_path / "other.h5", dtype="int8")
+
+
+def test_repack_resume(tmp_path: Path, source: Path, items: list[Item]) -> None:
+    destination = tmp_path / "destination.h5"
+    Writer(destination).write(items[:2])
+
+    assert repack(source, destination, resume=True) == {"written": 5, "skipped": 2, "verified": 7}
+    assert Reader(destination).read_all() == items
+
+    with pytest.raises(RuntimeError, match="cannot both resume and overwrite"):
+        repack(source, destination, resume=True, overwrite=True)
+    with pytest.raises(RuntimeError, match="different files"):
+        repack(source, source)
+
+
+def test_cli(tmp_path: Path, source: Path, items: list[Item], capsys: pytest.CaptureFixture) -> None:
+    destination = tmp_path / "destination.h5"
+    assert main(["repack", str(source), str(destination), "--format-version", "2.0", "-b", "2", "-q"]) == 0
+    assert "7 items written, 0 skipped, 7 verified" in capsys.readouterr().err
+    assert Reader(destination).read_all() == items
+
+    assert main(["repack", str(source), str(destination), "--no-verify", "-q"]) == 1
+    assert capsys.readouterr().err.startswith("error: ")
+
+    # the module is executable as well
+    process = subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "h5features", "repack", "--help"], capture_output=True, text=True, check=True
+    )
+    assert "--format-version" in process.stdout
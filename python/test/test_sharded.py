@@ -0,0 +1,94 @@
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from h5features import Item, Reader, ShardedReader, ShardedWriter, Version
+
+
+def make_items(prefix: str, count: int) -> list[Item]:
+    rng = np.random.default_rng(0)
+    return [Item(f"{prefix}{i}", rng.random((10, 4)), np.arange(10, dtype=np.float64)) for i in range(count)]
+
+
+def write_rank(directory: Path, rank: int) -> None:
+    with ShardedWriter(directory, max_items=2, rank=rank) as writer:
+        writer.write(make_items(f"rank{rank}-", 3))
+
+
+@pytest.mark.parametrize("version", [Version.v1_2, Version.v2_0])
+def test_sharded(tmp_path: Path, version: Version) -> None:
+    items = make_items("item", 10)
+    with ShardedWriter(tmp_path, group="group", max_items=4, version=version) as writer:
+        writer.write(items[:5])
+        writer.write(items[5])
+        writer.write(items[6:], workers=2)
+        assert writer.shards() == ["shard-00000-00000.h5", "shard-00000-00001.h5", "shard-00000-00002.h5"]
+        assert writer.rank == 0
+    assert writer.closed
+
+    reader = ShardedReader(tmp_path, group="group", max_files=2)
+    assert reader.items() == [item.name for item in items]
+    assert reader.shards() == writer.shards()
+    assert reader.shard("item9") == "shard-00000-00002.h5"
+    assert Reader(tmp_path / reader.shard("item4"), group="group").items() == [f"item{i}" for i in range(4, 8)]
+    assert reader.read("item3") == items[3]
+    assert reader.read_all(workers=2) == items
+    assert reader.read_many(["item8", "item1"]) == [items[8], items[1]]
+    shard = Reader(tmp_path / reader.shard("item2"), group="group")
+    assert reader.read_partial("item2", 2, 5) == shard.read_partial("item2", 2, 5)
+
+    with pytest.raises(RuntimeError, match="not in the dataset"):
+        reader.read("unknown")
+
+
+def test_max_bytes(tmp_path: Path) -> None:
+    items = make_items("item", 5)
+    bytes_per_item = items[0].features().nbytes + items[0].times().nbytes
+    with ShardedWriter(tmp_path, max_bytes=2 * bytes_per_item) as writer:
+        writer.write(items)
+    assert len(writer.shards()) == 3
+    assert ShardedReader(tmp_path).read_all() == items
+
+
+def test_ranks(tmp_path: Path) -> None:
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=write_rank, args=(tmp_path, rank)) for rank in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    reader = ShardedReader(tmp_path)
+    assert len(reader.shards()) == 6
+    assert reader.items() == [f"rank{rank}-{i}" for rank in range(3) for i in range(3)]
+    assert reader.read_all() == [item for rank in range(3) for item in make_items(f"rank{rank}-", 3)]
+
+
+def test_append(tmp_path: Path) -> None:
+    items = make_items("item", 4)
+    with ShardedWriter(tmp_path) as writer:
+        writer.write(items[:2])
+    with ShardedWriter(tmp_path) as writer:
+        with pytest.raises(RuntimeError, match="already written"):
+            writer.write(items[0])
+        writer.write(items[2:])
+    assert ShardedReader(tmp_path).read_all() == items
+
+    with ShardedWriter(tmp_path, overwrite=True) as writer:
+        writer.write(items[3])
+    assert ShardedReader(tmp_path).items() == ["item3"]
+
+
+def test_errors(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError, match="no manifest"):
+        ShardedReader(tmp_path)
+
+    writer = ShardedWriter(tmp_path)
+    with pytest.raises(RuntimeError, match="contains a tab"):
+        writer.write(make_items("a\tb", 1)[0])
+    writer.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        writer.write(make_items("item", 1)[0])
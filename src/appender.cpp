@@ -0,0 +1,52 @@
+#include "h5features/appender.h"
+#include "h5features/exception.h"
+#include "h5features/hdf5.h"
+#include <iostream>
+#include <utility>
+
+h5features::appender::appender(std::shared_ptr<h5features::details::item_stream> stream,
+                               std::shared_ptr<h5features::details::stats_recorder> recorder)
+    : m_stream{std::move(stream)}, m_recorder{std::move(recorder)} {}
+
+h5features::appender::~appender() {
+  try {
+    abort();
+  } catch (const h5features::exception &e) {
+    std::cerr << "WARNING h5features: " << e.what() << std::endl;
+  }
+}
+
+h5features::details::item_stream &h5features::appender::checked_stream() const {
+  if (closed()) {
+    throw h5features::exception("appender is closed");
+  }
+  return *m_stream;
+}
+
+void h5features::appender::append(const h5features::features &features, const h5features::times &times) {
+  const h5features::details::stats_scope scope{m_recorder};
+  const auto commit = checked_stream().prepare(features, times);
+  const auto lock = h5features::details::lock_hdf5();
+  commit();
+}
+
+void h5features::appender::close(const h5features::properties &properties) {
+  const h5features::details::stats_scope scope{m_recorder};
+  auto &stream = checked_stream();
+  const auto lock = h5features::details::lock_hdf5();
+  stream.close(properties);
+}
+
+void h5features::appender::abort() {
+  if (not m_stream) {
+    return;
+  }
+  const auto lock = h5features::details::lock_hdf5();
+  m_stream->abort();
+}
+
+bool h5features::appender::closed() const noexcept { return not m_stream or m_stream->closed(); }
+
+std::string h5features::appender::name() const { return m_stream ? m_stream->name() : std::string{}; }
+
+std::size_t h5features::appender::size() const noexcept { return m_stream ? m_stream->size() : 0; }
@@ -0,0 +1,66 @@
+#include "h5features/chunking.h"
+#include "h5features/exception.h"
+#include <algorithm>
+#include <cstdint>
+#include <unordered_map>
+
+static const std::unordered_map<h5features::chunking::access, std::string> access_map{
+    {h5features::chunking::access::whole, "whole"}, {h5features::chunking::access::partial, "partial"}};
+
+std::size_t init_target_bytes(h5features::chunking::access access, std::size_t target_bytes) {
+  if (target_bytes == 0) {
+    return access == h5features::chunking::access::whole ? 1UL << 20 : 1UL << 16;
+  }
+
+  if (target_bytes >= (std::uint64_t{1} << 32)) {
+    throw h5features::exception("chunk target size must be lower than 4 GB");
+  }
+
+  return target_bytes;
+}
+
+h5features::chunking::chunking(access access, std::size_t target_bytes)
+    : m_access{access}, m_target_bytes{init_target_bytes(access, target_bytes)} {}
+
+h5features::chunking::access h5features::chunking::get_access() const noexcept { return m_access; }
+
+std::size_t h5features::chunking::target_bytes() const noexcept { return m_target_bytes; }
+
+std::size_t h5features::chunking::frames(std::size_t size, std::size_t frame_bytes) const noexcept {
+  // at least one frame per chunk, even if larger than the target
+  const auto target = std::max<std::size_t>(m_target_bytes / std::max<std::size_t>(frame_bytes, 1), 1);
+  size = std::max<std::size_t>(size, 1);
+
+  if (m_access == access::partial) {
+    return std::min(size, target);
+  }
+
+  // balance the frames in the least number of chunks below the target, this
+  // avoids a small trailing chunk
+  const auto nchunks = (size + target - 1) / target;
+  return (size + nchunks - 1) / nchunks;
+}
+
+bool h5features::chunking::operator==(const chunking &other) const noexcept {
+  return m_access == other.m_access and m_target_bytes == other.m_target_bytes;
+}
+
+bool h5features::chunking::operator!=(const chunking &other) const noexcept { return not(*this == other); }
+
+h5features::chunking::access h5features::chunking::parse_access(const std::string &name) {
+  for (const auto &[access, access_name] : access_map) {
+    if (access_name == name) {
+      return access;
+    }
+  }
+
+  throw h5features::exception("unknown access pattern '" + name + "'");
+}
+
+std::ostream &h5features::operator<<(std::ostream &os, h5features::chunking::access access) {
+  return os << access_map.at(access);
+}
+
+std::ostream &h5features::operator<<(std::ostream &os, const h5features::chunking &chunking) {
+  return os << chunking.get_access() << " access, chunks of " << chunking.target_bytes() << " bytes";
+}
@@ -0,0 +1,154 @@
+#include "h5features/compression.h"
+#include "h5features/exception.h"
+#include <H5Ppublic.h>
+#include <H5Zpublic.h>
+#include <sstream>
+#include <unordered_map>
+#include <vector>
+
+// Identifiers of optional HDF5 filters, as registered by The HDF Group
+static constexpr H5Z_filter_t filter_lzf = 32000;
+static constexpr H5Z_filter_t filter_blosc = 32001;
+static constexpr H5Z_filter_t filter_zstd = 32015;
+
+static const std::unordered_map<h5features::compression::codec, std::string> codec_map{
+    {h5features::compression::codec::none, "none"},
+    {h5features::compression::codec::deflate, "deflate"},
+    {h5features::compression::codec::lzf, "lzf"},
+    {h5features::compression::codec::zstd, "zstd"},
+    {h5features::compression::codec::blosc, "blosc"}};
+
+int init_level(h5features::compression::codec codec, int level) {
+  struct range {
+    int min;
+    int max;
+    int fallback;
+  };
+  static const std::unordered_map<h5features::compression::codec, range> ranges{
+      {h5features::compression::codec::deflate, {1, 9, 9}},
+      {h5features::compression::codec::zstd, {1, 22, 3}},
+      {h5features::compression::codec::blosc, {0, 9, 5}}};
+
+  // codecs without level
+  const auto it = ranges.find(codec);
+  if (it == ranges.end()) {
+    return 0;
+  }
+
+  if (level == -1) {
+    return it->second.fallback;
+  }
+
+  if (level < it->second.min or level > it->second.max) {
+    std::stringstream msg;
+    msg << "invalid compression level " << level << " for " << codec << ", must be in [" << it->second.min << ", "
+        << it->second.max << "]";
+    throw h5features::exception(msg.str());
+  }
+
+  return level;
+}
+
+h5features::compression::compression(codec codec, int level, bool shuffle)
+    : m_codec{codec}, m_level{init_level(codec, level)}, m_shuffle{shuffle and codec != codec::none} {}
+
+h5features::compression::codec h5features::compression::get_codec() const noexcept { return m_codec; }
+
+int h5features::compression::level() const noexcept { return m_level; }
+
+bool h5features::compression::shuffle() const noexcept { return m_shuffle; }
+
+bool h5features::compression::enabled() const noexcept { return m_codec != codec::none; }
+
+bool h5features::compression::operator==(const compression &other) const noexcept {
+  return m_codec == other.m_codec and m_level == other.m_level and m_shuffle == other.m_shuffle;
+}
+
+bool h5features::compression::operator!=(const compression &other) const noexcept { return not(*this == other); }
+
+bool h5features::compression::is_available(codec codec) {
+  static const std::unordered_map<h5features::compression::codec, H5Z_filter_t> filters{
+      {codec::deflate, H5Z_FILTER_DEFLATE},
+      {codec::lzf, filter_lzf},
+      {codec::zstd, filter_zstd},
+      {codec::blosc, filter_blosc}};
+
+  if (codec == codec::none) {
+    return true;
+  }
+
+  const auto lock = h5features::details::lock_hdf5();
+  const hdf5::SilenceHDF5 silencer;
+  return H5Zfilter_avail(filters.at(codec)) > 0;
+}
+
+h5features::compression::codec h5features::compression::parse_codec(const std::string &name) {
+  for (const auto &[codec, codec_name] : codec_map) {
+    if (codec_name == name) {
+      return codec;
+    }
+  }
+
+  throw h5features::exception("unknown compression codec '" + name + "'");
+}
+
+void h5features::compression::apply(hdf5::DataSetCreateProps &props) const {
+  if (m_codec == codec::none) {
+    return;
+  }
+
+  if (not is_available(m_codec)) {
+    std::stringstream msg;
+    msg << "compression codec " << m_codec << " is not available";
+    throw h5features::exception(msg.str());
+  }
+
+  // blosc has its own shuffle filter
+  if (m_shuffle and m_codec != codec::blosc) {
+    props.add(hdf5::Shuffle());
+  }
+
+  herr_t status = 0;
+  switch (m_codec) {
+  case codec::deflate:
+    props.add(hdf5::Deflate(static_cast<unsigned int>(m_level)));
+    break;
+  case codec::lzf:
+    status = H5Pset_filter(props.getId(), filter_lzf, H5Z_FLAG_OPTIONAL, 0, nullptr);
+    break;
+  case codec::zstd: {
+    const unsigned int values[] = {static_cast<unsigned int>(m_level)};
+    status = H5Pset_filter(props.getId(), filter_zstd, H5Z_FLAG_OPTIONAL, 1, values);
+    break;
+  }
+  case codec::blosc: {
+    // the 4 first values are reserved, then level, shuffle and compressor (blosclz)
+    const unsigned int values[] = {0, 0, 0, 0, static_cast<unsigned int>(m_level), m_shuffle ? 1U : 0U, 0};
+    status = H5Pset_filter(props.getId(), filter_blosc, H5Z_FLAG_OPTIONAL, 7, values);
+    break;
+  }
+  default:
+    break;
+  }
+
+  if (status < 0) {
+    std::stringstream msg;
+    msg << "failed to setup compression codec " << m_codec;
+    throw h5features::exception(msg.str());
+  }
+}
+
+std::ostream &h5features::operator<<(std::ostream &os, h5features::compression::codec codec) {
+  return os << codec_map.at(codec);
+}
+
+std::ostream &h5features::operator<<(std::ostream &os, const h5features::compression &compression) {
+  os << compression.get_codec();
+  if (compression.level() != 0) {
+    os << " level " << compression.level();
+  }
+  if (compression.shuffle()) {
+    os << " with shuffle";
+  }
+  return os;
+}
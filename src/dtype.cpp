@@ -0,0 +1,75 @@
+#include "h5features/dtype.h"
+#include "h5features/exception.h"
+#include <H5Tpublic.h>
+#include <sstream>
+
+// HighFive does not define a half float type: the HDF5 datatype is built as
+// done by h5py so that float16 datasets are compatible with numpy
+struct float16_tag {};
+
+template <> HighFive::AtomicType<float16_tag>::AtomicType() {
+  _hid = H5Tcopy(H5T_NATIVE_FLOAT);
+  if (_hid < 0 or H5Tset_fields(_hid, 15, 10, 5, 0, 10) < 0 or H5Tset_size(_hid, 2) < 0 or H5Tset_ebias(_hid, 15) < 0) {
+    throw h5features::exception("failed to create float16 datatype");
+  }
+}
+
+std::size_t h5features::size_of(h5features::dtype dtype) noexcept {
+  switch (dtype) {
+  case h5features::dtype::float16:
+    return 2;
+  case h5features::dtype::float32:
+    return 4;
+  default:
+    return 8;
+  }
+}
+
+std::ostream &h5features::operator<<(std::ostream &os, h5features::dtype dtype) {
+  switch (dtype) {
+  case h5features::dtype::float16:
+    return os << "float16";
+  case h5features::dtype::float32:
+    return os << "float32";
+  default:
+    return os << "float64";
+  }
+}
+
+h5features::dtype h5features::parse_dtype(const std::string &name) {
+  for (const auto dtype : {h5features::dtype::float16, h5features::dtype::float32, h5features::dtype::float64}) {
+    std::stringstream dtype_name;
+    dtype_name << dtype;
+    if (dtype_name.str() == name) {
+      return dtype;
+    }
+  }
+
+  throw h5features::exception("unknown dtype '" + name + "'");
+}
+
+hdf5::DataType h5features::details::make_datatype(h5features::dtype dtype) {
+  switch (dtype) {
+  case h5features::dtype::float16:
+    return hdf5::AtomicType<float16_tag>{};
+  case h5features::dtype::float32:
+    return hdf5::AtomicType<float>{};
+  default:
+    return hdf5::AtomicType<double>{};
+  }
+}
+
+h5features::dtype h5features::details::read_dtype(const hdf5::DataSet &dataset) {
+  const auto datatype = dataset.getDataType();
+  if (datatype.getClass() == hdf5::DataTypeClass::Float) {
+    switch (datatype.getSize()) {
+    case 2:
+      return h5features::dtype::float16;
+    case 4:
+      return h5features::dtype::float32;
+    default:
+      break;
+    }
+  }
+  return h5features::dtype::float64;
+}
@@ -1,22 +1,69 @@
 #include "h5features/features.h"
 #include "h5features/exception.h"
+#include <cstring>
+#include <memory>
+#include <sstream>
+#include <utility>
 #include <vector>
 
+// Returns a view on the bytes of a buffer of `size` scalars
+template <class T> h5features::span<const std::byte> as_bytes(const T *data, std::size_t size) {
+  return {reinterpret_cast<const std::byte *>(data), size * sizeof(T)};
+}
+
 h5features::features::features(const std::vector<double> &data, std::size_t dim, bool check)
-    : m_features{data}, m_dim{dim} {
+    : features{std::vector<double>{data}, dim, check} {}
+
+h5features::features::features(std::vector<double> &&data, std::size_t dim, bool check)
+    : features{std::make_shared<const std::vector<double>>(std::move(data)), dim, check} {}
+
+h5features::features::features(h5features::span<const double> data, std::size_t dim, std::shared_ptr<const void> owner,
+                               bool check)
+    : features{as_bytes(data.data(), data.size()), h5features::dtype::float64, dim, std::move(owner), check} {}
+
+h5features::features::features(h5features::span<const float> data, std::size_t dim, std::shared_ptr<const void> owner,
+                               bool check)
+    : features{as_bytes(data.data(), data.size()), h5features::dtype::float32, dim, std::move(owner), check} {}
+
+h5features::features::features(h5features::span<const std::byte> data, h5features::dtype dtype, std::size_t dim,
+                               std::shared_ptr<const void> owner, bool check)
+    : m_owner{std::move(owner)}, m_features{data}, m_dtype{dtype}, m_dim{dim} {
   if (check) {
     validate();
   }
 }
 
-h5features::features::features(std::vector<double> &&data, std::size_t dim, bool check) : m_features{data}, m_dim{dim} {
-  if (check) {
-    validate();
+h5features::features::features(features &&other) noexcept
+    : m_owner{std::move(other.m_owner)}, m_features{std::exchange(other.m_features, {})}, m_dtype{other.m_dtype},
+      m_dim{other.m_dim} {}
+
+h5features::features &h5features::features::operator=(features &&other) noexcept {
+  if (this != &other) {
+    m_owner = std::move(other.m_owner);
+    m_features = std::exchange(other.m_features, {});
+    m_dtype = other.m_dtype;
+    m_dim = other.m_dim;
   }
+  return *this;
 }
 
 bool h5features::features::operator==(const features &other) const noexcept {
-  return this == &other or (m_dim == other.m_dim and m_features == other.m_features);
+  if (this == &other) {
+    return true;
+  }
+  if (m_dim != other.m_dim or m_dtype != other.m_dtype or m_features.size() != other.m_features.size()) {
+    return false;
+  }
+
+  // compare float values, float16 have no native type and are compared bitwise
+  switch (m_dtype) {
+  case h5features::dtype::float64:
+    return data<double>() == other.data<double>();
+  case h5features::dtype::float32:
+    return data<float>() == other.data<float>();
+  default:
+    return m_features.size() == 0 or std::memcmp(m_features.data(), other.m_features.data(), m_features.size()) == 0;
+  }
 }
 
 bool h5features::features::operator!=(const features &other) const noexcept { return not(*this == other); }
@@ -24,10 +71,11 @@ bool h5features::features::operator!=(const features &other) const noexcept { re
 std::size_t h5features::features::dim() const { return m_dim; }
 
 std::size_t h5features::features::size() const noexcept {
+  const auto count = m_features.size() / h5features::size_of(m_dtype);
   if (m_dim != 0) {
-    return m_features.size() / m_dim;
+    return count / m_dim;
   } else {
-    return m_features.size();
+    return count;
   }
 }
 
@@ -38,9 +86,22 @@ void h5features::features::validate() const {
   if (m_features.size() == 0) { // features must have a non-zero size
     throw h5features::exception("features must have a non-zero size");
   }
-  if (m_features.size() % m_dim != 0) { // all features must have the same dimension
+  if (m_features.size() % h5features::size_of(m_dtype) != 0) { // data must be made of entire scalars
+    throw h5features::exception("features size must be a multiple of the dtype size");
+  }
+  if ((m_features.size() / h5features::size_of(m_dtype)) % m_dim != 0) { // all features must have the same dimension
     throw h5features::exception("features size must be a multiple of dim");
   }
 }
 
-const std::vector<double> &h5features::features::data() const noexcept { return m_features; }
+h5features::dtype h5features::features::get_dtype() const noexcept { return m_dtype; }
+
+h5features::span<const std::byte> h5features::features::bytes() const noexcept { return m_features; }
+
+void h5features::features::check_dtype(h5features::dtype dtype) const {
+  if (dtype != m_dtype) {
+    std::stringstream msg;
+    msg << "features dtype is " << m_dtype << ", cannot access it as " << dtype;
+    throw h5features::exception(msg.str());
+  }
+}
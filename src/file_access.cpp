@@ -0,0 +1,105 @@
+#include "h5features/file_access.h"
+#include "h5features/exception.h"
+#include <H5ACpublic.h>
+#include <H5FDcore.h>
+#include <H5Ppublic.h>
+#include <algorithm>
+#include <unordered_map>
+
+static const std::unordered_map<h5features::file_access::driver, std::string> driver_map{
+    {h5features::file_access::driver::sec2, "sec2"}, {h5features::file_access::driver::core, "core"}};
+
+std::size_t init_metadata_cache_bytes(std::size_t bytes) {
+  if (bytes != 0 and (bytes < (1UL << 10) or bytes > (1UL << 27))) {
+    throw h5features::exception("metadata cache size must be between 1 kB and 128 MB");
+  }
+  return bytes;
+}
+
+h5features::file_access::file_access(std::size_t chunk_cache_bytes, std::size_t chunk_cache_slots,
+                                     std::size_t metadata_cache_bytes, driver driver)
+    : m_chunk_cache_bytes{chunk_cache_bytes}, m_chunk_cache_slots{chunk_cache_slots},
+      m_metadata_cache_bytes{init_metadata_cache_bytes(metadata_cache_bytes)}, m_driver{driver} {}
+
+std::size_t h5features::file_access::chunk_cache_bytes() const noexcept { return m_chunk_cache_bytes; }
+
+std::size_t h5features::file_access::chunk_cache_slots() const noexcept { return m_chunk_cache_slots; }
+
+std::size_t h5features::file_access::metadata_cache_bytes() const noexcept { return m_metadata_cache_bytes; }
+
+h5features::file_access::driver h5features::file_access::get_driver() const noexcept { return m_driver; }
+
+bool h5features::file_access::operator==(const file_access &other) const noexcept {
+  return m_chunk_cache_bytes == other.m_chunk_cache_bytes and m_chunk_cache_slots == other.m_chunk_cache_slots and
+         m_metadata_cache_bytes == other.m_metadata_cache_bytes and m_driver == other.m_driver;
+}
+
+bool h5features::file_access::operator!=(const file_access &other) const noexcept { return not(*this == other); }
+
+h5features::file_access::driver h5features::file_access::parse_driver(const std::string &name) {
+  for (const auto &[driver, driver_name] : driver_map) {
+    if (driver_name == name) {
+      return driver;
+    }
+  }
+
+  throw h5features::exception("unknown file driver '" + name + "'");
+}
+
+void h5features::file_access::apply(hdf5::FileAccessProps &props) const {
+  const auto id = props.getId();
+
+  if (m_chunk_cache_bytes != 0 or m_chunk_cache_slots != 0) {
+    // the number of metadata cache elements is ignored by HDF5 since 1.8
+    int elements = 0;
+    std::size_t slots = 0;
+    std::size_t bytes = 0;
+    double w0 = 0;
+    if (H5Pget_cache(id, &elements, &slots, &bytes, &w0) < 0) {
+      throw h5features::exception("failed to read the chunk cache settings");
+    }
+    slots = m_chunk_cache_slots != 0 ? m_chunk_cache_slots : slots;
+    bytes = m_chunk_cache_bytes != 0 ? m_chunk_cache_bytes : bytes;
+    if (H5Pset_cache(id, elements, slots, bytes, w0) < 0) {
+      throw h5features::exception("failed to setup the chunk cache");
+    }
+  }
+
+  if (m_metadata_cache_bytes != 0) {
+    H5AC_cache_config_t config;
+    config.version = H5AC__CURR_CACHE_CONFIG_VERSION;
+    if (H5Pget_mdc_config(id, &config) < 0) {
+      throw h5features::exception("failed to read the metadata cache settings");
+    }
+    config.set_initial_size = true;
+    config.initial_size = m_metadata_cache_bytes;
+    config.min_size = std::min(config.min_size, m_metadata_cache_bytes);
+    config.max_size = std::max(config.max_size, m_metadata_cache_bytes);
+    if (H5Pset_mdc_config(id, &config) < 0) {
+      throw h5features::exception("failed to setup the metadata cache");
+    }
+  }
+
+  // the file is read only, the core driver does not need a backing store
+  if (m_driver == driver::core and H5Pset_fapl_core(id, 1UL << 20, false) < 0) {
+    throw h5features::exception("failed to setup the core file driver");
+  }
+}
+
+std::ostream &h5features::operator<<(std::ostream &os, h5features::file_access::driver driver) {
+  return os << driver_map.at(driver);
+}
+
+std::ostream &h5features::operator<<(std::ostream &os, const h5features::file_access &access) {
+  os << access.get_driver() << " driver";
+  if (access.chunk_cache_bytes() != 0) {
+    os << ", chunk cache of " << access.chunk_cache_bytes() << " bytes";
+  }
+  if (access.chunk_cache_slots() != 0) {
+    os << ", " << access.chunk_cache_slots() << " chunk cache slots";
+  }
+  if (access.metadata_cache_bytes() != 0) {
+    os << ", metadata cache of " << access.metadata_cache_bytes() << " bytes";
+  }
+  return os;
+}
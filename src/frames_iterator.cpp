@@ -0,0 +1,115 @@
+#include "h5features/frames_iterator.h"
+#include "h5features/exception.h"
+#include "h5features/reader.h"
+#include <algorithm>
+#include <numeric>
+#include <random>
+#include <sstream>
+#include <utility>
+
+h5features::frames_iterator::frames_iterator(const h5features::reader &reader, std::size_t batch_frames,
+                                             bool shuffle_items, std::size_t prefetch, std::uint64_t seed)
+    : m_state{std::make_shared<state>(state{reader, reader.items(), reader.sizes(), 0, 0, batch_frames})},
+      m_prefetch{prefetch}, m_pool{}, m_pending{} {
+  if (batch_frames == 0) {
+    throw h5features::exception("batch_frames must be greater than 0");
+  }
+
+  if (shuffle_items) {
+    std::vector<std::size_t> order(m_state->items.size());
+    std::iota(order.begin(), order.end(), 0);
+    std::shuffle(order.begin(), order.end(), std::mt19937_64{seed});
+
+    std::vector<std::string> items;
+    std::vector<std::size_t> sizes;
+    items.reserve(order.size());
+    sizes.reserve(order.size());
+    for (const auto i : order) {
+      items.push_back(std::move(m_state->items[i]));
+      sizes.push_back(m_state->sizes[i]);
+    }
+    m_state->items = std::move(items);
+    m_state->sizes = std::move(sizes);
+  }
+
+  // start reading the first batches in background
+  if (m_prefetch != 0) {
+    m_pool = std::make_unique<h5features::details::thread_pool>(1);
+    for (std::size_t i = 0; i < m_prefetch; ++i) {
+      m_pending.push_back(m_pool->submit([state = m_state]() { return state->read(); }));
+    }
+  }
+}
+
+h5features::frames_iterator::~frames_iterator() = default;
+
+std::size_t h5features::frames_iterator::batch_frames() const noexcept { return m_state->batch_frames; }
+
+std::optional<h5features::features> h5features::frames_iterator::next() {
+  if (not m_pool) {
+    return m_state->read();
+  }
+
+  // all the batches have been returned
+  if (m_pending.empty()) {
+    return std::nullopt;
+  }
+
+  // the batches are read in order by a single thread, a failed read is removed
+  // before being rethrown so that it is not got twice
+  auto pending = std::move(m_pending.front());
+  m_pending.pop_front();
+  auto batch = pending.get();
+  if (batch.has_value()) {
+    m_pending.push_back(m_pool->submit([state = m_state]() { return state->read(); }));
+  }
+  return batch;
+}
+
+std::optional<h5features::features> h5features::frames_iterator::state::read() {
+  std::optional<h5features::features> batch;
+  std::shared_ptr<std::vector<std::byte>> buffer;
+  std::size_t frames = 0;
+
+  while (frames < batch_frames and item < items.size()) {
+    const auto count = std::min(batch_frames - frames, sizes[item] - frame);
+    if (count != 0) {
+      auto features = reader.read_frames(items[item], frame, frame + count);
+
+      if (not batch.has_value()) {
+        // a whole batch in a single read is returned as is
+        batch.emplace(std::move(features));
+      } else {
+        if (features.dim() != batch->dim() or features.get_dtype() != batch->get_dtype()) {
+          std::stringstream msg;
+          msg << "cannot batch frames of item '" << items[item] << "' with dimension " << features.dim()
+              << " and dtype " << features.get_dtype() << ", previous items have dimension " << batch->dim()
+              << " and dtype " << batch->get_dtype();
+          throw h5features::exception(msg.str());
+        }
+
+        // concatenate the frames in a buffer of the batch size
+        if (not buffer) {
+          buffer = std::make_shared<std::vector<std::byte>>();
+          buffer->reserve(batch_frames * batch->dim() * h5features::size_of(batch->get_dtype()));
+          buffer->insert(buffer->end(), batch->bytes().begin(), batch->bytes().end());
+        }
+        buffer->insert(buffer->end(), features.bytes().begin(), features.bytes().end());
+      }
+
+      frames += count;
+      frame += count;
+    }
+
+    if (frame == sizes[item]) {
+      ++item;
+      frame = 0;
+    }
+  }
+
+  if (buffer) {
+    const h5features::span<const std::byte> bytes{buffer->data(), buffer->size()};
+    return h5features::features{bytes, batch->get_dtype(), batch->dim(), std::move(buffer), false};
+  }
+  return batch;
+}
@@ -0,0 +1,19 @@
+#include "h5features/hdf5.h"
+#include <new>
+
+#ifndef _WIN32
+#include <pthread.h>
+#endif
+
+std::unique_lock<std::recursive_mutex> h5features::details::lock_hdf5() {
+  static std::recursive_mutex mutex;
+#ifndef _WIN32
+  // a process forked while another thread calls HDF5 would inherit a locked
+  // mutex: the fork waits for the lock, the mutex is then released in the
+  // parent and reset in the child, where the owner thread no longer exists
+  static const int registered =
+      pthread_atfork([] { mutex.lock(); }, [] { mutex.unlock(); }, [] { new (&mutex) std::recursive_mutex; });
+  static_cast<void>(registered);
+#endif
+  return std::unique_lock<std::recursive_mutex>{mutex};
+}
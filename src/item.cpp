@@ -1,8 +1,18 @@
 #include "h5features/item.h"
 #include "h5features/exception.h"
+#include <mutex>
 #include <string>
 #include <utility>
 
+struct h5features::item::lazy_state {
+  std::once_flag once;
+  std::function<h5features::properties()> decode;
+  h5features::properties properties;
+};
+
+h5features::item::lazy_properties::lazy_properties(std::function<h5features::properties()> decode)
+    : m_decode{std::move(decode)} {}
+
 h5features::item::item(const std::string &name, const h5features::features &features, const h5features::times &times,
                        const h5features::properties &properties, bool check)
     : m_name{name}, m_features{features}, m_times{times}, m_properties{properties} {
@@ -19,16 +29,26 @@ h5features::item::item(const std::string &name, h5features::features &&features,
   }
 }
 
-bool h5features::item::operator==(const item &other) const noexcept {
+h5features::item::item(const std::string &name, h5features::features &&features, h5features::times &&times,
+                       lazy_properties &&properties, bool check)
+    : m_name{name}, m_features{std::move(features)}, m_times{std::move(times)}, m_properties{},
+      m_lazy{std::make_shared<lazy_state>()} {
+  m_lazy->decode = std::move(properties.m_decode);
+  if (check) {
+    validate();
+  }
+}
+
+bool h5features::item::operator==(const item &other) const {
   if (this == &other) {
     return true;
   } else {
     return m_name == other.m_name and m_features == other.m_features and m_times == other.m_times and
-           m_properties == other.m_properties;
+           properties() == other.properties();
   }
 }
 
-bool h5features::item::operator!=(const item &other) const noexcept { return not(*this == other); }
+bool h5features::item::operator!=(const item &other) const { return not(*this == other); }
 
 std::size_t h5features::item::dim() const { return m_features.dim(); }
 
@@ -36,13 +56,26 @@ std::size_t h5features::item::size() const noexcept { return m_features.size();
 
 std::string h5features::item::name() const noexcept { return m_name; }
 
-bool h5features::item::has_properties() const noexcept { return m_properties.size() != 0; }
+bool h5features::item::has_properties() const { return properties().size() != 0; }
 
 const h5features::times &h5features::item::times() const noexcept { return m_times; }
 
 const h5features::features &h5features::item::features() const noexcept { return m_features; }
 
-const h5features::properties &h5features::item::properties() const noexcept { return m_properties; }
+const h5features::properties &h5features::item::properties() const {
+  if (not m_lazy) {
+    return m_properties;
+  }
+
+  // decode the properties once, the state being shared with the item's copies
+  std::call_once(m_lazy->once, [this]() {
+    if (m_lazy->decode) {
+      m_lazy->properties = m_lazy->decode();
+      m_lazy->decode = nullptr;
+    }
+  });
+  return m_lazy->properties;
+}
 
 void h5features::item::validate(bool deep) const {
   if (deep) {
@@ -0,0 +1,77 @@
+#include "h5features/details/manifest.h"
+#include "h5features/exception.h"
+#include <algorithm>
+#include <fstream>
+#include <iomanip>
+#include <regex>
+#include <sstream>
+
+namespace {
+std::string padded(std::size_t value) {
+  std::stringstream stream;
+  stream << std::setw(5) << std::setfill('0') << value;
+  return stream.str();
+}
+
+// Returns the files of `directory` matching `pattern`, sorted by name
+std::vector<std::filesystem::path> list_files(const std::filesystem::path &directory, const std::regex &pattern) {
+  std::vector<std::filesystem::path> files;
+  if (not std::filesystem::is_directory(directory)) {
+    return files;
+  }
+  for (const auto &entry : std::filesystem::directory_iterator(directory)) {
+    if (entry.is_regular_file() and std::regex_match(entry.path().filename().string(), pattern)) {
+      files.push_back(entry.path());
+    }
+  }
+  std::sort(files.begin(), files.end());
+  return files;
+}
+} // namespace
+
+std::string h5features::details::manifest_name(std::size_t rank) { return "manifest-" + padded(rank) + ".tsv"; }
+
+std::string h5features::details::shard_name(std::size_t rank, std::size_t index) {
+  return "shard-" + padded(rank) + "-" + padded(index) + ".h5";
+}
+
+std::vector<std::filesystem::path> h5features::details::list_manifests(const std::filesystem::path &directory) {
+  return list_files(directory, std::regex{R"(manifest-\d+\.tsv)"});
+}
+
+std::vector<std::filesystem::path> h5features::details::list_shards(const std::filesystem::path &directory,
+                                                                    std::size_t rank) {
+  return list_files(directory, std::regex{"shard-" + padded(rank) + R"(-\d+\.h5)"});
+}
+
+std::vector<h5features::details::manifest_entry>
+h5features::details::read_manifest(const std::filesystem::path &filename) {
+  std::ifstream file{filename};
+  if (not file) {
+    throw h5features::exception("failed to read the manifest " + filename.string());
+  }
+
+  std::vector<h5features::details::manifest_entry> entries;
+  std::size_t number = 0;
+  for (std::string line; std::getline(file, line);) {
+    ++number;
+    const auto tab = line.find('\t');
+    if (tab == std::string::npos or tab == 0 or tab + 1 == line.size()) {
+      throw h5features::exception("invalid line " + std::to_string(number) + " in the manifest " + filename.string());
+    }
+    entries.emplace_back(line.substr(0, tab), line.substr(tab + 1));
+  }
+  return entries;
+}
+
+void h5features::details::append_manifest(const std::filesystem::path &filename,
+                                          const std::vector<h5features::details::manifest_entry> &entries) {
+  std::ofstream file{filename, std::ios::app};
+  for (const auto &[item, shard] : entries) {
+    file << item << '\t' << shard << '\n';
+  }
+  file.flush();
+  if (not file) {
+    throw h5features::exception("failed to write the manifest " + filename.string());
+  }
+}
@@ -0,0 +1,150 @@
+#include "h5features/details/mapped_file.h"
+#include "h5features/exception.h"
+#include <string>
+#include <utility>
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+// Returns the address of the first chunk of a 1D dataset if all its chunks are
+// stored one after the other in the file, `HADDR_UNDEF` otherwise
+haddr_t chunks_address(const hdf5::DataSet &dataset, hid_t props, std::size_t element_size) {
+  hsize_t chunk_size;
+  if (dataset.getDimensions().size() != 1 or H5Pget_chunk(props, 1, &chunk_size) != 1) {
+    return HADDR_UNDEF;
+  }
+
+  // all the chunks must be allocated
+  const auto space = dataset.getSpace();
+  hsize_t nchunks;
+  if (H5Dget_num_chunks(dataset.getId(), space.getId(), &nchunks) < 0 or
+      nchunks * chunk_size < dataset.getElementCount()) {
+    return HADDR_UNDEF;
+  }
+
+  haddr_t first = HADDR_UNDEF;
+  for (hsize_t index = 0; index < nchunks; ++index) {
+    hsize_t offset;
+    unsigned int filter_mask;
+    haddr_t address;
+    hsize_t size;
+    if (H5Dget_chunk_info(dataset.getId(), space.getId(), index, &offset, &filter_mask, &address, &size) < 0) {
+      return HADDR_UNDEF;
+    }
+
+    if (index == 0) {
+      first = address;
+    }
+    if (offset != index * chunk_size or size != chunk_size * element_size or address != first + index * size) {
+      return HADDR_UNDEF;
+    }
+  }
+  return first;
+}
+
+#ifdef _WIN32
+h5features::details::mapped_file::mapped_file(const std::string &filename)
+    : m_data{nullptr}, m_size{0}, m_mapping{nullptr} {
+  HANDLE file = CreateFileA(filename.c_str(), GENERIC_READ, FILE_SHARE_READ | FILE_SHARE_WRITE, nullptr, OPEN_EXISTING,
+                            FILE_ATTRIBUTE_NORMAL, nullptr);
+  if (file == INVALID_HANDLE_VALUE) {
+    throw h5features::exception("failed to map file " + filename);
+  }
+
+  LARGE_INTEGER size;
+  if (GetFileSizeEx(file, &size)) {
+    m_size = static_cast<std::size_t>(size.QuadPart);
+    m_mapping = CreateFileMappingA(file, nullptr, PAGE_READONLY, 0, 0, nullptr);
+  }
+  CloseHandle(file);
+
+  if (m_mapping != nullptr) {
+    m_data = static_cast<const std::byte *>(MapViewOfFile(m_mapping, FILE_MAP_READ, 0, 0, 0));
+  }
+  if (m_data == nullptr) {
+    if (m_mapping != nullptr) {
+      CloseHandle(m_mapping);
+    }
+    throw h5features::exception("failed to map file " + filename);
+  }
+}
+
+h5features::details::mapped_file::~mapped_file() {
+  UnmapViewOfFile(m_data);
+  CloseHandle(m_mapping);
+}
+#else
+h5features::details::mapped_file::mapped_file(const std::string &filename) : m_data{nullptr}, m_size{0} {
+  const int file = open(filename.c_str(), O_RDONLY);
+  if (file < 0) {
+    throw h5features::exception("failed to map file " + filename);
+  }
+
+  struct stat status;
+  void *data = MAP_FAILED;
+  if (fstat(file, &status) == 0 and status.st_size > 0) {
+    m_size = static_cast<std::size_t>(status.st_size);
+    data = mmap(nullptr, m_size, PROT_READ, MAP_SHARED, file, 0);
+  }
+  close(file);
+
+  if (data == MAP_FAILED) {
+    throw h5features::exception("failed to map file " + filename);
+  }
+  m_data = static_cast<const std::byte *>(data);
+}
+
+h5features::details::mapped_file::~mapped_file() { munmap(const_cast<std::byte *>(m_data), m_size); }
+#endif
+
+std::size_t h5features::details::mapped_file::size() const noexcept { return m_size; }
+
+// Returns the address of the data of a dataset in the file if it is stored
+// with the type `dtype`, without filters and in one piece, `HADDR_UNDEF`
+// otherwise
+haddr_t data_address(const hdf5::DataSet &dataset, h5features::dtype dtype) {
+  // the data must be stored with its type in memory and without filters
+  const auto props = dataset.getCreatePropertyList();
+  if (H5Tequal(dataset.getDataType().getId(), h5features::details::make_datatype(dtype).getId()) <= 0 or
+      H5Pget_nfilters(props.getId()) != 0) {
+    return HADDR_UNDEF;
+  }
+
+  switch (H5Pget_layout(props.getId())) {
+  case H5D_CONTIGUOUS:
+    return H5Dget_offset(dataset.getId());
+  case H5D_CHUNKED:
+    return chunks_address(dataset, props.getId(), h5features::size_of(dtype));
+  default:
+    return HADDR_UNDEF;
+  }
+}
+
+std::optional<h5features::span<const std::byte>> h5features::details::mapped_file::view(const hdf5::DataSet &dataset,
+                                                                                        h5features::dtype dtype) const {
+  const auto element_size = h5features::size_of(dtype);
+  const auto count = dataset.getElementCount();
+  const auto nbytes = count * element_size;
+
+  // checking the chunks are contiguous queries each of them, this is done
+  // once per dataset
+  const auto key = std::make_pair(dataset.getAddress(), dtype);
+  auto resolved = m_addresses.find(key);
+  if (resolved == m_addresses.end() or resolved->second.first != count) {
+    resolved = m_addresses.insert_or_assign(key, std::make_pair(count, data_address(dataset, dtype))).first;
+  }
+  const auto address = resolved->second.second;
+
+  // the data must be aligned and within the mapped file (items written after
+  // the file was mapped are not)
+  if (address == HADDR_UNDEF or address % element_size != 0 or address + nbytes > m_size) {
+    return std::nullopt;
+  }
+  return h5features::span<const std::byte>{m_data + address, nbytes};
+}
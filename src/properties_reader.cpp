@@ -1,5 +1,11 @@
 #include "h5features/details/properties_reader.h"
+#include "h5features/details/stats_recorder.h"
+#include <cstdint>
+#include <cstring>
+#include <memory>
+#include <optional>
 #include <string>
+#include <utility>
 #include <vector>
 
 void read_properties_scalar(h5features::properties &props, const std::string &name, const hdf5::Attribute &attribute) {
@@ -62,6 +68,35 @@ void read_properties_vector(h5features::properties &props, const std::string &na
   }
 }
 
+// Returns the subgroups of a list of properties `name` in order, or nothing if
+// the subgroups are not a list. The elements of a list are stored as the
+// subgroups `name__i$$`, for i in [0, size).
+std::optional<std::vector<std::string>> list_elements(const std::string &name,
+                                                      const std::vector<std::string> &subgroups) {
+  const auto prefix = name + "__";
+  const std::string suffix = "$$";
+
+  std::vector<std::string> elements(subgroups.size());
+  for (const auto &subgroup : subgroups) {
+    if (subgroup.size() <= prefix.size() + suffix.size() or subgroup.compare(0, prefix.size(), prefix) != 0 or
+        subgroup.compare(subgroup.size() - suffix.size(), suffix.size(), suffix) != 0) {
+      return std::nullopt;
+    }
+
+    const auto digits = subgroup.substr(prefix.size(), subgroup.size() - prefix.size() - suffix.size());
+    if (digits.find_first_not_of("0123456789") != std::string::npos or digits.size() > 9) {
+      return std::nullopt;
+    }
+
+    const auto index = std::stoul(digits);
+    if (index >= elements.size() or not elements[index].empty()) {
+      return std::nullopt;
+    }
+    elements[index] = subgroup;
+  }
+  return elements;
+}
+
 h5features::properties h5features::details::read_properties(const hdf5::Group &group) {
   // fill it with the read properties
   h5features::properties properties;
@@ -81,20 +116,16 @@ h5features::properties h5features::details::read_properties(const hdf5::Group &g
     case hdf5::ObjectType::Group: {
       auto new_grp = group.getGroup(name);
       std::vector<std::string> groups_list = new_grp.listObjectNames();
-      if (groups_list.size() != 0) {
-        if (groups_list[0].find("__") != std::string::npos && groups_list[0].find("$$") != std::string::npos) {
-          std::vector<h5features::properties> props;
-          for (size_t i = 0; i < groups_list.size(); ++i) {
-            props.push_back(read_properties(new_grp.getGroup(groups_list[i])));
-          }
-          properties.set(name, props);
-        } else {
-          properties.set(name, read_properties(group.getGroup(name)));
+      const auto elements = groups_list.empty() ? std::nullopt : list_elements(name, groups_list);
+      if (elements.has_value()) {
+        std::vector<h5features::properties> props;
+        props.reserve(elements->size());
+        for (const auto &element : elements.value()) {
+          props.push_back(read_properties(new_grp.getGroup(element)));
         }
-      }
-
-      else {
-        properties.set(name, read_properties(group.getGroup(name)));
+        properties.set(name, props);
+      } else {
+        properties.set(name, read_properties(new_grp));
       }
       break;
     }
@@ -107,3 +138,155 @@ h5features::properties h5features::details::read_properties(const hdf5::Group &g
 
   return properties;
 }
+
+// Reads properties encoded by `h5features::details::encode_properties`
+class properties_decoder {
+public:
+  properties_decoder(h5features::span<const std::byte> bytes) : m_bytes{bytes}, m_position{0} {}
+
+  h5features::properties decode() {
+    for (const auto c : {'H', '5', 'F', 'P', '\x01'}) {
+      if (get_byte() != static_cast<std::byte>(c)) {
+        throw h5features::exception("invalid encoded properties: bad header");
+      }
+    }
+    auto properties = get_properties();
+    if (m_position != m_bytes.size()) {
+      throw h5features::exception("invalid encoded properties: trailing bytes");
+    }
+    return properties;
+  }
+
+private:
+  h5features::span<const std::byte> m_bytes;
+  std::size_t m_position;
+
+  // ensure `count` bytes can be read
+  void require(std::size_t count) const {
+    if (count > m_bytes.size() - m_position) {
+      throw h5features::exception("invalid encoded properties: unexpected end of data");
+    }
+  }
+
+  std::byte get_byte() {
+    require(1);
+    return m_bytes[m_position++];
+  }
+
+  std::uint64_t get_uint() {
+    require(8);
+    std::uint64_t value = 0;
+    for (std::size_t i = 0; i < 8; ++i) {
+      value |= static_cast<std::uint64_t>(m_bytes[m_position + i]) << (8 * i);
+    }
+    m_position += 8;
+    return value;
+  }
+
+  // reads a number of elements, each taking at least `bytes` bytes
+  std::size_t get_size(std::size_t bytes) {
+    const auto size = get_uint();
+    if (size > (m_bytes.size() - m_position) / bytes) {
+      throw h5features::exception("invalid encoded properties: unexpected end of data");
+    }
+    return static_cast<std::size_t>(size);
+  }
+
+  int get_int() { return static_cast<int>(static_cast<std::int64_t>(get_uint())); }
+
+  double get_double() {
+    const auto bits = get_uint();
+    double value;
+    std::memcpy(&value, &bits, sizeof(value));
+    return value;
+  }
+
+  std::string get_string() {
+    const auto size = get_size(1);
+    std::string value(reinterpret_cast<const char *>(m_bytes.data() + m_position), size);
+    m_position += size;
+    return value;
+  }
+
+  h5features::properties get_properties() {
+    h5features::properties properties;
+    const auto size = get_size(10);
+    for (std::size_t i = 0; i < size; ++i) {
+      const auto name = get_string();
+      switch (static_cast<std::uint8_t>(get_byte())) {
+      case 0:
+        properties.set(name, get_properties());
+        break;
+      case 1:
+        properties.set(name, get_byte() != std::byte{0});
+        break;
+      case 2:
+        properties.set(name, get_int());
+        break;
+      case 3:
+        properties.set(name, get_double());
+        break;
+      case 4:
+        properties.set(name, get_string());
+        break;
+      case 5: {
+        std::vector<int> value(get_size(8));
+        for (auto &v : value) {
+          v = get_int();
+        }
+        properties.set(name, value);
+        break;
+      }
+      case 6: {
+        std::vector<double> value(get_size(8));
+        for (auto &v : value) {
+          v = get_double();
+        }
+        properties.set(name, value);
+        break;
+      }
+      case 7: {
+        std::vector<std::string> value(get_size(8));
+        for (auto &v : value) {
+          v = get_string();
+        }
+        properties.set(name, value);
+        break;
+      }
+      case 8: {
+        std::vector<h5features::properties> value(get_size(8));
+        for (auto &v : value) {
+          v = get_properties();
+        }
+        properties.set(name, value);
+        break;
+      }
+      default:
+        throw h5features::exception("invalid encoded properties: unknown type");
+      }
+    }
+    return properties;
+  }
+};
+
+h5features::properties h5features::details::decode_properties(h5features::span<const std::byte> encoded) {
+  return properties_decoder{encoded}.decode();
+}
+
+h5features::item::lazy_properties h5features::details::read_lazy_properties(const hdf5::Group &group,
+                                                                            const std::string &name) {
+  if (group.getObjectType(name) == hdf5::ObjectType::Dataset) {
+    const auto dataset = group.getDataSet(name);
+    auto encoded = std::make_shared<std::vector<std::byte>>(dataset.getElementCount());
+    dataset.read_raw(reinterpret_cast<unsigned char *>(encoded->data()));
+    // the decoding is recorded in the statistics of the reader, if any
+    return h5features::item::lazy_properties{[encoded, recorder = h5features::details::stats_scope::current()]() {
+      const h5features::details::stats_scope scope{recorder, false};
+      const h5features::details::stats_timer timer{&h5features::stats::decode_properties};
+      return h5features::details::decode_properties({encoded->data(), encoded->size()});
+    }};
+  }
+
+  auto properties = std::make_shared<const h5features::properties>(read_properties(group.getGroup(name)));
+  return h5features::item::lazy_properties{[properties]() { return *properties; }};
+}
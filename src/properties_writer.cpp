@@ -1,8 +1,125 @@
 #include "h5features/details/properties_writer.h"
+#include <algorithm>
+#include <cstdint>
+#include <cstring>
 #include <memory>
+#include <sstream>
 #include <string>
+#include <utility>
 #include <vector>
 
+// The type tags of the encoded properties, see `properties_reader.cpp`
+enum class tag : std::uint8_t {
+  properties = 0,
+  boolean = 1,
+  integer = 2,
+  real = 3,
+  string = 4,
+  integers = 5,
+  reals = 6,
+  strings = 7,
+  properties_list = 8
+};
+
+class properties_encoder {
+public:
+  std::vector<std::byte> bytes;
+
+  void put(std::uint64_t value) {
+    for (std::size_t i = 0; i < 8; ++i) {
+      bytes.push_back(static_cast<std::byte>(value >> (8 * i)));
+    }
+  }
+
+  void put(tag value) { bytes.push_back(static_cast<std::byte>(value)); }
+
+  void put(const std::string &value) {
+    put(static_cast<std::uint64_t>(value.size()));
+    const auto *data = reinterpret_cast<const std::byte *>(value.data());
+    bytes.insert(bytes.end(), data, data + value.size());
+  }
+
+  // the properties sorted by name, so that the encoding is deterministic
+  void put(const h5features::properties &properties) {
+    std::vector<std::pair<const std::string *, const h5features::properties::value_type *>> sorted;
+    sorted.reserve(properties.size());
+    for (const auto &[name, value] : properties) {
+      sorted.emplace_back(&name, &value);
+    }
+    std::sort(sorted.begin(), sorted.end(), [](const auto &a, const auto &b) { return *a.first < *b.first; });
+
+    put(static_cast<std::uint64_t>(sorted.size()));
+    for (const auto &[name, value] : sorted) {
+      put(*name);
+      std::visit(*this, *value);
+    }
+  }
+
+  void operator()(const std::shared_ptr<h5features::properties> &value) {
+    put(tag::properties);
+    put(*value);
+  }
+
+  void operator()(bool value) {
+    put(tag::boolean);
+    bytes.push_back(static_cast<std::byte>(value ? 1 : 0));
+  }
+
+  void operator()(int value) {
+    put(tag::integer);
+    put(static_cast<std::uint64_t>(static_cast<std::int64_t>(value)));
+  }
+
+  void operator()(double value) {
+    put(tag::real);
+    put_real(value);
+  }
+
+  void operator()(const std::string &value) {
+    put(tag::string);
+    put(value);
+  }
+
+  void operator()(const std::vector<int> &value) {
+    put(tag::integers);
+    put(static_cast<std::uint64_t>(value.size()));
+    for (const auto v : value) {
+      put(static_cast<std::uint64_t>(static_cast<std::int64_t>(v)));
+    }
+  }
+
+  void operator()(const std::vector<double> &value) {
+    put(tag::reals);
+    put(static_cast<std::uint64_t>(value.size()));
+    for (const auto v : value) {
+      put_real(v);
+    }
+  }
+
+  void operator()(const std::vector<std::string> &value) {
+    put(tag::strings);
+    put(static_cast<std::uint64_t>(value.size()));
+    for (const auto &v : value) {
+      put(v);
+    }
+  }
+
+  void operator()(const std::vector<h5features::properties> &value) {
+    put(tag::properties_list);
+    put(static_cast<std::uint64_t>(value.size()));
+    for (const auto &v : value) {
+      put(v);
+    }
+  }
+
+private:
+  void put_real(double value) {
+    std::uint64_t bits;
+    std::memcpy(&bits, &value, sizeof(bits));
+    put(bits);
+  }
+};
+
 class properties_writer_visitor {
 public:
   properties_writer_visitor(hdf5::Group &group, const std::string &name, bool compress)
@@ -57,3 +174,29 @@ void h5features::details::write_properties(const h5features::properties &props,
     throw h5features::exception(msg.str());
   }
 }
+
+std::vector<std::byte> h5features::details::encode_properties(const h5features::properties &properties) {
+  properties_encoder encoder;
+  for (const auto c : {'H', '5', 'F', 'P', '\x01'}) {
+    encoder.bytes.push_back(static_cast<std::byte>(c));
+  }
+  encoder.put(properties);
+  return std::move(encoder.bytes);
+}
+
+void h5features::details::write_properties(const std::vector<std::byte> &encoded, hdf5::Group &group,
+                                           const std::string &name, bool compress) {
+  try {
+    hdf5::DataSetCreateProps props;
+    if (compress) {
+      props.add(hdf5::Chunking{encoded.size()});
+      props.add(hdf5::Deflate{9});
+    }
+    group.createDataSet<unsigned char>(name, hdf5::DataSpace{encoded.size()}, props)
+        .write_raw(reinterpret_cast<const unsigned char *>(encoded.data()));
+  } catch (const std::exception &e) {
+    std::stringstream msg;
+    msg << "failed to write properties: " << e.what();
+    throw h5features::exception(msg.str());
+  }
+}
@@ -0,0 +1,301 @@
+#include "h5features/details/raw_dataset.h"
+#include "h5features/exception.h"
+#include <H5Dpublic.h>
+#include <H5Ppublic.h>
+#include <H5Tpublic.h>
+#include <H5Zpublic.h>
+#include <algorithm>
+#include <cstring>
+#include <memory>
+#include <sstream>
+#include <utility>
+#include <zlib.h>
+
+// Byte shuffle of `count` elements of `size` bytes, as done by the HDF5 shuffle filter
+void shuffle(const char *source, char *destination, std::size_t count, std::size_t size) {
+  for (std::size_t i = 0; i < count; ++i) {
+    for (std::size_t j = 0; j < size; ++j) {
+      destination[j * count + i] = source[i * size + j];
+    }
+  }
+}
+
+// Inverse of shuffle
+void unshuffle(const char *source, char *destination, std::size_t count, std::size_t size) {
+  for (std::size_t i = 0; i < count; ++i) {
+    for (std::size_t j = 0; j < size; ++j) {
+      destination[i * size + j] = source[j * count + i];
+    }
+  }
+}
+
+h5features::details::raw_dataset::raw_dataset(const hdf5::DataSet &dataset, h5features::dtype dtype)
+    : m_dtype{dtype}, m_element_size{h5features::size_of(dtype)}, m_size{dataset.getElementCount()}, m_chunk_size{0},
+      m_direct{false}, m_compression{h5features::compression::codec::none}, m_shuffle{-1}, m_deflate{-1}, m_chunks{},
+      m_data{}, m_view{} {
+  m_direct = init_filters(dataset);
+  if (not m_direct) {
+    m_data.resize(m_size * m_element_size);
+    dataset.read_raw(m_data.data(), h5features::details::make_datatype(m_dtype));
+    return;
+  }
+
+  const auto id = dataset.getId();
+  const auto space = dataset.getSpace();
+  hsize_t nchunks;
+  if (H5Dget_num_chunks(id, space.getId(), &nchunks) < 0) {
+    throw h5features::exception("failed to read the number of chunks");
+  }
+
+  m_chunks.resize(nchunks);
+  for (hsize_t index = 0; index < nchunks; ++index) {
+    hsize_t offset;
+    hsize_t size;
+    haddr_t address;
+    auto &chunk = m_chunks[index];
+    if (H5Dget_chunk_info(id, space.getId(), index, &offset, &chunk.filter_mask, &address, &size) < 0) {
+      throw h5features::exception("failed to read chunk info");
+    }
+
+    chunk.offset = offset;
+    chunk.bytes.resize(size);
+    if (H5Dread_chunk(id, H5P_DEFAULT, &offset, &chunk.filter_mask, chunk.bytes.data()) < 0) {
+      throw h5features::exception("failed to read chunk");
+    }
+  }
+}
+
+h5features::details::raw_dataset::raw_dataset(h5features::span<const double> data, std::size_t chunk_size,
+                                              const h5features::compression &compression)
+    : raw_dataset{{reinterpret_cast<const std::byte *>(data.data()), data.size() * sizeof(double)},
+                  h5features::dtype::float64,
+                  chunk_size,
+                  compression} {}
+
+h5features::details::raw_dataset::raw_dataset(h5features::span<const std::byte> data, h5features::dtype dtype,
+                                              std::size_t chunk_size, const h5features::compression &compression)
+    : m_dtype{dtype}, m_element_size{h5features::size_of(dtype)}, m_size{data.size() / m_element_size},
+      m_chunk_size{chunk_size}, m_direct{false},
+      m_compression{chunk_size == 0 ? h5features::compression{h5features::compression::codec::none} : compression},
+      m_shuffle{-1}, m_deflate{-1}, m_chunks{}, m_data{}, m_view{} {
+  const auto codec = m_compression.get_codec();
+  m_direct = m_chunk_size != 0 and
+             (codec == h5features::compression::codec::none or codec == h5features::compression::codec::deflate);
+  if (not m_direct) {
+    m_view = data;
+    return;
+  }
+
+  // filters pipeline is shuffle (optional) then deflate
+  if (m_compression.shuffle()) {
+    m_shuffle = 0;
+  }
+  if (codec == h5features::compression::codec::deflate) {
+    m_deflate = m_shuffle + 1;
+  }
+
+  const std::size_t nbytes = m_chunk_size * m_element_size;
+  const unsigned int all_filters = (m_shuffle != -1 ? 1U : 0U) | (m_deflate != -1 ? 1U << m_deflate : 0U);
+  std::vector<char> padded;
+  std::vector<char> shuffled;
+
+  m_chunks.resize((m_size + m_chunk_size - 1) / m_chunk_size);
+  for (std::size_t index = 0; index < m_chunks.size(); ++index) {
+    auto &chunk = m_chunks[index];
+    chunk.offset = index * m_chunk_size;
+    chunk.filter_mask = 0;
+
+    // a chunk is always written entirely, the last one is padded with zeros
+    const auto count = std::min(m_chunk_size, m_size - chunk.offset);
+    const char *source = reinterpret_cast<const char *>(data.data()) + chunk.offset * m_element_size;
+    if (count < m_chunk_size) {
+      padded.assign(nbytes, 0);
+      std::copy_n(source, count * m_element_size, padded.begin());
+      source = padded.data();
+    }
+
+    if (m_deflate != -1) {
+      const char *input = source;
+      if (m_shuffle != -1) {
+        shuffled.resize(nbytes);
+        shuffle(source, shuffled.data(), m_chunk_size, m_element_size);
+        input = shuffled.data();
+      }
+
+      uLongf size = compressBound(nbytes);
+      chunk.bytes.resize(size);
+      if (compress2(reinterpret_cast<Bytef *>(chunk.bytes.data()), &size, reinterpret_cast<const Bytef *>(input),
+                    nbytes, m_compression.level()) != Z_OK) {
+        throw h5features::exception("failed to compress chunk");
+      }
+
+      // as the HDF5 deflate filter does, store the chunk uncompressed if
+      // compression is useless
+      if (size < nbytes) {
+        chunk.bytes.resize(size);
+        chunk.bytes.shrink_to_fit();
+        continue;
+      }
+      chunk.filter_mask = all_filters;
+    }
+
+    chunk.bytes.assign(source, source + nbytes);
+  }
+}
+
+bool h5features::details::raw_dataset::init_filters(const hdf5::DataSet &dataset) {
+  // the data must be stored with its type in memory in a 1D dataset
+  if (H5Tequal(dataset.getDataType().getId(), h5features::details::make_datatype(m_dtype).getId()) <= 0 or
+      dataset.getDimensions().size() != 1) {
+    return false;
+  }
+
+  // the dataset must be chunked
+  const auto props = dataset.getCreatePropertyList();
+  if (H5Pget_layout(props.getId()) != H5D_CHUNKED) {
+    return false;
+  }
+
+  hsize_t chunk_size;
+  if (H5Pget_chunk(props.getId(), 1, &chunk_size) < 0) {
+    throw h5features::exception("failed to read the chunk size");
+  }
+  m_chunk_size = chunk_size;
+
+  // the filters pipeline must be shuffle (optional) then deflate (optional)
+  const auto nfilters = H5Pget_nfilters(props.getId());
+  for (int position = 0; position < nfilters; ++position) {
+    unsigned int flags;
+    std::size_t nelements = 0;
+    unsigned int filter_config;
+    const auto filter =
+        H5Pget_filter2(props.getId(), position, &flags, &nelements, nullptr, 0, nullptr, &filter_config);
+
+    if (filter == H5Z_FILTER_SHUFFLE and position == 0) {
+      m_shuffle = position;
+    } else if (filter == H5Z_FILTER_DEFLATE and m_deflate == -1) {
+      m_deflate = position;
+    } else {
+      return false;
+    }
+  }
+
+  return true;
+}
+
+bool h5features::details::raw_dataset::is_applied(const chunk &chunk, int position) noexcept {
+  return position != -1 and not(chunk.filter_mask & (1U << position));
+}
+
+void h5features::details::raw_dataset::check_dtype(h5features::dtype dtype) const {
+  if (dtype != m_dtype) {
+    std::stringstream msg;
+    msg << "dataset dtype is " << m_dtype << ", cannot decode it as " << dtype;
+    throw h5features::exception(msg.str());
+  }
+}
+
+// Returns features owning `buffer`
+h5features::features make_features(std::shared_ptr<std::vector<char>> buffer, h5features::dtype dtype,
+                                   std::size_t dim) {
+  const h5features::span<const std::byte> bytes{reinterpret_cast<const std::byte *>(buffer->data()), buffer->size()};
+  return {bytes, dtype, dim, std::move(buffer), false};
+}
+
+h5features::features h5features::details::raw_dataset::decode_features(std::size_t dim) {
+  auto buffer = std::make_shared<std::vector<char>>(m_size * m_element_size);
+  decode(buffer->data());
+  return make_features(std::move(buffer), m_dtype, dim);
+}
+
+void h5features::details::raw_dataset::decode(char *destination) {
+  if (not m_direct) {
+    std::copy(m_data.begin(), m_data.end(), destination);
+    m_data = {};
+    return;
+  }
+
+  const std::size_t nbytes = m_chunk_size * m_element_size;
+  std::fill_n(destination, m_size * m_element_size, 0);
+  std::vector<char> inflated;
+  std::vector<char> unshuffled;
+
+  for (const auto &chunk : m_chunks) {
+    if (chunk.offset >= m_size) {
+      throw h5features::exception("chunk out of dataset bounds");
+    }
+
+    const char *source = chunk.bytes.data();
+    std::size_t size = chunk.bytes.size();
+
+    if (is_applied(chunk, m_deflate)) {
+      inflated.resize(nbytes);
+      uLongf inflated_size = nbytes;
+      if (uncompress(reinterpret_cast<Bytef *>(inflated.data()), &inflated_size,
+                     reinterpret_cast<const Bytef *>(source), size) != Z_OK) {
+        throw h5features::exception("failed to decompress chunk");
+      }
+      source = inflated.data();
+      size = inflated_size;
+    }
+
+    if (size < nbytes) {
+      throw h5features::exception("chunk is truncated");
+    }
+
+    if (is_applied(chunk, m_shuffle)) {
+      unshuffled.resize(nbytes);
+      unshuffle(source, unshuffled.data(), m_chunk_size, m_element_size);
+      source = unshuffled.data();
+    }
+
+    // the last chunk may be partially filled
+    const auto count = std::min(m_chunk_size, m_size - chunk.offset);
+    std::memcpy(destination + chunk.offset * m_element_size, source, count * m_element_size);
+  }
+}
+
+hdf5::DataSet h5features::details::raw_dataset::write(hdf5::Group &group, const std::string &name) const {
+  hdf5::DataSetCreateProps props;
+  if (m_chunk_size != 0) {
+    props.add(hdf5::Chunking{m_chunk_size});
+    m_compression.apply(props);
+  }
+
+  const auto datatype = h5features::details::make_datatype(m_dtype);
+  auto dataset = group.createDataSet(name, hdf5::DataSpace{m_size}, datatype, props);
+  if (not m_direct) {
+    dataset.write_raw(m_view.data(), datatype);
+    return dataset;
+  }
+
+  write_chunks(dataset, 0);
+  return dataset;
+}
+
+void h5features::details::raw_dataset::write(hdf5::DataSet &dataset, std::size_t offset) const {
+  dataset.resize({offset + m_size});
+  if (not m_direct) {
+    dataset.select({offset}, {m_size}).write_raw(m_view.data(), h5features::details::make_datatype(m_dtype));
+    return;
+  }
+  write_chunks(dataset, offset);
+}
+
+void h5features::details::raw_dataset::write_chunks(const hdf5::DataSet &dataset, std::size_t offset) const {
+  for (const auto &chunk : m_chunks) {
+    const hsize_t chunk_offset = offset + chunk.offset;
+    if (H5Dwrite_chunk(dataset.getId(), H5P_DEFAULT, chunk.filter_mask, &chunk_offset, chunk.bytes.size(),
+                       chunk.bytes.data()) < 0) {
+      throw h5features::exception("failed to write chunk");
+    }
+  }
+}
+
+h5features::features h5features::details::read_features(const hdf5::Selection &selection, h5features::dtype dtype,
+                                                        std::size_t dim) {
+  auto buffer =
+      std::make_shared<std::vector<char>>(selection.getMemSpace().getElementCount() * h5features::size_of(dtype));
+  selection.read_raw(buffer->data(), h5features::details::make_datatype(dtype));
+  return make_features(std::move(buffer), dtype, dim);
+}
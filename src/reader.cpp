@@ -1,25 +1,44 @@
 #include "h5features/reader.h"
+#include "h5features/details/mapped_file.h"
+#include "h5features/details/thread_pool.h"
 #include "h5features/details/v1_reader.h"
 #include "h5features/details/v2_reader.h"
 #include "h5features/exception.h"
+#include <algorithm>
+#include <atomic>
+#include <future>
 #include <memory>
 #include <sstream>
 #include <string>
 #include <utility>
 #include <vector>
 
-std::unique_ptr<h5features::details::reader_interface> init_reader(const std::string &filename,
-                                                                   const std::string &groupname) {
+// Maps a file in memory, returns null if its data addresses are not file offsets
+std::shared_ptr<const h5features::details::mapped_file> map_file(const hdf5::File &file) {
+  const hid_t props = H5Fget_create_plist(file.getId());
+  hsize_t userblock = 0;
+  const auto status = H5Pget_userblock(props, &userblock);
+  H5Pclose(props);
+  if (status < 0 or userblock != 0) {
+    return nullptr;
+  }
+  return std::make_shared<const h5features::details::mapped_file>(file.getName());
+}
+
+std::unique_ptr<h5features::details::reader_interface> init_reader(const hdf5::File &file, const std::string &groupname,
+                                                                   bool memory_map) {
+  const auto lock = h5features::details::lock_hdf5();
+
   // inhibate HDF5 errors stack printing (very verbose and useless to end user)
   const hdf5::SilenceHDF5 silencer;
 
   try {
-    auto group = hdf5::File{filename, hdf5::File::ReadOnly}.getGroup(groupname);
+    auto group = file.getGroup(groupname);
     auto version = h5features::read_version(group);
 
     switch (version) {
     case h5features::version::v2_0: {
-      return std::make_unique<h5features::v2::reader>(std::move(group), version);
+      return std::make_unique<h5features::v2::reader>(std::move(group), version, memory_map ? map_file(file) : nullptr);
       break;
     }
     case h5features::version::v1_2:
@@ -40,10 +59,49 @@ std::unique_ptr<h5features::details::reader_interface> init_reader(const std::st
   }
 }
 
-h5features::reader::reader(const std::string &filename, const std::string &group)
-    : m_filename{filename}, m_groupname{group}, m_reader{init_reader(filename, group)} {}
+hdf5::File open_file(const std::string &filename, const h5features::file_access &access) {
+  const auto lock = h5features::details::lock_hdf5();
+  const hdf5::SilenceHDF5 silencer;
+
+  try {
+    auto props = hdf5::FileAccessProps::Empty();
+    access.apply(props);
+    return hdf5::File{filename, hdf5::File::ReadOnly, props};
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(e.what());
+  }
+}
+
+std::unique_ptr<h5features::details::reader_interface> init_reader(const std::string &filename,
+                                                                   const std::string &groupname, bool memory_map,
+                                                                   const h5features::file_access &access) {
+  // the file is closed with the lock held, the group keeps it open
+  const auto lock = h5features::details::lock_hdf5();
+  return init_reader(open_file(filename, access), groupname, memory_map);
+}
+
+h5features::reader::reader(const std::string &filename, const std::string &group, bool memory_map)
+    : reader(filename, group, memory_map, h5features::file_access{}) {}
+
+h5features::reader::reader(const std::string &filename, const std::string &group, bool memory_map,
+                           const h5features::file_access &access)
+    : m_filename{filename}, m_groupname{group}, m_reader{init_reader(filename, group, memory_map, access)} {}
+
+h5features::reader::reader(const hdf5::File &file, const std::string &group, bool memory_map)
+    : m_filename{file.getName()}, m_groupname{group}, m_reader{init_reader(file, group, memory_map)} {}
+
+hdf5::File h5features::reader::open(const std::string &filename, const h5features::file_access &access) {
+  return open_file(filename, access);
+}
+
+h5features::reader::~reader() {
+  // closing the HDF5 group may close the file as well
+  const auto lock = h5features::details::lock_hdf5();
+  m_reader.reset();
+}
 
 std::vector<std::string> h5features::reader::list_groups(const std::string &filename) {
+  const auto lock = h5features::details::lock_hdf5();
   try {
     return HighFive::File(filename).listObjectNames();
   } catch (const hdf5::Exception &e) {
@@ -57,22 +115,242 @@ std::string h5features::reader::groupname() const { return m_groupname; }
 
 h5features::version h5features::reader::version() const { return m_reader->version(); }
 
-std::vector<std::string> h5features::reader::items() const { return m_reader->items(); }
+std::vector<std::string> h5features::reader::items() const {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  return m_reader->items();
+}
+
+std::vector<std::size_t> h5features::reader::sizes() const {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  return m_reader->sizes();
+}
+
+std::vector<std::size_t> h5features::reader::dims() const {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  return m_reader->dims();
+}
+
+std::vector<std::pair<double, double>> h5features::reader::time_spans() const {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  return m_reader->time_spans();
+}
+
+std::vector<h5features::item> h5features::reader::read_all(bool ignore_properties, std::size_t workers) const {
+  const h5features::details::stats_scope scope{recorder()};
+  return read_many(items(), ignore_properties, workers);
+}
+
+std::vector<h5features::item> h5features::reader::read_many(const std::vector<std::string> &names,
+                                                            bool ignore_properties, std::size_t workers) const {
+  const h5features::details::stats_scope scope{recorder()};
+  if (workers == 0) {
+    workers = h5features::details::thread_pool::default_workers();
+  }
+  workers = std::min(workers, names.size());
+
+  // sequential read in the calling thread, version 1.x items are read in bulk
+  if (workers <= 1 or m_reader->version() != h5features::version::v2_0) {
+    const auto lock = h5features::details::lock_hdf5();
+    return m_reader->read_items(names, ignore_properties);
+  }
+
+  std::vector<h5features::item> items;
+  items.reserve(names.size());
+
+  // each task reads the raw content of an item from file, with HDF5 locked,
+  // and then decodes it concurrently with the other tasks
+  h5features::details::thread_pool pool{workers};
+  std::vector<std::future<h5features::item>> futures;
+  futures.reserve(names.size());
+  for (const auto &name : names) {
+    futures.push_back(pool.submit([this, &name, ignore_properties, recorder = recorder()]() {
+      const h5features::details::stats_scope scope{recorder, false};
+      h5features::details::deferred_item decode;
+      {
+        const auto lock = h5features::details::lock_hdf5();
+        decode = m_reader->fetch_item(name, ignore_properties);
+      }
+      return decode();
+    }));
+  }
+
+  for (auto &future : futures) {
+    items.push_back(future.get());
+  }
+  return items;
+}
 
-std::vector<h5features::item> h5features::reader::read_all(bool ignore_properties) const {
-  std::vector<h5features::item> all_items;
-  for (const auto &item : items()) {
-    all_items.push_back(read_item(item, ignore_properties));
+std::vector<h5features::item> h5features::reader::read_range(std::size_t start, std::size_t stop,
+                                                             bool ignore_properties, std::size_t workers) const {
+  const h5features::details::stats_scope scope{recorder()};
+  auto names = items();
+  if (start > stop or stop > names.size()) {
+    std::stringstream msg;
+    msg << "invalid range of items [" << start << ", " << stop << "), there are " << names.size() << " items";
+    throw h5features::exception(msg.str());
   }
 
-  return all_items;
+  return read_many({names.begin() + start, names.begin() + stop}, ignore_properties, workers);
 }
 
 h5features::item h5features::reader::read_item(const std::string &name, bool ignore_properties) const {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
   return m_reader->read_item(name, ignore_properties);
 }
 
+std::vector<h5features::item>
+h5features::reader::read_segments(const std::vector<std::tuple<std::string, double, double>> &segments,
+                                  bool ignore_properties) const {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  return m_reader->read_segments(segments, ignore_properties);
+}
+
+h5features::features h5features::reader::read_frames(const std::string &name, std::size_t start,
+                                                     std::size_t stop) const {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  return m_reader->read_frames(name, start, stop);
+}
+
+std::size_t h5features::reader::concatenation::frames() const noexcept { return offsets.empty() ? 0 : offsets.back(); }
+
+h5features::reader::concatenation
+h5features::reader::prepare_concatenated(const std::vector<std::string> &names) const {
+  const h5features::details::stats_scope scope{recorder()};
+  concatenation layout;
+  layout.names = names;
+  layout.offsets.reserve(names.size() + 1);
+  layout.offsets.push_back(0);
+
+  const auto lock = h5features::details::lock_hdf5();
+  for (std::size_t index = 0; index < names.size(); ++index) {
+    const auto shape = m_reader->read_shape(names[index]);
+    if (index == 0) {
+      layout.dim = shape.dim;
+      layout.dtype = shape.dtype;
+      layout.times_dim = shape.times_dim;
+    } else if (shape.dim != layout.dim or shape.times_dim != layout.times_dim) {
+      std::stringstream msg;
+      msg << "cannot concatenate item '" << names[index] << "' with features dimension " << shape.dim
+          << " and times dimension " << shape.times_dim << ", previous items have features dimension " << layout.dim
+          << " and times dimension " << layout.times_dim;
+      throw h5features::exception(msg.str());
+    }
+    layout.offsets.push_back(layout.offsets.back() + shape.size);
+  }
+  return layout;
+}
+
+void h5features::reader::read_concatenated(const concatenation &layout, h5features::span<std::byte> features,
+                                           h5features::dtype dtype, h5features::span<double> times) const {
+  if (layout.offsets.size() != layout.names.size() + 1 or layout.offsets.front() != 0 or
+      not std::is_sorted(layout.offsets.begin(), layout.offsets.end())) {
+    throw h5features::exception("invalid concatenation layout");
+  }
+  if (features.size() != layout.frames() * layout.dim * h5features::size_of(dtype)) {
+    throw h5features::exception("the features destination does not match the concatenation size");
+  }
+  if (times.size() != layout.frames() * layout.times_dim) {
+    throw h5features::exception("the times destination does not match the concatenation size");
+  }
+
+  const h5features::details::stats_scope scope{recorder()};
+  const auto frame_bytes = layout.dim * h5features::size_of(dtype);
+  for (std::size_t index = 0; index < layout.names.size(); ++index) {
+    const auto first = layout.offsets[index];
+    const h5features::details::item_shape shape{layout.offsets[index + 1] - first, layout.dim, layout.dtype,
+                                                layout.times_dim};
+
+    // the lock is released between items so that other threads can read
+    const auto lock = h5features::details::lock_hdf5();
+    m_reader->read_item_into(layout.names[index], shape, features.data() + first * frame_bytes, dtype,
+                             times.data() + first * layout.times_dim);
+  }
+}
+
+h5features::frames_iterator h5features::reader::iter_frames(std::size_t batch_frames, bool shuffle_items,
+                                                            std::size_t prefetch, std::uint64_t seed) const {
+  return {*this, batch_frames, shuffle_items, prefetch, seed};
+}
+
 h5features::item h5features::reader::read_item(const std::string &name, double start, double stop,
                                                bool ignore_properties) const {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
   return m_reader->read_item(name, start, stop, ignore_properties);
 }
+
+// Executes a read in the I/O thread. The task shares the concrete reader so
+// that the reader can be destroyed before the read completes, the reader is
+// then released by the task with the HDF5 lock held.
+template <class Read>
+std::future<h5features::item> submit_read(std::shared_ptr<h5features::details::reader_interface> reader,
+                                          std::shared_ptr<h5features::details::stats_recorder> recorder, Read read) {
+  return h5features::details::io_thread().submit(
+      [reader = std::move(reader), recorder = std::move(recorder), read = std::move(read)]() mutable {
+        const h5features::details::stats_scope scope{recorder};
+        const auto lock = h5features::details::lock_hdf5();
+        try {
+          auto item = read(*reader);
+          reader.reset();
+          return item;
+        } catch (...) {
+          reader.reset();
+          throw;
+        }
+      });
+}
+
+std::future<h5features::item> h5features::reader::read_item_async(const std::string &name,
+                                                                  bool ignore_properties) const {
+  return submit_read(m_reader, recorder(),
+                     [name, ignore_properties](const h5features::details::reader_interface &reader) {
+                       return reader.read_item(name, ignore_properties);
+                     });
+}
+
+std::future<h5features::item> h5features::reader::read_item_async(const std::string &name, double start, double stop,
+                                                                  bool ignore_properties) const {
+  return submit_read(m_reader, recorder(),
+                     [name, start, stop, ignore_properties](const h5features::details::reader_interface &reader) {
+                       return reader.read_item(name, start, stop, ignore_properties);
+                     });
+}
+
+std::shared_ptr<h5features::details::stats_recorder> h5features::reader::recorder() const {
+  return std::atomic_load(&m_stats);
+}
+
+void h5features::reader::enable_stats(std::function<void(const h5features::stats &)> callback) {
+  std::atomic_store(&m_stats, std::make_shared<h5features::details::stats_recorder>(std::move(callback)));
+  const auto lock = h5features::details::lock_hdf5();
+  h5features::details::metadata_cache_hit_rate(m_reader->group(), true);
+}
+
+void h5features::reader::disable_stats() { std::atomic_store(&m_stats, {}); }
+
+h5features::stats h5features::reader::stats() const {
+  const auto recorder = this->recorder();
+  if (not recorder) {
+    return {};
+  }
+
+  auto stats = recorder->get();
+  const auto lock = h5features::details::lock_hdf5();
+  stats.cache_hit_rate = h5features::details::metadata_cache_hit_rate(m_reader->group());
+  return stats;
+}
+
+void h5features::reader::reset_stats() {
+  if (const auto recorder = this->recorder()) {
+    recorder->reset();
+    const auto lock = h5features::details::lock_hdf5();
+    h5features::details::metadata_cache_hit_rate(m_reader->group(), true);
+  }
+}
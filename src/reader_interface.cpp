@@ -1,5 +1,12 @@
 #include "h5features/details/reader_interface.h"
+#include <algorithm>
+#include <memory>
+#include <numeric>
+#include <optional>
+#include <string>
+#include <unordered_map>
 #include <utility>
+#include <vector>
 
 h5features::details::reader_interface::reader_interface(hdf5::Group &&group, h5features::version version)
     : m_group{std::move(group)}, m_version(version) {}
@@ -7,3 +14,112 @@ h5features::details::reader_interface::reader_interface(hdf5::Group &&group, h5f
 h5features::details::reader_interface::~reader_interface() {}
 
 h5features::version h5features::details::reader_interface::version() const noexcept { return m_version; }
+
+const hdf5::Group &h5features::details::reader_interface::group() const noexcept { return m_group; }
+
+h5features::details::deferred_item h5features::details::reader_interface::fetch_item(const std::string &name,
+                                                                                     bool ignore_properties) const {
+  auto item = std::make_shared<h5features::item>(read_item(name, ignore_properties));
+  return [item]() { return std::move(*item); };
+}
+
+std::vector<h5features::item> h5features::details::reader_interface::read_items(const std::vector<std::string> &names,
+                                                                                bool ignore_properties) const {
+  std::vector<h5features::item> items;
+  items.reserve(names.size());
+  for (const auto &name : names) {
+    items.push_back(read_item(name, ignore_properties));
+  }
+  return items;
+}
+
+std::vector<h5features::item> h5features::details::reader_interface::read_segments(const std::vector<segment> &segments,
+                                                                                   bool ignore_properties) const {
+  // the segments of each item, the items in order of first appearance
+  std::vector<std::string> names;
+  std::unordered_map<std::string, std::vector<std::size_t>> indices;
+  for (std::size_t index = 0; index < segments.size(); ++index) {
+    const auto &name = std::get<0>(segments[index]);
+    auto &item_indices = indices[name];
+    if (item_indices.empty()) {
+      names.push_back(name);
+    }
+    item_indices.push_back(index);
+  }
+
+  std::vector<std::optional<h5features::item>> items(segments.size());
+  for (const auto &name : names) {
+    const auto &item_indices = indices.at(name);
+    std::vector<std::pair<double, double>> intervals;
+    intervals.reserve(item_indices.size());
+    for (const auto index : item_indices) {
+      intervals.emplace_back(std::get<1>(segments[index]), std::get<2>(segments[index]));
+    }
+
+    auto item_segments = read_item_segments(name, intervals, ignore_properties);
+    for (std::size_t i = 0; i < item_indices.size(); ++i) {
+      items[item_indices[i]].emplace(std::move(item_segments[i]));
+    }
+  }
+
+  std::vector<h5features::item> result;
+  result.reserve(items.size());
+  for (auto &item : items) {
+    result.push_back(std::move(item.value()));
+  }
+  return result;
+}
+
+std::vector<h5features::item> h5features::details::reader_interface::read_item_segments(
+    const std::string &name, const std::vector<std::pair<double, double>> &intervals, bool ignore_properties) const {
+  std::vector<h5features::item> items;
+  items.reserve(intervals.size());
+  for (const auto &[start, stop] : intervals) {
+    items.push_back(read_item(name, start, stop, ignore_properties));
+  }
+  return items;
+}
+
+std::vector<h5features::features> h5features::details::read_ranges(
+    const std::vector<std::pair<std::size_t, std::size_t>> &ranges,
+    const std::function<h5features::features(const std::vector<std::pair<std::size_t, std::size_t>> &)> &read) {
+  if (ranges.empty()) {
+    return {};
+  }
+
+  // visit the ranges by increasing first frame
+  std::vector<std::size_t> order(ranges.size());
+  std::iota(order.begin(), order.end(), 0);
+  std::stable_sort(order.begin(), order.end(),
+                   [&ranges](std::size_t a, std::size_t b) { return ranges[a].first < ranges[b].first; });
+
+  // merge the ranges in runs, retaining the position of each range in the
+  // concatenated runs
+  std::vector<std::pair<std::size_t, std::size_t>> runs;
+  std::vector<std::size_t> positions(ranges.size());
+  std::size_t run_position = 0;
+  for (const auto index : order) {
+    const auto &range = ranges[index];
+    if (runs.empty() or range.first > runs.back().second) {
+      if (not runs.empty()) {
+        run_position += runs.back().second - runs.back().first;
+      }
+      runs.push_back(range);
+    } else {
+      runs.back().second = std::max(runs.back().second, range.second);
+    }
+    positions[index] = run_position + range.first - runs.back().first;
+  }
+
+  const auto features = std::make_shared<const h5features::features>(read(runs));
+  const auto frame_bytes = features->dim() * h5features::size_of(features->get_dtype());
+
+  std::vector<h5features::features> result;
+  result.reserve(ranges.size());
+  for (std::size_t index = 0; index < ranges.size(); ++index) {
+    const auto size = ranges[index].second - ranges[index].first;
+    result.emplace_back(features->bytes().subspan(positions[index] * frame_bytes, size * frame_bytes),
+                        features->get_dtype(), features->dim(), features, false);
+  }
+  return result;
+}
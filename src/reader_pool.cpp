@@ -0,0 +1,78 @@
+#include "h5features/reader_pool.h"
+#include "h5features/details/thread_pool.h"
+#include "h5features/exception.h"
+#include <filesystem>
+#include <utility>
+
+std::size_t init_max_files(std::size_t max_files) {
+  if (max_files == 0) {
+    throw h5features::exception("the pool must keep at least one file open");
+  }
+  return max_files;
+}
+
+h5features::reader_pool::reader_pool(std::size_t max_files, bool memory_map, const h5features::file_access &access)
+    : m_max_files{init_max_files(max_files)}, m_memory_map{memory_map}, m_access{access}, m_mutex{},
+      m_pid{h5features::details::current_pid()}, m_entries{}, m_positions{} {}
+
+h5features::reader_pool::~reader_pool() {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  evict(0);
+}
+
+std::shared_ptr<h5features::reader> h5features::reader_pool::get(const std::string &filename,
+                                                                 const std::string &group) {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  check_process();
+
+  // the same file may be referred to by different paths
+  const auto key = std::filesystem::absolute(filename).lexically_normal().string();
+
+  auto position = m_positions.find(key);
+  if (position == m_positions.end()) {
+    evict(m_max_files - 1);
+    m_entries.push_front(entry{key, h5features::reader::open(filename, m_access), {}});
+    position = m_positions.emplace(key, m_entries.begin()).first;
+  } else {
+    m_entries.splice(m_entries.begin(), m_entries, position->second);
+  }
+
+  auto &readers = position->second->readers;
+  if (const auto reader = readers.find(group); reader != readers.end()) {
+    return reader->second;
+  }
+
+  // the reader constructor is private, std::make_shared cannot be used
+  const std::shared_ptr<h5features::reader> reader{new h5features::reader(position->second->file, group, m_memory_map)};
+  readers.emplace(group, reader);
+  return reader;
+}
+
+std::size_t h5features::reader_pool::open_files() const {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  return m_entries.size();
+}
+
+std::size_t h5features::reader_pool::max_files() const noexcept { return m_max_files; }
+
+void h5features::reader_pool::clear() {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  evict(0);
+}
+
+void h5features::reader_pool::check_process() {
+  const auto pid = h5features::details::current_pid();
+  if (pid != m_pid) {
+    evict(0);
+    m_pid = pid;
+  }
+}
+
+void h5features::reader_pool::evict(std::size_t size) {
+  // closing the files must be serialized with the other HDF5 calls
+  const auto lock = h5features::details::lock_hdf5();
+  while (m_entries.size() > size) {
+    m_positions.erase(m_entries.back().filename);
+    m_entries.pop_back();
+  }
+}
@@ -0,0 +1,347 @@
+#include "h5features/repack.h"
+#include "h5features/exception.h"
+#include "h5features/hdf5.h"
+#include "h5features/reader.h"
+#include "h5features/writer.h"
+#include <H5Ppublic.h>
+#include <H5Tpublic.h>
+#include <algorithm>
+#include <climits>
+#include <cstring>
+#include <filesystem>
+#include <future>
+#include <memory>
+#include <optional>
+#include <sstream>
+#include <type_traits>
+#include <unordered_set>
+#include <utility>
+#include <vector>
+#include <zlib.h>
+
+namespace {
+// Updates a CRC32 with `size` bytes, zlib takes at most UINT_MAX bytes at once
+std::uint32_t update(std::uint32_t crc, const void *data, std::size_t size) {
+  const auto *bytes = static_cast<const Bytef *>(data);
+  while (size > 0) {
+    const auto count = static_cast<uInt>(std::min<std::size_t>(size, UINT_MAX));
+    crc = static_cast<std::uint32_t>(crc32(crc, bytes, count));
+    bytes += count;
+    size -= count;
+  }
+  return crc;
+}
+
+template <class T> std::uint32_t update(std::uint32_t crc, const T &value) { return update(crc, &value, sizeof(T)); }
+
+std::uint32_t update(std::uint32_t crc, const std::string &value) {
+  return update(update(crc, value.size()), value.data(), value.size());
+}
+
+std::uint32_t properties_checksum(const h5features::properties &properties);
+
+// The checksum of a property value, tagged with its type
+std::uint32_t value_checksum(const h5features::properties::value_type &value) {
+  const auto crc = update(0, value.index());
+  return std::visit(
+      [crc](const auto &v) {
+        using T = std::decay_t<decltype(v)>;
+        if constexpr (std::is_same_v<T, std::shared_ptr<h5features::properties>>) {
+          return update(crc, properties_checksum(*v));
+        } else if constexpr (std::is_same_v<T, std::string>) {
+          return update(crc, v);
+        } else if constexpr (std::is_same_v<T, std::vector<int>> or std::is_same_v<T, std::vector<double>>) {
+          return update(update(crc, v.size()), v.data(), v.size() * sizeof(typename T::value_type));
+        } else if constexpr (std::is_same_v<T, std::vector<std::string>>) {
+          auto result = update(crc, v.size());
+          for (const auto &element : v) {
+            result = update(result, element);
+          }
+          return result;
+        } else if constexpr (std::is_same_v<T, std::vector<h5features::properties>>) {
+          auto result = update(crc, v.size());
+          for (const auto &element : v) {
+            result = update(result, properties_checksum(element));
+          }
+          return result;
+        } else {
+          return update(crc, v);
+        }
+      },
+      value);
+}
+
+// The entries of properties are not ordered, their checksums are summed
+std::uint32_t properties_checksum(const h5features::properties &properties) {
+  std::uint32_t sum = 0;
+  for (const auto &[name, value] : properties) {
+    sum += update(value_checksum(value), name);
+  }
+  return sum;
+}
+
+// Returns the features converted to `dtype` by HDF5
+h5features::features convert(const h5features::features &features, h5features::dtype dtype) {
+  const auto source = features.get_dtype();
+  if (source == dtype) {
+    return features;
+  }
+
+  // the conversion is done in place, the buffer fits the larger type
+  const auto count = features.size() * features.dim();
+  const auto data = features.bytes();
+  auto buffer = std::make_shared<std::vector<std::byte>>(
+      count * std::max(h5features::size_of(source), h5features::size_of(dtype)));
+  std::memcpy(buffer->data(), data.data(), data.size());
+  {
+    const auto lock = h5features::details::lock_hdf5();
+    const auto source_type = h5features::details::make_datatype(source);
+    const auto destination_type = h5features::details::make_datatype(dtype);
+    if (H5Tconvert(source_type.getId(), destination_type.getId(), count, buffer->data(), nullptr, H5P_DEFAULT) < 0) {
+      throw h5features::exception("failed to convert the features to another dtype");
+    }
+  }
+
+  return {{buffer->data(), count * h5features::size_of(dtype)}, dtype, features.dim(), buffer, false};
+}
+
+// The items of a batch read from the source, with their checksums
+struct batch {
+  std::vector<h5features::item> items;
+  std::vector<std::uint32_t> checksums;
+};
+
+void check_options(const std::string &source, const std::string &destination,
+                   const h5features::repack_options &options) {
+  if (options.batch_items == 0) {
+    throw h5features::exception("the batches must have at least one item");
+  }
+  if (options.resume and options.overwrite) {
+    throw h5features::exception("cannot both resume and overwrite the destination");
+  }
+  if (std::filesystem::exists(source) and std::filesystem::exists(destination) and
+      std::filesystem::equivalent(source, destination)) {
+    throw h5features::exception("the source and destination must be different files");
+  }
+}
+
+// Returns the items already written in the destination group
+std::unordered_set<std::string> existing_items(const std::string &destination, const std::string &group) {
+  if (not std::filesystem::exists(destination)) {
+    return {};
+  }
+
+  const auto groups = h5features::reader::list_groups(destination);
+  if (std::find(groups.begin(), groups.end(), group) == groups.end()) {
+    return {};
+  }
+
+  const auto items = h5features::reader(destination, group).items();
+  return {items.begin(), items.end()};
+}
+
+// Reads items from the source, converted to the destination dtype
+std::vector<h5features::item> read_source(const h5features::reader &source, const std::vector<std::string> &names,
+                                          const h5features::repack_options &options) {
+  auto items = source.read_many(names, false, options.workers);
+  if (options.dtype.has_value()) {
+    for (auto &item : items) {
+      item = {item.name(), convert(item.features(), options.dtype.value()), item.times(), item.properties()};
+    }
+  }
+  return items;
+}
+
+// Removes items from a group of the destination
+void discard_items(const std::string &destination, const std::string &group, const std::vector<std::string> &names) {
+  const auto lock = h5features::details::lock_hdf5();
+  try {
+    hdf5::File file{destination, hdf5::File::ReadWrite};
+    auto items_group = file.getGroup(group);
+    for (const auto &name : names) {
+      items_group.unlink(name);
+    }
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(std::string("failed to discard incomplete items: ") + e.what());
+  }
+}
+
+// The version 1.1 groups are written without the properties of the items
+bool stores_properties(h5features::version version) { return version > h5features::version::v1_1; }
+
+// Returns the items of the source already written in the destination, checked
+// against their checksums in the source whatever `options.verify`: an item
+// interrupted while being written must not be skipped. The unreadable items
+// are discarded from a version 2.0 destination to be written again, the
+// readable items differing from the source are rejected.
+std::unordered_set<std::string> resumed_items(const h5features::reader &source, const std::vector<std::string> &names,
+                                              const std::string &destination, const std::string &group,
+                                              const h5features::repack_options &options, std::size_t &verified) {
+  const auto existing = existing_items(destination, group);
+  std::vector<std::string> to_check;
+  std::copy_if(names.begin(), names.end(), std::back_inserter(to_check),
+               [&existing](const auto &name) { return existing.count(name) != 0; });
+  if (to_check.empty()) {
+    return {};
+  }
+
+  std::unordered_set<std::string> resumed;
+  std::vector<std::string> incomplete;
+  h5features::version version;
+  {
+    const h5features::reader written{destination, group};
+    version = written.version();
+    const auto with_properties = stores_properties(version);
+    for (std::size_t start = 0; start < to_check.size(); start += options.batch_items) {
+      const std::vector<std::string> batch{to_check.begin() + start,
+                                           to_check.begin() + std::min(to_check.size(), start + options.batch_items)};
+      const auto items = read_source(source, batch, options);
+
+      // read the items one by one only when the batch cannot be read at once
+      std::vector<std::optional<h5features::item>> written_items;
+      try {
+        const auto read = written.read_many(batch, false, options.workers);
+        written_items.assign(read.begin(), read.end());
+      } catch (const h5features::exception &) {
+        for (const auto &name : batch) {
+          try {
+            written_items.emplace_back(written.read_item(name));
+          } catch (const h5features::exception &) {
+            written_items.emplace_back();
+          }
+        }
+      }
+
+      for (std::size_t i = 0; i < batch.size(); ++i) {
+        if (not written_items[i].has_value()) {
+          incomplete.push_back(batch[i]);
+          continue;
+        }
+        if (h5features::details::checksum(*written_items[i], with_properties) !=
+            h5features::details::checksum(items[i], with_properties)) {
+          throw h5features::exception("checksum mismatch for item '" + batch[i] + "'");
+        }
+        resumed.insert(batch[i]);
+        ++verified;
+      }
+    }
+  }
+
+  if (not incomplete.empty()) {
+    if (version != h5features::version::v2_0) {
+      std::stringstream msg;
+      msg << "item '" << incomplete.front() << "' is incomplete in the destination, cannot resume a group of version "
+          << version;
+      throw h5features::exception(msg.str());
+    }
+    discard_items(destination, group, incomplete);
+  }
+  return resumed;
+}
+} // namespace
+
+std::uint32_t h5features::details::checksum(const h5features::item &item, bool properties) {
+  const auto &features = item.features();
+  const auto &times = item.times();
+  auto crc = update(0, item.name());
+  crc = update(crc, features.get_dtype());
+  crc = update(crc, features.dim());
+  crc = update(crc, features.bytes().data(), features.bytes().size());
+  crc = update(crc, times.dim());
+  crc = update(crc, times.data().data(), times.data().size() * sizeof(double));
+  return properties ? update(crc, properties_checksum(item.properties())) : crc;
+}
+
+h5features::repack_summary h5features::repack(const std::string &source, const std::string &destination,
+                                              const std::string &group, const h5features::repack_options &options) {
+  check_options(source, destination, options);
+  const auto destination_group = options.group.empty() ? group : options.group;
+
+  const h5features::reader reader{source, group};
+  const auto names = reader.items();
+  const auto nbatches = (names.size() + options.batch_items - 1) / options.batch_items;
+
+  h5features::repack_summary summary;
+  const auto existing = options.resume
+                            ? resumed_items(reader, names, destination, destination_group, options, summary.verified)
+                            : std::unordered_set<std::string>{};
+
+  // the properties are left out of the checksums when the destination cannot
+  // store them, known once the writer is opened
+  bool with_properties = true;
+
+  // reads a batch of the items to write
+  const auto read_batch = [&](std::size_t index) {
+    const auto first = names.begin() + index * options.batch_items;
+    const auto last = names.begin() + std::min(names.size(), (index + 1) * options.batch_items);
+    std::vector<std::string> to_read;
+    std::copy_if(first, last, std::back_inserter(to_read), [&](const auto &name) { return existing.count(name) == 0; });
+
+    batch result{read_source(reader, to_read, options), {}};
+    if (options.verify) {
+      std::transform(result.items.begin(), result.items.end(), std::back_inserter(result.checksums),
+                     [&](const auto &item) { return h5features::details::checksum(item, with_properties); });
+    }
+    return result;
+  };
+
+  std::vector<std::pair<std::string, std::uint32_t>> checksums;
+  {
+    h5features::writer_options writer_options;
+    writer_options.overwrite = options.overwrite;
+    writer_options.compression = options.compression;
+    writer_options.chunking = options.chunking;
+    writer_options.index = options.index;
+    writer_options.compact_properties = options.compact_properties;
+    writer_options.version = options.version;
+    h5features::writer writer{destination, destination_group, writer_options};
+    with_properties = stores_properties(writer.version());
+
+    // the next batch is read while the current one is written
+    std::future<batch> next;
+    if (nbatches > 0) {
+      next = std::async(std::launch::async, read_batch, 0);
+    }
+    for (std::size_t index = 0; index < nbatches; ++index) {
+      auto current = next.get();
+      if (index + 1 < nbatches) {
+        next = std::async(std::launch::async, read_batch, index + 1);
+      }
+
+      if (options.verify) {
+        for (std::size_t i = 0; i < current.items.size(); ++i) {
+          checksums.emplace_back(current.items[i].name(), current.checksums[i]);
+        }
+      }
+      writer.write(current.items.begin(), current.items.end(), options.workers);
+      writer.flush();
+      summary.written += current.items.size();
+
+      if (options.progress) {
+        options.progress(std::min(names.size(), (index + 1) * options.batch_items), names.size());
+      }
+    }
+    summary.skipped = names.size() - summary.written;
+  }
+
+  if (options.verify) {
+    const h5features::reader written{destination, destination_group};
+    for (std::size_t start = 0; start < checksums.size(); start += options.batch_items) {
+      const auto stop = std::min(checksums.size(), start + options.batch_items);
+      std::vector<std::string> to_read;
+      for (std::size_t i = start; i < stop; ++i) {
+        to_read.push_back(checksums[i].first);
+      }
+
+      const auto items = written.read_many(to_read, false, options.workers);
+      for (std::size_t i = start; i < stop; ++i) {
+        if (h5features::details::checksum(items[i - start], with_properties) != checksums[i].second) {
+          throw h5features::exception("checksum mismatch for item '" + checksums[i].first + "'");
+        }
+        ++summary.verified;
+      }
+    }
+  }
+
+  return summary;
+}
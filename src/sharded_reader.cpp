@@ -0,0 +1,99 @@
+#include "h5features/sharded_reader.h"
+#include "h5features/details/manifest.h"
+#include "h5features/exception.h"
+#include <optional>
+#include <utility>
+
+h5features::sharded_reader::sharded_reader(const std::string &directory, const std::string &group,
+                                           std::size_t max_files, bool memory_map,
+                                           const h5features::file_access &access)
+    : m_directory{directory}, m_group{group}, m_items{}, m_shards{}, m_positions{},
+      m_pool{std::make_unique<h5features::reader_pool>(max_files, memory_map, access)} {
+  const auto manifests = h5features::details::list_manifests(m_directory);
+  if (manifests.empty()) {
+    throw h5features::exception("no manifest found in " + directory);
+  }
+
+  std::unordered_map<std::string, std::size_t> shards;
+  for (const auto &manifest : manifests) {
+    for (auto &[item, shard] : h5features::details::read_manifest(manifest)) {
+      auto position = shards.find(shard);
+      if (position == shards.end()) {
+        position = shards.emplace(shard, m_shards.size()).first;
+        m_shards.push_back(shard);
+      }
+      if (not m_positions.emplace(item, position->second).second) {
+        throw h5features::exception("item '" + item + "' is listed in several shards");
+      }
+      m_items.push_back(std::move(item));
+    }
+  }
+}
+
+std::string h5features::sharded_reader::directory() const { return m_directory.string(); }
+
+std::string h5features::sharded_reader::groupname() const { return m_group; }
+
+std::vector<std::string> h5features::sharded_reader::items() const { return m_items; }
+
+std::vector<std::string> h5features::sharded_reader::shards() const { return m_shards; }
+
+std::string h5features::sharded_reader::shard(const std::string &name) const { return m_shards[shard_index(name)]; }
+
+std::size_t h5features::sharded_reader::shard_index(const std::string &name) const {
+  const auto position = m_positions.find(name);
+  if (position == m_positions.end()) {
+    throw h5features::exception("item '" + name + "' is not in the dataset");
+  }
+  return position->second;
+}
+
+std::shared_ptr<h5features::reader> h5features::sharded_reader::get(std::size_t shard) const {
+  return m_pool->get((m_directory / m_shards[shard]).string(), m_group);
+}
+
+h5features::item h5features::sharded_reader::read_item(const std::string &name, bool ignore_properties) const {
+  return get(shard_index(name))->read_item(name, ignore_properties);
+}
+
+h5features::item h5features::sharded_reader::read_item(const std::string &name, double start, double stop,
+                                                       bool ignore_properties) const {
+  return get(shard_index(name))->read_item(name, start, stop, ignore_properties);
+}
+
+std::vector<h5features::item> h5features::sharded_reader::read_many(const std::vector<std::string> &names,
+                                                                    bool ignore_properties, std::size_t workers) const {
+  // group the names by shard, remembering their position in the output
+  std::unordered_map<std::size_t, std::pair<std::vector<std::string>, std::vector<std::size_t>>> groups;
+  std::vector<std::size_t> order;
+  for (std::size_t i = 0; i < names.size(); ++i) {
+    const auto shard = shard_index(names[i]);
+    auto &group = groups[shard];
+    if (group.first.empty()) {
+      order.push_back(shard);
+    }
+    group.first.push_back(names[i]);
+    group.second.push_back(i);
+  }
+
+  // item has no default constructor, the items are placed at the end
+  std::vector<std::optional<h5features::item>> items(names.size());
+  for (const auto shard : order) {
+    const auto &[shard_names, positions] = groups.at(shard);
+    auto shard_items = get(shard)->read_many(shard_names, ignore_properties, workers);
+    for (std::size_t i = 0; i < positions.size(); ++i) {
+      items[positions[i]].emplace(std::move(shard_items[i]));
+    }
+  }
+
+  std::vector<h5features::item> result;
+  result.reserve(items.size());
+  for (auto &item : items) {
+    result.push_back(std::move(*item));
+  }
+  return result;
+}
+
+std::vector<h5features::item> h5features::sharded_reader::read_all(bool ignore_properties, std::size_t workers) const {
+  return read_many(m_items, ignore_properties, workers);
+}
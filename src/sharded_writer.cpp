@@ -0,0 +1,169 @@
+#include "h5features/sharded_writer.h"
+#include "h5features/exception.h"
+#include <algorithm>
+#include <iostream>
+#include <unordered_set>
+
+namespace {
+// Returns the size of the features and times of an item in bytes
+std::size_t item_bytes(const h5features::item &item) {
+  return item.features().bytes().size() + item.times().data().size() * sizeof(double);
+}
+
+// Returns the index of a shard from its file name, as `shard-<rank>-<index>.h5`
+std::size_t shard_index(const std::filesystem::path &shard) {
+  const auto stem = shard.stem().string();
+  return std::stoul(stem.substr(stem.rfind('-') + 1));
+}
+
+std::filesystem::path init_directory(const std::string &directory) {
+  std::error_code error;
+  std::filesystem::create_directories(directory, error);
+  if (error) {
+    throw h5features::exception("failed to create the directory " + directory + ": " + error.message());
+  }
+  return directory;
+}
+} // namespace
+
+h5features::sharded_writer::sharded_writer(const std::string &directory, const std::string &group,
+                                           std::size_t max_items, std::size_t max_bytes, std::size_t rank,
+                                           const h5features::writer_options &options)
+    : m_directory{init_directory(directory)}, m_group{group}, m_max_items{max_items}, m_max_bytes{max_bytes},
+      m_rank{rank}, m_options{options}, m_writer{}, m_next_shard{0}, m_shards{}, m_pending{}, m_items{0}, m_bytes{0},
+      m_names{}, m_closed{false} {
+  const auto manifest = m_directory / h5features::details::manifest_name(m_rank);
+  if (m_options.overwrite) {
+    std::filesystem::remove(manifest);
+    for (const auto &shard : h5features::details::list_shards(m_directory, m_rank)) {
+      std::filesystem::remove(shard);
+    }
+  } else if (std::filesystem::exists(manifest)) {
+    for (const auto &entry : h5features::details::read_manifest(manifest)) {
+      m_names.insert(entry.first);
+    }
+  }
+
+  // the new shards come after the existing ones, including a shard left
+  // incomplete by an interrupted writer
+  for (const auto &shard : h5features::details::list_shards(m_directory, m_rank)) {
+    m_next_shard = std::max(m_next_shard, shard_index(shard) + 1);
+  }
+}
+
+h5features::sharded_writer::~sharded_writer() {
+  try {
+    close();
+  } catch (const h5features::exception &e) {
+    std::cerr << "WARNING h5features: " << e.what() << std::endl;
+  }
+}
+
+void h5features::sharded_writer::write(const h5features::item &item) { write_items({item}, 1); }
+
+void h5features::sharded_writer::write_items(const std::vector<std::reference_wrapper<const h5features::item>> &items,
+                                             std::size_t workers) {
+  if (m_closed) {
+    throw h5features::exception("writer is closed");
+  }
+
+  // check the whole batch before writing anything, so that a rejected item
+  // does not leave the items preceding it half registered
+  std::unordered_set<std::string> batch;
+  for (const auto &item : items) {
+    check_item(item);
+    if (not batch.insert(item.get().name()).second) {
+      throw h5features::exception("item '" + item.get().name() + "' is given twice");
+    }
+  }
+
+  // the items are written by runs going to the same shard
+  std::vector<std::reference_wrapper<const h5features::item>> run;
+  const auto write_run = [&]() {
+    try {
+      m_writer->write(run.begin(), run.end(), workers);
+    } catch (...) {
+      for (const auto &item : run) {
+        m_names.erase(item.get().name());
+      }
+      throw;
+    }
+    for (const auto &item : run) {
+      m_pending.emplace_back(item.get().name(), m_shards.back());
+    }
+    run.clear();
+  };
+
+  for (const auto &item : items) {
+    const auto bytes = item_bytes(item);
+    if (m_writer and full(bytes)) {
+      write_run();
+      close_shard();
+    }
+    if (not m_writer) {
+      open_shard();
+    }
+
+    m_names.insert(item.get().name());
+    run.push_back(item);
+    ++m_items;
+    m_bytes += bytes;
+  }
+
+  if (not run.empty()) {
+    write_run();
+  }
+}
+
+void h5features::sharded_writer::check_item(const h5features::item &item) const {
+  if (item.name().find_first_of("\t\n\r") != std::string::npos) {
+    throw h5features::exception("item name '" + item.name() + "' contains a tab or a newline");
+  }
+  if (m_names.count(item.name()) != 0) {
+    throw h5features::exception("item '" + item.name() + "' is already written");
+  }
+}
+
+bool h5features::sharded_writer::full(std::size_t bytes) const noexcept {
+  // an item larger than `m_max_bytes` goes to an empty shard anyway
+  return (m_max_items != 0 and m_items + 1 > m_max_items) or
+         (m_max_bytes != 0 and m_items != 0 and m_bytes + bytes > m_max_bytes);
+}
+
+void h5features::sharded_writer::open_shard() {
+  const auto name = h5features::details::shard_name(m_rank, m_next_shard);
+  auto options = m_options;
+  options.overwrite = true;
+  m_writer = std::make_unique<h5features::writer>((m_directory / name).string(), m_group, options);
+  ++m_next_shard;
+  m_shards.push_back(name);
+  m_items = 0;
+  m_bytes = 0;
+}
+
+void h5features::sharded_writer::close_shard() {
+  const auto writer = std::move(m_writer);
+  writer->close();
+  h5features::details::append_manifest(m_directory / h5features::details::manifest_name(m_rank), m_pending);
+  m_pending.clear();
+}
+
+void h5features::sharded_writer::close() {
+  if (m_closed) {
+    return;
+  }
+  m_closed = true;
+  if (m_writer) {
+    close_shard();
+  }
+}
+
+bool h5features::sharded_writer::closed() const noexcept { return m_closed; }
+
+std::string h5features::sharded_writer::directory() const { return m_directory.string(); }
+
+std::string h5features::sharded_writer::groupname() const { return m_group; }
+
+std::size_t h5features::sharded_writer::rank() const noexcept { return m_rank; }
+
+std::vector<std::string> h5features::sharded_writer::shards() const { return m_shards; }
@@ -0,0 +1,114 @@
+#include "h5features/details/stats_recorder.h"
+#include <exception>
+#include <iostream>
+#include <utility>
+
+// The recorder of the current thread, see `stats_scope`
+static thread_local std::shared_ptr<h5features::details::stats_recorder> current_recorder;
+
+h5features::details::stats_recorder::stats_recorder(stats_callback callback)
+    : m_mutex{}, m_stats{}, m_callback{std::move(callback)} {}
+
+h5features::stats h5features::details::stats_recorder::get() const {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  return m_stats;
+}
+
+void h5features::details::stats_recorder::reset() {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  m_stats = h5features::stats{};
+}
+
+void h5features::details::stats_recorder::add(stats_operation operation, double seconds) {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  ++(m_stats.*operation).count;
+  (m_stats.*operation).seconds += seconds;
+}
+
+void h5features::details::stats_recorder::add_read(std::size_t bytes, std::size_t stored_bytes) {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  m_stats.bytes_read += bytes;
+  m_stats.bytes_read_stored += stored_bytes;
+}
+
+void h5features::details::stats_recorder::add_written(std::size_t bytes, std::size_t stored_bytes) {
+  const std::lock_guard<std::mutex> lock{m_mutex};
+  m_stats.bytes_written += bytes;
+  m_stats.bytes_written_stored += stored_bytes;
+}
+
+void h5features::details::stats_recorder::notify() const {
+  if (m_callback) {
+    m_callback(get());
+  }
+}
+
+h5features::details::stats_scope::stats_scope(std::shared_ptr<stats_recorder> recorder, bool notify)
+    : m_previous{std::move(current_recorder)}, m_notify{notify and recorder and recorder != m_previous} {
+  current_recorder = std::move(recorder);
+}
+
+h5features::details::stats_scope::~stats_scope() {
+  const auto recorder = std::exchange(current_recorder, std::move(m_previous));
+  if (m_notify) {
+    // a failing callback must not interrupt the operation
+    try {
+      recorder->notify();
+    } catch (const std::exception &e) {
+      std::cerr << "WARNING h5features: statistics callback failed: " << e.what() << std::endl;
+    }
+  }
+}
+
+const std::shared_ptr<h5features::details::stats_recorder> &h5features::details::stats_scope::current() noexcept {
+  return current_recorder;
+}
+
+h5features::details::stats_timer::stats_timer(stats_operation operation)
+    : m_recorder{current_recorder.get()}, m_operation{operation}, m_start{} {
+  if (m_recorder) {
+    m_start = std::chrono::steady_clock::now();
+  }
+}
+
+h5features::details::stats_timer::~stats_timer() {
+  if (m_recorder) {
+    const std::chrono::duration<double> duration = std::chrono::steady_clock::now() - m_start;
+    m_recorder->add(m_operation, duration.count());
+  }
+}
+
+bool h5features::details::recording_stats() noexcept { return current_recorder != nullptr; }
+
+void h5features::details::record_read(const hdf5::DataSet &dataset, std::size_t bytes) {
+  if (not current_recorder) {
+    return;
+  }
+
+  // estimate the stored bytes from the compression ratio of the dataset
+  const auto size = dataset.getElementCount() * dataset.getDataType().getSize();
+  const auto stored =
+      size == 0 ? bytes : static_cast<std::size_t>(static_cast<double>(bytes) * dataset.getStorageSize() / size);
+  current_recorder->add_read(bytes, stored);
+}
+
+void h5features::details::record_written(std::size_t bytes, std::size_t stored_bytes) {
+  if (current_recorder) {
+    current_recorder->add_written(bytes, stored_bytes);
+  }
+}
+
+double h5features::details::metadata_cache_hit_rate(const hdf5::Object &object, bool reset) {
+  double rate = 0;
+  const hid_t file = H5Iget_file_id(object.getId());
+  if (file >= 0) {
+    if (H5Fget_mdc_hit_rate(file, &rate) < 0) {
+      rate = 0;
+    }
+    if (reset) {
+      H5Freset_mdc_hit_rate_stats(file);
+    }
+    H5Fclose(file);
+  }
+  return rate;
+}
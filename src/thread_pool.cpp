@@ -0,0 +1,87 @@
+#include "h5features/details/thread_pool.h"
+#include <algorithm>
+
+#ifdef _WIN32
+#include <process.h>
+#else
+#include <unistd.h>
+#endif
+
+h5features::details::thread_pool::thread_pool(std::size_t workers) : m_stopping{false} {
+  if (workers == 0) {
+    workers = default_workers();
+  }
+
+  m_workers.reserve(workers);
+  for (std::size_t i = 0; i < workers; ++i) {
+    m_workers.emplace_back([this]() { work(); });
+  }
+}
+
+h5features::details::thread_pool::~thread_pool() {
+  {
+    const std::lock_guard<std::mutex> lock{m_mutex};
+    m_stopping = true;
+  }
+  m_condition.notify_all();
+
+  for (auto &worker : m_workers) {
+    worker.join();
+  }
+}
+
+std::size_t h5features::details::thread_pool::size() const noexcept { return m_workers.size(); }
+
+std::size_t h5features::details::thread_pool::default_workers() noexcept {
+  return std::max<std::size_t>(std::thread::hardware_concurrency(), 1);
+}
+
+void h5features::details::thread_pool::push(std::function<void()> &&task) {
+  {
+    const std::lock_guard<std::mutex> lock{m_mutex};
+    m_tasks.push(std::move(task));
+  }
+  m_condition.notify_one();
+}
+
+void h5features::details::thread_pool::work() {
+  while (true) {
+    std::function<void()> task;
+    {
+      std::unique_lock<std::mutex> lock{m_mutex};
+      m_condition.wait(lock, [this]() { return m_stopping or not m_tasks.empty(); });
+
+      // pending tasks are completed before stopping
+      if (m_tasks.empty()) {
+        return;
+      }
+      task = std::move(m_tasks.front());
+      m_tasks.pop();
+    }
+    task();
+  }
+}
+
+long h5features::details::current_pid() {
+#ifdef _WIN32
+  return static_cast<long>(_getpid());
+#else
+  return static_cast<long>(getpid());
+#endif
+}
+
+h5features::details::thread_pool &h5features::details::io_thread() {
+  static std::mutex mutex;
+  static std::unique_ptr<thread_pool> pool;
+  static long pid = 0;
+
+  const std::lock_guard<std::mutex> lock{mutex};
+  if (not pool or pid != current_pid()) {
+    // the thread inherited from the parent process does not exist in a forked
+    // process, it cannot be joined and the pool is leaked
+    static_cast<void>(pool.release());
+    pool = std::make_unique<thread_pool>(1);
+    pid = current_pid();
+  }
+  return *pool;
+}
@@ -0,0 +1,117 @@
+#include "h5features/details/time_index.h"
+#include <algorithm>
+
+// The minimal number of frames between two samples
+static constexpr std::size_t min_step = 256;
+
+// The maximal number of samples, this keeps the index below 32 kB so that it
+// fits in a compact HDF5 attribute
+static constexpr std::size_t max_samples = 2048;
+
+h5features::details::time_index::time_index(const h5features::times &times)
+    : m_size{times.size()}, m_dim{times.dim()},
+      m_step{std::max(min_step, (times.size() + max_samples - 1) / max_samples)}, m_samples{} {
+  // short items are read entirely
+  if (m_size <= 2 * m_step) {
+    return;
+  }
+
+  const auto data = times.data();
+  m_samples.reserve(((m_size + m_step - 1) / m_step) * m_dim);
+  for (std::size_t frame = 0; frame < m_size; frame += m_step) {
+    m_samples.insert(m_samples.end(), data.begin() + frame * m_dim, data.begin() + (frame + 1) * m_dim);
+  }
+}
+
+h5features::details::time_index::time_index(std::size_t dim) : m_size{0}, m_dim{dim}, m_step{min_step}, m_samples{} {}
+
+void h5features::details::time_index::append(const h5features::times &times) {
+  const auto data = times.data();
+  const auto size = times.size();
+
+  // the sampled frames are the multiples of the step
+  for (auto frame = (m_size + m_step - 1) / m_step * m_step; frame < m_size + size; frame += m_step) {
+    const auto position = (frame - m_size) * m_dim;
+    m_samples.insert(m_samples.end(), data.begin() + position, data.begin() + position + m_dim);
+
+    if (m_samples.size() > max_samples * m_dim) {
+      // keep the samples of the frames multiple of twice the step
+      std::size_t count = 0;
+      for (std::size_t sample = 0; sample < m_samples.size() / m_dim; sample += 2) {
+        std::copy_n(m_samples.begin() + sample * m_dim, m_dim, m_samples.begin() + count * m_dim);
+        ++count;
+      }
+      m_samples.resize(count * m_dim);
+      m_step *= 2;
+      frame = frame / m_step * m_step;
+    }
+  }
+  m_size += size;
+}
+
+h5features::details::time_index::time_index(std::vector<double> &&samples, std::size_t size, std::size_t dim,
+                                            std::size_t step)
+    : m_size{size}, m_dim{dim}, m_step{step}, m_samples{std::move(samples)} {}
+
+std::optional<h5features::details::time_index>
+h5features::details::time_index::read(const hdf5::DataSet &dataset, std::size_t size, std::size_t dim) {
+  if (not dataset.hasAttribute("index") or not dataset.hasAttribute("index_step")) {
+    return std::nullopt;
+  }
+
+  std::size_t step;
+  dataset.getAttribute("index_step").read(step);
+  std::vector<double> samples;
+  dataset.getAttribute("index").read(samples);
+
+  // ignore an index not consistent with the times
+  if (step == 0 or samples.size() != ((size + step - 1) / step) * dim) {
+    return std::nullopt;
+  }
+  return time_index{std::move(samples), size, dim, step};
+}
+
+void h5features::details::time_index::write(hdf5::DataSet &dataset) const {
+  if (not empty()) {
+    dataset.createAttribute("index_step", m_step);
+    dataset.createAttribute("index", m_samples);
+  }
+}
+
+bool h5features::details::time_index::empty() const noexcept {
+  // short items are read entirely
+  return m_samples.empty() or m_size <= 2 * m_step;
+}
+
+std::pair<std::size_t, std::size_t> h5features::details::time_index::search(double start, double stop) const {
+  if (empty()) {
+    return {0, m_size};
+  }
+
+  // returns the number of samples verifying `before`, the samples verifying it
+  // being sorted first
+  const auto count = [this](auto &&before) {
+    std::size_t first = 0;
+    std::size_t last = m_samples.size() / m_dim;
+    while (first < last) {
+      const auto middle = first + (last - first) / 2;
+      if (before(middle)) {
+        first = middle + 1;
+      } else {
+        last = middle;
+      }
+    }
+    return first;
+  };
+
+  // number of samples with a start time lower than `start`, and with a stop
+  // time lower or equal to `stop`
+  const auto before_start = count([this, start](std::size_t i) { return m_samples[i * m_dim] < start; });
+  const auto before_stop = count([this, stop](std::size_t i) { return m_samples[i * m_dim + m_dim - 1] <= stop; });
+
+  // the first frame in [start, stop] follows the last sample before start, and
+  // the frames after the first sample after stop are out of [start, stop]
+  const auto first = before_start == 0 ? 0 : (before_start - 1) * m_step;
+  const auto last = std::min(m_size, before_stop * m_step);
+  return first < last ? std::make_pair(first, last) : std::make_pair(first, first);
+}
@@ -1,6 +1,8 @@
 #include "h5features/times.h"
 #include "h5features/exception.h"
 #include <algorithm>
+#include <iterator>
+#include <memory>
 #include <sstream>
 #include <utility>
 #include <vector>
@@ -14,35 +16,39 @@ std::vector<double> init_from_start_stop(const std::vector<double> &start, const
     throw h5features::exception("tstart and tstop must have the same size");
   }
 
-  std::vector<double> data;
-  data.reserve(2 * start.size());
-  for (std::size_t i = 0; i < start.size(); ++i) {
-    data.push_back(start[i]);
-    data.push_back(stop[i]);
+  // indexed writes to a preallocated buffer, so that the loop is vectorized
+  const auto size = start.size();
+  std::vector<double> data(2 * size);
+  double *const destination = data.data();
+  const double *const first = start.data();
+  const double *const last = stop.data();
+  for (std::size_t i = 0; i < size; ++i) {
+    destination[2 * i] = first[i];
+    destination[2 * i + 1] = last[i];
   }
   return data;
 }
 
-// An iterator used to iterate on interleaved data stored in a vector, i.e. to
-// iterate the vector with a step of 2. It is assumed the vector has an even
+// An iterator used to iterate on interleaved data stored in a span, i.e. to
+// iterate the span with a step of 2. It is assumed the span has an even
 // size. It is used to efficiently use STL algorithms on interleaved data.
 class iterator {
 public:
-  using iterator_category = std::vector<double>::iterator::iterator_category;
+  using iterator_category = std::random_access_iterator_tag;
   using value_type = double;
-  using difference_type = std::vector<double>::iterator::difference_type;
+  using difference_type = std::ptrdiff_t;
   using pointer = double *;
   using reference = double &;
 
-  static inline iterator begin_start(const std::vector<double> &v) { return {v.begin()}; }
+  static inline iterator begin_start(const h5features::span<const double> &v) { return {v.begin()}; }
 
-  static inline iterator end_start(const std::vector<double> &v) { return {v.end()}; }
+  static inline iterator end_start(const h5features::span<const double> &v) { return {v.end()}; }
 
-  static inline iterator begin_stop(const std::vector<double> &v) { return {v.begin() + 1}; }
+  static inline iterator begin_stop(const h5features::span<const double> &v) { return {v.begin() + 1}; }
 
-  static inline iterator end_stop(const std::vector<double> &v) { return {v.end() + 1}; }
+  static inline iterator end_stop(const h5features::span<const double> &v) { return {v.end() + 1}; }
 
-  iterator(std::vector<double>::const_iterator it) : m_it{it} {}
+  iterator(const double *it) : m_it{it} {}
 
   inline bool operator==(const iterator &other) const { return m_it == other.m_it; }
 
@@ -80,7 +86,7 @@ public:
   inline value_type operator*() const { return *m_it; }
 
 private:
-  std::vector<double>::const_iterator m_it;
+  const double *m_it;
 };
 } // namespace details
 
@@ -98,24 +104,40 @@ h5features::times::format h5features::times::get_format(const std::size_t &dim)
 }
 
 h5features::times::times(const std::vector<double> &data, format times_format, bool validate)
-    : m_data{data}, m_format{times_format} {
+    : times{std::vector<double>{data}, times_format, validate} {}
+
+h5features::times::times(std::vector<double> &&data, format times_format, bool validate) : m_format{times_format} {
+  // the vector is moved to a shared buffer owned by the times
+  auto buffer = std::make_shared<const std::vector<double>>(std::move(data));
+  m_data = *buffer;
+  m_owner = std::move(buffer);
+
   if (validate) {
     this->validate();
   }
 }
 
-h5features::times::times(std::vector<double> &&data, format times_format, bool validate)
-    : m_data{std::move(data)}, m_format{times_format} {
+h5features::times::times(h5features::span<const double> data, format times_format, std::shared_ptr<const void> owner,
+                         bool validate)
+    : m_owner{std::move(owner)}, m_data{data}, m_format{times_format} {
   if (validate) {
     this->validate();
   }
 }
 
 h5features::times::times(const std::vector<double> &start, const std::vector<double> &stop, bool validate)
-    : m_data{details::init_from_start_stop(start, stop)}, m_format{format::interval} {
-  if (validate) {
-    this->validate();
+    : times{details::init_from_start_stop(start, stop), format::interval, validate} {}
+
+h5features::times::times(times &&other) noexcept
+    : m_owner{std::move(other.m_owner)}, m_data{std::exchange(other.m_data, {})}, m_format{other.m_format} {}
+
+h5features::times &h5features::times::operator=(times &&other) noexcept {
+  if (this != &other) {
+    m_owner = std::move(other.m_owner);
+    m_data = std::exchange(other.m_data, {});
+    m_format = other.m_format;
   }
+  return *this;
 }
 
 bool h5features::times::operator==(const times &other) const noexcept {
@@ -146,7 +168,7 @@ std::size_t h5features::times::dim() const noexcept {
   }
 }
 
-const std::vector<double> &h5features::times::data() const noexcept { return m_data; }
+h5features::span<const double> h5features::times::data() const noexcept { return m_data; }
 
 double h5features::times::start() const {
   if (size() == 0) {
@@ -161,7 +183,7 @@ double h5features::times::stop() const {
     throw h5features::exception("times is empty");
   }
 
-  return *(m_data.rbegin());
+  return *(m_data.end() - 1);
 }
 
 void h5features::times::validate() const {
@@ -170,34 +192,29 @@ void h5features::times::validate() const {
     throw h5features::exception("timestamps must be non-empty");
   }
 
-  switch (m_format) {
-  case format::simple: {
-    if (not std::is_sorted(m_data.begin(), m_data.end())) {
-      throw h5features::exception("timestamps must be sorted in increasing order");
-    }
+  if (m_format == format::interval and m_data.size() % 2 != 0) {
+    throw h5features::exception("timestamps must have an even size (as [start, stop] pairs)");
+  }
 
-    break;
+  // a single pass over the timestamps, without branching so that the loop is
+  // vectorized. For simple times, the start and stop of a frame are the same.
+  const auto dim = this->dim();
+  const auto size = this->size();
+  const double *const data = m_data.data();
+  bool sorted = true;
+  bool ordered = not(data[0] > data[dim - 1]);
+  for (std::size_t i = 1; i < size; ++i) {
+    const double *const previous = data + (i - 1) * dim;
+    const double *const current = data + i * dim;
+    sorted &= not(current[0] < previous[0]) & not(current[dim - 1] < previous[dim - 1]);
+    ordered &= not(current[0] > current[dim - 1]);
   }
-  default: // format::interval
-  {
-    if (m_data.size() % 2 != 0) {
-      throw h5features::exception("timestamps must have an even size (as [start, stop] pairs)");
-    }
-
-    if (not(std::is_sorted(details::iterator::begin_start(m_data), details::iterator::end_start(m_data)) and
-            std::is_sorted(details::iterator::begin_stop(m_data), details::iterator::end_stop(m_data)))) {
-      throw h5features::exception("timestamps must be sorted in increasing order");
-    }
-
-    // ensure tstart <= tstop for all frames
-    for (auto it = m_data.begin(); it != m_data.end(); it += 2) {
-      if (*it > *(it + 1)) {
-        throw h5features::exception("tstart must be lower or equal to tstop for all timestamps");
-      }
-    }
 
-    break;
+  if (not sorted) {
+    throw h5features::exception("timestamps must be sorted in increasing order");
   }
+  if (not ordered) {
+    throw h5features::exception("tstart must be lower or equal to tstop for all timestamps");
   }
 }
 
@@ -240,15 +257,6 @@ h5features::times h5features::times::select(const std::size_t &start, const std:
     throw h5features::exception("stop index must be lower or equal to size");
   }
 
-  switch (m_format) {
-  case format::simple: {
-    return {{m_data.begin() + start, m_data.begin() + stop}, format::simple, false};
-    break;
-  }
-  default: // format::interval
-  {
-    return {{m_data.begin() + start * 2, m_data.begin() + stop * 2}, format::interval, false};
-    break;
-  }
-  }
+  // the selected times share the buffer of those times
+  return {m_data.subspan(start * dim(), (stop - start) * dim()), m_format, m_owner, false};
 }
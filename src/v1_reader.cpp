@@ -1,13 +1,31 @@
 #include "h5features/details/v1_reader.h"
 #include "h5features/details/properties_reader.h"
+#include "h5features/details/raw_dataset.h"
+#include "h5features/details/stats_recorder.h"
 #include "h5features/exception.h"
 #include <algorithm>
+#include <array>
+#include <cstddef>
 #include <iostream>
+#include <memory>
+#include <numeric>
+#include <optional>
 #include <sstream>
 #include <string>
 #include <utility>
 #include <vector>
 
+// The maximal size of the features read at once by `read_items`, in bytes
+static constexpr std::size_t max_run_bytes = 1UL << 26;
+
+// Returns a copy of the frames [first, last) of `features`
+h5features::features slice(const h5features::features &features, std::size_t first, std::size_t last) {
+  const auto frame_bytes = features.dim() * h5features::size_of(features.get_dtype());
+  auto buffer = std::make_shared<const std::vector<std::byte>>(features.bytes().begin() + first * frame_bytes,
+                                                               features.bytes().begin() + last * frame_bytes);
+  return {{buffer->data(), buffer->size()}, features.get_dtype(), features.dim(), buffer, false};
+}
+
 /*
  * Because of a bug in HighFive when reading string datasets wrote from h5py, we
  * need a custom low-level function to read that. Here we assume the dataset has
@@ -29,10 +47,11 @@ std::vector<std::string> read_string_dataset(const hdf5::DataSet dataset) {
   char **raw_data = new char *[nitems];
   H5Dread(dataset_id, datatype_id, H5S_ALL, H5S_ALL, H5P_DEFAULT, raw_data);
 
-  // convert it to a vector of strings
+  // convert it to a vector of strings, the elements never written (when the
+  // writer was not closed) are null
   std::vector<std::string> items(nitems);
   for (size_t i = 0; i < nitems; ++i) {
-    items[i] = std::string(raw_data[i]);
+    items[i] = raw_data[i] == nullptr ? std::string{} : std::string(raw_data[i]);
   }
 
   // deallocate raw data
@@ -70,16 +89,98 @@ h5features::v1::reader::reader(hdf5::Group &&group, h5features::version version)
   try {
     m_items = read_string_dataset(m_group.getDataSet(items_dataset_name));
     m_group.getDataSet(index_dataset_name).read(m_index);
+
+    // the datasets are larger than the items they contain when the writer was
+    // not closed, see `h5features::v1::writer`
+    if (m_group.hasAttribute("counts")) {
+      std::array<std::size_t, 2> counts;
+      m_group.getAttribute("counts").read(counts);
+      m_items.resize(std::min(m_items.size(), counts[0]));
+      m_index.resize(m_items.size());
+    }
   } catch (const hdf5::Exception &) {
     // failed to load the datasets, assumes the group is empty (this is
     // required to have a behavior consistent with version 2.0)
     m_items.clear();
     m_index.clear();
   }
+
+  if (not m_items.empty() and m_group.exist("features")) {
+    m_features = m_group.getDataSet("features");
+  }
+
+  // index the items by name, the first one is retained in case of duplicates
+  m_positions.reserve(m_items.size());
+  for (std::size_t index = 0; index < m_items.size(); ++index) {
+    m_positions.emplace(m_items[index], index);
+  }
 }
 
 std::vector<std::string> h5features::v1::reader::items() const { return m_items; }
 
+std::vector<std::size_t> h5features::v1::reader::sizes() const {
+  std::vector<std::size_t> sizes;
+  sizes.reserve(m_index.size());
+  for (std::size_t index = 0; index < m_index.size(); ++index) {
+    sizes.push_back(index == 0 ? m_index[0] + 1 : m_index[index] - m_index[index - 1]);
+  }
+  return sizes;
+}
+
+std::vector<std::size_t> h5features::v1::reader::dims() const {
+  if (not m_features.has_value()) {
+    return {};
+  }
+
+  // all the items share the features dataset
+  try {
+    return std::vector<std::size_t>(m_index.size(), m_features->getDimensions()[1]);
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(std::string("failed to read features dimension: ") + e.what());
+  }
+}
+
+std::vector<std::pair<double, double>> h5features::v1::reader::time_spans() const {
+  if (m_index.empty()) {
+    return {};
+  }
+
+  const h5features::details::stats_timer timer{&h5features::stats::read_times};
+  try {
+    const auto dataset = get_times_dataset();
+    const auto rank = dataset.getDimensions().size();
+
+    // read only the first timestamp of the first frame and the last timestamp
+    // of the last frame of each item, simple times may be stored in a 1D dataset
+    const auto last_column = rank == 1 ? 0 : dataset.getDimensions()[1] - 1;
+    std::vector<std::size_t> coordinates;
+    coordinates.reserve(2 * rank * m_index.size());
+    for (std::size_t index = 0; index < m_index.size(); ++index) {
+      coordinates.push_back(index == 0 ? 0 : m_index[index - 1] + 1);
+      if (rank == 2) {
+        coordinates.push_back(0);
+      }
+      coordinates.push_back(m_index[index]);
+      if (rank == 2) {
+        coordinates.push_back(last_column);
+      }
+    }
+
+    std::vector<double> bounds(2 * m_index.size());
+    h5features::details::record_read(dataset, bounds.size() * sizeof(double));
+    dataset.select(hdf5::ElementSet{coordinates}).read_raw(bounds.data());
+
+    std::vector<std::pair<double, double>> spans;
+    spans.reserve(m_index.size());
+    for (std::size_t index = 0; index < m_index.size(); ++index) {
+      spans.emplace_back(bounds[2 * index], bounds[2 * index + 1]);
+    }
+    return spans;
+  } catch (const std::exception &e) {
+    throw h5features::exception(std::string("failed to read times: ") + e.what());
+  }
+}
+
 h5features::item h5features::v1::reader::read_item(const std::string &name, bool ignore_properties) const {
   // retrieve the start and stop indices of the item in the index
   const auto position = get_item_position(name);
@@ -93,25 +194,199 @@ h5features::item h5features::v1::reader::read_item(const std::string &name, doub
   // retrieve the start and stop indices of the item in the index
   const auto position = get_item_position(name);
 
-  // retrieve the sub-position from times
-  const auto times = read_times(position);
-  const auto subposition = times.get_indices(start, stop);
+  // retrieve the sub-position from times, without reading them all
+  const auto subposition = search_times(position, start, stop);
+
+  return {name, read_features(subposition), read_times(subposition), {read_properties(name, ignore_properties)}, false};
+}
+
+h5features::features h5features::v1::reader::read_frames(const std::string &name, std::size_t start,
+                                                         std::size_t stop) const {
+  const auto position = get_item_position(name);
+  if (start >= stop or stop > position.second - position.first) {
+    std::stringstream msg;
+    msg << "item '" << name << "': invalid frames [" << start << ", " << stop << ")";
+    throw h5features::exception(msg.str());
+  }
+  return read_features({position.first + start, position.first + stop});
+}
 
-  return {name,
-          read_features({position.first + subposition.first, position.first + subposition.second}),
-          times.select(subposition.first, subposition.second),
-          {read_properties(name, ignore_properties)},
-          false};
+h5features::details::item_shape h5features::v1::reader::read_shape(const std::string &name) const {
+  const auto position = get_item_position(name);
+  try {
+    const auto features = m_group.getDataSet("features");
+    const auto times = get_times_dataset().getDimensions();
+    return {position.second - position.first, features.getDimensions()[1], h5features::details::read_dtype(features),
+            times.size() == 1 ? 1 : times[1]};
+  } catch (const std::exception &e) {
+    throw h5features::exception(std::string("failed to read item '") + name + "': " + e.what());
+  }
+}
+
+void h5features::v1::reader::read_item_into(const std::string &name, const h5features::details::item_shape &shape,
+                                            std::byte *features, h5features::dtype dtype, double *times) const {
+  const auto position = get_item_position(name);
+  const auto size = position.second - position.first;
+  if (size != shape.size) {
+    throw h5features::exception("item '" + name + "': features do not match the expected shape");
+  }
+
+  try {
+    const h5features::details::stats_timer timer{&h5features::stats::read_features};
+    const auto dataset = m_group.getDataSet("features");
+    if (dataset.getDimensions()[1] != shape.dim) {
+      throw h5features::exception("features do not match the expected shape");
+    }
+    h5features::details::record_read(dataset,
+                                     size * shape.dim * h5features::size_of(h5features::details::read_dtype(dataset)));
+    dataset.select({position.first, 0}, {size, shape.dim})
+        .read_raw(features, h5features::details::make_datatype(dtype));
+  } catch (const std::exception &e) {
+    throw h5features::exception(std::string("failed to read features: ") + e.what());
+  }
+
+  try {
+    const h5features::details::stats_timer timer{&h5features::stats::read_times};
+    const auto dataset = get_times_dataset();
+    const auto dimensions = dataset.getDimensions();
+    if ((dimensions.size() == 1 ? 1 : dimensions[1]) != shape.times_dim) {
+      throw h5features::exception("times do not match the expected shape");
+    }
+    h5features::details::record_read(dataset, size * shape.times_dim * sizeof(double));
+    if (dimensions.size() == 1) {
+      dataset.select({position.first}, {size}).read_raw(times);
+    } else {
+      dataset.select({position.first, 0}, {size, shape.times_dim}).read_raw(times);
+    }
+  } catch (const std::exception &e) {
+    throw h5features::exception(std::string("failed to read times: ") + e.what());
+  }
+}
+
+std::vector<h5features::item> h5features::v1::reader::read_items(const std::vector<std::string> &names,
+                                                                 bool ignore_properties) const {
+  if (names.empty()) {
+    return {};
+  }
+
+  // retrieve the rows of each item in the features and times datasets
+  std::vector<std::pair<std::size_t, std::size_t>> positions;
+  positions.reserve(names.size());
+  for (const auto &name : names) {
+    positions.push_back(get_item_position(name));
+  }
+
+  // visit the items in the order they are stored on file
+  std::vector<std::size_t> order(names.size());
+  std::iota(order.begin(), order.end(), 0);
+  std::stable_sort(order.begin(), order.end(),
+                   [&positions](std::size_t a, std::size_t b) { return positions[a].first < positions[b].first; });
+
+  std::size_t frame_bytes;
+  try {
+    const auto dataset = m_group.getDataSet("features");
+    frame_bytes = dataset.getDimensions()[1] * h5features::size_of(h5features::details::read_dtype(dataset));
+  } catch (const std::exception &e) {
+    throw h5features::exception(std::string("failed to read features: ") + e.what());
+  }
+
+  std::vector<std::optional<h5features::item>> items(names.size());
+  auto first = order.begin();
+  while (first != order.end()) {
+    // extend the run while the next item follows on file, up to a maximal size
+    const auto start = positions[*first].first;
+    auto stop = positions[*first].second;
+    auto last = std::next(first);
+    while (last != order.end() and positions[*last].first == stop and
+           (positions[*last].second - start) * frame_bytes <= max_run_bytes) {
+      stop = positions[*last].second;
+      ++last;
+    }
+
+    // read the whole run at once and split it in items
+    auto features = read_features({start, stop});
+    auto times = read_times({start, stop});
+    if (std::next(first) == last) {
+      items[*first].emplace(names[*first], std::move(features), std::move(times),
+                            read_properties(names[*first], ignore_properties), false);
+    } else {
+      for (auto it = first; it != last; ++it) {
+        const auto begin = positions[*it].first - start;
+        const auto end = positions[*it].second - start;
+        items[*it].emplace(names[*it], slice(features, begin, end), times.select(begin, end),
+                           read_properties(names[*it], ignore_properties), false);
+      }
+    }
+    first = last;
+  }
+
+  std::vector<h5features::item> result;
+  result.reserve(items.size());
+  for (auto &item : items) {
+    result.push_back(std::move(item.value()));
+  }
+  return result;
+}
+
+std::vector<h5features::item> h5features::v1::reader::read_item_segments(
+    const std::string &name, const std::vector<std::pair<double, double>> &intervals, bool ignore_properties) const {
+  const auto position = get_item_position(name);
+
+  // a single interval is searched on file, otherwise the item's times are read
+  // once for all the intervals
+  std::optional<h5features::times> times;
+  std::vector<std::pair<std::size_t, std::size_t>> frames;
+  frames.reserve(intervals.size());
+  if (intervals.size() == 1) {
+    frames.push_back(search_times(position, intervals[0].first, intervals[0].second));
+  } else {
+    times.emplace(read_times(position));
+    for (const auto &[start, stop] : intervals) {
+      const auto indices = times->get_indices(start, stop);
+      frames.emplace_back(position.first + indices.first, position.first + indices.second);
+    }
+  }
+
+  auto features = h5features::details::read_ranges(frames, [this](const auto &runs) {
+    const h5features::details::stats_timer timer{&h5features::stats::read_features};
+    try {
+      const auto dataset = m_group.getDataSet("features");
+      const auto dim = dataset.getDimensions()[1];
+      const auto dtype = h5features::details::read_dtype(dataset);
+      hdf5::HyperSlab slab{hdf5::RegularHyperSlab{{runs[0].first, 0}, {runs[0].second - runs[0].first, dim}}};
+      std::size_t count = runs[0].second - runs[0].first;
+      for (std::size_t i = 1; i < runs.size(); ++i) {
+        slab |= hdf5::RegularHyperSlab{{runs[i].first, 0}, {runs[i].second - runs[i].first, dim}};
+        count += runs[i].second - runs[i].first;
+      }
+      h5features::details::record_read(dataset, count * dim * h5features::size_of(dtype));
+      return h5features::details::read_features(dataset.select(slab), dtype, dim);
+    } catch (const std::exception &e) {
+      throw h5features::exception(std::string("failed to read features: ") + e.what());
+    }
+  });
+  const auto properties = read_properties(name, ignore_properties);
+
+  std::vector<h5features::item> items;
+  items.reserve(intervals.size());
+  for (std::size_t i = 0; i < intervals.size(); ++i) {
+    items.emplace_back(name, h5features::features{features[i]},
+                       times.has_value()
+                           ? times->select(frames[i].first - position.first, frames[i].second - position.first)
+                           : read_times(frames[i]),
+                       h5features::item::lazy_properties{properties}, false);
+  }
+  return items;
 }
 
 std::pair<std::size_t, std::size_t> h5features::v1::reader::get_item_position(const std::string &name) const {
   // ensure the item exists
-  const auto item_iterator = std::find(m_items.begin(), m_items.end(), name);
-  if (item_iterator == m_items.end()) {
+  const auto item_iterator = m_positions.find(name);
+  if (item_iterator == m_positions.end()) {
     throw h5features::exception("the requested item does not exist: " + name);
   }
 
-  const auto index = std::distance(m_items.begin(), item_iterator);
+  const auto index = item_iterator->second;
   if (index != 0) {
     return {m_index[index - 1] + 1, m_index[index] + 1};
   } else {
@@ -120,52 +395,120 @@ std::pair<std::size_t, std::size_t> h5features::v1::reader::get_item_position(co
 }
 
 h5features::features h5features::v1::reader::read_features(const std::pair<std::size_t, std::size_t> &position) const {
+  const h5features::details::stats_timer timer{&h5features::stats::read_features};
   try {
     const auto dataset = m_group.getDataSet("features");
     const auto dim = dataset.getDimensions()[1];
-    std::vector<double> data(dim * (position.second - position.first));
-    dataset.select({position.first, 0}, {position.second - position.first, dim}).read_raw(data.data());
-    return {data, dim, false};
+    const auto dtype = h5features::details::read_dtype(dataset);
+    h5features::details::record_read(dataset, (position.second - position.first) * dim * h5features::size_of(dtype));
+    return h5features::details::read_features(
+        dataset.select({position.first, 0}, {position.second - position.first, dim}), dtype, dim);
   } catch (const std::exception &e) {
     throw h5features::exception(std::string("failed to read features: ") + e.what());
   }
 }
 
-h5features::times h5features::v1::reader::read_times(const std::pair<std::size_t, std::size_t> &position) const {
+hdf5::DataSet h5features::v1::reader::get_times_dataset() const {
   // retrieve the name of the times dataset according to file version
-  std::string times_name;
   switch (m_version) {
   case h5features::version::v1_1:
   case h5features::version::v1_2:
-    times_name = "labels";
-    break;
+    return m_group.getDataSet("labels");
   default:
-    times_name = "times";
+    return m_group.getDataSet("times");
+  }
+}
+
+std::pair<std::size_t, std::size_t>
+h5features::v1::reader::search_times(const std::pair<std::size_t, std::size_t> &position, double start,
+                                     double stop) const {
+  if (start >= stop) {
+    throw h5features::exception("start must be lower than stop");
+  }
+
+  const h5features::details::stats_timer timer{&h5features::stats::read_times};
+  std::pair<std::size_t, std::size_t> subposition;
+  try {
+    const auto dataset = get_times_dataset();
+    const auto dimensions = dataset.getDimensions();
+    const auto dim = dimensions.size() == 1 ? 1 : dimensions[1];
+
+    // read a single timestamp
+    const auto timestamp = [&dataset, &dimensions](std::size_t frame, std::size_t column) {
+      double value;
+      if (dimensions.size() == 1) {
+        dataset.select({frame}, {1}).read_raw(&value);
+      } else {
+        dataset.select({frame, column}, {1, 1}).read_raw(&value);
+      }
+      return value;
+    };
+
+    // returns the first frame of the item for which `before` is false, the
+    // frames verifying it being sorted first
+    const auto bisect = [&position](auto &&before) {
+      auto first = position.first;
+      auto last = position.second;
+      while (first < last) {
+        const auto middle = first + (last - first) / 2;
+        if (before(middle)) {
+          first = middle + 1;
+        } else {
+          last = middle;
+        }
+      }
+      return first;
+    };
+
+    // as in h5features::times::get_indices, by a binary search on file
+    subposition.first = bisect([&](std::size_t frame) { return timestamp(frame, 0) < start; });
+    subposition.second = bisect([&](std::size_t frame) { return timestamp(frame, dim - 1) <= stop; });
+  } catch (const std::exception &e) {
+    throw h5features::exception(std::string("failed to read times: ") + e.what());
+  }
+
+  if (subposition.first >= subposition.second) {
+    std::stringstream msg;
+    msg << "no valid indices for time interval (" << start << ", " << stop << ")";
+    throw h5features::exception(msg.str());
   }
+  return subposition;
+}
 
+h5features::times h5features::v1::reader::read_times(const std::pair<std::size_t, std::size_t> &position) const {
+  const h5features::details::stats_timer timer{&h5features::stats::read_times};
   try {
-    const auto dataset = m_group.getDataSet(times_name);
-    const auto dim = dataset.getDimensions().size();
+    const auto dataset = get_times_dataset();
+    const auto dimensions = dataset.getDimensions();
     const auto size = position.second - position.first;
+
+    // simple times may be stored in a 1D dataset
+    const auto dim = dimensions.size() == 1 ? 1 : dimensions[1];
     std::vector<double> data(dim * size);
-    dataset.select({position.first, 0}, {size, dim}).read_raw(data.data());
-    return {data, h5features::times::get_format(dim), false};
+    h5features::details::record_read(dataset, data.size() * sizeof(double));
+    if (dimensions.size() == 1) {
+      dataset.select({position.first}, {size}).read_raw(data.data());
+    } else {
+      dataset.select({position.first, 0}, {size, dim}).read_raw(data.data());
+    }
+    return {std::move(data), h5features::times::get_format(dim), false};
   } catch (const std::exception &e) {
     throw h5features::exception(std::string("failed to read times: ") + e.what());
   }
 }
 
-h5features::properties h5features::v1::reader::read_properties(const std::string &name, bool ignore_properties) const {
+h5features::item::lazy_properties h5features::v1::reader::read_properties(const std::string &name,
+                                                                          bool ignore_properties) const {
   // warn user if properties are present but not readable
   if (m_version <= h5features::version::v1_1 and m_group.exist("properties") and not ignore_properties) {
     std::cerr << "WARNING h5features version " << m_version << ": ignoring properties while reading item " << name
               << std::endl;
   } else if (m_group.exist("properties") and not ignore_properties) {
+    const h5features::details::stats_timer timer{&h5features::stats::read_properties};
     const hdf5::Group properties_group = m_group.getGroup("properties");
     if (properties_group.exist(name)) {
-      const hdf5::Group item_group = properties_group.getGroup(name);
-      return h5features::details::read_properties(item_group);
+      return h5features::details::read_lazy_properties(properties_group, name);
     }
   }
-  return {};
+  return h5features::item::lazy_properties{nullptr};
 }
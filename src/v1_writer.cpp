@@ -1,54 +1,179 @@
 #include "h5features/details/v1_writer.h"
 #include "h5features/details/properties_writer.h"
+#include "h5features/details/stats_recorder.h"
 #include <algorithm>
+#include <array>
+#include <cmath>
 #include <iostream>
 #include <string>
 #include <utility>
 #include <vector>
 
-h5features::v1::writer::writer(hdf5::Group &&group, bool compress, h5features::version version)
-    : h5features::details::writer_interface{std::move(group), compress, version},
-      m_chunk_size{static_cast<std::size_t>(std::pow(2, 7))} {
-  // read the name of items already stored (if any)
+// The maximal number of items and bytes of data buffered before being written
+static constexpr std::size_t max_pending_items = 4096;
+static constexpr std::size_t max_pending_bytes = 16 * 1024 * 1024;
+
+// The number of elements in a chunk of the "index" and "items" datasets
+static constexpr std::size_t items_chunk_size = 1024;
+
+// The attribute of the group storing the number of items and frames written,
+// the datasets being larger when the writer was not closed
+static const std::string counts_attribute = "counts";
+
+h5features::v1::writer::writer(hdf5::Group &&group, const h5features::compression &compression,
+                               const h5features::chunking &chunking, h5features::version version,
+                               bool compact_properties)
+    : h5features::details::writer_interface{std::move(group), compression, chunking, version, compact_properties},
+      m_chunk_size{static_cast<std::size_t>(std::pow(2, 7))}, m_names{}, m_initialized{m_group.getNumberObjects() != 0},
+      m_dim_features{0}, m_dim_times{0}, m_dtype{h5features::dtype::float64}, m_items{0}, m_frames{0}, m_last_index{-1},
+      m_pending{} {
+  if (not m_initialized) {
+    return;
+  }
+
+  // read the items already stored (if any), the datasets are larger than the
+  // data they contain if the previous writer was not closed
   try {
-    m_group.getDataSet("items").read(m_names);
+    const auto items = m_group.getDataSet("items");
+    if (m_group.hasAttribute(counts_attribute)) {
+      std::array<std::size_t, 2> counts;
+      m_group.getAttribute(counts_attribute).read(counts);
+      m_items = counts[0];
+      m_frames = counts[1];
+    } else {
+      // the groups written without the counts have datasets of the exact size
+      m_items = items.getDimensions()[0];
+      if (m_items != 0) {
+        std::int64_t last_index;
+        m_group.getDataSet("index").select(hdf5::ElementSet{m_items - 1}).read(last_index);
+        m_frames = static_cast<std::size_t>(last_index + 1);
+      }
+    }
+
+    std::vector<std::string> names;
+    if (m_items != 0) {
+      items.select({0}, {m_items}).read(names);
+    }
+    m_last_index = static_cast<std::int64_t>(m_frames) - 1;
+    m_names.insert(names.begin(), names.end());
+
+    const auto features = m_group.getDataSet("features");
+    m_dim_features = features.getDimensions()[1];
+    m_dtype = h5features::details::read_dtype(features);
+    m_dim_times = m_group.getDataSet("labels").getDimensions()[1];
   } catch (const hdf5::Exception &) {
     m_names.clear();
+    m_items = 0;
+    m_frames = 0;
+    m_last_index = -1;
   }
 }
 
 void h5features::v1::writer::write(const h5features::item &item) {
   // the group does not exist, initialize empty datasets
-  if (m_group.getNumberObjects() == 0) {
-    lazy_init(item.features().dim(), item.times().dim());
+  if (not m_initialized) {
+    lazy_init(item.features().dim(), item.features().get_dtype(), item.times().dim());
+    m_initialized = true;
+    m_dim_features = item.features().dim();
+    m_dim_times = item.times().dim();
+    m_dtype = item.features().get_dtype();
   } else {
     // ensure the item is compatible with the existing data and can be appended
     try {
-      check_appendable(item);
+      check_appendable(item.name(), item.features().dim(), item.features().get_dtype(), item.times().dim());
     } catch (const h5features::exception &e) {
       throw h5features::exception(std::string("cannot append item to existing group: ") + e.what());
     }
   }
+  warn_properties(item.name(), item.properties());
 
-  // on v1_0 or v1.1 warn if properties because they cannot be wrote
-  if (m_version <= h5features::version::v1_1 and item.has_properties()) {
-    std::cerr << "WARNING h5features version " << m_version << ": ignoring properties while writing item "
-              << item.name() << " (use version 1.2 or greater to save properties)" << std::endl;
+  // finally buffer the item with its properties, appended to existing data
+  // by batches
+  try {
+    append_pending(item);
+
+    const auto bytes = m_pending.times.size() * sizeof(double) + m_pending.features.size();
+    if (m_pending.names.size() >= max_pending_items or bytes >= max_pending_bytes) {
+      write_pending();
+    }
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(std::string("failed to write item: ") + e.what());
+  }
+}
+
+void h5features::v1::writer::flush() {
+  if (not m_initialized) {
+    return;
   }
 
-  // finally append the item to existing data
   try {
-    write_index(item);
-    write_name(item);
-    write_times(item);
-    write_features(item);
-    write_properties(item);
+    write_pending();
+
+    // trim the datasets to their actual size
+    auto index = m_group.getDataSet("index");
+    trim_dataset(index, m_items);
+    auto items = m_group.getDataSet("items");
+    trim_dataset(items, m_items);
+    auto labels = m_group.getDataSet("labels");
+    trim_dataset(labels, m_frames);
+    auto features = m_group.getDataSet("features");
+    trim_dataset(features, m_frames);
   } catch (const hdf5::Exception &e) {
-    throw h5features::exception(std::string("failed to write item: ") + e.what());
+    throw h5features::exception(std::string("failed to write items: ") + e.what());
+  }
+}
+
+void h5features::v1::writer::write_concatenated(const h5features::details::concatenated_items &items) {
+  const auto dim_features = items.features.dim();
+  const auto dim_times = items.times.dim();
+  if (not m_initialized) {
+    lazy_init(dim_features, items.features.get_dtype(), dim_times);
+    m_initialized = true;
+    m_dim_features = dim_features;
+    m_dim_times = dim_times;
+    m_dtype = items.features.get_dtype();
+  }
+
+  // ensure all the items can be appended before writing any of them
+  std::unordered_set<std::string> names;
+  for (const auto &name : items.names) {
+    try {
+      check_appendable(name, dim_features, items.features.get_dtype(), dim_times);
+      if (not names.insert(name).second) {
+        throw h5features::exception("item already exists");
+      }
+    } catch (const h5features::exception &e) {
+      throw h5features::exception("cannot append item '" + name + "' to existing group: " + e.what());
+    }
+  }
+
+  try {
+    // keep the items in order, the pending ones are written first
+    write_pending();
+
+    std::vector<std::int64_t> index;
+    index.reserve(items.names.size());
+    for (std::size_t i = 0; i < items.names.size(); ++i) {
+      const auto &properties = items.properties_of(i);
+      warn_properties(items.names[i], properties);
+      write_properties(items.names[i], properties);
+      index.push_back(m_last_index + static_cast<std::int64_t>(items.offsets[i + 1]));
+    }
+
+    // the items are written at once, straight from the concatenated data
+    append_datasets(index, items.names, items.times.data().data(), items.features.bytes().data(),
+                    items.features.size());
+    m_names.insert(items.names.begin(), items.names.end());
+    if (not index.empty()) {
+      m_last_index = index.back();
+    }
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(std::string("failed to write items: ") + e.what());
   }
 }
 
-void h5features::v1::writer::lazy_init(const std::size_t &dim_features, const std::size_t dim_times) {
+void h5features::v1::writer::lazy_init(const std::size_t &dim_features, h5features::dtype dtype,
+                                       const std::size_t dim_times) {
   try {
     // "format" attribute is required by v1.1, despite only "dense" value is
     // supported (a planned "sparse" format has never been implemented)
@@ -56,7 +181,7 @@ void h5features::v1::writer::lazy_init(const std::size_t &dim_features, const st
 
     init_index();
     init_items();
-    init_features(dim_features);
+    init_features(dim_features, dtype);
     init_times(dim_times);
   } catch (const hdf5::Exception &e) {
     throw h5features::exception(std::string("failed to initialize group: ") + e.what());
@@ -70,10 +195,8 @@ void h5features::v1::writer::init_index() {
   }
 
   hdf5::DataSetCreateProps props;
-  props.add(hdf5::Chunking{10});
-  if (m_compress) {
-    props.add(hdf5::Deflate{9});
-  }
+  props.add(hdf5::Chunking{items_chunk_size});
+  m_compression.apply(props);
 
   const std::vector<std::size_t> size{0};
   const std::vector<std::size_t> max_size{hdf5::DataSpace::UNLIMITED};
@@ -87,8 +210,8 @@ void h5features::v1::writer::init_items() {
   }
 
   hdf5::DataSetCreateProps props;
-  props.add(hdf5::Chunking{10});
-  if (m_compress) {
+  props.add(hdf5::Chunking{items_chunk_size});
+  if (m_compression.enabled()) {
     props.add(hdf5::Deflate{9});
   }
 
@@ -97,7 +220,7 @@ void h5features::v1::writer::init_items() {
   m_group.createDataSet<std::string>("items", hdf5::DataSpace{size, max_size}, props);
 }
 
-void h5features::v1::writer::init_features(const std::size_t &dim) {
+void h5features::v1::writer::init_features(const std::size_t &dim, h5features::dtype dtype) {
   // ensure the dataset "features" does not exist in the group
   if (m_group.exist("features")) {
     throw h5features::exception("object 'features' already exists in the group");
@@ -105,13 +228,11 @@ void h5features::v1::writer::init_features(const std::size_t &dim) {
 
   hdf5::DataSetCreateProps props;
   props.add(hdf5::Chunking{m_chunk_size, dim});
-  if (m_compress) {
-    props.add(hdf5::Deflate{9});
-  }
+  m_compression.apply(props);
 
   const std::vector<std::size_t> size{0, dim};
   const std::vector<std::size_t> max_size{hdf5::DataSpace::UNLIMITED, dim};
-  m_group.createDataSet<double>("features", hdf5::DataSpace{size, max_size}, props);
+  m_group.createDataSet("features", hdf5::DataSpace{size, max_size}, h5features::details::make_datatype(dtype), props);
 }
 
 void h5features::v1::writer::init_times(const std::size_t &dim) {
@@ -122,99 +243,174 @@ void h5features::v1::writer::init_times(const std::size_t &dim) {
 
   hdf5::DataSetCreateProps props;
   props.add(hdf5::Chunking{m_chunk_size, dim});
-  if (m_compress) {
-    props.add(hdf5::Deflate{9});
-  }
+  m_compression.apply(props);
 
   const std::vector<std::size_t> size{0, dim};
   const std::vector<std::size_t> max_size{hdf5::DataSpace::UNLIMITED, dim};
   m_group.createDataSet<double>("labels", hdf5::DataSpace{size, max_size}, props);
 }
 
-void h5features::v1::writer::check_appendable(const h5features::item &item) const {
+void h5features::v1::writer::check_appendable(const std::string &name, std::size_t dim_features,
+                                              h5features::dtype dtype, std::size_t dim_times) const {
   // check if name is already present
-  if (std::find(m_names.begin(), m_names.end(), item.name()) != m_names.end()) {
+  if (m_names.count(name) != 0) {
     throw h5features::exception("item already exists");
   }
 
   // check dimension for times
-  if (m_group.getDataSet("labels").getDimensions()[1] != item.times().dim()) {
+  if (m_dim_times != dim_times) {
     throw h5features::exception("times dimension mismatch");
   }
 
   // check dimension for features
-  if (m_group.getDataSet("features").getDimensions()[1] != item.features().dim()) {
+  if (m_dim_features != dim_features) {
     throw h5features::exception("features dimension mismatch");
   }
-}
 
-std::vector<std::size_t> h5features::v1::writer::resize_dataset(hdf5::DataSet &dataset, const std::size_t increment) {
-  auto size = dataset.getDimensions();
-  size[0] += increment;
-  dataset.resize(size);
-  return size;
+  // check type for features, all the items share a single dataset
+  if (m_dtype != dtype) {
+    throw h5features::exception("features dtype mismatch");
+  }
 }
 
-void h5features::v1::writer::write_index(const h5features::item &item) {
-  // the index dataset
-  auto dataset = m_group.getDataSet("index");
+void h5features::v1::writer::warn_properties(const std::string &name, const h5features::properties &properties) const {
+  // on v1_0 or v1.1 warn if properties because they cannot be wrote
+  if (m_version <= h5features::version::v1_1 and properties.size() != 0) {
+    std::cerr << "WARNING h5features version " << m_version << ": ignoring properties while writing item " << name
+              << " (use version 1.2 or greater to save properties)" << std::endl;
+  }
+}
 
-  // resize the dataset (one more element)
-  const auto size = resize_dataset(dataset, 1)[0];
+void h5features::v1::writer::reserve_dataset(hdf5::DataSet &dataset, std::size_t size) {
+  auto dims = dataset.getDimensions();
+  if (dims[0] < size) {
+    dims[0] = std::max(size, 2 * dims[0]);
+    dataset.resize(dims);
+  }
+}
 
-  // get the current index and append it to the dataset
-  if (size > 1) {
-    std::size_t index;
-    dataset.select(hdf5::ElementSet{size - 2}).read(index);
-    dataset.select(hdf5::ElementSet{size - 1}).write(item.size() + index);
-  } else {
-    dataset.select(hdf5::ElementSet{size - 1}).write(item.size() - 1);
+void h5features::v1::writer::trim_dataset(hdf5::DataSet &dataset, std::size_t size) {
+  auto dims = dataset.getDimensions();
+  if (dims[0] != size) {
+    dims[0] = size;
+    dataset.resize(dims);
   }
 }
 
-void h5features::v1::writer::write_name(const h5features::item &item) {
-  m_names.push_back(item.name());
+void h5features::v1::writer::append_pending(const h5features::item &item) {
+  // the index stores the position of the last frame of each item
+  m_last_index += static_cast<std::int64_t>(item.size());
+  m_pending.index.push_back(m_last_index);
 
-  // the names dataset
-  auto dataset = m_group.getDataSet("items");
+  m_names.insert(item.name());
+  m_pending.names.push_back(item.name());
+  m_pending.properties.push_back(item.properties());
 
-  // resize the dataset (one more element)
-  const auto size = resize_dataset(dataset, 1)[0];
+  const auto times = item.times().data();
+  m_pending.times.insert(m_pending.times.end(), times.begin(), times.end());
 
-  // append the item name to the dataset
-  dataset.select(hdf5::ElementSet{size - 1}).write(item.name());
+  const auto features = item.features().bytes();
+  m_pending.features.insert(m_pending.features.end(), features.begin(), features.end());
+  m_pending.frames += item.size();
 }
 
-void h5features::v1::writer::write_times(const h5features::item &item) {
-  // get and resize the times dataset by the item size
-  auto dataset = m_group.getDataSet("labels");
-  const auto size = resize_dataset(dataset, item.size());
+void h5features::v1::writer::write_pending() {
+  if (m_pending.names.empty()) {
+    return;
+  }
 
-  // append the times to the dataset
-  dataset.select({size[0] - item.size(), 0}, {item.size(), item.times().dim()}).write_raw(item.times().data().data());
+  for (std::size_t i = 0; i < m_pending.names.size(); ++i) {
+    write_properties(m_pending.names[i], m_pending.properties[i]);
+  }
+  append_datasets(m_pending.index, m_pending.names, m_pending.times.data(), m_pending.features.data(),
+                  m_pending.frames);
+
+  m_pending.index.clear();
+  m_pending.names.clear();
+  m_pending.properties.clear();
+  m_pending.times.clear();
+  m_pending.features.clear();
+  m_pending.frames = 0;
 }
 
-void h5features::v1::writer::write_features(const h5features::item &item) {
-  // get and resize the times dataset by the item size
-  auto dataset = m_group.getDataSet("features");
-  const auto size = resize_dataset(dataset, item.size());
+void h5features::v1::writer::append_datasets(const std::vector<std::int64_t> &index,
+                                             const std::vector<std::string> &names, const double *times,
+                                             const std::byte *features, std::size_t frames) {
+  const auto items = names.size();
+  if (items == 0) {
+    return;
+  }
+
+  // append the index and names of the items
+  auto index_dataset = m_group.getDataSet("index");
+  reserve_dataset(index_dataset, m_items + items);
+  index_dataset.select({m_items}, {items}).write(index);
+
+  auto names_dataset = m_group.getDataSet("items");
+  reserve_dataset(names_dataset, m_items + items);
+  names_dataset.select({m_items}, {items}).write(names);
+
+  if (frames != 0) {
+    // the stored bytes are estimated from the growth of the datasets
+    const auto stored_size = [](const hdf5::DataSet &dataset) {
+      return h5features::details::recording_stats() ? dataset.getStorageSize() : 0;
+    };
+
+    // append the times and features
+    {
+      const h5features::details::stats_timer timer{&h5features::stats::write_times};
+      auto dataset = m_group.getDataSet("labels");
+      reserve_dataset(dataset, m_frames + frames);
+      const auto stored = stored_size(dataset);
+      dataset.select({m_frames, 0}, {frames, m_dim_times}).write_raw(times);
+      h5features::details::record_written(frames * m_dim_times * sizeof(double), stored_size(dataset) - stored);
+    }
+
+    {
+      const h5features::details::stats_timer timer{&h5features::stats::write_features};
+      auto dataset = m_group.getDataSet("features");
+      reserve_dataset(dataset, m_frames + frames);
+      const auto stored = stored_size(dataset);
+      dataset.select({m_frames, 0}, {frames, m_dim_features})
+          .write_raw(features, h5features::details::make_datatype(m_dtype));
+      h5features::details::record_written(frames * m_dim_features * h5features::size_of(m_dtype),
+                                          stored_size(dataset) - stored);
+    }
+  }
 
-  // append the features to the dataset
-  dataset.select({size[0] - item.size(), 0}, {item.size(), item.dim()}).write_raw(item.features().data().data());
+  m_items += items;
+  m_frames += frames;
+  write_counts();
 }
 
-void h5features::v1::writer::write_properties(const h5features::item &item) {
-  if (item.has_properties()) {
+void h5features::v1::writer::write_counts() {
+  const std::array<std::size_t, 2> counts{m_items, m_frames};
+  if (m_group.hasAttribute(counts_attribute)) {
+    m_group.getAttribute(counts_attribute).write(counts);
+  } else {
+    m_group.createAttribute(counts_attribute, counts);
+  }
+}
+
+void h5features::v1::writer::write_properties(const std::string &name, const h5features::properties &properties) {
+  if (properties.size() != 0) {
+    const h5features::details::stats_timer timer{&h5features::stats::write_properties};
     // retrieve the "properties" group, creating it if not existing
     if (not m_group.exist("properties")) {
       m_group.createGroup("properties");
     }
     hdf5::Group properties_group = m_group.getGroup("properties");
 
-    // create the properties group for that item
-    hdf5::Group item_group = properties_group.createGroup(item.name());
+    if (m_compact_properties) {
+      // write the encoded properties as a dataset named after the item
+      h5features::details::write_properties(h5features::details::encode_properties(properties), properties_group, name,
+                                            m_compression.enabled());
+    } else {
+      // create the properties group for that item
+      hdf5::Group item_group = properties_group.createGroup(name);
 
-    // write its properties within it
-    h5features::details::write_properties(item.properties(), item_group, m_compress);
+      // write its properties within it
+      h5features::details::write_properties(properties, item_group, m_compression.enabled());
+    }
   }
 }
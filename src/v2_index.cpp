@@ -0,0 +1,176 @@
+#include "h5features/details/v2_index.h"
+#include "h5features/exception.h"
+#include <algorithm>
+#include <numeric>
+#include <string>
+#include <utility>
+#include <vector>
+
+// The number of items in a chunk of the index datasets
+static constexpr hsize_t index_chunk_size = 1024;
+
+// Creates an extendable dataset of `size` rows of `dim` elements
+template <class T>
+hdf5::DataSet create_index_dataset(hdf5::Group &group, const std::string &name, std::size_t size, std::size_t dim = 1) {
+  hdf5::DataSetCreateProps props;
+  if (dim == 1) {
+    props.add(hdf5::Chunking(std::vector<hsize_t>{index_chunk_size}));
+    return group.createDataSet<T>(name, hdf5::DataSpace({size}, {hdf5::DataSpace::UNLIMITED}), props);
+  }
+  props.add(hdf5::Chunking(std::vector<hsize_t>{index_chunk_size, dim}));
+  return group.createDataSet<T>(name, hdf5::DataSpace({size, dim}, {hdf5::DataSpace::UNLIMITED, dim}), props);
+}
+
+const std::string h5features::v2::index::name = "__index__";
+
+std::optional<h5features::v2::index> h5features::v2::index::load(const hdf5::Group &group) {
+  try {
+    if (not group.exist(name) or group.getObjectType(name) != hdf5::ObjectType::Group) {
+      return std::nullopt;
+    }
+
+    const auto index_group = group.getGroup(name);
+    h5features::v2::index index;
+    index_group.getDataSet("names").read(index.m_names);
+    index_group.getDataSet("sizes").read(index.m_sizes);
+    index_group.getDataSet("dims").read(index.m_dims);
+
+    // the index must refer to all the items in the group
+    const auto size = index.m_names.size();
+    const auto spans_dataset = index_group.getDataSet("spans");
+    if (index.m_sizes.size() != size or index.m_dims.size() != size or
+        spans_dataset.getDimensions() != std::vector<std::size_t>{size, 2} or group.getNumberObjects() != size + 1) {
+      return std::nullopt;
+    }
+
+    std::vector<double> spans(2 * size);
+    if (size != 0) {
+      spans_dataset.read_raw(spans.data());
+    }
+
+    // sort the items by name, as listed by HDF5
+    std::vector<std::size_t> order(index.m_names.size());
+    std::iota(order.begin(), order.end(), 0);
+    std::sort(order.begin(), order.end(),
+              [&index](std::size_t a, std::size_t b) { return index.m_names[a] < index.m_names[b]; });
+
+    h5features::v2::index sorted;
+    sorted.m_names.reserve(order.size());
+    sorted.m_sizes.reserve(order.size());
+    sorted.m_dims.reserve(order.size());
+    sorted.m_spans.reserve(order.size());
+    for (const auto i : order) {
+      sorted.m_names.push_back(std::move(index.m_names[i]));
+      sorted.m_sizes.push_back(index.m_sizes[i]);
+      sorted.m_dims.push_back(index.m_dims[i]);
+      sorted.m_spans.emplace_back(spans[2 * i], spans[2 * i + 1]);
+    }
+    return sorted;
+  } catch (const hdf5::Exception &) {
+    // the index is not readable, ignore it
+    return std::nullopt;
+  }
+}
+
+void h5features::v2::index::create(hdf5::Group &group) {
+  if (group.exist(name)) {
+    return;
+  }
+
+  try {
+    // index the items already in the group
+    std::vector<std::string> names;
+    std::vector<std::size_t> sizes;
+    std::vector<std::size_t> dims;
+    std::vector<double> spans;
+    for (const auto &item : group.listObjectNames()) {
+      const auto metadata = scan(group.getGroup(item));
+      names.push_back(item);
+      sizes.push_back(metadata.size);
+      dims.push_back(metadata.dim);
+      spans.push_back(metadata.span.first);
+      spans.push_back(metadata.span.second);
+    }
+
+    auto index_group = group.createGroup(name);
+    auto names_dataset = create_index_dataset<std::string>(index_group, "names", names.size());
+    auto sizes_dataset = create_index_dataset<std::size_t>(index_group, "sizes", sizes.size());
+    auto dims_dataset = create_index_dataset<std::size_t>(index_group, "dims", dims.size());
+    auto spans_dataset = create_index_dataset<double>(index_group, "spans", names.size(), 2);
+    if (not names.empty()) {
+      names_dataset.write(names);
+      sizes_dataset.write(sizes);
+      dims_dataset.write(dims);
+      spans_dataset.write_raw(spans.data());
+    }
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(std::string("failed to write index: ") + e.what());
+  }
+}
+
+void h5features::v2::index::append(hdf5::Group &group, const std::vector<std::string> &items,
+                                   const std::vector<entry> &metadata) {
+  const auto count = items.size();
+  if (count == 0) {
+    return;
+  }
+
+  std::vector<std::size_t> sizes_data, dims_data;
+  std::vector<double> spans_data;
+  sizes_data.reserve(count);
+  dims_data.reserve(count);
+  spans_data.reserve(2 * count);
+  for (const auto &entry : metadata) {
+    sizes_data.push_back(entry.size);
+    dims_data.push_back(entry.dim);
+    spans_data.push_back(entry.span.first);
+    spans_data.push_back(entry.span.second);
+  }
+
+  try {
+    auto index_group = group.getGroup(name);
+    auto names = index_group.getDataSet("names");
+    auto sizes = index_group.getDataSet("sizes");
+    auto dims = index_group.getDataSet("dims");
+    auto spans = index_group.getDataSet("spans");
+
+    const auto position = names.getDimensions()[0];
+    names.resize({position + count});
+    sizes.resize({position + count});
+    dims.resize({position + count});
+    spans.resize({position + count, 2});
+
+    names.select({position}, {count}).write(items);
+    sizes.select({position}, {count}).write(sizes_data);
+    dims.select({position}, {count}).write(dims_data);
+    spans.select({position, 0}, {count, 2}).write_raw(spans_data.data());
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(std::string("failed to write index: ") + e.what());
+  }
+}
+
+h5features::v2::index::entry h5features::v2::index::scan(const hdf5::Group &item_group) {
+  try {
+    const auto features = item_group.getDataSet("features");
+    std::size_t dim;
+    features.getAttribute("dim").read(dim);
+
+    const auto times = item_group.getDataSet("times");
+    const auto count = times.getDimensions()[0];
+    double start, stop;
+    times.select({0}, {1}).read_raw(&start);
+    times.select({count - 1}, {1}).read_raw(&stop);
+
+    return {features.getDimensions()[0] / dim, dim, {start, stop}};
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(std::string("failed to read item metadata: ") + e.what());
+  }
+}
+
+const std::vector<std::string> &h5features::v2::index::names() const noexcept { return m_names; }
+
+const std::vector<std::size_t> &h5features::v2::index::sizes() const noexcept { return m_sizes; }
+
+const std::vector<std::size_t> &h5features::v2::index::dims() const noexcept { return m_dims; }
+
+const std::vector<std::pair<double, double>> &h5features::v2::index::spans() const noexcept { return m_spans; }
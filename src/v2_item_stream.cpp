@@ -0,0 +1,225 @@
+#include "h5features/details/v2_item_stream.h"
+#include "h5features/details/raw_dataset.h"
+#include "h5features/details/stats_recorder.h"
+#include "h5features/details/v2_writer.h"
+#include "h5features/exception.h"
+#include <algorithm>
+#include <memory>
+#include <sstream>
+#include <utility>
+
+// The maximal number of elements in a chunk of times, as for the items written
+// at once
+static constexpr std::size_t times_chunk_size = 32768;
+
+// Creates an empty 1D dataset extendable by chunks of `chunk_size` elements
+hdf5::DataSet create_extendable(hdf5::Group &group, const std::string &name, h5features::dtype dtype,
+                                std::size_t chunk_size, const h5features::compression &compression) {
+  hdf5::DataSetCreateProps props;
+  props.add(hdf5::Chunking{chunk_size});
+  compression.apply(props);
+  return group.createDataSet(name, hdf5::DataSpace({0}, {hdf5::DataSpace::UNLIMITED}),
+                             h5features::details::make_datatype(dtype), props);
+}
+
+h5features::v2::chunked_dataset::chunked_dataset(hdf5::DataSet &&dataset, h5features::dtype dtype,
+                                                 std::size_t chunk_size, const h5features::compression &compression)
+    : m_dataset{std::move(dataset)}, m_dtype{dtype}, m_chunk_size{chunk_size}, m_compression{compression}, m_offset{0},
+      m_pending{} {}
+
+h5features::details::deferred_write h5features::v2::chunked_dataset::prepare(h5features::span<const std::byte> data) {
+  const auto element_size = h5features::size_of(m_dtype);
+  const auto chunk_bytes = m_chunk_size * element_size;
+
+  // the chunks to write with their offset, the data they encode is either the
+  // buffered chunk or a view on `data`
+  auto buffered = std::make_shared<std::vector<std::byte>>();
+  std::vector<std::pair<std::size_t, std::shared_ptr<const h5features::details::raw_dataset>>> chunks;
+
+  // complete the buffered chunk
+  if (not m_pending.empty()) {
+    const auto count = std::min(chunk_bytes - m_pending.size(), data.size());
+    m_pending.insert(m_pending.end(), data.begin(), data.begin() + count);
+    data = data.subspan(count, data.size() - count);
+    if (m_pending.size() < chunk_bytes) {
+      return []() {};
+    }
+
+    buffered->swap(m_pending);
+    chunks.emplace_back(m_offset, std::make_shared<const h5features::details::raw_dataset>(
+                                      *buffered, m_dtype, m_chunk_size, m_compression));
+    m_offset += m_chunk_size;
+  }
+
+  // the whole chunks are encoded from the data, the remainder is buffered
+  const auto whole = data.size() / chunk_bytes * chunk_bytes;
+  if (whole != 0) {
+    chunks.emplace_back(m_offset, std::make_shared<const h5features::details::raw_dataset>(
+                                      data.subspan(0, whole), m_dtype, m_chunk_size, m_compression));
+    m_offset += whole / element_size;
+  }
+  m_pending.assign(data.begin() + whole, data.end());
+
+  return [this, buffered, chunks]() {
+    for (const auto &[offset, chunk] : chunks) {
+      chunk->write(m_dataset, offset);
+    }
+  };
+}
+
+void h5features::v2::chunked_dataset::flush() {
+  if (m_pending.empty()) {
+    return;
+  }
+
+  const h5features::details::raw_dataset chunk{m_pending, m_dtype, m_chunk_size, m_compression};
+  chunk.write(m_dataset, m_offset);
+  m_offset += m_pending.size() / h5features::size_of(m_dtype);
+  m_pending.clear();
+}
+
+hdf5::DataSet &h5features::v2::chunked_dataset::dataset() noexcept { return m_dataset; }
+
+h5features::v2::item_stream::item_stream(h5features::v2::writer &writer, const std::string &name, std::size_t dim,
+                                         h5features::times::format format, h5features::dtype dtype)
+    : m_writer{writer}, m_name{name}, m_dim{dim}, m_dim_times{format == h5features::times::format::simple ? 1UL : 2UL},
+      m_dtype{dtype}, m_group{}, m_features{}, m_times{}, m_index{m_dim_times}, m_size{0}, m_first{}, m_last{} {
+  if (m_name.empty()) {
+    throw h5features::exception("item name must not be empty");
+  }
+  if (m_dim == 0) {
+    throw h5features::exception("features dimension must be strictly positive");
+  }
+
+  // the length of the item is not known, the features chunks have the target
+  // size of the chunking policy whatever the access
+  const auto frame_bytes = m_dim * h5features::size_of(m_dtype);
+  const auto features_chunk_size = m_dim * std::max<std::size_t>(m_writer.m_chunking.target_bytes() / frame_bytes, 1);
+
+  m_group.emplace(m_writer.create_item(m_name, m_dim, m_dim_times));
+  try {
+    m_times.emplace(
+        create_extendable(*m_group, "times", h5features::dtype::float64, times_chunk_size, m_writer.m_compression),
+        h5features::dtype::float64, times_chunk_size, m_writer.m_compression);
+    m_features.emplace(create_extendable(*m_group, "features", m_dtype, features_chunk_size, m_writer.m_compression),
+                       m_dtype, features_chunk_size, m_writer.m_compression);
+  } catch (const hdf5::Exception &e) {
+    abort();
+    throw h5features::exception(std::string("failed to create item: ") + e.what());
+  }
+}
+
+const std::string &h5features::v2::item_stream::name() const noexcept { return m_name; }
+
+std::size_t h5features::v2::item_stream::size() const noexcept { return m_size; }
+
+bool h5features::v2::item_stream::closed() const noexcept { return not m_group.has_value(); }
+
+h5features::details::deferred_write h5features::v2::item_stream::prepare(const h5features::features &features,
+                                                                         const h5features::times &times) {
+  if (closed()) {
+    throw h5features::exception("appender is closed");
+  }
+  if (features.dim() != m_dim) {
+    std::stringstream msg;
+    msg << "features dimension is " << features.dim() << ", expected " << m_dim;
+    throw h5features::exception(msg.str());
+  }
+  if (features.get_dtype() != m_dtype) {
+    std::stringstream msg;
+    msg << "features dtype is " << features.get_dtype() << ", expected " << m_dtype;
+    throw h5features::exception(msg.str());
+  }
+  if (times.dim() != m_dim_times) {
+    std::stringstream msg;
+    msg << "times dimension is " << times.dim() << ", expected " << m_dim_times;
+    throw h5features::exception(msg.str());
+  }
+  if (times.size() != features.size()) {
+    throw h5features::exception("times and features must have the same size");
+  }
+  if (times.size() == 0) {
+    return []() {};
+  }
+
+  // the timestamps are sorted within the block, they must follow the ones
+  // already appended
+  const auto data = times.data();
+  if (not m_last.empty() and (data[0] < m_last.front() or data[m_dim_times - 1] < m_last.back())) {
+    throw h5features::exception("timestamps must be sorted in increasing order");
+  }
+
+  const h5features::details::stats_timer timer{&h5features::stats::compress};
+  auto write_times = m_times->prepare({reinterpret_cast<const std::byte *>(data.data()), data.size() * sizeof(double)});
+  auto write_features = m_features->prepare(features.bytes());
+
+  m_index.append(times);
+  if (m_first.empty()) {
+    m_first.assign(data.begin(), data.begin() + m_dim_times);
+  }
+  m_last.assign(data.end() - m_dim_times, data.end());
+  m_size += times.size();
+
+  return [this, write_times, write_features]() {
+    if (closed()) {
+      throw h5features::exception("appender is closed");
+    }
+
+    try {
+      {
+        const h5features::details::stats_timer timer{&h5features::stats::write_times};
+        write_times();
+      }
+      const h5features::details::stats_timer timer{&h5features::stats::write_features};
+      write_features();
+    } catch (const hdf5::Exception &e) {
+      abort();
+      throw h5features::exception(std::string("failed to append to item: ") + e.what());
+    } catch (...) {
+      abort();
+      throw;
+    }
+  };
+}
+
+void h5features::v2::item_stream::close(const h5features::properties &properties) {
+  if (closed()) {
+    throw h5features::exception("appender is closed");
+  }
+  if (m_size == 0) {
+    throw h5features::exception("item must not be empty");
+  }
+
+  try {
+    m_times->flush();
+    m_features->flush();
+    m_writer.finalize_item(m_name, *m_group, m_features->dataset(), m_times->dataset(), m_index, properties, m_size,
+                           {m_first.front(), m_last.back()});
+  } catch (const hdf5::Exception &e) {
+    abort();
+    throw h5features::exception(std::string("failed to close item: ") + e.what());
+  } catch (...) {
+    abort();
+    throw;
+  }
+  release();
+}
+
+void h5features::v2::item_stream::abort() {
+  if (closed()) {
+    return;
+  }
+
+  release();
+  try {
+    m_writer.m_group.unlink(m_name);
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception("failed to discard item '" + m_name + "': " + e.what());
+  }
+}
+
+void h5features::v2::item_stream::release() {
+  m_features.reset();
+  m_times.reset();
+  m_group.reset();
+}
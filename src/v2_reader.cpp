@@ -1,48 +1,104 @@
 #include "h5features/details/v2_reader.h"
+#include "h5features/details/mapped_file.h"
 #include "h5features/details/properties_reader.h"
+#include "h5features/details/raw_dataset.h"
+#include "h5features/details/stats_recorder.h"
+#include "h5features/details/time_index.h"
+#include <algorithm>
+#include <memory>
+#include <optional>
 #include <string>
 #include <unordered_map>
 #include <utility>
 #include <vector>
 
+// ensure the dataset `name` exists in the group
+void check_dataset(const hdf5::Group &group, const std::string &name) {
+  if (not group.exist(name)) {
+    throw h5features::exception("object '" + name + "' does not exist in the group");
+  }
+  if (hdf5::ObjectType::Dataset != group.getObjectType(name)) {
+    throw h5features::exception("object '" + name + "' is not a dataset in the group");
+  }
+}
+
+std::size_t read_features_dim(const hdf5::DataSet &dataset) {
+  std::size_t dim;
+  dataset.getAttribute("dim").read(dim);
+  return dim;
+}
+
+h5features::times::format read_times_format(const hdf5::DataSet &dataset) {
+  static const std::unordered_map<std::string, h5features::times::format> format_name{
+      {"simple", h5features::times::format::simple}, {"interval", h5features::times::format::interval}};
+  std::string format;
+  dataset.getAttribute("format").read(format);
+  return format_name.at(format);
+}
+
+// A mapping of the file being read, null when the file is not memory mapped
+using mapping_ptr = std::shared_ptr<const h5features::details::mapped_file>;
+
+// Returns the features of a dataset viewed from the mapped file, if possible
+std::optional<h5features::features> map_features(const hdf5::DataSet &dataset, const mapping_ptr &mapping) {
+  if (mapping) {
+    const auto dtype = h5features::details::read_dtype(dataset);
+    if (const auto bytes = mapping->view(dataset, dtype)) {
+      return h5features::features{bytes.value(), dtype, read_features_dim(dataset), mapping, false};
+    }
+  }
+  return std::nullopt;
+}
+
+// Returns the times of a dataset viewed from the mapped file, if possible
+std::optional<h5features::times> map_times(const hdf5::DataSet &dataset, const mapping_ptr &mapping) {
+  if (mapping) {
+    if (const auto bytes = mapping->view(dataset, h5features::dtype::float64)) {
+      return h5features::times{{reinterpret_cast<const double *>(bytes->data()), bytes->size() / sizeof(double)},
+                               read_times_format(dataset),
+                               mapping,
+                               false};
+    }
+  }
+  return std::nullopt;
+}
+
 class features_reader {
 public:
+  features_reader(const mapping_ptr &mapping) : m_mapping{mapping} {}
+
   h5features::features read(const hdf5::Group &group) const {
-    // ensure the dataset "features" exists in the group
-    if (not group.exist("features")) {
-      throw h5features::exception("object 'features' does not exist in the group");
-    }
-    if (hdf5::ObjectType::Dataset != group.getObjectType("features")) {
-      throw h5features::exception("object 'features' is not a dataset in the group");
-    }
+    const h5features::details::stats_timer timer{&h5features::stats::read_features};
+    check_dataset(group, "features");
 
     try {
       return concrete_read(group);
+    } catch (const h5features::exception &) {
+      throw;
     } catch (...) {
       throw h5features::exception("failed to read 'features' in the group");
     }
   }
 
 protected:
-  inline std::size_t dim(const hdf5::DataSet &dataset) const {
-    std::size_t dim;
-    dataset.getAttribute("dim").read(dim);
-    return dim;
-  }
+  mapping_ptr m_mapping;
 
   virtual h5features::features concrete_read(const hdf5::Group &group) const {
     const auto dataset = group.getDataSet("features");
-
-    std::vector<double> data;
-    dataset.read(data);
-
-    return {std::move(data), dim(dataset), false};
+    auto features = map_features(dataset, m_mapping);
+    if (not features) {
+      features.emplace(h5features::details::raw_dataset(dataset, h5features::details::read_dtype(dataset))
+                           .decode_features(read_features_dim(dataset)));
+    }
+    h5features::details::record_read(dataset, features->bytes().size());
+    return std::move(features.value());
   }
 };
 
 class features_partial_reader : public features_reader {
 public:
-  features_partial_reader(const std::pair<std::size_t, std::size_t> &indices) : m_indices{indices} {
+  features_partial_reader(const std::pair<std::size_t, std::size_t> &indices, const mapping_ptr &mapping)
+      : features_reader{mapping}, m_indices{indices} {
     if (m_indices.first >= m_indices.second) {
       throw h5features::exception("partial read failed, invalid indices: start >= stop");
     }
@@ -54,7 +110,7 @@ private:
   h5features::features concrete_read(const hdf5::Group &group) const override {
     const auto dataset = group.getDataSet("features");
     const auto size = dataset.getDimensions()[0];
-    const auto dim = this->dim(dataset);
+    const auto dim = read_features_dim(dataset);
 
     const auto offset = m_indices.first * dim;
     if (offset >= size) {
@@ -66,46 +122,109 @@ private:
       throw h5features::exception("partial read failed, invalid indices: stop > size");
     }
 
-    std::vector<double> data;
-    dataset.select({offset}, {count}).read(data);
-    return {std::move(data), dim, false};
+    const auto dtype = h5features::details::read_dtype(dataset);
+    h5features::details::record_read(dataset, count * h5features::size_of(dtype));
+    if (m_mapping) {
+      if (const auto bytes = m_mapping->view(dataset, dtype)) {
+        const auto element_size = h5features::size_of(dtype);
+        return {bytes->subspan(offset * element_size, count * element_size), dtype, dim, m_mapping, false};
+      }
+    }
+    return h5features::details::read_features(dataset.select({offset}, {count}), dtype, dim);
   }
 };
 
-h5features::times read_times(const hdf5::Group &group) {
-  // ensure the dataset "times" exists in the group
-  if (not group.exist("times")) {
-    throw h5features::exception("object 'times' does not exist in the group");
-  }
-  if (hdf5::ObjectType::Dataset != group.getObjectType("times")) {
-    throw h5features::exception("object 'times' is not a dataset in the group");
-  }
+h5features::times read_times(const hdf5::Group &group, const mapping_ptr &mapping) {
+  const h5features::details::stats_timer timer{&h5features::stats::read_times};
+  check_dataset(group, "times");
 
   // read the "times" dataset as a times instance
   try {
     const auto dataset = group.getDataSet("times");
+    h5features::details::record_read(dataset, dataset.getElementCount() * sizeof(double));
+    if (auto times = map_times(dataset, mapping)) {
+      return std::move(times.value());
+    }
 
-    // read data
     std::vector<double> data;
     dataset.read(data);
-
-    // read format
-    const std::unordered_map<std::string, h5features::times::format> format_name{
-        {"simple", h5features::times::format::simple}, {"interval", h5features::times::format::interval}};
-    std::string f;
-    dataset.getAttribute("format").read(f);
-    return {data, format_name.at(f), false};
+    return {std::move(data), read_times_format(dataset), false};
   } catch (...) {
     throw h5features::exception("failed to read 'times' in the group");
   }
 }
 
+// Returns the times of the frames that may be within the time intervals, along
+// with the index of their first frame. When the times are indexed, only the
+// timestamps of the frames located by the index are read.
+std::pair<h5features::times, std::size_t> read_candidate_times(const hdf5::Group &group,
+                                                               const std::vector<std::pair<double, double>> &intervals,
+                                                               const mapping_ptr &mapping) {
+  if (not mapping) {
+    const h5features::details::stats_timer timer{&h5features::stats::read_times};
+    check_dataset(group, "times");
+
+    std::optional<std::pair<h5features::times, std::size_t>> candidates;
+    try {
+      const auto dataset = group.getDataSet("times");
+      const auto format = read_times_format(dataset);
+      const std::size_t dim = format == h5features::times::format::simple ? 1 : 2;
+      if (const auto index = h5features::details::time_index::read(dataset, dataset.getElementCount() / dim, dim)) {
+        // the frames located for all the intervals
+        std::size_t first = dataset.getElementCount() / dim;
+        std::size_t last = 0;
+        for (const auto &[start, stop] : intervals) {
+          const auto range = index->search(start, stop);
+          if (range.first < range.second) {
+            first = std::min(first, range.first);
+            last = std::max(last, range.second);
+          }
+        }
+        first = std::min(first, last);
+
+        std::vector<double> data((last - first) * dim);
+        h5features::details::record_read(dataset, data.size() * sizeof(double));
+        if (not data.empty()) {
+          dataset.select({first * dim}, {data.size()}).read_raw(data.data());
+        }
+        candidates.emplace(h5features::times{std::move(data), format, false}, first);
+      }
+    } catch (...) {
+      throw h5features::exception("failed to read 'times' in the group");
+    }
+
+    if (candidates.has_value()) {
+      return std::move(candidates.value());
+    }
+  }
+
+  // the times are not indexed or mapped in memory
+  return {read_times(group, mapping), 0};
+}
+
 class item_reader {
 public:
-  item_reader(bool ignore_properties) : m_ignore_properties{ignore_properties} {}
+  item_reader(bool ignore_properties, const mapping_ptr &mapping)
+      : m_ignore_properties{ignore_properties}, m_mapping{mapping} {}
 
   h5features::item read(const hdf5::Group &group, const std::string &name) const {
-    // ensure the dataset exists in the group
+    const auto item_group = open_group(group, name);
+
+    // read and return the item
+    try {
+      return concrete_read(item_group, name);
+    } catch (...) {
+      rethrow(name);
+    }
+  }
+
+protected:
+  bool m_ignore_properties;
+
+  mapping_ptr m_mapping;
+
+  // ensure the item exists in the group
+  static void check_group(const hdf5::Group &group, const std::string &name) {
     if (not group.exist(name)) {
       std::stringstream msg;
       msg << "object '" << name << "' does not exist in the group";
@@ -117,10 +236,23 @@ public:
       msg << "object '" << name << "' is not a group";
       throw h5features::exception(msg.str());
     }
+  }
 
-    // read and return the item
+  // open the group of an item
+  static hdf5::Group open_group(const hdf5::Group &group, const std::string &name) {
+    const h5features::details::stats_timer timer{&h5features::stats::open_group};
+    check_group(group, name);
     try {
-      return concrete_read(group.getGroup(name), name);
+      return group.getGroup(name);
+    } catch (...) {
+      rethrow(name);
+    }
+  }
+
+  // rethrow the current exception, prefixed by the item name
+  [[noreturn]] static void rethrow(const std::string &name) {
+    try {
+      throw;
     } catch (const h5features::exception &e) {
       std::stringstream msg;
       msg << "item '" << name << "': " << e.what();
@@ -132,54 +264,410 @@ public:
     }
   }
 
-protected:
-  bool m_ignore_properties;
-
-  h5features::properties read_properties(const hdf5::Group &group) const {
-    h5features::properties properties;
+  h5features::item::lazy_properties read_properties(const hdf5::Group &group) const {
     if (not m_ignore_properties and group.exist("properties")) {
-      hdf5::Group properties_group = group.getGroup("properties");
-      properties = h5features::details::read_properties(properties_group);
+      const h5features::details::stats_timer timer{&h5features::stats::read_properties};
+      return h5features::details::read_lazy_properties(group, "properties");
     }
-    return properties;
+    return h5features::item::lazy_properties{nullptr};
   }
 
   virtual h5features::item concrete_read(const hdf5::Group &group, const std::string &name) const {
-    return {name, features_reader().read(group), read_times(group), read_properties(group), false};
+    return {name, features_reader(m_mapping).read(group), read_times(group, m_mapping), read_properties(group), false};
   }
 };
 
 class item_partial_reader : public item_reader {
 public:
-  item_partial_reader(bool ignore_properties, double start, double stop)
-      : item_reader{ignore_properties}, m_start{start}, m_stop{stop} {}
+  item_partial_reader(bool ignore_properties, double start, double stop, const mapping_ptr &mapping)
+      : item_reader{ignore_properties, mapping}, m_start{start}, m_stop{stop} {}
 
 private:
   double m_start;
   double m_stop;
 
   h5features::item concrete_read(const hdf5::Group &group, const std::string &name) const override {
-    auto times = read_times(group);
+    const auto [times, offset] = read_candidate_times(group, {{m_start, m_stop}}, m_mapping);
     try {
-      auto indices = times.get_indices(m_start, m_stop);
-      return {name, features_partial_reader(indices).read(group), times.select(indices.first, indices.second),
-              read_properties(group), false};
+      const auto indices = times.get_indices(m_start, m_stop);
+      return {name, features_partial_reader({offset + indices.first, offset + indices.second}, m_mapping).read(group),
+              times.select(indices.first, indices.second), read_properties(group), false};
     } catch (const h5features::exception &) {
       throw h5features::exception("partial read is empty");
     }
   }
 };
 
-h5features::v2::reader::reader(hdf5::Group &&group, h5features::version version)
-    : h5features::details::reader_interface{std::move(group), version} {}
+class segments_reader : public item_reader {
+public:
+  segments_reader(bool ignore_properties, const std::vector<std::pair<double, double>> &intervals,
+                  const mapping_ptr &mapping)
+      : item_reader{ignore_properties, mapping}, m_intervals{intervals} {}
+
+  // Read the frames of an item within each interval
+  std::vector<h5features::item> read_segments(const hdf5::Group &group, const std::string &name) const {
+    const auto item_group = open_group(group, name);
+
+    try {
+      return concrete_read_segments(item_group, name);
+    } catch (...) {
+      rethrow(name);
+    }
+  }
+
+private:
+  std::vector<std::pair<double, double>> m_intervals;
+
+  std::vector<h5features::item> concrete_read_segments(const hdf5::Group &group, const std::string &name) const {
+    // the times are read once for all the intervals
+    const auto [times, offset] = read_candidate_times(group, m_intervals, m_mapping);
+    std::vector<std::pair<std::size_t, std::size_t>> indices;
+    indices.reserve(m_intervals.size());
+    for (const auto &[start, stop] : m_intervals) {
+      try {
+        indices.push_back(times.get_indices(start, stop));
+      } catch (const h5features::exception &) {
+        throw h5features::exception("partial read is empty");
+      }
+    }
 
-std::vector<std::string> h5features::v2::reader::items() const { return m_group.listObjectNames(); }
+    std::vector<std::pair<std::size_t, std::size_t>> frames;
+    frames.reserve(indices.size());
+    for (const auto &[first, last] : indices) {
+      frames.emplace_back(offset + first, offset + last);
+    }
+    const auto features = read_features(group, frames);
+    const auto properties = read_properties(group);
+
+    std::vector<h5features::item> items;
+    items.reserve(m_intervals.size());
+    for (std::size_t i = 0; i < m_intervals.size(); ++i) {
+      items.emplace_back(name, h5features::features{features[i]}, times.select(indices[i].first, indices[i].second),
+                         h5features::item::lazy_properties{properties}, false);
+    }
+    return items;
+  }
+
+  // Read the features of several ranges of frames, in a single selection
+  std::vector<h5features::features>
+  read_features(const hdf5::Group &group, const std::vector<std::pair<std::size_t, std::size_t>> &frames) const {
+    const h5features::details::stats_timer timer{&h5features::stats::read_features};
+    check_dataset(group, "features");
+
+    try {
+      const auto dataset = group.getDataSet("features");
+      const auto dim = read_features_dim(dataset);
+      const auto dtype = h5features::details::read_dtype(dataset);
+      const auto stop = std::max_element(frames.begin(), frames.end(), [](const auto &a, const auto &b) {
+                          return a.second < b.second;
+                        })->second;
+      if (stop * dim > dataset.getElementCount()) {
+        throw h5features::exception("partial read failed, invalid indices: stop > size");
+      }
+
+      std::size_t count = 0;
+      for (const auto &[first, last] : frames) {
+        count += last - first;
+      }
+      h5features::details::record_read(dataset, count * dim * h5features::size_of(dtype));
+
+      // view each range from the mapped file
+      if (m_mapping) {
+        if (const auto bytes = m_mapping->view(dataset, dtype)) {
+          const auto frame_bytes = dim * h5features::size_of(dtype);
+          std::vector<h5features::features> features;
+          features.reserve(frames.size());
+          for (const auto &[first, last] : frames) {
+            features.emplace_back(bytes->subspan(first * frame_bytes, (last - first) * frame_bytes), dtype, dim,
+                                  m_mapping, false);
+          }
+          return features;
+        }
+      }
+
+      return h5features::details::read_ranges(frames, [&](const auto &runs) {
+        hdf5::HyperSlab slab{hdf5::RegularHyperSlab{{runs[0].first * dim}, {(runs[0].second - runs[0].first) * dim}}};
+        for (std::size_t i = 1; i < runs.size(); ++i) {
+          slab |= hdf5::RegularHyperSlab{{runs[i].first * dim}, {(runs[i].second - runs[i].first) * dim}};
+        }
+        return h5features::details::read_features(dataset.select(slab), dtype, dim);
+      });
+    } catch (const h5features::exception &) {
+      throw;
+    } catch (...) {
+      throw h5features::exception("failed to read 'features' in the group");
+    }
+  }
+};
+
+class frames_reader : public item_reader {
+public:
+  frames_reader(const mapping_ptr &mapping) : item_reader{true, mapping} {}
+
+  // Read the features of the frames [start, stop) of an item
+  h5features::features read(const hdf5::Group &group, const std::string &name, std::size_t start,
+                            std::size_t stop) const {
+    const auto item_group = open_group(group, name);
+
+    try {
+      return features_partial_reader({start, stop}, m_mapping).read(item_group);
+    } catch (...) {
+      rethrow(name);
+    }
+  }
+};
+
+class item_into_reader : public item_reader {
+public:
+  item_into_reader() : item_reader{true, nullptr} {}
+
+  // Read the shape of an item from the metadata of its datasets
+  h5features::details::item_shape read_shape(const hdf5::Group &group, const std::string &name) const {
+    const auto item_group = open_group(group, name);
+
+    try {
+      check_dataset(item_group, "features");
+      check_dataset(item_group, "times");
+      const auto features = item_group.getDataSet("features");
+      const auto dim = read_features_dim(features);
+      const auto format = read_times_format(item_group.getDataSet("times"));
+      return {dim == 0 ? 0 : features.getElementCount() / dim, dim, h5features::details::read_dtype(features),
+              format == h5features::times::format::simple ? 1UL : 2UL};
+    } catch (...) {
+      rethrow(name);
+    }
+  }
+
+  // Read the features and times of an item into the destination buffers
+  void read_into(const hdf5::Group &group, const std::string &name, const h5features::details::item_shape &shape,
+                 std::byte *features, h5features::dtype dtype, double *times) const {
+    const auto item_group = open_group(group, name);
+
+    try {
+      {
+        const h5features::details::stats_timer timer{&h5features::stats::read_features};
+        check_dataset(item_group, "features");
+        const auto dataset = item_group.getDataSet("features");
+        if (read_features_dim(dataset) != shape.dim or dataset.getElementCount() != shape.size * shape.dim) {
+          throw h5features::exception("features do not match the expected shape");
+        }
+        h5features::details::record_read(dataset, dataset.getElementCount() *
+                                                      h5features::size_of(h5features::details::read_dtype(dataset)));
+        if (shape.size != 0) {
+          dataset.read_raw(features, h5features::details::make_datatype(dtype));
+        }
+      }
+      {
+        const h5features::details::stats_timer timer{&h5features::stats::read_times};
+        check_dataset(item_group, "times");
+        const auto dataset = item_group.getDataSet("times");
+        if (dataset.getElementCount() != shape.size * shape.times_dim) {
+          throw h5features::exception("times do not match the expected shape");
+        }
+        h5features::details::record_read(dataset, dataset.getElementCount() * sizeof(double));
+        if (shape.size != 0) {
+          dataset.read_raw(times);
+        }
+      }
+    } catch (...) {
+      rethrow(name);
+    }
+  }
+};
+
+class item_fetcher : public item_reader {
+public:
+  item_fetcher(bool ignore_properties, const mapping_ptr &mapping) : item_reader{ignore_properties, mapping} {}
+
+  // Read the raw content of the item, the returned function decodes it
+  h5features::details::deferred_item fetch(const hdf5::Group &group, const std::string &name) const {
+    const auto item_group = open_group(group, name);
+
+    try {
+      check_dataset(item_group, "features");
+      check_dataset(item_group, "times");
+
+      auto content = std::make_shared<raw_item>();
+      try {
+        const h5features::details::stats_timer timer{&h5features::stats::read_features};
+        const auto dataset = item_group.getDataSet("features");
+        content->mapped_features = map_features(dataset, m_mapping);
+        if (not content->mapped_features) {
+          content->features =
+              std::make_unique<h5features::details::raw_dataset>(dataset, h5features::details::read_dtype(dataset));
+          content->dim = read_features_dim(dataset);
+        }
+        h5features::details::record_read(dataset, dataset.getElementCount() *
+                                                      h5features::size_of(h5features::details::read_dtype(dataset)));
+      } catch (...) {
+        throw h5features::exception("failed to read 'features' in the group");
+      }
+      try {
+        const h5features::details::stats_timer timer{&h5features::stats::read_times};
+        const auto dataset = item_group.getDataSet("times");
+        h5features::details::record_read(dataset, dataset.getElementCount() * sizeof(double));
+        content->mapped_times = map_times(dataset, m_mapping);
+        if (not content->mapped_times) {
+          content->times = std::make_unique<h5features::details::raw_dataset>(dataset);
+          content->format = read_times_format(dataset);
+        }
+      } catch (...) {
+        throw h5features::exception("failed to read 'times' in the group");
+      }
+      content->properties = read_properties(item_group);
+
+      return [name, content]() { return decode(name, *content); };
+    } catch (...) {
+      rethrow(name);
+    }
+  }
+
+private:
+  // The content of an item read from file
+  struct raw_item {
+    std::unique_ptr<h5features::details::raw_dataset> features;
+    std::size_t dim;
+    std::unique_ptr<h5features::details::raw_dataset> times;
+    h5features::times::format format;
+    std::optional<h5features::item::lazy_properties> properties;
+
+    // The features and times viewed from the mapped file, nothing to decode
+    std::optional<h5features::features> mapped_features;
+    std::optional<h5features::times> mapped_times;
+  };
+
+  // Decode an item, does not call HDF5
+  static h5features::item decode(const std::string &name, raw_item &content) {
+    try {
+      const h5features::details::stats_timer timer{&h5features::stats::decompress};
+      std::optional<h5features::features> features = std::move(content.mapped_features);
+      if (not features) {
+        try {
+          features.emplace(content.features->decode_features(content.dim));
+        } catch (...) {
+          throw h5features::exception("failed to read 'features' in the group");
+        }
+      }
+
+      std::optional<h5features::times> times = std::move(content.mapped_times);
+      if (not times) {
+        try {
+          times.emplace(content.times->decode<double>(), content.format, false);
+        } catch (...) {
+          throw h5features::exception("failed to read 'times' in the group");
+        }
+      }
+
+      return {name, std::move(features.value()), std::move(times.value()), std::move(content.properties.value()),
+              false};
+    } catch (...) {
+      rethrow(name);
+    }
+  }
+};
+
+h5features::v2::reader::reader(hdf5::Group &&group, h5features::version version,
+                               std::shared_ptr<const h5features::details::mapped_file> mapping)
+    : h5features::details::reader_interface{std::move(group), version}, m_index{h5features::v2::index::load(m_group)},
+      m_mapping{std::move(mapping)} {}
+
+std::vector<std::string> h5features::v2::reader::items() const {
+  if (m_index.has_value()) {
+    return m_index->names();
+  }
+
+  auto names = m_group.listObjectNames();
+  names.erase(std::remove(names.begin(), names.end(), h5features::v2::index::name), names.end());
+  return names;
+}
+
+std::vector<std::size_t> h5features::v2::reader::sizes() const {
+  if (m_index.has_value()) {
+    return m_index->sizes();
+  }
+
+  // no index, read the metadata of each item
+  std::vector<std::size_t> sizes;
+  for (const auto &name : items()) {
+    sizes.push_back(h5features::v2::index::scan(m_group.getGroup(name)).size);
+  }
+  return sizes;
+}
+
+std::vector<std::size_t> h5features::v2::reader::dims() const {
+  if (m_index.has_value()) {
+    return m_index->dims();
+  }
+
+  // no index, read the metadata of each item
+  std::vector<std::size_t> dims;
+  for (const auto &name : items()) {
+    dims.push_back(h5features::v2::index::scan(m_group.getGroup(name)).dim);
+  }
+  return dims;
+}
+
+std::vector<std::pair<double, double>> h5features::v2::reader::time_spans() const {
+  if (m_index.has_value()) {
+    return m_index->spans();
+  }
+
+  // no index, read the metadata of each item
+  std::vector<std::pair<double, double>> spans;
+  for (const auto &name : items()) {
+    spans.push_back(h5features::v2::index::scan(m_group.getGroup(name)).span);
+  }
+  return spans;
+}
 
 h5features::item h5features::v2::reader::read_item(const std::string &name, bool ignore_properties) const {
-  return item_reader(ignore_properties).read(m_group, name);
+  return item_reader(ignore_properties, m_mapping).read(m_group, name);
+}
+
+void h5features::v2::reader::retain_features(const std::string &name) const {
+  if (m_retained and m_retained_name == name) {
+    return;
+  }
+
+  m_retained.reset();
+  m_retained_name.clear();
+  const hdf5::SilenceHDF5 silencer;
+  try {
+    m_retained = m_group.getGroup(name).getDataSet("features");
+    m_retained_name = name;
+  } catch (const hdf5::Exception &) {
+    // the item is not valid, the error is reported by the read itself
+  }
 }
 
 h5features::item h5features::v2::reader::read_item(const std::string &name, double start, double stop,
                                                    bool ignore_properties) const {
-  return item_partial_reader(ignore_properties, start, stop).read(m_group, name);
+  retain_features(name);
+  return item_partial_reader(ignore_properties, start, stop, m_mapping).read(m_group, name);
+}
+
+h5features::features h5features::v2::reader::read_frames(const std::string &name, std::size_t start,
+                                                         std::size_t stop) const {
+  retain_features(name);
+  return frames_reader(m_mapping).read(m_group, name, start, stop);
+}
+
+h5features::details::item_shape h5features::v2::reader::read_shape(const std::string &name) const {
+  return item_into_reader().read_shape(m_group, name);
+}
+
+void h5features::v2::reader::read_item_into(const std::string &name, const h5features::details::item_shape &shape,
+                                            std::byte *features, h5features::dtype dtype, double *times) const {
+  item_into_reader().read_into(m_group, name, shape, features, dtype, times);
+}
+
+h5features::details::deferred_item h5features::v2::reader::fetch_item(const std::string &name,
+                                                                      bool ignore_properties) const {
+  return item_fetcher(ignore_properties, m_mapping).fetch(m_group, name);
+}
+
+std::vector<h5features::item> h5features::v2::reader::read_item_segments(
+    const std::string &name, const std::vector<std::pair<double, double>> &intervals, bool ignore_properties) const {
+  retain_features(name);
+  return segments_reader(ignore_properties, intervals, m_mapping).read_segments(m_group, name);
 }
@@ -1,75 +1,115 @@
 #include "h5features/details/v2_writer.h"
 #include "h5features/details/properties_writer.h"
+#include "h5features/details/stats_recorder.h"
+#include "h5features/details/time_index.h"
+#include "h5features/details/v2_index.h"
+#include "h5features/details/v2_item_stream.h"
 #include <algorithm>
+#include <memory>
 #include <string>
 #include <unordered_map>
+#include <unordered_set>
 #include <utility>
 
-void write_features(const h5features::features &features, hdf5::Group &group, bool compress) {
+// The maximal number of items buffered before being appended to the index
+static constexpr std::size_t max_pending_index = 4096;
+
+// The features can be read partially so chunking is important here. The number
+// of frames in a chunk depends on the chunking policy, see
+// `h5features::chunking`. Note that a frame is never split into several chunks.
+std::size_t features_chunk_size(const h5features::features &features, const h5features::chunking &chunking) {
+  return features.dim() * chunking.frames(features.size(), features.dim() * h5features::size_of(features.get_dtype()));
+}
+
+// compression is only implemented for chunked data. The times are always read
+// entirely so chunking is not critical here. We use a maximal chunk of 2**15
+// leading to a maximal chunk size of 524kB (2**15 * 2 channels * 8 bytes) (by
+// default the HDF5 chunk cache is 1MB per dataset).
+std::size_t times_chunk_size(const h5features::times &times, const h5features::compression &compression) {
+  return compression.enabled() ? std::min<std::size_t>(times.size() * times.dim(), 32768UL) : 0;
+}
+
+void write_features(const h5features::details::raw_dataset &features, std::size_t dim, std::size_t bytes,
+                    hdf5::Group &group) {
+  const h5features::details::stats_timer timer{&h5features::stats::write_features};
+
   // ensure the dataset "features" does not exist in the group
   if (group.exist("features")) {
     throw h5features::exception("object 'features' already exists in the group");
   }
 
-  // The features can be read partially so chunking is important here. We
-  // choose a relatively little chunk of 128. This leads to a chunk size of
-  // 128*8 = 1kB per dimension. Note that a frame is never split into several
-  // chunks.
-  hdf5::DataSetCreateProps props;
-  props.add(hdf5::Chunking{features.dim() * std::min<std::size_t>(features.size(), 128UL)});
-  if (compress) {
-    props.add(hdf5::Deflate{9});
-  }
-
   // create the features dataset and write to it
   try {
-    auto dataset = group.createDataSet<double>("features", hdf5::DataSpace::From(features.data()), props);
-    dataset.write(features.data());
-    dataset.createAttribute("dim", features.dim());
+    auto dataset = features.write(group, "features");
+    dataset.createAttribute("dim", dim);
+    if (h5features::details::recording_stats()) {
+      H5Dflush(dataset.getId());
+      h5features::details::record_written(bytes, dataset.getStorageSize());
+    }
   } catch (const hdf5::Exception &e) {
     throw h5features::exception(std::string("failed to write features: ") + e.what());
   }
 }
 
-void write_times(const h5features::times &times, hdf5::Group &group, bool compress) {
+void write_times_attributes(hdf5::DataSet &dataset, std::size_t dim, const h5features::details::time_index &index) {
+  // write format
+  static const std::unordered_map<std::size_t, std::string> format_name{{1, "simple"}, {2, "interval"}};
+  dataset.createAttribute("format", format_name.at(dim));
+
+  // write the index of long times
+  index.write(dataset);
+}
+
+void write_times(const h5features::details::raw_dataset &times, std::size_t dim,
+                 const h5features::details::time_index &index, hdf5::Group &group) {
+  const h5features::details::stats_timer timer{&h5features::stats::write_times};
+
   // ensure the dataset "times" does not exist in the group
   if (group.exist("times")) {
     throw h5features::exception("object 'times' already exists in the group");
   }
 
-  // compression is only implemented for chunked data. The times are always
-  // read entirely so chunking is not critical here. We use a maximal chunk of
-  // 2**15 leading to a maximal chunk size of 524kB (2**15 * 2 channels * 8
-  // bytes) (by default the HDF5 chunk cache is 1MB per dataset).
-  hdf5::DataSetCreateProps props;
-  if (compress) {
-    props.add(hdf5::Chunking{std::min<std::size_t>(times.size() * times.dim(), 32768UL)});
-    props.add(hdf5::Deflate{9});
-  }
-
   // create the times dataset and write to it
   try {
-    // write data
-    auto dataset = group.createDataSet<double>("times", hdf5::DataSpace::From(times.data()), props);
-    dataset.write(times.data());
+    auto dataset = times.write(group, "times");
+    write_times_attributes(dataset, dim, index);
 
-    // write format
-    static const std::unordered_map<std::size_t, std::string> format_name{{1, "simple"}, {2, "interval"}};
-    dataset.createAttribute("format", format_name.at(times.dim()));
+    if (h5features::details::recording_stats()) {
+      H5Dflush(dataset.getId());
+      h5features::details::record_written(dataset.getElementCount() * sizeof(double), dataset.getStorageSize());
+    }
   } catch (...) {
     throw h5features::exception("failed to write times");
   }
 }
 
-void write_properties(const h5features::properties &properties, hdf5::Group &group, bool compress) {
-  if (properties.size() != 0) {
+void write_properties(const h5features::properties &properties, const std::optional<std::vector<std::byte>> &encoded,
+                      hdf5::Group &group, bool compress) {
+  if (not encoded.has_value() and properties.size() == 0) {
+    return;
+  }
+
+  const h5features::details::stats_timer timer{&h5features::stats::write_properties};
+  if (encoded.has_value()) {
+    h5features::details::write_properties(encoded.value(), group, "properties", compress);
+  } else if (properties.size() != 0) {
     hdf5::Group properties_group = group.createGroup("properties");
     h5features::details::write_properties(properties, properties_group, compress);
   }
 }
 
-h5features::v2::writer::writer(hdf5::Group &&group, bool compress, h5features::version version)
-    : h5features::details::writer_interface{std::move(group), compress, version}, m_dim_features{}, m_dim_times{} {
+h5features::v2::writer::writer(hdf5::Group &&group, const h5features::compression &compression,
+                               const h5features::chunking &chunking, bool index, h5features::version version,
+                               bool compact_properties)
+    : h5features::details::writer_interface{std::move(group), compression, chunking, version, compact_properties},
+      m_index{index}, m_pending_names{}, m_pending_entries{}, m_dim_features{}, m_dim_times{} {
+  // an existing index must be kept up to date
+  if (m_index) {
+    h5features::v2::index::create(m_group);
+  } else {
+    m_index = m_group.exist(h5features::v2::index::name);
+  }
+
   if (m_group.hasAttribute("dim_features")) {
     std::size_t dim;
     m_group.getAttribute("dim_features").read(dim);
@@ -83,51 +123,166 @@ h5features::v2::writer::writer(hdf5::Group &&group, bool compress, h5features::v
   }
 }
 
-void h5features::v2::writer::write(const h5features::item &item) {
+void h5features::v2::writer::write(const h5features::item &item) { prepare(item)(); }
+
+h5features::details::deferred_write h5features::v2::writer::prepare(const h5features::item &item) {
+  return prepare(item.name(), item.features(), item.times(), item.properties());
+}
+
+void h5features::v2::writer::check_concatenated(const h5features::details::concatenated_items &items) {
+  std::unordered_set<std::string> names;
+  for (const auto &name : items.names) {
+    try {
+      check_name(name);
+      if (not names.insert(name).second) {
+        throw h5features::exception("item already exists in the group");
+      }
+    } catch (const h5features::exception &e) {
+      throw h5features::exception("cannot write item '" + name + "': " + e.what());
+    }
+  }
+
+  check_dim_features(items.features.dim());
+  check_dim_times(items.times.dim());
+}
+
+h5features::details::deferred_write
+h5features::v2::writer::prepare(const h5features::details::concatenated_items &items, std::size_t i) {
+  // the items are written from views on the concatenated data
+  return prepare(items.names[i], items.features_of(i), items.times_of(i), items.properties_of(i));
+}
+
+void h5features::v2::writer::flush() {
+  h5features::v2::index::append(m_group, m_pending_names, m_pending_entries);
+  m_pending_names.clear();
+  m_pending_entries.clear();
+}
+
+h5features::details::deferred_write h5features::v2::writer::prepare(const std::string &name,
+                                                                    const h5features::features &features,
+                                                                    const h5features::times &times,
+                                                                    const h5features::properties &properties) {
+  // compress the features and times and index the times, without calling HDF5
+  const h5features::details::stats_timer timer{&h5features::stats::compress};
+  auto raw_features = std::make_shared<const h5features::details::raw_dataset>(
+      features.bytes(), features.get_dtype(), features_chunk_size(features, m_chunking), m_compression);
+  auto raw_times = std::make_shared<const h5features::details::raw_dataset>(
+      times.data(), times_chunk_size(times, m_compression), m_compression);
+  auto index = std::make_shared<const h5features::details::time_index>(times);
+  auto encoded_properties = std::make_shared<std::optional<std::vector<std::byte>>>();
+  if (m_compact_properties and properties.size() != 0) {
+    encoded_properties->emplace(h5features::details::encode_properties(properties));
+  }
+
+  // the features, times and properties are views or references, copied cheaply
+  return [this, name, features, times, &properties, raw_features, raw_times, index, encoded_properties]() {
+    commit(name, features, times, properties, *raw_features, *raw_times, *index, *encoded_properties);
+  };
+}
+
+void h5features::v2::writer::commit(const std::string &name, const h5features::features &features,
+                                    const h5features::times &times, const h5features::properties &properties,
+                                    const h5features::details::raw_dataset &raw_features,
+                                    const h5features::details::raw_dataset &raw_times,
+                                    const h5features::details::time_index &index,
+                                    const std::optional<std::vector<std::byte>> &encoded_properties) {
+  // write the item to file
+  hdf5::Group item_group = create_item(name, features.dim(), times.dim());
+  write_times(raw_times, times.dim(), index, item_group);
+  write_features(raw_features, features.dim(), features.bytes().size(), item_group);
+  write_properties(properties, encoded_properties, item_group, m_compression.enabled());
+
+  append_index(name, {times.size(), features.dim(), {times.start(), times.stop()}});
+}
+
+std::unique_ptr<h5features::details::item_stream> h5features::v2::writer::open_item(const std::string &name,
+                                                                                    std::size_t dim,
+                                                                                    h5features::times::format format,
+                                                                                    h5features::dtype dtype) {
+  return std::make_unique<h5features::v2::item_stream>(*this, name, dim, format, dtype);
+}
+
+hdf5::Group h5features::v2::writer::create_item(const std::string &name, std::size_t dim, std::size_t dim_times) {
+  check_name(name);
+
+  // ensure the features and times have consistent dimension in the group
+  check_dim_features(dim);
+  check_dim_times(dim_times);
+
+  return m_group.createGroup(name);
+}
+
+void h5features::v2::writer::check_name(const std::string &name) const {
+  if (name == h5features::v2::index::name) {
+    throw h5features::exception("item name '" + name + "' is reserved");
+  }
+
   // ensure the item does not exist in the group
-  if (m_group.exist(item.name())) {
+  if (m_group.exist(name)) {
     throw h5features::exception("item already exists in the group");
   }
+}
 
-  // ensure the features and times have consistent dimension in the group
-  check_dim_features(item);
-  check_dim_times(item);
+void h5features::v2::writer::finalize_item(const std::string &name, hdf5::Group &item_group, hdf5::DataSet &features,
+                                           hdf5::DataSet &times, const h5features::details::time_index &index,
+                                           const h5features::properties &properties, std::size_t size,
+                                           const std::pair<double, double> &span) {
+  const std::size_t dim = features.getElementCount() / size;
+  try {
+    features.createAttribute("dim", dim);
+    write_times_attributes(times, times.getElementCount() / size, index);
+  } catch (const hdf5::Exception &e) {
+    throw h5features::exception(std::string("failed to write item attributes: ") + e.what());
+  }
 
-  // write the item to file
-  hdf5::Group item_group = m_group.createGroup(item.name());
-  write_times(item.times(), item_group, m_compress);
-  write_features(item.features(), item_group, m_compress);
-  write_properties(item.properties(), item_group, m_compress);
+  std::optional<std::vector<std::byte>> encoded_properties;
+  if (m_compact_properties and properties.size() != 0) {
+    encoded_properties.emplace(h5features::details::encode_properties(properties));
+  }
+  write_properties(properties, encoded_properties, item_group, m_compression.enabled());
+
+  append_index(name, {size, dim, span});
+}
+
+void h5features::v2::writer::append_index(const std::string &name, const h5features::v2::index::entry &entry) {
+  if (not m_index) {
+    return;
+  }
+
+  m_pending_names.push_back(name);
+  m_pending_entries.push_back(entry);
+  if (m_pending_names.size() >= max_pending_index) {
+    flush();
+  }
 }
 
-void h5features::v2::writer::check_dim_features(const h5features::item &item) {
+void h5features::v2::writer::check_dim_features(std::size_t dim) {
   if (m_dim_features.has_value()) {
-    if (m_dim_features.value() != item.dim()) {
+    if (m_dim_features.value() != dim) {
       std::stringstream msg;
       msg << "dimension of existing features is " << m_dim_features.value() << ", cannot write features of dimension "
-          << item.dim();
+          << dim;
       throw h5features::exception(msg.str());
     }
   } else {
     // first item, setup the features dimension and write them as attribute in
     // the group
-    m_dim_features.emplace(item.dim());
-    m_group.createAttribute("dim_features", item.dim());
+    m_dim_features.emplace(dim);
+    m_group.createAttribute("dim_features", dim);
   }
 }
 
-void h5features::v2::writer::check_dim_times(const h5features::item &item) {
+void h5features::v2::writer::check_dim_times(std::size_t dim) {
   if (m_dim_times.has_value()) {
-    if (m_dim_times.value() != item.times().dim()) {
+    if (m_dim_times.value() != dim) {
       std::stringstream msg;
-      msg << "dimension of existing times is " << m_dim_times.value() << ", cannot write times of dimension "
-          << item.times().dim();
+      msg << "dimension of existing times is " << m_dim_times.value() << ", cannot write times of dimension " << dim;
       throw h5features::exception(msg.str());
     }
   } else {
     // first item, setup the timesdimension and write them as attribute in
     // the group
-    m_dim_times.emplace(item.times().dim());
-    m_group.createAttribute("dim_times", item.times().dim());
+    m_dim_times.emplace(dim);
+    m_group.createAttribute("dim_times", dim);
   }
 }
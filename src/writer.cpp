@@ -1,35 +1,54 @@
 #include "h5features/writer.h"
+#include "h5features/details/thread_pool.h"
 #include "h5features/details/v1_writer.h"
 #include "h5features/details/v2_writer.h"
 #include "h5features/exception.h"
+#include <algorithm>
+#include <atomic>
+#include <deque>
+#include <exception>
+#include <functional>
+#include <future>
+#include <iostream>
 #include <memory>
+#include <sstream>
 #include <string>
 #include <utility>
 
-inline std::unique_ptr<h5features::details::writer_interface> get_writer(hdf5::Group &&group, bool compress,
-                                                                         h5features::version version) {
-  switch (version) {
+inline std::unique_ptr<h5features::details::writer_interface> get_writer(hdf5::Group &&group,
+                                                                         const h5features::writer_options &options) {
+  switch (options.version) {
   case h5features::version::v1_1:
   case h5features::version::v1_2:
-    return std::make_unique<h5features::v1::writer>(std::move(group), compress, version);
+    return std::make_unique<h5features::v1::writer>(std::move(group), options.compression, options.chunking,
+                                                    options.version, options.compact_properties);
     break;
   case h5features::version::v2_0:
-    return std::make_unique<h5features::v2::writer>(std::move(group), compress, version);
+    return std::make_unique<h5features::v2::writer>(std::move(group), options.compression, options.chunking,
+                                                    options.index, options.version, options.compact_properties);
     break;
   default:
     throw h5features::exception("unsupported version for writer");
   }
 }
 
-std::unique_ptr<h5features::details::writer_interface> init_writer(const std::string &filename,
-                                                                   const std::string &groupname, bool overwrite,
-                                                                   bool compress, h5features::version version) {
+std::unique_ptr<h5features::details::writer_interface>
+init_writer(const std::string &filename, const std::string &groupname, const h5features::writer_options &options) {
+  const auto lock = h5features::details::lock_hdf5();
+
   // inhibate HDF5 errors stack printing
   const hdf5::SilenceHDF5 silencer;
 
+  // fail before creating the file if the compression is not supported
+  if (not h5features::compression::is_available(options.compression.get_codec())) {
+    std::stringstream msg;
+    msg << "compression codec " << options.compression.get_codec() << " is not available";
+    throw h5features::exception(msg.str());
+  }
+
   // setup the correct flag for file creation
   auto flag = hdf5::File::Create | hdf5::File::ReadWrite;
-  if (overwrite) {
+  if (options.overwrite) {
     flag = hdf5::File::Overwrite | hdf5::File::ReadWrite;
   }
 
@@ -41,8 +60,8 @@ std::unique_ptr<h5features::details::writer_interface> init_writer(const std::st
       // the group does not exist in the file, create an empty one and put the
       // current version in it
       auto group = file.createGroup(groupname);
-      h5features::write_version(group, version);
-      return get_writer(std::move(group), compress, version);
+      h5features::write_version(group, options.version);
+      return get_writer(std::move(group), options);
     } else {
       auto group = file.getGroup(groupname);
 
@@ -52,28 +71,287 @@ std::unique_ptr<h5features::details::writer_interface> init_writer(const std::st
       } else {
         // the group already exists in the file and is not empty, ensure the
         // version is supported so we can can write new items in it
-        if (h5features::read_version(group) != version) {
+        if (h5features::read_version(group) != options.version) {
           throw h5features::exception("non empty group: unsupported h5features version");
         }
       }
-      return get_writer(std::move(group), compress, version);
+      return get_writer(std::move(group), options);
     }
   } catch (const hdf5::Exception &e) {
     throw h5features::exception(e.what());
   }
 }
 
+// Returns the writer settings with deflate compression or no compression
+h5features::writer_options default_options(bool overwrite, bool compress, h5features::version version) {
+  h5features::writer_options options;
+  options.overwrite = overwrite;
+  if (not compress) {
+    options.compression = h5features::compression{h5features::compression::codec::none};
+  }
+  options.version = version;
+  return options;
+}
+
+// Validates concatenated items in a single pass, see `writer::write_concatenated`
+void validate_concatenated(const h5features::details::concatenated_items &items) {
+  if (items.offsets.size() != items.names.size() + 1) {
+    throw h5features::exception("offsets must have one element per item plus the total number of frames");
+  }
+  if (items.offsets.front() != 0 or items.offsets.back() != items.features.size()) {
+    throw h5features::exception("offsets must start at 0 and end at the number of frames");
+  }
+  if (items.times.size() != items.features.size()) {
+    throw h5features::exception("times and features must have the same size");
+  }
+  if (not items.properties.empty() and items.properties.size() != items.names.size()) {
+    throw h5features::exception("properties must be empty or have one element per item");
+  }
+  if (std::adjacent_find(items.offsets.begin(), items.offsets.end(), std::greater_equal<std::size_t>{}) !=
+      items.offsets.end()) {
+    throw h5features::exception("offsets must be strictly increasing, items must not be empty");
+  }
+
+  // the timestamps are sorted within each item, not across items
+  const auto dim = items.times.dim();
+  const double *const data = items.times.data().data();
+  for (std::size_t i = 0; i < items.names.size(); ++i) {
+    const auto first = items.offsets[i];
+    const auto last = items.offsets[i + 1];
+    if (items.names[i].empty()) {
+      throw h5features::exception("item name must not be empty");
+    }
+
+    // no branching so that the loop is vectorized, see `times::validate`
+    bool sorted = true;
+    bool ordered = not(data[first * dim] > data[first * dim + dim - 1]);
+    for (std::size_t j = first + 1; j < last; ++j) {
+      const double *const previous = data + (j - 1) * dim;
+      const double *const current = data + j * dim;
+      sorted &= not(current[0] < previous[0]) & not(current[dim - 1] < previous[dim - 1]);
+      ordered &= not(current[0] > current[dim - 1]);
+    }
+
+    if (not sorted) {
+      throw h5features::exception("timestamps of item '" + items.names[i] + "' must be sorted in increasing order");
+    }
+    if (not ordered) {
+      throw h5features::exception("tstart must be lower or equal to tstop for all timestamps of item '" +
+                                  items.names[i] + "'");
+    }
+  }
+}
+
 h5features::writer::writer(const std::string &filename, const std::string &group, bool overwrite, bool compress,
                            h5features::version version)
-    : m_filename{filename}, m_groupname{group}, m_writer{init_writer(filename, group, overwrite, compress, version)} {}
+    : writer{filename, group, default_options(overwrite, compress, version)} {}
+
+h5features::writer::writer(const std::string &filename, const std::string &group,
+                           const h5features::writer_options &options)
+    : m_filename{filename}, m_groupname{group}, m_writer{init_writer(filename, group, options)},
+      m_version{m_writer->version()}, m_streams{} {}
 
 std::string h5features::writer::filename() const { return m_filename; }
 
 std::string h5features::writer::groupname() const { return m_groupname; }
 
-h5features::version h5features::writer::version() const {
-  return m_writer->version();
-  ;
+h5features::version h5features::writer::version() const { return m_version; }
+
+h5features::writer::~writer() {
+  try {
+    close();
+  } catch (const h5features::exception &e) {
+    std::cerr << "WARNING h5features: " << e.what() << std::endl;
+  }
+}
+
+h5features::details::writer_interface &h5features::writer::checked_writer() const {
+  if (not m_writer) {
+    throw h5features::exception("writer is closed");
+  }
+  return *m_writer;
+}
+
+void h5features::writer::write(const h5features::item &item) {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  checked_writer().write(item);
+}
+
+void h5features::writer::write_concatenated(const std::vector<std::string> &names, const h5features::features &features,
+                                            const h5features::times &times, const std::vector<std::size_t> &offsets,
+                                            const std::vector<h5features::properties> &properties,
+                                            std::size_t workers) {
+  const h5features::details::stats_scope scope{recorder()};
+  const h5features::details::concatenated_items items{names, features, times, offsets, properties};
+  validate_concatenated(items);
+  if (names.empty()) {
+    return;
+  }
+
+  // in version 1.x the items are appended at once
+  auto &writer = checked_writer();
+  if (m_version != h5features::version::v2_0) {
+    const auto lock = h5features::details::lock_hdf5();
+    writer.write_concatenated(items);
+    return;
+  }
+
+  // in version 2.0 the items are all checked, then encoded out of the HDF5
+  // lock and written one by one
+  {
+    const auto lock = h5features::details::lock_hdf5();
+    writer.check_concatenated(items);
+  }
+  write_prepared(names.size(), [&writer, &items](std::size_t i) { return writer.prepare(items, i); }, workers);
+}
+
+h5features::appender h5features::writer::open_item(const std::string &name, std::size_t dim,
+                                                   h5features::times::format format, h5features::dtype dtype) {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  std::shared_ptr<h5features::details::item_stream> stream = checked_writer().open_item(name, dim, format, dtype);
+
+  // forget the items already closed
+  m_streams.erase(std::remove_if(m_streams.begin(), m_streams.end(),
+                                 [](const auto &stream) {
+                                   const auto locked = stream.lock();
+                                   return not locked or locked->closed();
+                                 }),
+                  m_streams.end());
+  m_streams.push_back(stream);
+  return h5features::appender{std::move(stream), recorder()};
+}
+
+void h5features::writer::flush() {
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  checked_writer().flush();
 }
 
-void h5features::writer::write(const h5features::item &item) { m_writer->write(item); }
+void h5features::writer::close() {
+  if (not m_writer) {
+    return;
+  }
+
+  // closing the HDF5 group may close the file as well
+  const h5features::details::stats_scope scope{recorder()};
+  const auto lock = h5features::details::lock_hdf5();
+  try {
+    // all the items not closed are discarded before the writer is released
+    std::exception_ptr error;
+    for (const auto &stream : m_streams) {
+      if (const auto locked = stream.lock()) {
+        try {
+          locked->abort();
+        } catch (...) {
+          error = error ? error : std::current_exception();
+        }
+      }
+    }
+    m_streams.clear();
+    m_writer->flush();
+    if (error) {
+      std::rethrow_exception(error);
+    }
+  } catch (...) {
+    m_writer.reset();
+    throw;
+  }
+  m_writer.reset();
+}
+
+bool h5features::writer::closed() const noexcept { return not m_writer; }
+
+void h5features::writer::write_items(const std::vector<std::reference_wrapper<const h5features::item>> &items,
+                                     std::size_t workers) {
+  const h5features::details::stats_scope scope{recorder()};
+  auto &writer = checked_writer();
+  write_prepared(items.size(), [&writer, &items](std::size_t i) { return writer.prepare(items[i]); }, workers);
+}
+
+void h5features::writer::write_prepared(std::size_t count,
+                                        const std::function<h5features::details::deferred_write(std::size_t)> &prepare,
+                                        std::size_t workers) {
+  if (workers == 0) {
+    workers = h5features::details::thread_pool::default_workers();
+  }
+  workers = std::min(workers, count);
+
+  // sequential write in the calling thread
+  if (workers <= 1) {
+    for (std::size_t i = 0; i < count; ++i) {
+      const auto commit = prepare(i);
+      const auto lock = h5features::details::lock_hdf5();
+      commit();
+    }
+    return;
+  }
+
+  // the items are compressed by the pool of workers while the calling thread
+  // writes them to file in order. To bound memory usage, at most 2 items per
+  // worker are compressed ahead of the one being written.
+  h5features::details::thread_pool pool{workers};
+  std::deque<std::future<h5features::details::deferred_write>> pending;
+  std::size_t next = 0;
+
+  const auto submit = [&]() {
+    pending.push_back(pool.submit([&prepare, i = next++, recorder = recorder()]() {
+      const h5features::details::stats_scope scope{recorder, false};
+      return prepare(i);
+    }));
+  };
+
+  while (next < count and pending.size() < 2 * workers) {
+    submit();
+  }
+
+  while (not pending.empty()) {
+    const auto commit = pending.front().get();
+    pending.pop_front();
+    if (next < count) {
+      submit();
+    }
+
+    const auto lock = h5features::details::lock_hdf5();
+    commit();
+  }
+}
+
+std::shared_ptr<h5features::details::stats_recorder> h5features::writer::recorder() const {
+  return std::atomic_load(&m_stats);
+}
+
+void h5features::writer::enable_stats(std::function<void(const h5features::stats &)> callback) {
+  std::atomic_store(&m_stats, std::make_shared<h5features::details::stats_recorder>(std::move(callback)));
+  const auto lock = h5features::details::lock_hdf5();
+  if (m_writer) {
+    h5features::details::metadata_cache_hit_rate(m_writer->group(), true);
+  }
+}
+
+void h5features::writer::disable_stats() { std::atomic_store(&m_stats, {}); }
+
+h5features::stats h5features::writer::stats() const {
+  const auto recorder = this->recorder();
+  if (not recorder) {
+    return {};
+  }
+
+  auto stats = recorder->get();
+  const auto lock = h5features::details::lock_hdf5();
+  if (m_writer) {
+    stats.cache_hit_rate = h5features::details::metadata_cache_hit_rate(m_writer->group());
+  }
+  return stats;
+}
+
+void h5features::writer::reset_stats() {
+  if (const auto recorder = this->recorder()) {
+    recorder->reset();
+    const auto lock = h5features::details::lock_hdf5();
+    if (m_writer) {
+      h5features::details::metadata_cache_hit_rate(m_writer->group(), true);
+    }
+  }
+}
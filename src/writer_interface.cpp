@@ -1,9 +1,61 @@
 #include "h5features/details/writer_interface.h"
+#include "h5features/exception.h"
 #include <utility>
 
-h5features::details::writer_interface::writer_interface(hdf5::Group &&group, bool compress, h5features::version version)
-    : m_group{std::move(group)}, m_compress{compress}, m_version{version} {}
+std::size_t h5features::details::concatenated_items::size(std::size_t i) const { return offsets[i + 1] - offsets[i]; }
+
+h5features::features h5features::details::concatenated_items::features_of(std::size_t i) const {
+  const auto frame_bytes = features.dim() * h5features::size_of(features.get_dtype());
+  return {features.bytes().subspan(offsets[i] * frame_bytes, size(i) * frame_bytes), features.get_dtype(),
+          features.dim(), nullptr, false};
+}
+
+h5features::times h5features::details::concatenated_items::times_of(std::size_t i) const {
+  return {times.data().subspan(offsets[i] * times.dim(), size(i) * times.dim()),
+          h5features::times::get_format(times.dim()), nullptr, false};
+}
+
+const h5features::properties &h5features::details::concatenated_items::properties_of(std::size_t i) const {
+  static const h5features::properties empty{};
+  return properties.empty() ? empty : properties[i];
+}
+
+h5features::details::item_stream::~item_stream() {}
+
+h5features::details::writer_interface::writer_interface(hdf5::Group &&group, const h5features::compression &compression,
+                                                        const h5features::chunking &chunking,
+                                                        h5features::version version, bool compact_properties)
+    : m_group{std::move(group)}, m_compression{compression}, m_chunking{chunking}, m_version{version},
+      m_compact_properties{compact_properties} {}
 
 h5features::details::writer_interface::~writer_interface() {}
 
 h5features::version h5features::details::writer_interface::version() const noexcept { return m_version; }
+
+const hdf5::Group &h5features::details::writer_interface::group() const noexcept { return m_group; }
+
+void h5features::details::writer_interface::flush() {}
+
+h5features::details::deferred_write h5features::details::writer_interface::prepare(const h5features::item &item) {
+  return [this, &item]() { write(item); };
+}
+
+void h5features::details::writer_interface::write_concatenated(const concatenated_items &items) {
+  check_concatenated(items);
+  for (std::size_t i = 0; i < items.names.size(); ++i) {
+    prepare(items, i)();
+  }
+}
+
+void h5features::details::writer_interface::check_concatenated(const concatenated_items &) {}
+
+h5features::details::deferred_write h5features::details::writer_interface::prepare(const concatenated_items &,
+                                                                                   std::size_t) {
+  throw h5features::exception("writing concatenated items one by one requires version 2.0");
+}
+
+std::unique_ptr<h5features::details::item_stream>
+h5features::details::writer_interface::open_item(const std::string &, std::size_t, h5features::times::format,
+                                                 h5features::dtype) {
+  throw h5features::exception("writing an item by blocks requires version 2.0");
+}
@@ -0,0 +1,195 @@
+#define BOOST_TEST_MODULE test_appender
+
+#include "test_utils_data.h"
+#include "test_utils_ostream.h"
+#include "test_utils_tmpdir.h"
+
+#include "boost/test/data/test_case.hpp"
+#include "boost/test/unit_test.hpp"
+#include "h5features/appender.h"
+#include "h5features/chunking.h"
+#include "h5features/compression.h"
+#include "h5features/exception.h"
+#include "h5features/hdf5.h"
+#include "h5features/reader.h"
+#include "h5features/writer.h"
+#include <cstddef>
+#include <string>
+#include <vector>
+
+auto compression_dataset =
+    boost::unit_test::data::make({h5features::compression{h5features::compression::codec::none},
+                                  h5features::compression{h5features::compression::codec::deflate, 6, true}});
+
+// Appends an item by blocks of `block` frames
+void append_blocks(h5features::appender &appender, const h5features::item &item, std::size_t block) {
+  const auto features = item.features().data();
+  const auto times = item.times().data();
+  const auto dim = item.dim();
+  const auto dim_times = item.times().dim();
+  for (std::size_t start = 0; start < item.size(); start += block) {
+    const auto stop = std::min(start + block, item.size());
+    appender.append(
+        h5features::features{std::vector<double>(features.begin() + start * dim, features.begin() + stop * dim), dim},
+        h5features::times{std::vector<double>(times.begin() + start * dim_times, times.begin() + stop * dim_times),
+                          h5features::times::get_format(dim_times)});
+  }
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_append, compression_dataset, compression) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const auto item = utils::generate_item("item", 1000, 5);
+
+  // chunks of 32 frames, the blocks are not aligned on chunks
+  for (const std::size_t block : {1, 7, 32, 100, 1000}) {
+    const auto name = "item" + std::to_string(block);
+    {
+      h5features::writer_options options;
+      options.compression = compression;
+      options.chunking = h5features::chunking{h5features::chunking::access::partial, 32 * 5 * 8};
+      h5features::writer writer{filename, "features", options};
+      auto appender = writer.open_item(name, 5);
+      append_blocks(appender, item, block);
+      BOOST_CHECK_EQUAL(appender.size(), 1000);
+      BOOST_CHECK_EQUAL(appender.name(), name);
+      BOOST_CHECK(not appender.closed());
+      appender.close(item.properties());
+      BOOST_CHECK(appender.closed());
+    }
+
+    const auto read = h5features::reader(filename, "features").read_item(name);
+    BOOST_CHECK_EQUAL(read.features(), item.features());
+    BOOST_CHECK_EQUAL(read.times(), item.times());
+    BOOST_CHECK_EQUAL(read.properties(), item.properties());
+  }
+}
+
+BOOST_FIXTURE_TEST_CASE(test_append_long, utils::fixture::temp_directory) {
+  // long enough for the index of the times to be decimated
+  const auto filename = (tmpdir / "test.h5").string();
+  const auto item = utils::generate_item("item", 600000, 1, false, h5features::times::format::simple);
+  {
+    h5features::writer_options options;
+    options.overwrite = true;
+    options.index = true;
+    h5features::writer writer{filename, "features", options};
+    auto appender = writer.open_item("item", 1, h5features::times::format::simple);
+    append_blocks(appender, item, 70001);
+    appender.close();
+  }
+
+  // the step of the index of the times doubled to keep at most 2048 samples
+  {
+    hdf5::File file(filename, hdf5::File::ReadOnly);
+    const auto times = file.getGroup("features").getGroup("item").getDataSet("times");
+    std::size_t step;
+    times.getAttribute("index_step").read(step);
+    BOOST_CHECK_EQUAL(step, 512);
+    std::vector<double> samples;
+    times.getAttribute("index").read(samples);
+    BOOST_CHECK_EQUAL(samples.size(), (600000 + 511) / 512);
+    BOOST_CHECK_EQUAL(samples[1], 512);
+  }
+
+  const h5features::reader reader{filename, "features"};
+  BOOST_CHECK_EQUAL(reader.sizes(), std::vector<std::size_t>{600000});
+  BOOST_CHECK_EQUAL(reader.dims(), std::vector<std::size_t>{1});
+  BOOST_CHECK_EQUAL(reader.time_spans()[0].first, 0);
+  BOOST_CHECK_EQUAL(reader.time_spans()[0].second, 599999);
+  BOOST_CHECK_EQUAL(reader.read_item("item"), item);
+  for (const auto &[start, stop] : std::vector<std::pair<double, double>>{{0, 10}, {1000.5, 2000}, {599000, 700000}}) {
+    const auto partial = reader.read_item("item", start, stop);
+    const auto [first, last] = item.times().get_indices(start, stop);
+    BOOST_CHECK_EQUAL(partial.size(), last - first);
+    BOOST_CHECK_EQUAL(partial.times().start(), item.times().data()[first]);
+  }
+}
+
+BOOST_FIXTURE_TEST_CASE(test_append_float32, utils::fixture::temp_directory) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const std::vector<float> features{1, 2, 3, 4, 5, 6};
+  {
+    h5features::writer writer{filename};
+    auto appender = writer.open_item("item", 2, h5features::times::format::simple, h5features::dtype::float32);
+    BOOST_CHECK_THROW(appender.append(h5features::features{std::vector<double>{1, 2}, 2},
+                                      h5features::times{std::vector<double>{0}, h5features::times::format::simple}),
+                      h5features::exception);
+    appender.append(h5features::features{features, 2},
+                    h5features::times{std::vector<double>{0, 1, 2}, h5features::times::format::simple});
+    appender.close();
+  }
+
+  const auto read = h5features::reader(filename, "features").read_item("item");
+  BOOST_CHECK_EQUAL(read.features().get_dtype(), h5features::dtype::float32);
+  BOOST_CHECK(read.features().data<float>() == features);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_append_errors, utils::fixture::temp_directory) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const h5features::features features{std::vector<double>{1, 2, 3, 4}, 2};
+  const h5features::times times{std::vector<double>{0, 1}, std::vector<double>{1, 2}};
+
+  {
+    h5features::writer writer{filename, "v1", true, false, h5features::version::v1_2};
+    BOOST_CHECK_THROW(writer.open_item("item", 2), h5features::exception);
+  }
+
+  h5features::writer writer{filename, "features"};
+  BOOST_CHECK_THROW(writer.open_item("", 2), h5features::exception);
+  BOOST_CHECK_THROW(writer.open_item("item", 0), h5features::exception);
+
+  auto appender = writer.open_item("item", 2);
+  BOOST_CHECK_THROW(writer.open_item("item", 2), h5features::exception);
+  BOOST_CHECK_THROW(writer.write(utils::generate_item("item", 2, 2)), h5features::exception);
+  BOOST_CHECK_THROW(appender.close(), h5features::exception);
+
+  // inconsistent blocks
+  BOOST_CHECK_THROW(appender.append(h5features::features{std::vector<double>{1, 2, 3}, 3}, times),
+                    h5features::exception);
+  BOOST_CHECK_THROW(
+      appender.append(features, h5features::times{std::vector<double>{0, 1}, h5features::times::format::simple}),
+      h5features::exception);
+  BOOST_CHECK_THROW(appender.append(h5features::features{std::vector<double>{1, 2}, 2}, times), h5features::exception);
+  appender.append(features, times);
+  BOOST_CHECK_THROW(appender.append(features, times), h5features::exception);
+  BOOST_CHECK_EQUAL(appender.size(), 2);
+
+  // the dimension of the group is fixed by the first item
+  BOOST_CHECK_THROW(writer.open_item("other", 3), h5features::exception);
+
+  appender.close();
+  BOOST_CHECK_THROW(appender.close(), h5features::exception);
+  BOOST_CHECK_THROW(appender.append(features, times), h5features::exception);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_append_discard, utils::fixture::temp_directory) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const auto item = utils::generate_item("item", 10, 3);
+  {
+    h5features::writer writer{filename};
+    {
+      // destroyed before being closed
+      auto appender = writer.open_item("destroyed", 3);
+      append_blocks(appender, item, 4);
+    }
+
+    auto aborted = writer.open_item("aborted", 3);
+    append_blocks(aborted, item, 4);
+    aborted.abort();
+    BOOST_CHECK(aborted.closed());
+    aborted.abort();
+
+    auto moved = writer.open_item("moved", 3);
+    append_blocks(moved, item, 4);
+    auto other = std::move(moved);
+    other.close();
+
+    auto unclosed = writer.open_item("unclosed", 3);
+    append_blocks(unclosed, item, 4);
+    writer.close();
+    BOOST_CHECK(unclosed.closed());
+    BOOST_CHECK_THROW(unclosed.append(item.features(), item.times()), h5features::exception);
+  }
+
+  BOOST_CHECK_EQUAL(h5features::reader(filename, "features").items(), std::vector<std::string>{"moved"});
+}
@@ -0,0 +1,86 @@
+#define BOOST_TEST_MODULE test_chunking
+
+#include "test_utils_data.h"
+#include "test_utils_ostream.h"
+#include "test_utils_tmpdir.h"
+
+#include "boost/test/data/test_case.hpp"
+#include "boost/test/unit_test.hpp"
+#include "h5features/chunking.h"
+#include "h5features/exception.h"
+#include "h5features/reader.h"
+#include "h5features/version.h"
+#include "h5features/writer.h"
+#include <H5Ppublic.h>
+#include <sstream>
+#include <string>
+#include <vector>
+
+using pattern = h5features::chunking::access;
+
+BOOST_AUTO_TEST_CASE(test_target) {
+  BOOST_CHECK_EQUAL(h5features::chunking{}.target_bytes(), 1UL << 16);
+  BOOST_CHECK_EQUAL(h5features::chunking{}.get_access(), pattern::partial);
+  BOOST_CHECK_EQUAL(h5features::chunking{pattern::whole}.target_bytes(), 1UL << 20);
+  BOOST_CHECK_EQUAL(h5features::chunking(pattern::whole, 1000).target_bytes(), 1000);
+  BOOST_CHECK_THROW(h5features::chunking(pattern::whole, 1UL << 32), h5features::exception);
+
+  BOOST_CHECK_EQUAL(h5features::chunking(pattern::whole, 1000), h5features::chunking(pattern::whole, 1000));
+  BOOST_CHECK_NE(h5features::chunking(pattern::partial, 1000), h5features::chunking(pattern::whole, 1000));
+}
+
+BOOST_AUTO_TEST_CASE(test_access) {
+  for (const auto &name : {"whole", "partial"}) {
+    std::stringstream stream;
+    stream << h5features::chunking::parse_access(name);
+    BOOST_CHECK_EQUAL(stream.str(), name);
+  }
+  BOOST_CHECK_THROW(h5features::chunking::parse_access("random"), h5features::exception);
+}
+
+BOOST_AUTO_TEST_CASE(test_frames) {
+  // partial: as many frames as fit in the target
+  const h5features::chunking partial{pattern::partial, 1000};
+  BOOST_CHECK_EQUAL(partial.frames(1000, 100), 10);
+  BOOST_CHECK_EQUAL(partial.frames(5, 100), 5);
+  BOOST_CHECK_EQUAL(partial.frames(1000, 2000), 1);
+  BOOST_CHECK_EQUAL(partial.frames(0, 100), 1);
+
+  // whole: a single chunk below the target, else balanced chunks
+  const h5features::chunking whole{pattern::whole, 1000};
+  BOOST_CHECK_EQUAL(whole.frames(10, 100), 10);
+  BOOST_CHECK_EQUAL(whole.frames(11, 100), 6);
+  BOOST_CHECK_EQUAL(whole.frames(25, 100), 9);
+  BOOST_CHECK_EQUAL(whole.frames(1000, 2000), 1);
+}
+
+auto chunking_dataset = boost::unit_test::data::make({h5features::chunking{}, h5features::chunking{pattern::whole},
+                                                      h5features::chunking{pattern::partial, 400},
+                                                      h5features::chunking{pattern::whole, 4000}});
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_write, chunking_dataset, chunking) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const auto item = utils::generate_item("item", 300, 5);
+
+  for (const bool compress : {true, false}) {
+    h5features::writer_options options;
+    options.overwrite = true;
+    options.compression = h5features::compression{compress ? h5features::compression::codec::deflate
+                                                           : h5features::compression::codec::none};
+    options.chunking = chunking;
+    h5features::writer(filename, "group", options).write(item);
+
+    const h5features::reader reader(filename, "group");
+    BOOST_CHECK_EQUAL(reader.read_item("item"), item);
+
+    const auto indices = item.times().get_indices(10, 20);
+    BOOST_CHECK_EQUAL(reader.read_item("item", 10, 20).features().data(),
+                      item.features().data().subspan(indices.first * 5, (indices.second - indices.first) * 5));
+
+    // the chunks on file follow the policy
+    const auto dataset = hdf5::File(filename).getGroup("group").getGroup("item").getDataSet("features");
+    hsize_t chunk_size;
+    H5Pget_chunk(dataset.getCreatePropertyList().getId(), 1, &chunk_size);
+    BOOST_CHECK_EQUAL(chunk_size, 5 * chunking.frames(300, 5 * sizeof(double)));
+  }
+}
@@ -0,0 +1,107 @@
+#define BOOST_TEST_MODULE test_compression
+
+#include "test_utils_data.h"
+#include "test_utils_ostream.h"
+#include "test_utils_tmpdir.h"
+
+#include "boost/test/data/test_case.hpp"
+#include "boost/test/unit_test.hpp"
+#include "h5features/compression.h"
+#include "h5features/exception.h"
+#include "h5features/reader.h"
+#include "h5features/version.h"
+#include "h5features/writer.h"
+#include <sstream>
+#include <string>
+#include <vector>
+
+using codec = h5features::compression::codec;
+
+BOOST_AUTO_TEST_CASE(test_level) {
+  BOOST_CHECK_EQUAL(h5features::compression{}.level(), 9);
+  BOOST_CHECK_EQUAL(h5features::compression{codec::zstd}.level(), 3);
+  BOOST_CHECK_EQUAL(h5features::compression{codec::blosc}.level(), 5);
+  BOOST_CHECK_EQUAL(h5features::compression(codec::lzf, 4).level(), 0);
+  BOOST_CHECK_EQUAL(h5features::compression(codec::deflate, 1).level(), 1);
+  BOOST_CHECK_EQUAL(h5features::compression(codec::zstd, 22).level(), 22);
+
+  BOOST_CHECK_THROW(h5features::compression(codec::deflate, 0), h5features::exception);
+  BOOST_CHECK_THROW(h5features::compression(codec::deflate, 10), h5features::exception);
+  BOOST_CHECK_THROW(h5features::compression(codec::zstd, 23), h5features::exception);
+  BOOST_CHECK_THROW(h5features::compression(codec::blosc, -2), h5features::exception);
+}
+
+BOOST_AUTO_TEST_CASE(test_shuffle) {
+  BOOST_CHECK(not h5features::compression{}.shuffle());
+  BOOST_CHECK(h5features::compression(codec::deflate, 4, true).shuffle());
+  BOOST_CHECK(not h5features::compression(codec::none, 4, true).shuffle());
+  BOOST_CHECK(not h5features::compression(codec::none).enabled());
+  BOOST_CHECK(h5features::compression(codec::lzf).enabled());
+
+  BOOST_CHECK_EQUAL(h5features::compression(codec::deflate, 9), h5features::compression{});
+  BOOST_CHECK_NE(h5features::compression(codec::deflate, 9, true), h5features::compression{});
+}
+
+BOOST_AUTO_TEST_CASE(test_codec) {
+  for (const auto &name : {"none", "deflate", "lzf", "zstd", "blosc"}) {
+    std::stringstream stream;
+    stream << h5features::compression::parse_codec(name);
+    BOOST_CHECK_EQUAL(stream.str(), name);
+  }
+  BOOST_CHECK_THROW(h5features::compression::parse_codec("gzip"), h5features::exception);
+
+  BOOST_CHECK(h5features::compression::is_available(codec::none));
+  BOOST_CHECK(h5features::compression::is_available(codec::deflate));
+}
+
+auto version_dataset = boost::unit_test::data::make({h5features::version::v1_2, h5features::version::v2_0});
+
+auto compression_dataset = boost::unit_test::data::make(
+    {h5features::compression{codec::none}, h5features::compression{codec::deflate, 1},
+     h5features::compression{codec::deflate, 9, true}, h5features::compression{codec::deflate, 4, true}});
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_write, version_dataset *compression_dataset, vers,
+                       compression) {
+  const auto filename = (tmpdir / "test.h5").string();
+
+  // several chunks per item, the last one being partial
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 5; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 300 + i, 5));
+  }
+
+  h5features::writer_options options;
+  options.overwrite = true;
+  options.compression = compression;
+  options.version = vers;
+  for (const std::size_t workers : {1, 4}) {
+    h5features::writer(filename, "group", options).write(items.begin(), items.end(), workers);
+    const h5features::reader reader(filename, "group");
+    BOOST_CHECK_EQUAL(reader.read_all(), items);
+    BOOST_CHECK_EQUAL(reader.read_all(false, 4), items);
+
+    const auto indices = items[2].times().get_indices(10, 20);
+    BOOST_CHECK_EQUAL(reader.read_item("item2", 10, 20).features().data(),
+                      items[2].features().data().subspan(indices.first * 5, (indices.second - indices.first) * 5));
+  }
+
+  if (vers == h5features::version::v2_0) {
+    // the chunks written directly are decoded by HDF5 as expected
+    const auto dataset = hdf5::File(filename).getGroup("group").getGroup("item3").getDataSet("features");
+    std::vector<double> data;
+    dataset.read(data);
+    BOOST_CHECK_EQUAL(data, items[3].features().data());
+  }
+}
+
+BOOST_FIXTURE_TEST_CASE(test_unavailable, utils::fixture::temp_directory) {
+  const auto filename = (tmpdir / "test.h5").string();
+  for (const auto codec : {codec::lzf, codec::zstd, codec::blosc}) {
+    if (not h5features::compression::is_available(codec)) {
+      h5features::writer_options options;
+      options.overwrite = true;
+      options.compression = h5features::compression{codec};
+      BOOST_CHECK_THROW(h5features::writer(filename, "group", options), h5features::exception);
+    }
+  }
+}
@@ -6,6 +6,10 @@
 #include "boost/test/unit_test.hpp"
 #include "h5features/exception.h"
 #include "h5features/features.h"
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <sstream>
 #include <string>
 #include <utility>
 #include <vector>
@@ -60,3 +64,64 @@ BOOST_AUTO_TEST_CASE(test_assign_operator) {
   BOOST_CHECK(f1 == f3);
   BOOST_CHECK(f2 != f3);
 }
+
+BOOST_AUTO_TEST_CASE(test_borrow) {
+  auto buffer = std::make_shared<std::vector<double>>(std::vector<double>{0, 1, 2, 0, 1, 2});
+  const h5features::features f1{{buffer->data(), buffer->size()}, 3, buffer};
+  BOOST_CHECK_EQUAL(2, f1.size());
+  BOOST_CHECK_EQUAL(3, f1.dim());
+  BOOST_CHECK_EQUAL(f1.data().data(), buffer->data());
+  BOOST_CHECK(f1 == h5features::features(*buffer, 3));
+
+  // the buffer is kept alive by the features and shared by copies
+  const std::weak_ptr<std::vector<double>> observer = buffer;
+  buffer.reset();
+  {
+    const h5features::features f2{f1};
+    BOOST_CHECK_EQUAL(f2.data().data(), f1.data().data());
+  }
+  BOOST_CHECK(not observer.expired());
+
+  BOOST_CHECK_THROW(h5features::features(h5features::span<const double>{}, 3, nullptr), h5features::exception);
+}
+
+BOOST_AUTO_TEST_CASE(test_dtype) {
+  const h5features::features f64{std::vector<double>{0, 1, 2, 0, 1, 2}, 3};
+  BOOST_CHECK_EQUAL(f64.get_dtype(), h5features::dtype::float64);
+  BOOST_CHECK_EQUAL(f64.bytes().size(), 6 * sizeof(double));
+
+  const h5features::features f32{std::vector<float>{0, 1, 2, 0, 1, 2}, 3};
+  BOOST_CHECK_EQUAL(f32.get_dtype(), h5features::dtype::float32);
+  BOOST_CHECK_EQUAL(f32.size(), 2);
+  BOOST_CHECK_EQUAL(f32.bytes().size(), 6 * sizeof(float));
+  BOOST_CHECK(f32.data<float>() == std::vector<float>({0, 1, 2, 0, 1, 2}));
+  BOOST_CHECK_EXCEPTION(f32.data(), h5features::exception, [&](const auto &e) {
+    return std::string(e.what()) == "features dtype is float32, cannot access it as float64";
+  });
+
+  // 0x3c00 is 1.0 in half precision
+  const h5features::features f16{std::vector<std::uint16_t>{0, 0x3c00, 0, 0x3c00}, 2};
+  BOOST_CHECK_EQUAL(f16.get_dtype(), h5features::dtype::float16);
+  BOOST_CHECK_EQUAL(f16.size(), 2);
+  BOOST_CHECK_THROW(f16.data<float>(), h5features::exception);
+
+  // same values but different dtypes
+  BOOST_CHECK(f64 != f32);
+  BOOST_CHECK(f32 == h5features::features(std::vector<float>{0, 1, 2, 0, 1, 2}, 3));
+
+  // borrowed bytes must be made of entire scalars
+  const std::vector<std::byte> bytes(6);
+  BOOST_CHECK_NO_THROW(h5features::features({bytes.data(), 6}, h5features::dtype::float16, 3, nullptr));
+  BOOST_CHECK_EXCEPTION(
+      h5features::features({bytes.data(), 6}, h5features::dtype::float32, 1, nullptr), h5features::exception,
+      [&](const auto &e) { return std::string(e.what()) == "features size must be a multiple of the dtype size"; });
+}
+
+BOOST_AUTO_TEST_CASE(test_parse_dtype) {
+  for (const auto &name : {"float16", "float32", "float64"}) {
+    std::stringstream stream;
+    stream << h5features::parse_dtype(name);
+    BOOST_CHECK_EQUAL(stream.str(), name);
+  }
+  BOOST_CHECK_THROW(h5features::parse_dtype("int8"), h5features::exception);
+}
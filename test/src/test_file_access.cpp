@@ -0,0 +1,119 @@
+#define BOOST_TEST_MODULE test_file_access
+
+#include "test_utils_data.h"
+#include "test_utils_ostream.h"
+#include "test_utils_tmpdir.h"
+
+#include "boost/test/data/test_case.hpp"
+#include "boost/test/unit_test.hpp"
+#include "h5features/exception.h"
+#include "h5features/file_access.h"
+#include "h5features/reader.h"
+#include "h5features/version.h"
+#include "h5features/writer.h"
+#include <H5FDcore.h>
+#include <H5Ppublic.h>
+#include <sstream>
+#include <string>
+#include <vector>
+
+using driver = h5features::file_access::driver;
+
+BOOST_AUTO_TEST_CASE(test_settings) {
+  const h5features::file_access access{};
+  BOOST_CHECK_EQUAL(access.chunk_cache_bytes(), 0);
+  BOOST_CHECK_EQUAL(access.chunk_cache_slots(), 0);
+  BOOST_CHECK_EQUAL(access.metadata_cache_bytes(), 0);
+  BOOST_CHECK_EQUAL(access.get_driver(), driver::sec2);
+
+  BOOST_CHECK_EQUAL(h5features::file_access(1000, 7), h5features::file_access(1000, 7));
+  BOOST_CHECK_NE(h5features::file_access(1000, 7), h5features::file_access(1000, 7, 0, driver::core));
+
+  BOOST_CHECK_NO_THROW(h5features::file_access(0, 0, 1UL << 10));
+  BOOST_CHECK_NO_THROW(h5features::file_access(0, 0, 1UL << 27));
+  BOOST_CHECK_THROW(h5features::file_access(0, 0, 1000), h5features::exception);
+  BOOST_CHECK_THROW(h5features::file_access(0, 0, (1UL << 27) + 1), h5features::exception);
+}
+
+BOOST_AUTO_TEST_CASE(test_driver) {
+  for (const auto &name : {"sec2", "core"}) {
+    std::stringstream stream;
+    stream << h5features::file_access::parse_driver(name);
+    BOOST_CHECK_EQUAL(stream.str(), name);
+  }
+  BOOST_CHECK_THROW(h5features::file_access::parse_driver("mpio"), h5features::exception);
+
+  std::stringstream stream;
+  stream << h5features::file_access(1000, 7, 2048, driver::core);
+  BOOST_CHECK_EQUAL(stream.str(), "core driver, chunk cache of 1000 bytes, 7 chunk cache slots, "
+                                  "metadata cache of 2048 bytes");
+}
+
+BOOST_AUTO_TEST_CASE(test_apply) {
+  int elements;
+  std::size_t slots;
+  std::size_t bytes;
+  double w0;
+
+  // the defaults are preserved
+  auto props = hdf5::FileAccessProps::Empty();
+  h5features::file_access{}.apply(props);
+  H5Pget_cache(props.getId(), &elements, &slots, &bytes, &w0);
+  BOOST_CHECK_EQUAL(slots, 521);
+  BOOST_CHECK_EQUAL(bytes, 1UL << 20);
+  BOOST_CHECK_NE(H5Pget_driver(props.getId()), H5FD_CORE);
+
+  // the slots are kept when only the size is changed
+  props = hdf5::FileAccessProps::Empty();
+  h5features::file_access{1UL << 24}.apply(props);
+  H5Pget_cache(props.getId(), &elements, &slots, &bytes, &w0);
+  BOOST_CHECK_EQUAL(slots, 521);
+  BOOST_CHECK_EQUAL(bytes, 1UL << 24);
+
+  props = hdf5::FileAccessProps::Empty();
+  h5features::file_access(1UL << 24, 10007, 1UL << 24, driver::core).apply(props);
+  H5Pget_cache(props.getId(), &elements, &slots, &bytes, &w0);
+  BOOST_CHECK_EQUAL(slots, 10007);
+  BOOST_CHECK_EQUAL(bytes, 1UL << 24);
+  BOOST_CHECK_EQUAL(H5Pget_driver(props.getId()), H5FD_CORE);
+
+  H5AC_cache_config_t config;
+  config.version = H5AC__CURR_CACHE_CONFIG_VERSION;
+  H5Pget_mdc_config(props.getId(), &config);
+  BOOST_CHECK(config.set_initial_size);
+  BOOST_CHECK_EQUAL(config.initial_size, 1UL << 24);
+  BOOST_CHECK_LE(config.min_size, config.initial_size);
+  BOOST_CHECK_GE(config.max_size, config.initial_size);
+}
+
+auto version_dataset = boost::unit_test::data::make({h5features::version::v1_2, h5features::version::v2_0});
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_read, version_dataset, version) {
+  const auto filename = (tmpdir / "test.h5").string();
+  {
+    h5features::writer_options options;
+    options.overwrite = true;
+    options.chunking = h5features::chunking{h5features::chunking::access::partial, 1000};
+    options.version = version;
+    h5features::writer writer(filename, "group", options);
+    writer.write(utils::generate_item("item1", 200, 5));
+    writer.write(utils::generate_item("item2", 200, 5));
+  }
+
+  // the items read with the default settings
+  const h5features::reader expected(filename, "group");
+  for (const auto &access : {h5features::file_access(1UL << 20, 101), h5features::file_access(16, 1, 1UL << 20),
+                             h5features::file_access(0, 0, 0, driver::core)}) {
+    const h5features::reader reader(filename, "group", false, access);
+    BOOST_CHECK_EQUAL(reader.read_all(), expected.read_all());
+
+    // consecutive partial reads on several items reuse or replace the cache
+    for (const auto &name : {"item1", "item1", "item2", "item1"}) {
+      BOOST_CHECK_EQUAL(reader.read_item(name, 10, 20), expected.read_item(name, 10, 20));
+      BOOST_CHECK_EQUAL(reader.read_frames(name, 50, 60).data(), expected.read_frames(name, 50, 60).data());
+    }
+
+    BOOST_CHECK_THROW(reader.read_item("missing", 10, 20), h5features::exception);
+    BOOST_CHECK_EQUAL(reader.read_item("item2", 10, 20), expected.read_item("item2", 10, 20));
+  }
+}
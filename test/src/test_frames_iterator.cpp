@@ -0,0 +1,127 @@
+#define BOOST_TEST_MODULE test_frames_iterator
+
+#include "test_utils_data.h"
+#include "test_utils_ostream.h"
+#include "test_utils_tmpdir.h"
+
+#include "boost/test/data/test_case.hpp"
+#include "boost/test/unit_test.hpp"
+#include "h5features/exception.h"
+#include "h5features/frames_iterator.h"
+#include "h5features/reader.h"
+#include "h5features/version.h"
+#include "h5features/writer.h"
+#include <algorithm>
+#include <string>
+#include <vector>
+
+auto version_dataset =
+    boost::unit_test::data::make({h5features::version::v1_1, h5features::version::v1_2, h5features::version::v2_0});
+
+// Returns the concatenated features of the items
+std::vector<double> concatenate(const std::vector<h5features::item> &items) {
+  std::vector<double> data;
+  for (const auto &item : items) {
+    const auto features = item.features().data();
+    data.insert(data.end(), features.begin(), features.end());
+  }
+  return data;
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_read_frames, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+  const auto item = utils::generate_item("item", 100, 4, false);
+  h5features::writer(filename, "group", true, true, vers).write(item);
+  const h5features::reader reader(filename, "group");
+
+  const auto frames = reader.read_frames("item", 10, 25);
+  BOOST_CHECK_EQUAL(frames.size(), 15);
+  BOOST_CHECK_EQUAL(frames.dim(), 4);
+  BOOST_CHECK(std::equal(frames.data().begin(), frames.data().end(), item.features().data().begin() + 40));
+  BOOST_CHECK_EQUAL(reader.read_frames("item", 0, 100), item.features());
+
+  BOOST_CHECK_THROW(reader.read_frames("item", 10, 10), h5features::exception);
+  BOOST_CHECK_THROW(reader.read_frames("item", 10, 101), h5features::exception);
+  BOOST_CHECK_THROW(reader.read_frames("spam", 0, 1), h5features::exception);
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_batches, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+  std::vector<h5features::item> items;
+  for (const std::size_t size : {50, 3, 120, 7}) {
+    items.push_back(utils::generate_item("item" + std::to_string(items.size()), size, 5, false));
+  }
+  h5features::writer(filename, "group", true, true, vers).write(items.begin(), items.end());
+  const h5features::reader reader(filename, "group");
+  const auto expected = concatenate(items);
+
+  for (const std::size_t prefetch : {0, 1, 3}) {
+    for (const std::size_t batch_frames : {1, 16, 180, 1000}) {
+      auto frames = reader.iter_frames(batch_frames, false, prefetch);
+      BOOST_CHECK_EQUAL(frames.batch_frames(), batch_frames);
+
+      std::vector<double> data;
+      std::size_t batches = 0;
+      while (auto batch = frames.next()) {
+        BOOST_CHECK_EQUAL(batch->dim(), 5);
+        BOOST_CHECK(batch->size() == batch_frames or data.size() + batch->data().size() == expected.size());
+        data.insert(data.end(), batch->data().begin(), batch->data().end());
+        ++batches;
+      }
+      BOOST_CHECK_EQUAL(batches, (180 + batch_frames - 1) / batch_frames);
+      BOOST_CHECK(data == expected);
+      BOOST_CHECK(not frames.next().has_value());
+    }
+  }
+
+  BOOST_CHECK_THROW(reader.iter_frames(0), h5features::exception);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_failed_batch, utils::fixture::temp_directory) {
+  const std::string filename = (tmpdir / "test.h5").string();
+  const auto item = utils::generate_item("item0", 3, 2, false);
+  const auto data = item.features().data();
+  const std::vector<h5features::item> items{item,
+                                            {"item1", {std::vector<float>(data.begin(), data.end()), 2}, item.times()}};
+  h5features::writer(filename, "group", true, true).write(items.begin(), items.end());
+  const h5features::reader reader(filename, "group");
+
+  // the frames of different dtypes cannot be batched
+  auto frames = reader.iter_frames(6, false, 2);
+  BOOST_CHECK_THROW(frames.next(), h5features::exception);
+
+  // the failed batch is not got again from the prefetched ones
+  const auto next = [&frames]() {
+    try {
+      frames.next();
+    } catch (const h5features::exception &) {
+    }
+  };
+  BOOST_CHECK_NO_THROW(next());
+}
+
+BOOST_FIXTURE_TEST_CASE(test_shuffle, utils::fixture::temp_directory) {
+  const std::string filename = (tmpdir / "test.h5").string();
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 10; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 1, 2, false));
+  }
+  h5features::writer(filename, "group", true, true).write(items.begin(), items.end());
+  const h5features::reader reader(filename, "group");
+
+  // with one frame per item, a batch is an item
+  const auto read = [&reader](std::uint64_t seed) {
+    std::vector<double> data;
+    auto frames = reader.iter_frames(1, true, 2, seed);
+    while (auto batch = frames.next()) {
+      data.insert(data.end(), batch->data().begin(), batch->data().end());
+    }
+    return data;
+  };
+
+  const auto expected = concatenate(items);
+  const auto shuffled = read(1);
+  BOOST_CHECK(shuffled == read(1));
+  BOOST_CHECK(shuffled != expected);
+  BOOST_CHECK(std::is_permutation(shuffled.begin(), shuffled.end(), expected.begin()));
+}
@@ -4,9 +4,13 @@
 #include "test_utils_tmpdir.h"
 
 #include "boost/test/unit_test.hpp"
+#include "h5features/details/properties_reader.h"
+#include "h5features/details/properties_writer.h"
 #include "h5features/exception.h"
 #include "h5features/hdf5.h"
+#include "h5features/item.h"
 #include "h5features/properties.h"
+#include <cstddef>
 #include <set>
 #include <string>
 #include <utility>
@@ -95,3 +99,119 @@ BOOST_AUTO_TEST_CASE(test_nested) {
 
   BOOST_CHECK_EQUAL(outer.get<h5features::properties>("inner"), inner);
 }
+
+namespace {
+h5features::properties generate_nested() {
+  h5features::properties inner;
+  inner.set("one", 1);
+  inner.set("negative", -42);
+  inner.set("pi", 3.14159);
+  inner.set("empty", std::string{});
+  inner.set<std::vector<double>>("reals", {1.5, -2.5});
+
+  // more than 10 elements so that the order of the list is not lexicographic
+  std::vector<h5features::properties> list;
+  for (int i = 0; i < 12; ++i) {
+    h5features::properties element;
+    element.set("i", i);
+    list.push_back(element);
+  }
+
+  h5features::properties outer;
+  outer.set("flag", true);
+  outer.set("name", std::string{"outer"});
+  outer.set<std::vector<int>>("ints", {1, 2, 3});
+  outer.set<std::vector<std::string>>("stuff", {"one", "", "two"});
+  outer.set("inner", inner);
+  outer.set("list", list);
+  outer.set("empty_list", std::vector<h5features::properties>{});
+  return outer;
+}
+} // namespace
+
+BOOST_AUTO_TEST_CASE(test_encode) {
+  for (const auto &props : {h5features::properties{}, generate_nested()}) {
+    const auto encoded = h5features::details::encode_properties(props);
+    BOOST_CHECK_EQUAL(h5features::details::decode_properties({encoded.data(), encoded.size()}), props);
+  }
+
+  // the encoding does not depend on the insertion order
+  h5features::properties first;
+  first.set("a", 1);
+  first.set("b", 2);
+  h5features::properties second;
+  second.set("b", 2);
+  second.set("a", 1);
+  BOOST_CHECK(h5features::details::encode_properties(first) == h5features::details::encode_properties(second));
+}
+
+BOOST_AUTO_TEST_CASE(test_decode_bad) {
+  const auto encoded = h5features::details::encode_properties(generate_nested());
+
+  // empty buffer, bad header, truncated data and trailing bytes
+  const std::vector<std::byte> empty;
+  BOOST_CHECK_THROW(h5features::details::decode_properties({empty.data(), empty.size()}), h5features::exception);
+
+  auto bad = encoded;
+  bad[0] = std::byte{0};
+  BOOST_CHECK_THROW(h5features::details::decode_properties({bad.data(), bad.size()}), h5features::exception);
+
+  BOOST_CHECK_THROW(h5features::details::decode_properties({encoded.data(), encoded.size() - 1}),
+                    h5features::exception);
+
+  bad = encoded;
+  bad.push_back(std::byte{0});
+  BOOST_CHECK_THROW(h5features::details::decode_properties({bad.data(), bad.size()}), h5features::exception);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_write_read, utils::fixture::temp_directory) {
+  const auto props = generate_nested();
+  hdf5::File file((tmpdir / "test.h5").string(), hdf5::File::Create);
+  auto root = file.getGroup("/");
+
+  for (const bool compress : {true, false}) {
+    // properties stored as groups, lists of more than 10 elements in order
+    // (empty lists cannot be represented as groups)
+    auto grouped = props;
+    grouped.erase("empty_list");
+    auto group = file.createGroup(compress ? "group_compressed" : "group");
+    h5features::details::write_properties(grouped, group, compress);
+    BOOST_CHECK_EQUAL(h5features::details::read_properties(group), grouped);
+
+    // properties stored as an encoded dataset
+    const std::string name = compress ? "encoded_compressed" : "encoded";
+    h5features::details::write_properties(h5features::details::encode_properties(props), root, name, compress);
+    BOOST_CHECK(file.getObjectType(name) == hdf5::ObjectType::Dataset);
+    const h5features::item item{"item", h5features::features{std::vector<double>{1, 2}, 1},
+                                h5features::times{std::vector<double>{0, 1}, h5features::times::format::simple},
+                                h5features::details::read_lazy_properties(root, name)};
+    BOOST_CHECK(item.has_properties());
+    BOOST_CHECK_EQUAL(item.properties(), props);
+  }
+}
+
+BOOST_AUTO_TEST_CASE(test_lazy) {
+  int calls = 0;
+  const auto props = generate_nested();
+  const h5features::item item{"item", h5features::features{std::vector<double>{1, 2}, 1},
+                              h5features::times{std::vector<double>{0, 1}, h5features::times::format::simple},
+                              h5features::item::lazy_properties{[&calls, &props]() {
+                                ++calls;
+                                return props;
+                              }}};
+
+  // decoded once, on the first access, and shared by the copies
+  BOOST_CHECK_EQUAL(calls, 0);
+  const auto copy = item;
+  BOOST_CHECK_EQUAL(copy.properties(), props);
+  BOOST_CHECK_EQUAL(item.properties(), props);
+  BOOST_CHECK_EQUAL(calls, 1);
+
+  // a decoding error is reported on access
+  const h5features::item bad{"item", h5features::features{std::vector<double>{1, 2}, 1},
+                             h5features::times{std::vector<double>{0, 1}, h5features::times::format::simple},
+                             h5features::item::lazy_properties{[]() -> h5features::properties {
+                               throw h5features::exception("invalid encoded properties");
+                             }}};
+  BOOST_CHECK_THROW(bad.properties(), h5features::exception);
+}
@@ -7,12 +7,18 @@
 
 #include "boost/test/data/test_case.hpp"
 #include "boost/test/unit_test.hpp"
+#include "h5features/chunking.h"
+#include "h5features/compression.h"
 #include "h5features/exception.h"
 #include "h5features/reader.h"
 #include "h5features/version.h"
 #include "h5features/writer.h"
+#include <future>
 #include <iostream>
+#include <optional>
 #include <string>
+#include <tuple>
+#include <utility>
 #include <vector>
 
 auto version_dataset =
@@ -155,3 +161,451 @@ BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_rw_partial, version_
     BOOST_CHECK_NO_THROW(item.validate());
   }
 }
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_read_many, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+
+  // several chunks per item, the last one being partial
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 10; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 300 + i, 5, vers > h5features::version::v1_1));
+  }
+
+  for (const bool compress : {true, false}) {
+    h5features::writer(filename, "group", true, compress, vers).write(items.begin(), items.end());
+    const h5features::reader reader(filename, "group");
+
+    for (const std::size_t workers : {0, 1, 4}) {
+      BOOST_CHECK_EQUAL(reader.read_all(false, workers), items);
+      BOOST_CHECK_EQUAL(reader.read_many({}, false, workers).size(), 0);
+
+      // items are returned in the requested order
+      const auto many = reader.read_many({"item7", "item2", "item7"}, false, workers);
+      BOOST_CHECK_EQUAL(many.size(), 3);
+      BOOST_CHECK_EQUAL(many[0], items[7]);
+      BOOST_CHECK_EQUAL(many[1], items[2]);
+      BOOST_CHECK_EQUAL(many[2], items[7]);
+
+      for (const auto &item : reader.read_many({"item3", "item5"}, true, workers)) {
+        BOOST_CHECK(not item.has_properties());
+      }
+
+      BOOST_CHECK_THROW(reader.read_many({"item1", "spam", "item2"}, false, workers), h5features::exception);
+    }
+  }
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_read_range, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 6; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 10 + i, 4, vers > h5features::version::v1_1));
+  }
+  h5features::writer(filename, "group", true, false, vers).write(items.begin(), items.end());
+  const h5features::reader reader(filename, "group");
+
+  BOOST_CHECK_EQUAL(reader.read_range(0, 6), items);
+  BOOST_CHECK_EQUAL(reader.read_range(2, 2).size(), 0);
+
+  const auto range = reader.read_range(1, 4);
+  BOOST_CHECK_EQUAL(range.size(), 3);
+  for (std::size_t i = 0; i < range.size(); ++i) {
+    BOOST_CHECK_EQUAL(range[i], items[i + 1]);
+  }
+
+  // items not contiguous on file, in reverse order and repeated
+  const auto many = reader.read_many({"item5", "item4", "item0", "item1", "item4"});
+  BOOST_CHECK_EQUAL(many.size(), 5);
+  BOOST_CHECK_EQUAL(many[0], items[5]);
+  BOOST_CHECK_EQUAL(many[1], items[4]);
+  BOOST_CHECK_EQUAL(many[2], items[0]);
+  BOOST_CHECK_EQUAL(many[3], items[1]);
+  BOOST_CHECK_EQUAL(many[4], items[4]);
+
+  BOOST_CHECK_THROW(reader.read_range(4, 2), h5features::exception);
+  BOOST_CHECK_THROW(reader.read_range(0, 7), h5features::exception);
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_read_async, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 10; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 50 + i, 3, false));
+  }
+  h5features::writer(filename, "group", true, true, vers).write(items.begin(), items.end());
+  const h5features::reader reader(filename, "group");
+
+  // the reads are submitted at once and executed in the background
+  std::vector<std::future<h5features::item>> futures;
+  for (const auto &item : items) {
+    futures.push_back(reader.read_item_async(item.name()));
+  }
+  auto partial = reader.read_item_async("item3", 5, 20);
+  auto missing = reader.read_item_async("spam");
+
+  for (std::size_t i = 0; i < items.size(); ++i) {
+    BOOST_CHECK_EQUAL(futures[i].get(), items[i]);
+  }
+  BOOST_CHECK_EQUAL(partial.get(), reader.read_item("item3", 5, 20));
+  BOOST_CHECK_THROW(missing.get(), h5features::exception);
+
+  // the reader can be destroyed before the read completes
+  std::future<h5features::item> orphan;
+  {
+    const h5features::reader other(filename, "group");
+    orphan = other.read_item_async("item1");
+  }
+  BOOST_CHECK_EQUAL(orphan.get(), items[1]);
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_read_concatenated, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 4; ++i) {
+    items.push_back(
+        utils::generate_item("item" + std::to_string(i), 20 + i, 3, false, h5features::times::format::interval));
+  }
+  h5features::writer(filename, "group", true, true, vers).write(items.begin(), items.end());
+  const h5features::reader reader(filename, "group");
+
+  const std::vector<std::size_t> order{2, 0, 3};
+  const auto layout = reader.prepare_concatenated({"item2", "item0", "item3"});
+  BOOST_CHECK_EQUAL(layout.names, (std::vector<std::string>{"item2", "item0", "item3"}));
+  BOOST_CHECK_EQUAL(layout.offsets, (std::vector<std::size_t>{0, 22, 42, 65}));
+  BOOST_CHECK_EQUAL(layout.frames(), 65);
+  BOOST_CHECK_EQUAL(layout.dim, 3);
+  BOOST_CHECK_EQUAL(layout.dtype, h5features::dtype::float64);
+  BOOST_CHECK_EQUAL(layout.times_dim, 2);
+
+  std::vector<double> features(65 * 3);
+  std::vector<double> times(65 * 2);
+  reader.read_concatenated(layout, {reinterpret_cast<std::byte *>(features.data()), features.size() * sizeof(double)},
+                           h5features::dtype::float64, {times.data(), times.size()});
+
+  // the features are converted on read
+  std::vector<float> features32(65 * 3);
+  reader.read_concatenated(layout,
+                           {reinterpret_cast<std::byte *>(features32.data()), features32.size() * sizeof(float)},
+                           h5features::dtype::float32, {times.data(), times.size()});
+
+  for (std::size_t i = 0; i < order.size(); ++i) {
+    const auto &item = items[order[i]];
+    const auto first = layout.offsets[i];
+    BOOST_CHECK_EQUAL(h5features::span<const double>(features.data() + first * 3, item.size() * 3),
+                      item.features().data());
+    BOOST_CHECK_EQUAL(h5features::span<const double>(times.data() + first * 2, item.size() * 2), item.times().data());
+    for (std::size_t j = 0; j < item.size() * 3; ++j) {
+      BOOST_CHECK_EQUAL(features32[first * 3 + j], static_cast<float>(item.features().data()[j]));
+    }
+  }
+
+  // empty concatenation
+  const auto empty = reader.prepare_concatenated({});
+  BOOST_CHECK_EQUAL(empty.frames(), 0);
+  BOOST_CHECK_NO_THROW(reader.read_concatenated(empty, {}, h5features::dtype::float64, {}));
+
+  BOOST_CHECK_THROW(reader.prepare_concatenated({"item0", "spam"}), h5features::exception);
+  BOOST_CHECK_THROW(reader.read_concatenated(layout, {reinterpret_cast<std::byte *>(features.data()), 8},
+                                             h5features::dtype::float64, {times.data(), times.size()}),
+                    h5features::exception);
+  BOOST_CHECK_THROW(reader.read_concatenated(
+                        layout, {reinterpret_cast<std::byte *>(features.data()), features.size() * sizeof(double)},
+                        h5features::dtype::float64, {times.data(), 2}),
+                    h5features::exception);
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_sizes, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 4; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 5 + i, 3, false));
+  }
+
+  std::vector<std::size_t> sizes;
+  std::vector<std::pair<double, double>> spans;
+  for (const auto &item : items) {
+    sizes.push_back(item.size());
+    spans.emplace_back(item.times().start(), item.times().stop());
+  }
+
+  for (const bool index : {false, true}) {
+    // the first items are indexed when opening the second writer
+    h5features::writer_options options;
+    options.overwrite = true;
+    options.version = vers;
+    h5features::writer(filename, "group", options).write(items.begin(), items.begin() + 2);
+    options.overwrite = false;
+    options.index = index;
+    h5features::writer(filename, "group", options).write(items.begin() + 2, items.end());
+
+    const h5features::reader reader(filename, "group");
+    BOOST_CHECK_EQUAL(reader.items(), (std::vector<std::string>{"item0", "item1", "item2", "item3"}));
+    BOOST_CHECK_EQUAL(reader.sizes(), sizes);
+    BOOST_CHECK_EQUAL(reader.dims(), std::vector<std::size_t>(4, 3));
+    BOOST_CHECK(reader.time_spans() == spans);
+    BOOST_CHECK_EQUAL(reader.read_all(), items);
+  }
+
+  // the spans of items with simple times
+  std::vector<h5features::item> simple;
+  for (std::size_t i = 0; i < 3; ++i) {
+    simple.push_back(
+        utils::generate_item("item" + std::to_string(i), 1 + 4 * i, 3, false, h5features::times::format::simple));
+  }
+  h5features::writer(filename, "simple", false, true, vers).write(simple.begin(), simple.end());
+  spans.clear();
+  for (const auto &item : simple) {
+    spans.emplace_back(item.times().start(), item.times().stop());
+  }
+  BOOST_CHECK(h5features::reader(filename, "simple").time_spans() == spans);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_index, utils::fixture::temp_directory) {
+  const std::string filename = (tmpdir / "test.h5").string();
+
+  std::vector<h5features::item> items;
+  for (const auto &name : {"b", "a", "c"}) {
+    items.push_back(utils::generate_item(name, 4, 2, false));
+  }
+
+  {
+    h5features::writer_options options;
+    options.overwrite = true;
+    options.index = true;
+    h5features::writer writer(filename, "group", options);
+    writer.write(items.begin(), items.end());
+    BOOST_CHECK_THROW(writer.write(utils::generate_item("__index__", 4, 2)), h5features::exception);
+
+    // the index is appended by batches, when the writer is flushed
+    const auto indexed = [&filename]() {
+      return hdf5::File(filename, hdf5::File::ReadOnly).getDataSet("group/__index__/names").getDimensions()[0];
+    };
+    BOOST_CHECK_EQUAL(indexed(), 0);
+    writer.flush();
+    BOOST_CHECK_EQUAL(indexed(), 3);
+  }
+
+  // the index is maintained even if not requested
+  h5features::writer(filename, "group").write(utils::generate_item("d", 7, 2));
+  {
+    const auto group = hdf5::File(filename, hdf5::File::ReadOnly).getGroup("group");
+    BOOST_CHECK(group.exist("__index__"));
+    BOOST_CHECK_EQUAL(group.getGroup("__index__").getDataSet("names").getDimensions()[0], 4);
+    BOOST_CHECK_EQUAL(group.getGroup("__index__").getDataSet("dims").getDimensions()[0], 4);
+  }
+
+  const std::vector<std::string> names{"a", "b", "c", "d"};
+  const std::vector<std::size_t> sizes{4, 4, 4, 7};
+  BOOST_CHECK_EQUAL(h5features::reader(filename, "group").items(), names);
+  BOOST_CHECK_EQUAL(h5features::reader(filename, "group").sizes(), sizes);
+  BOOST_CHECK_EQUAL(h5features::reader(filename, "group").dims(), std::vector<std::size_t>(4, 2));
+
+  // an index not consistent with the items is ignored
+  hdf5::File(filename, hdf5::File::ReadWrite).getGroup("group").unlink("c");
+  const h5features::reader reader(filename, "group");
+  BOOST_CHECK_EQUAL(reader.items(), (std::vector<std::string>{"a", "b", "d"}));
+  BOOST_CHECK_EQUAL(reader.sizes(), (std::vector<std::size_t>{4, 4, 7}));
+  BOOST_CHECK_EQUAL(reader.read_all().size(), 3);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_memory_map, utils::fixture::temp_directory) {
+  const std::string filename = (tmpdir / "test.h5").string();
+
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 3; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 500 + i, 7));
+  }
+
+  for (const bool compress : {false, true}) {
+    h5features::writer(filename, "group", true, compress).write(items.begin(), items.end());
+    const h5features::reader reader(filename, "group", true);
+
+    BOOST_CHECK_EQUAL(reader.read_all(), items);
+    BOOST_CHECK_EQUAL(reader.read_all(false, 2), items);
+    BOOST_CHECK_EQUAL(reader.read_item("item1", 1.0, 10.0),
+                      h5features::reader(filename, "group").read_item("item1", 1.0, 10.0));
+
+    // uncompressed data are viewed from the mapped file, not copied
+    const auto item1 = reader.read_item("item1");
+    const auto item2 = reader.read_item("item1");
+    BOOST_CHECK_EQUAL(item1.features().bytes().data() == item2.features().bytes().data(), not compress);
+    BOOST_CHECK_EQUAL(item1.times().data().data() == item2.times().data().data(), not compress);
+  }
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_partial_long, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+  const std::size_t size = 5000;
+
+  for (const auto format : {h5features::times::format::simple, h5features::times::format::interval}) {
+    const auto item = utils::generate_item("item", size, 2, false, format);
+    h5features::writer(filename, "group", true, true, vers).write(item);
+    const h5features::reader reader(filename, "group");
+
+    // the times of long items are indexed in version 2.0
+    if (vers == h5features::version::v2_0) {
+      const auto times = hdf5::File(filename, hdf5::File::ReadOnly).getGroup("group/item").getDataSet("times");
+      BOOST_CHECK(times.hasAttribute("index"));
+      BOOST_CHECK(times.hasAttribute("index_step"));
+    }
+
+    for (const auto &[start, stop] : std::vector<std::pair<double, double>>{{-10.0, 0.0},
+                                                                            {-10.0, 0.7},
+                                                                            {0.0, 0.1},
+                                                                            {0.2, 0.3},
+                                                                            {255.5, 256.2},
+                                                                            {256.0, 257.0},
+                                                                            {1023.9, 1800.0},
+                                                                            {4998.6, 4999.2},
+                                                                            {4999.2, 6000.0},
+                                                                            {-1.0, 6000.0}}) {
+      std::optional<h5features::item> expected;
+      try {
+        const auto indices = item.times().get_indices(start, stop);
+        expected.emplace("item",
+                         h5features::features{std::vector<double>(item.features().data().begin() + indices.first * 2,
+                                                                  item.features().data().begin() + indices.second * 2),
+                                              2},
+                         item.times().select(indices.first, indices.second));
+      } catch (const h5features::exception &) {
+      }
+
+      if (expected.has_value()) {
+        BOOST_CHECK_EQUAL(reader.read_item("item", start, stop), expected.value());
+      } else {
+        BOOST_CHECK_THROW(reader.read_item("item", start, stop), h5features::exception);
+      }
+    }
+  }
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_read_segments, version_dataset, vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+  {
+    h5features::writer writer(filename, "group", true, false, vers);
+    writer.write(utils::generate_item("item1", 5000, 3, false, h5features::times::format::interval));
+    writer.write(utils::generate_item("item2", 10, 3, true, h5features::times::format::interval));
+    writer.write(utils::generate_item("item3", 3000, 3, false, h5features::times::format::interval));
+  }
+
+  // overlapping, adjacent, disjoint and repeated segments over several items
+  const std::vector<std::tuple<std::string, double, double>> segments{
+      {"item1", 10.0, 20.0},     {"item2", 0.0, 5.0},      {"item1", 15.0, 30.0}, {"item1", 30.0, 40.0},
+      {"item1", 4000.0, 4500.0}, {"item3", 100.0, 2900.0}, {"item1", 10.0, 20.0}, {"item2", -1.0, 100.0},
+      {"item1", 0.0, 5000.0},    {"item3", 2998.5, 3001.0}};
+
+  for (const auto memory_map : {false, true}) {
+    const h5features::reader reader(filename, "group", memory_map);
+
+    const auto items = reader.read_segments(segments);
+    BOOST_REQUIRE_EQUAL(items.size(), segments.size());
+    for (std::size_t i = 0; i < segments.size(); ++i) {
+      const auto &[name, start, stop] = segments[i];
+      BOOST_CHECK_EQUAL(items[i], reader.read_item(name, start, stop));
+    }
+
+    // a single segment per item
+    const auto single = reader.read_segments({segments[0], segments[1]});
+    BOOST_CHECK_EQUAL(single[0], items[0]);
+    BOOST_CHECK_EQUAL(single[1], items[1]);
+
+    BOOST_CHECK(reader.read_segments({}).empty());
+    BOOST_CHECK_THROW(reader.read_segments({{"item1", 0.0, 1.0}, {"spam", 0.0, 1.0}}), h5features::exception);
+    BOOST_CHECK_THROW(reader.read_segments({{"item1", 0.0, 1.0}, {"item1", 6000.0, 7000.0}}), h5features::exception);
+    BOOST_CHECK_THROW(reader.read_segments({{"item2", 6000.0, 7000.0}}), h5features::exception);
+  }
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_stats,
+                       boost::unit_test::data::make({h5features::version::v1_2, h5features::version::v2_0}), vers) {
+  const std::string filename = (tmpdir / "test.h5").string();
+  std::vector<h5features::item> items;
+  std::size_t bytes = 0;
+  for (std::size_t i = 0; i < 4; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 50, 4, true));
+    bytes += items.back().features().bytes().size() + items.back().times().data().size() * sizeof(double);
+  }
+
+  {
+    // with compact properties, decoded on first access
+    h5features::writer_options options;
+    options.overwrite = true;
+    options.compact_properties = true;
+    options.version = vers;
+    h5features::writer writer(filename, "group", options);
+    BOOST_CHECK_EQUAL(writer.stats().bytes_written, 0);
+
+    std::size_t calls = 0;
+    writer.enable_stats([&calls](const h5features::stats &) { ++calls; });
+    writer.write(items.begin(), items.end(), 2);
+    writer.close();
+
+    const auto stats = writer.stats();
+    BOOST_CHECK_EQUAL(stats.bytes_written, bytes);
+    BOOST_CHECK_GT(stats.bytes_written_stored, 0);
+    BOOST_CHECK_EQUAL(stats.write_properties.count, items.size());
+    BOOST_CHECK_GT(stats.write_features.count, 0);
+    BOOST_CHECK_GT(stats.write_times.count, 0);
+    BOOST_CHECK_EQUAL(stats.read_features.count, 0);
+    BOOST_CHECK_EQUAL(calls, 2);
+    if (vers == h5features::version::v2_0) {
+      BOOST_CHECK_EQUAL(stats.compress.count, items.size());
+    }
+  }
+
+  h5features::reader reader(filename, "group");
+  BOOST_CHECK_EQUAL(reader.read_item("item0"), items[0]);
+  BOOST_CHECK_EQUAL(reader.stats().read_features.count, 0);
+
+  std::vector<h5features::stats> received;
+  reader.enable_stats([&received](const h5features::stats &stats) { received.push_back(stats); });
+  const auto item = reader.read_item("item0");
+  BOOST_CHECK_EQUAL(received.size(), 1);
+  BOOST_CHECK_EQUAL(received[0].read_features.count, 1);
+  BOOST_CHECK_EQUAL(received[0].read_times.count, 1);
+  BOOST_CHECK_EQUAL(received[0].read_properties.count, 1);
+  BOOST_CHECK_EQUAL(received[0].decode_properties.count, 0);
+  BOOST_CHECK_EQUAL(received[0].bytes_read, bytes / items.size());
+  BOOST_CHECK_GE(received[0].read_features.seconds, 0);
+
+  // the properties are decoded on first access, by any thread
+  BOOST_CHECK_EQUAL(item.properties(), items[0].properties());
+  BOOST_CHECK_EQUAL(reader.stats().decode_properties.count, 1);
+
+  // a nested operation is notified once
+  BOOST_CHECK(reader.read_all(false, 2) == items);
+  BOOST_CHECK_EQUAL(received.size(), 2);
+  BOOST_CHECK_EQUAL(reader.stats().bytes_read, bytes + bytes / items.size());
+  BOOST_CHECK_EQUAL(reader.stats().read_features.count, vers == h5features::version::v2_0 ? 5 : 2);
+  if (vers == h5features::version::v2_0) {
+    BOOST_CHECK_EQUAL(reader.stats().open_group.count, 5);
+    BOOST_CHECK_EQUAL(reader.stats().decompress.count, 4);
+  }
+  BOOST_CHECK_GE(reader.stats().cache_hit_rate, 0);
+  BOOST_CHECK_LE(reader.stats().cache_hit_rate, 1);
+
+  // partial reads
+  reader.reset_stats();
+  BOOST_CHECK_EQUAL(reader.stats().bytes_read, 0);
+  BOOST_CHECK_EQUAL(reader.stats().read_features.count, 0);
+  reader.read_item("item1", 10, 19.5, true);
+  BOOST_CHECK_EQUAL(reader.stats().read_properties.count, 0);
+  BOOST_CHECK_EQUAL(reader.stats().bytes_read,
+                    10 * 4 * sizeof(double) + (vers == h5features::version::v2_0 ? 50 : 10) * 2 * sizeof(double));
+
+  // a failing callback does not interrupt the read
+  reader.enable_stats([](const h5features::stats &) { throw h5features::exception("callback"); });
+  {
+    utils::capture_stream captured(std::cerr);
+    BOOST_CHECK_EQUAL(reader.read_item("item2"), items[2]);
+    BOOST_CHECK(captured.is_equal("WARNING h5features: statistics callback failed: callback\n", false));
+  }
+
+  reader.disable_stats();
+  reader.read_item("item2");
+  BOOST_CHECK_EQUAL(reader.stats().read_features.count, 0);
+}
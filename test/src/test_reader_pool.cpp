@@ -0,0 +1,110 @@
+#define BOOST_TEST_MODULE test_reader_pool
+
+#include "test_utils_data.h"
+#include "test_utils_ostream.h"
+#include "test_utils_tmpdir.h"
+
+#include "boost/test/unit_test.hpp"
+#include "h5features/exception.h"
+#include "h5features/reader.h"
+#include "h5features/reader_pool.h"
+#include "h5features/version.h"
+#include "h5features/writer.h"
+#include <string>
+#include <vector>
+
+#ifndef _WIN32
+#include <sys/wait.h>
+#include <unistd.h>
+#endif
+
+BOOST_AUTO_TEST_CASE(test_max_files) {
+  BOOST_CHECK_THROW(h5features::reader_pool(0), h5features::exception);
+  BOOST_CHECK_EQUAL(h5features::reader_pool().max_files(), 16);
+  BOOST_CHECK_EQUAL(h5features::reader_pool().open_files(), 0);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_get, utils::fixture::temp_directory) {
+  const auto file1 = (tmpdir / "test1.h5").string();
+  const auto file2 = (tmpdir / "test2.h5").string();
+  const auto item = utils::generate_item("item", 20, 3);
+  for (const auto &filename : {file1, file2}) {
+    h5features::writer(filename, "group1", true).write(item);
+    h5features::writer(filename, "group2", false, true, h5features::version::v1_2).write(item);
+  }
+
+  h5features::reader_pool pool{1};
+  const auto reader1 = pool.get(file1, "group1");
+  BOOST_CHECK_EQUAL(reader1->read_item("item"), item);
+  BOOST_CHECK_EQUAL(reader1->filename(), file1);
+  BOOST_CHECK_EQUAL(pool.open_files(), 1);
+
+  // the readers are shared, the groups of a file share the open file
+  BOOST_CHECK_EQUAL(pool.get(file1, "group1"), reader1);
+  BOOST_CHECK_EQUAL(pool.get((tmpdir / "." / "test1.h5").string(), "group1"), reader1);
+  const auto reader2 = pool.get(file1, "group2");
+  BOOST_CHECK_NE(reader2, reader1);
+  BOOST_CHECK_EQUAL(reader2->version(), h5features::version::v1_2);
+  BOOST_CHECK_EQUAL(reader2->read_item("item"), item);
+  BOOST_CHECK_EQUAL(pool.open_files(), 1);
+
+  // the first file is evicted, its readers remain valid
+  BOOST_CHECK_EQUAL(pool.get(file2, "group1")->read_item("item"), item);
+  BOOST_CHECK_EQUAL(pool.open_files(), 1);
+  BOOST_CHECK_EQUAL(reader1->read_item("item"), item);
+  BOOST_CHECK_NE(pool.get(file1, "group1"), reader1);
+
+  BOOST_CHECK_THROW(pool.get(file1, "missing"), h5features::exception);
+  BOOST_CHECK_THROW(pool.get((tmpdir / "missing.h5").string(), "group1"), h5features::exception);
+
+  pool.clear();
+  BOOST_CHECK_EQUAL(pool.open_files(), 0);
+  BOOST_CHECK_EQUAL(reader2->read_item("item"), item);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_lru, utils::fixture::temp_directory) {
+  std::vector<std::string> files;
+  for (const auto &name : {"a.h5", "b.h5", "c.h5"}) {
+    files.push_back((tmpdir / name).string());
+    h5features::writer(files.back(), "features", true).write(utils::generate_item("item", 5, 2));
+  }
+
+  h5features::reader_pool pool{2};
+  const auto a = pool.get(files[0]);
+  const auto b = pool.get(files[1]);
+
+  // a is used again, b is the least recently used and is evicted
+  BOOST_CHECK_EQUAL(pool.get(files[0]), a);
+  pool.get(files[2]);
+  BOOST_CHECK_EQUAL(pool.open_files(), 2);
+  BOOST_CHECK_EQUAL(pool.get(files[0]), a);
+  BOOST_CHECK_NE(pool.get(files[1]), b);
+}
+
+#ifndef _WIN32
+BOOST_FIXTURE_TEST_CASE(test_fork, utils::fixture::temp_directory) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const auto item = utils::generate_item("item", 20, 3);
+  h5features::writer(filename, "features", true).write(item);
+
+  h5features::reader_pool pool;
+  const auto reader = pool.get(filename);
+  BOOST_CHECK_EQUAL(reader->read_item("item"), item);
+
+  const pid_t pid = fork();
+  if (pid == 0) {
+    // in the child process the file is reopened
+    const auto child_reader = pool.get(filename);
+    const bool success = child_reader != reader and child_reader->read_item("item") == item;
+    _exit(success ? 0 : 1);
+  }
+
+  int status = 0;
+  BOOST_REQUIRE_EQUAL(waitpid(pid, &status, 0), pid);
+  BOOST_CHECK(WIFEXITED(status));
+  BOOST_CHECK_EQUAL(WEXITSTATUS(status), 0);
+
+  // the parent process still uses the open file
+  BOOST_CHECK_EQUAL(pool.get(filename), reader);
+}
+#endif
@@ -0,0 +1,230 @@
+#define BOOST_TEST_MODULE test_repack
+
+#include "test_utils_data.h"
+#include "test_utils_ostream.h"
+#include "test_utils_tmpdir.h"
+
+#include "boost/test/data/test_case.hpp"
+#include "boost/test/unit_test.hpp"
+#include "h5features/compression.h"
+#include "h5features/exception.h"
+#include "h5features/hdf5.h"
+#include "h5features/reader.h"
+#include "h5features/repack.h"
+#include "h5features/version.h"
+#include "h5features/writer.h"
+#include <cstddef>
+#include <string>
+#include <utility>
+#include <vector>
+
+auto version_dataset = boost::unit_test::data::make({h5features::version::v1_2, h5features::version::v2_0});
+
+std::vector<h5features::item> generate_items(std::size_t count) {
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < count; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 10 + i, 4));
+  }
+  return items;
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_repack, version_dataset *version_dataset, source_version,
+                       destination_version) {
+  const auto source = (tmpdir / "source.h5").string();
+  const auto destination = (tmpdir / "destination.h5").string();
+  const auto items = generate_items(10);
+  h5features::writer(source, "group", true, false, source_version).write(items.begin(), items.end());
+
+  h5features::repack_options options;
+  options.group = "repacked";
+  options.version = destination_version;
+  options.batch_items = 3;
+  options.workers = 2;
+  std::vector<std::pair<std::size_t, std::size_t>> progress;
+  options.progress = [&](std::size_t done, std::size_t total) { progress.emplace_back(done, total); };
+
+  const auto summary = h5features::repack(source, destination, "group", options);
+  BOOST_CHECK_EQUAL(summary.written, 10);
+  BOOST_CHECK_EQUAL(summary.skipped, 0);
+  BOOST_CHECK_EQUAL(summary.verified, 10);
+  BOOST_CHECK_EQUAL(progress.size(), 4);
+  BOOST_CHECK_EQUAL(progress.front().first, 3);
+  BOOST_CHECK_EQUAL(progress.back().first, 10);
+  BOOST_CHECK_EQUAL(progress.back().second, 10);
+
+  const h5features::reader reader{destination, "repacked"};
+  BOOST_CHECK_EQUAL(reader.version(), destination_version);
+  BOOST_CHECK_EQUAL(reader.read_all().size(), 10);
+  for (const auto &item : items) {
+    BOOST_CHECK_EQUAL(reader.read_item(item.name()), item);
+  }
+}
+
+BOOST_FIXTURE_TEST_CASE(test_repack_dtype, utils::fixture::temp_directory) {
+  const auto source = (tmpdir / "source.h5").string();
+  const auto destination = (tmpdir / "destination.h5").string();
+  const auto item = utils::generate_item("item", 20, 3);
+  h5features::writer(source, "features", true).write(item);
+
+  h5features::repack_options options;
+  options.dtype = h5features::dtype::float32;
+  options.compression = h5features::compression{h5features::compression::codec::none};
+  BOOST_CHECK_EQUAL(h5features::repack(source, destination, "features", options).verified, 1);
+
+  const auto repacked = h5features::reader(destination, "features").read_item("item");
+  BOOST_CHECK_EQUAL(repacked.features().get_dtype(), h5features::dtype::float32);
+  const auto expected = item.features().data();
+  const auto actual = repacked.features().data<float>();
+  BOOST_REQUIRE_EQUAL(actual.size(), expected.size());
+  for (std::size_t i = 0; i < expected.size(); ++i) {
+    BOOST_CHECK_EQUAL(actual[i], static_cast<float>(expected[i]));
+  }
+  BOOST_CHECK_EQUAL(repacked.times(), item.times());
+  BOOST_CHECK_EQUAL(repacked.properties(), item.properties());
+}
+
+BOOST_FIXTURE_TEST_CASE(test_repack_resume, utils::fixture::temp_directory) {
+  const auto source = (tmpdir / "source.h5").string();
+  const auto destination = (tmpdir / "destination.h5").string();
+  const auto items = generate_items(10);
+  h5features::writer(source, "features", true, true, h5features::version::v1_2).write(items.begin(), items.end());
+
+  // an interrupted repack wrote the first items only
+  h5features::writer(destination, "features", true).write(items.begin(), items.begin() + 4);
+
+  h5features::repack_options options;
+  options.resume = true;
+  options.batch_items = 4;
+  auto summary = h5features::repack(source, destination, "features", options);
+  BOOST_CHECK_EQUAL(summary.written, 6);
+  BOOST_CHECK_EQUAL(summary.skipped, 4);
+  BOOST_CHECK_EQUAL(summary.verified, 10);
+  BOOST_CHECK_EQUAL(h5features::reader(destination, "features").read_all().size(), 10);
+
+  // nothing left to write, the skipped items are checked even without verification
+  options.verify = false;
+  summary = h5features::repack(source, destination, "features", options);
+  BOOST_CHECK_EQUAL(summary.written, 0);
+  BOOST_CHECK_EQUAL(summary.skipped, 10);
+  BOOST_CHECK_EQUAL(summary.verified, 10);
+
+  // without resume the items already written are rejected
+  options.resume = false;
+  BOOST_CHECK_THROW(h5features::repack(source, destination, "features", options), h5features::exception);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_repack_resume_interrupted, utils::fixture::temp_directory) {
+  const auto source = (tmpdir / "source.h5").string();
+  const auto destination = (tmpdir / "destination.h5").string();
+  const auto items = generate_items(10);
+  h5features::writer(source, "features", true).write(items.begin(), items.end());
+
+  // an interrupted repack wrote the first items and created the next one only
+  h5features::writer_options writer_options;
+  writer_options.overwrite = true;
+  writer_options.index = true;
+  h5features::writer(destination, "features", writer_options).write(items.begin(), items.begin() + 4);
+  {
+    hdf5::File file(destination, hdf5::File::ReadWrite);
+    file.getGroup("features").createGroup("item4").createDataSet<double>("times", hdf5::DataSpace({14}));
+  }
+
+  // the incomplete item is written again, even without verification
+  h5features::repack_options options;
+  options.resume = true;
+  options.verify = false;
+  options.index = true;
+  const auto summary = h5features::repack(source, destination, "features", options);
+  BOOST_CHECK_EQUAL(summary.written, 6);
+  BOOST_CHECK_EQUAL(summary.skipped, 4);
+  BOOST_CHECK_EQUAL(summary.verified, 4);
+
+  const h5features::reader reader{destination, "features"};
+  BOOST_CHECK_EQUAL(reader.read_all(), items);
+  BOOST_CHECK_EQUAL(reader.sizes().size(), 10);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_repack_v1_1, utils::fixture::temp_directory) {
+  const auto source = (tmpdir / "source.h5").string();
+  const auto destination = (tmpdir / "destination.h5").string();
+  const auto items = generate_items(10);
+  h5features::writer(source, "features", true).write(items.begin(), items.end());
+
+  // version 1.1 drops the properties, the items are verified without them
+  h5features::writer_options writer_options;
+  writer_options.overwrite = true;
+  writer_options.version = h5features::version::v1_1;
+  h5features::writer(destination, "features", writer_options).write(items.begin(), items.begin() + 4);
+
+  h5features::repack_options options;
+  options.resume = true;
+  options.version = h5features::version::v1_1;
+  const auto summary = h5features::repack(source, destination, "features", options);
+  BOOST_CHECK_EQUAL(summary.written, 6);
+  BOOST_CHECK_EQUAL(summary.skipped, 4);
+  BOOST_CHECK_EQUAL(summary.verified, 10);
+
+  const auto written = h5features::reader(destination, "features").read_all();
+  BOOST_REQUIRE_EQUAL(written.size(), 10);
+  for (std::size_t i = 0; i < items.size(); ++i) {
+    BOOST_CHECK(written[i].properties().size() == 0);
+    BOOST_CHECK_EQUAL(h5features::details::checksum(written[i], false), h5features::details::checksum(items[i], false));
+  }
+}
+
+BOOST_FIXTURE_TEST_CASE(test_repack_mismatch, utils::fixture::temp_directory) {
+  const auto source = (tmpdir / "source.h5").string();
+  const auto destination = (tmpdir / "destination.h5").string();
+  const auto items = generate_items(3);
+  h5features::writer(source, "features", true).write(items.begin(), items.end());
+
+  // the destination has another version of an item, detected when verifying
+  h5features::writer(destination, "features", true).write(utils::generate_item("item0", 10, 4));
+
+  h5features::repack_options options;
+  options.resume = true;
+  BOOST_CHECK_THROW(h5features::repack(source, destination, "features", options), h5features::exception);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_repack_errors, utils::fixture::temp_directory) {
+  const auto source = (tmpdir / "source.h5").string();
+  h5features::writer(source, "features", true).write(utils::generate_item("item", 10, 2));
+
+  BOOST_CHECK_THROW(h5features::repack(source, source), h5features::exception);
+  BOOST_CHECK_THROW(h5features::repack(source, (tmpdir / "." / "source.h5").string()), h5features::exception);
+  BOOST_CHECK_THROW(h5features::repack(source, (tmpdir / "other.h5").string(), "missing"), h5features::exception);
+
+  h5features::repack_options options;
+  options.batch_items = 0;
+  BOOST_CHECK_THROW(h5features::repack(source, (tmpdir / "other.h5").string(), "features", options),
+                    h5features::exception);
+
+  options.batch_items = 1;
+  options.resume = true;
+  options.overwrite = true;
+  BOOST_CHECK_THROW(h5features::repack(source, (tmpdir / "other.h5").string(), "features", options),
+                    h5features::exception);
+}
+
+BOOST_AUTO_TEST_CASE(test_checksum) {
+  const auto item = utils::generate_item("item", 10, 3);
+  BOOST_CHECK_EQUAL(h5features::details::checksum(item), h5features::details::checksum(item));
+
+  // the properties are hashed whatever the order of their entries
+  h5features::properties first;
+  first.set<int>("a", 1);
+  first.set<std::string>("b", "b");
+  h5features::properties second;
+  second.set<std::string>("b", "b");
+  second.set<int>("a", 1);
+  BOOST_CHECK_EQUAL(h5features::details::checksum({"item", item.features(), item.times(), first}),
+                    h5features::details::checksum({"item", item.features(), item.times(), second}));
+
+  second.set<int>("a", 2);
+  BOOST_CHECK_NE(h5features::details::checksum({"item", item.features(), item.times(), first}),
+                 h5features::details::checksum({"item", item.features(), item.times(), second}));
+  BOOST_CHECK_NE(h5features::details::checksum(item),
+                 h5features::details::checksum({"other", item.features(), item.times(), item.properties()}));
+  BOOST_CHECK_NE(h5features::details::checksum(item),
+                 h5features::details::checksum({"item", item.features(), item.times()}));
+}
@@ -0,0 +1,191 @@
+#define BOOST_TEST_MODULE test_sharded
+
+#include "test_utils_data.h"
+#include "test_utils_ostream.h"
+#include "test_utils_tmpdir.h"
+
+#include "boost/test/data/test_case.hpp"
+#include "boost/test/unit_test.hpp"
+#include "h5features/details/manifest.h"
+#include "h5features/exception.h"
+#include "h5features/reader.h"
+#include "h5features/sharded_reader.h"
+#include "h5features/sharded_writer.h"
+#include "h5features/version.h"
+#include <cstddef>
+#include <fstream>
+#include <string>
+#include <vector>
+
+auto version_dataset = boost::unit_test::data::make({h5features::version::v1_2, h5features::version::v2_0});
+
+std::vector<h5features::item> generate_items(std::size_t count, const std::string &prefix = "item") {
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < count; ++i) {
+    items.push_back(utils::generate_item(prefix + std::to_string(i), 10, 4));
+  }
+  return items;
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_max_items, version_dataset, version) {
+  const auto items = generate_items(10);
+  {
+    h5features::writer_options options;
+    options.version = version;
+    h5features::sharded_writer writer{tmpdir.string(), "group", 4, 0, 0, options};
+    writer.write(items.begin(), items.begin() + 5);
+    writer.write(items[5]);
+    writer.write(items.begin() + 6, items.end());
+    BOOST_CHECK_EQUAL(writer.shards().size(), 3);
+    BOOST_CHECK(not writer.closed());
+  }
+
+  const h5features::sharded_reader reader{tmpdir.string(), "group"};
+  BOOST_CHECK_EQUAL(reader.shards().size(), 3);
+  BOOST_CHECK_EQUAL(reader.items().size(), 10);
+  BOOST_CHECK_EQUAL(reader.shard("item0"), h5features::details::shard_name(0, 0));
+  BOOST_CHECK_EQUAL(reader.shard("item9"), h5features::details::shard_name(0, 2));
+  BOOST_CHECK_EQUAL(h5features::reader((tmpdir / reader.shard("item4")).string(), "group").items().size(), 4);
+
+  for (const auto &item : items) {
+    BOOST_CHECK_EQUAL(reader.read_item(item.name()), item);
+  }
+  const auto all = reader.read_all(false, 2);
+  BOOST_REQUIRE_EQUAL(all.size(), items.size());
+  for (std::size_t i = 0; i < items.size(); ++i) {
+    BOOST_CHECK_EQUAL(all[i], items[i]);
+  }
+
+  const auto many = reader.read_many({"item9", "item0", "item5"});
+  BOOST_CHECK_EQUAL(many[0], items[9]);
+  BOOST_CHECK_EQUAL(many[1], items[0]);
+  BOOST_CHECK_EQUAL(many[2], items[5]);
+
+  const auto partial = reader.read_item("item3", 2.0, 5.0);
+  BOOST_CHECK_EQUAL(
+      partial, h5features::reader((tmpdir / reader.shard("item3")).string(), "group").read_item("item3", 2.0, 5.0));
+
+  BOOST_CHECK_THROW(reader.read_item("unknown"), h5features::exception);
+  BOOST_CHECK_THROW(reader.shard("unknown"), h5features::exception);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_max_bytes, utils::fixture::temp_directory) {
+  // each item has 10 frames of 4 doubles and 10 intervals
+  const auto items = generate_items(5);
+  const std::size_t bytes = 10 * 4 * sizeof(double) + 10 * 2 * sizeof(double);
+  {
+    h5features::sharded_writer writer{tmpdir.string(), "features", 0, 2 * bytes};
+    writer.write(items.begin(), items.end());
+    BOOST_CHECK_EQUAL(writer.shards().size(), 3);
+  }
+  {
+    // a single item larger than the limit goes to its own shard
+    h5features::writer_options options;
+    options.overwrite = true;
+    h5features::sharded_writer writer{tmpdir.string(), "features", 0, 1, 0, options};
+    writer.write(items.begin(), items.end());
+    BOOST_CHECK_EQUAL(writer.shards().size(), 5);
+  }
+  BOOST_CHECK_EQUAL(h5features::details::list_shards(tmpdir.string(), 0).size(), 5);
+  BOOST_CHECK_EQUAL(h5features::sharded_reader(tmpdir.string()).read_all().size(), 5);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_ranks, utils::fixture::temp_directory) {
+  const auto first = generate_items(3, "first");
+  const auto second = generate_items(4, "second");
+  {
+    // two writers of different ranks write at once
+    h5features::sharded_writer writer0{tmpdir.string(), "features", 2, 0, 0};
+    h5features::sharded_writer writer1{tmpdir.string(), "features", 2, 0, 1};
+    for (std::size_t i = 0; i < 4; ++i) {
+      if (i < first.size()) {
+        writer0.write(first[i]);
+      }
+      writer1.write(second[i]);
+    }
+    BOOST_CHECK_EQUAL(writer1.rank(), 1);
+  }
+  BOOST_CHECK_EQUAL(h5features::details::list_manifests(tmpdir.string()).size(), 2);
+
+  const h5features::sharded_reader reader{tmpdir.string()};
+  BOOST_CHECK_EQUAL(reader.shards().size(), 4);
+  const std::vector<std::string> expected{"first0", "first1", "first2", "second0", "second1", "second2", "second3"};
+  BOOST_CHECK_EQUAL(reader.items(), expected);
+  BOOST_CHECK_EQUAL(reader.read_item("second3"), second[3]);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_append, utils::fixture::temp_directory) {
+  const auto items = generate_items(4);
+  {
+    h5features::sharded_writer writer{tmpdir.string()};
+    writer.write(items[0]);
+    writer.write(items[1]);
+  }
+  {
+    h5features::sharded_writer writer{tmpdir.string()};
+    BOOST_CHECK_THROW(writer.write(items[0]), h5features::exception);
+    writer.write(items[2]);
+    writer.write(items[3]);
+    BOOST_CHECK_EQUAL(writer.shards(), std::vector<std::string>{h5features::details::shard_name(0, 1)});
+  }
+  BOOST_CHECK_EQUAL(h5features::sharded_reader(tmpdir.string()).items().size(), 4);
+
+  {
+    h5features::writer_options options;
+    options.overwrite = true;
+    h5features::sharded_writer writer{tmpdir.string(), "features", 0, 0, 0, options};
+    writer.write(items[0]);
+  }
+  BOOST_CHECK_EQUAL(h5features::details::list_shards(tmpdir.string(), 0).size(), 1);
+  BOOST_CHECK_EQUAL(h5features::sharded_reader(tmpdir.string()).items(), std::vector<std::string>{"item0"});
+}
+
+BOOST_FIXTURE_TEST_CASE(test_rejected_batch, utils::fixture::temp_directory) {
+  const auto items = generate_items(3);
+  {
+    h5features::sharded_writer writer{tmpdir.string()};
+    writer.write(items[0]);
+
+    // a batch with an item already written or given twice is rejected as a whole
+    const std::vector<h5features::item> written{items[1], items[2], items[0]};
+    BOOST_CHECK_THROW(writer.write(written.begin(), written.end()), h5features::exception);
+    const std::vector<h5features::item> twice{items[1], items[1]};
+    BOOST_CHECK_THROW(writer.write(twice.begin(), twice.end()), h5features::exception);
+
+    writer.write(items[1]);
+    writer.write(items[2]);
+    BOOST_CHECK_EQUAL(writer.shards().size(), 1);
+  }
+
+  BOOST_CHECK_EQUAL(h5features::details::list_shards(tmpdir.string(), 0).size(), 1);
+  BOOST_CHECK_EQUAL(h5features::sharded_reader(tmpdir.string()).read_all(), items);
+}
+
+BOOST_FIXTURE_TEST_CASE(test_errors, utils::fixture::temp_directory) {
+  BOOST_CHECK_THROW(h5features::sharded_reader(tmpdir.string()), h5features::exception);
+
+  h5features::sharded_writer writer{tmpdir.string()};
+  const auto item = utils::generate_item("item", 10, 4);
+  writer.write(item);
+  BOOST_CHECK_THROW(writer.write(item), h5features::exception);
+  BOOST_CHECK_THROW(writer.write(utils::generate_item("a\tb", 10, 4)), h5features::exception);
+  BOOST_CHECK_THROW(writer.write(utils::generate_item("a\nb", 10, 4)), h5features::exception);
+
+  // the items of the current shard are in the manifest once it is closed
+  BOOST_CHECK(h5features::details::list_manifests(tmpdir.string()).empty());
+  writer.close();
+  writer.close();
+  BOOST_CHECK(writer.closed());
+  BOOST_CHECK_THROW(writer.write(utils::generate_item("other", 10, 4)), h5features::exception);
+  BOOST_CHECK_EQUAL(
+      h5features::details::read_manifest((tmpdir / h5features::details::manifest_name(0)).string()).size(), 1);
+
+  // an item in several shards
+  h5features::details::append_manifest((tmpdir / h5features::details::manifest_name(1)).string(),
+                                       {{"item", h5features::details::shard_name(1, 0)}});
+  BOOST_CHECK_THROW(h5features::sharded_reader(tmpdir.string()), h5features::exception);
+
+  // an invalid manifest
+  std::ofstream((tmpdir / h5features::details::manifest_name(1)).string()) << "invalid\n";
+  BOOST_CHECK_THROW(h5features::sharded_reader(tmpdir.string()), h5features::exception);
+}
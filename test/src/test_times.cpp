@@ -6,6 +6,8 @@
 #include "boost/test/unit_test.hpp"
 #include "h5features/exception.h"
 #include "h5features/times.h"
+#include <memory>
+#include <optional>
 #include <string>
 #include <utility>
 #include <vector>
@@ -91,6 +93,18 @@ BOOST_AUTO_TEST_CASE(test_ctor) {
   BOOST_CHECK(t2 != t3);
 }
 
+BOOST_AUTO_TEST_CASE(test_borrow) {
+  const auto buffer = std::make_shared<const std::vector<double>>(std::vector<double>{0, 2, 1, 3});
+  const h5features::times t1{*buffer, h5features::times::format::interval, buffer};
+  BOOST_CHECK_EQUAL(t1.size(), 2);
+  BOOST_CHECK_EQUAL(t1.data().data(), buffer->data());
+  BOOST_CHECK(t1 == h5features::times(*buffer, h5features::times::format::interval));
+
+  BOOST_CHECK_EXCEPTION(
+      h5features::times(*buffer, h5features::times::format::simple, buffer), h5features::exception,
+      [&](const auto &e) { return std::string(e.what()) == "timestamps must be sorted in increasing order"; });
+}
+
 BOOST_AUTO_TEST_CASE(test_assign_operator) {
   const h5features::times t1{{0, 1, 2, 2, 3, 3}, h5features::times::format::simple};
 
@@ -205,3 +219,21 @@ BOOST_AUTO_TEST_CASE(test_select_interval) {
     BOOST_CHECK_EQUAL(t2, t);
   }
 }
+
+BOOST_AUTO_TEST_CASE(test_select_shared) {
+  const h5features::times t{{0, 1, 2, 3, 4, 5}, {2, 3, 4, 5, 6, 7}};
+
+  // the selected times are a view on the same buffer
+  const auto t2 = t.select(2, 4);
+  BOOST_CHECK_EQUAL(t2.data().data(), t.data().data() + 4);
+  BOOST_CHECK_EQUAL(t2.select(1, 2).data().data(), t.data().data() + 6);
+
+  // and keep it alive
+  std::optional<h5features::times> t3;
+  {
+    const h5features::times t4({0, 1, 2, 3}, h5features::times::format::simple);
+    t3.emplace(t4.select(1, 3));
+  }
+  BOOST_CHECK_EQUAL(t3->data()[0], 1);
+  BOOST_CHECK_EQUAL(t3->data()[1], 2);
+}
@@ -8,8 +8,13 @@
 #include "boost/test/data/test_case.hpp"
 #include "boost/test/unit_test.hpp"
 #include "h5features/exception.h"
+#include "h5features/reader.h"
 #include "h5features/version.h"
 #include "h5features/writer.h"
+#include <algorithm>
+#include <cstdint>
+#include <string>
+#include <vector>
 
 auto version_dataset =
     boost::unit_test::data::make({h5features::version::v1_1, h5features::version::v1_2, h5features::version::v2_0});
@@ -203,3 +208,275 @@ BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_version, version_dat
     BOOST_CHECK_NO_THROW(h5features::writer(filename, "group", true));
   }
 }
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_write_many, version_dataset, vers) {
+  const auto filename = (tmpdir / "test.h5").string();
+
+  // several chunks per item, the last one being partial
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 10; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 300 + i, 5, vers > h5features::version::v1_1));
+  }
+
+  for (const bool compress : {true, false}) {
+    for (const std::size_t workers : {0, 1, 4}) {
+      h5features::writer(filename, "group", true, compress, vers).write(items.begin(), items.end(), workers);
+      BOOST_CHECK_EQUAL(h5features::reader(filename, "group").read_all(), items);
+    }
+  }
+
+  // the items preceding a failing one are written
+  const std::vector<h5features::item> duplicated{items[0], items[1], items[0], items[2]};
+  for (const std::size_t workers : {1, 4}) {
+    BOOST_CHECK_THROW(
+        h5features::writer(filename, "group", true, true, vers).write(duplicated.begin(), duplicated.end(), workers),
+        h5features::exception);
+    BOOST_CHECK_EQUAL(h5features::reader(filename, "group").items(), std::vector<std::string>({"item0", "item1"}));
+  }
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_write_concatenated, version_dataset, vers) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const bool properties = vers > h5features::version::v1_1;
+
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 6; ++i) {
+    items.push_back(
+        utils::generate_item("item" + std::to_string(i), 20 + i, 4, properties, h5features::times::format::interval));
+  }
+
+  // concatenate the items 1 to 4
+  std::vector<std::string> names;
+  std::vector<double> features;
+  std::vector<double> times;
+  std::vector<std::size_t> offsets{0};
+  std::vector<h5features::properties> props;
+  for (std::size_t i = 1; i < 5; ++i) {
+    names.push_back(items[i].name());
+    features.insert(features.end(), items[i].features().data().begin(), items[i].features().data().end());
+    times.insert(times.end(), items[i].times().data().begin(), items[i].times().data().end());
+    offsets.push_back(offsets.back() + items[i].size());
+    props.push_back(items[i].properties());
+  }
+  const h5features::features cfeatures{features, 4};
+  const h5features::times ctimes{times, h5features::times::format::interval, false};
+
+  // the concatenated items are written in order with the other ones
+  {
+    h5features::writer writer(filename, "group", true, true, vers);
+    writer.write(items[0]);
+    writer.write_concatenated(names, cfeatures, ctimes, offsets, props, 2);
+    writer.write(items[5]);
+    writer.write_concatenated({}, {std::vector<double>{}, 4, false},
+                              {std::vector<double>{}, h5features::times::format::interval, false}, {0});
+  }
+  {
+    const h5features::reader reader(filename, "group");
+    BOOST_CHECK_EQUAL(reader.read_all(), items);
+    BOOST_CHECK_EQUAL(reader.sizes(), (std::vector<std::size_t>{20, 21, 22, 23, 24, 25}));
+  }
+
+  // without properties
+  {
+    h5features::writer writer(filename, "group", true, true, vers);
+    writer.write_concatenated(names, cfeatures, ctimes, offsets);
+  }
+  {
+    const auto item = h5features::reader(filename, "group").read_item("item2");
+    BOOST_CHECK(not item.has_properties());
+    BOOST_CHECK_EQUAL(item.features(), items[2].features());
+    BOOST_CHECK_EQUAL(item.times(), items[2].times());
+  }
+
+  // invalid concatenations
+  h5features::writer writer(filename, "group", true, true, vers);
+  const auto check_throw = [&](const std::vector<std::string> &n, const std::vector<std::size_t> &o,
+                               const std::vector<h5features::properties> &p = {}) {
+    BOOST_CHECK_THROW(writer.write_concatenated(n, cfeatures, ctimes, o, p), h5features::exception);
+  };
+  check_throw(names, {0, 20, 41});
+  check_throw(names, {1, 21, 43, 66, 90});
+  check_throw(names, {0, 21, 43, 66, 89});
+  check_throw(names, {0, 21, 21, 66, 90});
+  check_throw({"a", "", "c", "d"}, offsets);
+  check_throw(names, offsets, {props[0]});
+  check_throw(names, {0, 21, 42, 66, 90}); // the times of item2 overlap item3
+  BOOST_CHECK_THROW(writer.write_concatenated(names, cfeatures,
+                                              {std::vector<double>(2 * 89), h5features::times::format::interval, false},
+                                              offsets),
+                    h5features::exception);
+
+  // no item is written when one cannot be written in the group
+  check_throw({"item1", "item2", "item1", "item4"}, offsets);
+  writer.write(items[3]);
+  check_throw(names, offsets);
+  writer.close();
+  BOOST_CHECK_EQUAL(h5features::reader(filename, "group").items(), std::vector<std::string>{"item3"});
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_write_dtype, version_dataset, vers) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const auto times = utils::generate_times(300);
+  const auto values = utils::generate_vector(300 * 4);
+
+  // 0x3c00 is 1.0 and 0x3555 is about 1/3 in half precision
+  std::vector<std::uint16_t> halfs(300 * 4, 0x3c00);
+  std::fill_n(halfs.begin(), 100, 0x3555);
+
+  const std::vector<h5features::item> items{{"float64", {values, 4}, times},
+                                            {"float32", {std::vector<float>(values.begin(), values.end()), 4}, times},
+                                            {"float16", {halfs, 4}, times}};
+
+  for (const bool compress : {true, false}) {
+    for (const auto &item : items) {
+      h5features::writer(filename, item.name(), true, compress, vers).write(item);
+
+      const h5features::reader reader(filename, item.name());
+      BOOST_CHECK_EQUAL(reader.read_item(item.name()), item);
+      BOOST_CHECK_EQUAL(reader.read_item(item.name()).features().get_dtype(), item.features().get_dtype());
+      BOOST_CHECK_EQUAL(reader.read_all(false, 2)[0], item);
+
+      const auto partial = reader.read_item(item.name(), 10, 20);
+      BOOST_CHECK_EQUAL(partial.features().get_dtype(), item.features().get_dtype());
+      BOOST_CHECK(partial.features().bytes().size() ==
+                  partial.size() * 4 * h5features::size_of(item.features().get_dtype()));
+    }
+  }
+
+  // in v1, all the features share a single dataset of the first item's dtype
+  if (vers != h5features::version::v2_0) {
+    const std::vector<h5features::item> mixed{items[1], {"other", {values, 4}, times}};
+    {
+      h5features::writer writer(filename, "mixed", true, true, vers);
+      writer.write(items[1]);
+      BOOST_CHECK_THROW(writer.write(mixed[1]), h5features::exception);
+      BOOST_CHECK_THROW(writer.write(mixed.begin() + 1, mixed.end()), h5features::exception);
+    }
+    BOOST_CHECK_EQUAL(h5features::reader(filename, "mixed").items(), std::vector<std::string>{"float32"});
+
+    // also when appending to an existing group
+    h5features::writer writer(filename, "mixed", false, true, vers);
+    BOOST_CHECK_THROW(writer.write(mixed[1]), h5features::exception);
+    writer.write({"other", {std::vector<float>(values.begin(), values.end()), 4}, times});
+  }
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_compact_properties,
+                       boost::unit_test::data::make({h5features::version::v1_2, h5features::version::v2_0}), vers) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const auto item = utils::generate_item("item", 30, 4, true);
+  const h5features::item item2{"item2", item.features(), item.times()};
+
+  for (const bool compact : {true, false}) {
+    {
+      h5features::writer_options options;
+      options.overwrite = true;
+      options.compact_properties = compact;
+      options.version = vers;
+      h5features::writer writer(filename, "group", options);
+      writer.write(item);
+      writer.write(item2);
+    }
+
+    // the compact properties are a dataset, properties groups otherwise
+    {
+      hdf5::File file(filename, hdf5::File::ReadOnly);
+      const auto path = vers == h5features::version::v2_0 ? "group/item/properties" : "group/properties/item";
+      BOOST_CHECK((file.getObjectType(path) == hdf5::ObjectType::Dataset) == compact);
+    }
+
+    const h5features::reader reader(filename, "group");
+    BOOST_CHECK_EQUAL(reader.read_item("item"), item);
+    BOOST_CHECK_EQUAL(reader.read_item("item", 2, 10).properties(), item.properties());
+    BOOST_CHECK(not reader.read_item("item2").has_properties());
+    BOOST_CHECK(not reader.read_item("item", true).has_properties());
+    BOOST_CHECK_EQUAL(reader.read_all()[0], item);
+  }
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_flush_close, version_dataset, vers) {
+  const auto filename = (tmpdir / "test.h5").string();
+
+  // more items than buffered by the v1 writers
+  std::vector<h5features::item> items;
+  std::size_t frames = 0;
+  for (std::size_t i = 0; i < 5000; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 1 + i % 7, 3, false));
+    frames += items.back().size();
+  }
+
+  h5features::writer writer(filename, "group", true, true, vers);
+  writer.write(items.begin(), items.begin() + 4000);
+  writer.flush();
+  BOOST_CHECK_EQUAL(h5features::reader(filename, "group").items().size(), 4000);
+
+  writer.write(items.begin() + 4000, items.end());
+  BOOST_CHECK(not writer.closed());
+  writer.close();
+  BOOST_CHECK(writer.closed());
+  BOOST_CHECK_NO_THROW(writer.close());
+  BOOST_CHECK_EQUAL(writer.version(), vers);
+  BOOST_CHECK_THROW(writer.write(items[0]), h5features::exception);
+  BOOST_CHECK_THROW(writer.flush(), h5features::exception);
+
+  // the v1 datasets are trimmed to their actual size
+  if (vers != h5features::version::v2_0) {
+    hdf5::File file(filename, hdf5::File::ReadOnly);
+    BOOST_CHECK_EQUAL(file.getDataSet("group/index").getDimensions()[0], items.size());
+    BOOST_CHECK_EQUAL(file.getDataSet("group/items").getDimensions()[0], items.size());
+    BOOST_CHECK_EQUAL(file.getDataSet("group/features").getDimensions()[0], frames);
+    BOOST_CHECK_EQUAL(file.getDataSet("group/labels").getDimensions()[0], frames);
+  }
+
+  // append to the closed group, the items are written on destruction
+  const auto last = utils::generate_item("last", 10, 3, false);
+  {
+    h5features::writer appender(filename, "group", false, true, vers);
+    BOOST_CHECK_THROW(appender.write(items[10]), h5features::exception);
+    appender.write(last);
+  }
+
+  const h5features::reader reader(filename, "group");
+  BOOST_CHECK_EQUAL(reader.items().size(), items.size() + 1);
+  for (const auto i : {0, 1, 4095, 4096, 4999}) {
+    BOOST_CHECK_EQUAL(reader.read_item(items[i].name()), items[i]);
+  }
+  BOOST_CHECK_EQUAL(reader.read_item("last"), last);
+}
+
+BOOST_DATA_TEST_CASE_F(utils::fixture::temp_directory, test_not_closed,
+                       boost::unit_test::data::make({h5features::version::v1_1, h5features::version::v1_2}), vers) {
+  const auto filename = (tmpdir / "test.h5").string();
+  const bool properties = vers > h5features::version::v1_1;
+  std::vector<h5features::item> items;
+  for (std::size_t i = 0; i < 4; ++i) {
+    items.push_back(utils::generate_item("item" + std::to_string(i), 10 + i, 3, properties));
+  }
+
+  // the properties are buffered with the items
+  {
+    h5features::writer writer(filename, "group", true, true, vers);
+    writer.write(items.begin(), items.begin() + 3);
+    BOOST_CHECK(not hdf5::File(filename, hdf5::File::ReadOnly).exist("group/properties"));
+    writer.flush();
+    BOOST_CHECK_EQUAL(hdf5::File(filename, hdf5::File::ReadOnly).exist("group/properties"), properties);
+  }
+
+  // a writer not closed leaves the datasets larger than their content
+  {
+    hdf5::File file(filename, hdf5::File::ReadWrite);
+    for (const auto &name : {"index", "items"}) {
+      file.getDataSet(std::string("group/") + name).resize({16});
+    }
+    for (const auto &name : {"features", "labels"}) {
+      auto dataset = file.getDataSet(std::string("group/") + name);
+      dataset.resize({100, dataset.getDimensions()[1]});
+    }
+  }
+  BOOST_CHECK_EQUAL(h5features::reader(filename, "group").items().size(), 3);
+
+  h5features::writer(filename, "group", false, true, vers).write(items[3]);
+  const h5features::reader reader(filename, "group");
+  BOOST_CHECK_EQUAL(reader.read_all(), items);
+  BOOST_CHECK_EQUAL(reader.sizes(), (std::vector<std::size_t>{10, 11, 12, 13}));
+}
@@ -5,6 +5,7 @@
 #include "h5features/features.h"
 #include "h5features/item.h"
 #include "h5features/properties.h"
+#include "h5features/span.h"
 #include "h5features/times.h"
 #include "h5features/writer.h"
 #include <iostream>
@@ -89,4 +90,10 @@ std::ostream &boost_test_print_type(std::ostream &ostr, const h5features::writer
 
 } // namespace std
 
+namespace h5features {
+template <class T> std::ostream &boost_test_print_type(std::ostream &ostr, const h5features::span<T> &v) {
+  return std::boost_test_print_type(ostr, v.to_vector());
+}
+} // namespace h5features
+
 #endif // H5FEATURES_TEST_UTILS_OSTREAM_HPP